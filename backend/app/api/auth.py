@@ -35,6 +35,7 @@ from app.auth_utils import (
     ALGORITHM,
 )
 from app.config import settings
+from app.services import session_cache
 from app.services.error_logger import log_error
 import logging
 
@@ -520,9 +521,11 @@ async def refresh_token(
                         UserSession.is_active.is_(True),
                     ).values(is_active=False)
                 )
+                session_cache.revoke_on_commit(db, user_id=user_id)
                 raise HTTPException(status_code=401, detail="Refresh token has been revoked")
             # Invalidate the old session
             old_session.is_active = False
+            session_cache.revoke_on_commit(db, jti=old_session.token_jti)
 
         jti = _generate_jti()
         refresh_jti = _generate_jti()
@@ -559,6 +562,7 @@ async def logout(
             UserSession.is_active.is_(True),
         ).values(is_active=False)
     )
+    session_cache.revoke_on_commit(db, user_id=current_user.id)
     db.add(AuditLog(
         entity_type="auth", entity_id=current_user.id, action="logout",
         user_id=current_user.id,
@@ -645,6 +649,7 @@ async def revoke_session(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     session.is_active = False
+    session_cache.revoke_on_commit(db, jti=session.token_jti)
     return {"status": "ok", "message": "Session revoked"}
 
 
@@ -677,6 +682,7 @@ async def change_password(
                 UserSession.is_active.is_(True),
             ).values(is_active=False)
         )
+        session_cache.revoke_on_commit(db, user_id=current_user.id)
 
         db.add(AuditLog(
             entity_type="auth", entity_id=current_user.id, action="password_changed",
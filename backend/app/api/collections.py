@@ -10,12 +10,18 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.services.whatsapp_notifier import send_whatsapp_message
 from app.services.error_logger import log_error
+from app.services.collections_queue import (
+    InvalidCursor,
+    QueueFilters,
+    QueueSort,
+    fetch_queue_page,
+)
 from app.services.collections_engine import (
     sync_collection_cases,
     compute_next_best_action,
@@ -24,6 +30,8 @@ from app.services.collections_engine import (
     calculate_settlement,
     check_ptp_status,
     generate_daily_snapshot,
+    apply_latest_ptp,
+    refresh_case_ptp,
     get_collections_analytics,
     get_agent_performance,
 )
@@ -47,9 +55,9 @@ def _ev(v):
 
 
 from app.models.user import User, UserRole
-from app.models.loan import LoanApplication, LoanStatus, ApplicantProfile
+from app.models.loan import LoanApplication, ApplicantProfile
 from app.models.audit import AuditLog
-from app.models.payment import Payment, PaymentSchedule, ScheduleStatus, PaymentStatus
+from app.models.payment import Payment, PaymentSchedule, PaymentStatus
 from app.models.collection import (
     CollectionRecord, CollectionChannel, CollectionOutcome,
     CollectionChat, ChatDirection, ChatMessageStatus,
@@ -63,6 +71,7 @@ from app.models.collections_ext import (
     SettlementOffer, SettlementOfferType, SettlementStatus,
     ComplianceRule, SLAConfig,
     CollectionsDashboardSnapshot,
+    propensity_estimate,
 )
 from app.schemas import (
     CollectionRecordCreate,
@@ -70,6 +79,7 @@ from app.schemas import (
     CollectionChatCreate,
     CollectionChatResponse,
     CollectionQueueEntry,
+    CollectionQueuePage,
     CollectionCaseResponse,
     CollectionCaseUpdate,
     NBAOverrideRequest,
@@ -94,6 +104,9 @@ router = APIRouter()
 STAFF_ROLES = (UserRole.JUNIOR_UNDERWRITER, UserRole.SENIOR_UNDERWRITER, UserRole.ADMIN)
 SENIOR_ROLES = (UserRole.SENIOR_UNDERWRITER, UserRole.ADMIN)
 
+EXPORT_PAGE_SIZE = 1000
+EXPORT_MAX_ROWS = 10000
+
 # Simulated auto-reply messages
 AUTO_REPLIES = [
     "Thank you for reaching out. I'll review my account and get back to you.",
@@ -109,7 +122,7 @@ AUTO_REPLIES = [
 # Enhanced Queue
 # ══════════════════════════════════════════════════════════════════════════
 
-@router.get("/queue", response_model=list[CollectionQueueEntry])
+@router.get("/queue", response_model=CollectionQueuePage)
 async def get_collection_queue(
     search: Optional[str] = Query(None, description="Search by name, reference, phone, employer"),
     stage: Optional[str] = Query(None, description="Filter by delinquency stage"),
@@ -124,327 +137,36 @@ async def get_collection_queue(
     sort_by: str = Query("priority_score", description="Sort field"),
     sort_dir: str = Query("desc", description="Sort direction: asc or desc"),
     limit: int = Query(200, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Ignored when a cursor is given"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     current_user: User = Depends(require_roles(*STAFF_ROLES)),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get overdue loans needing collection action — enhanced with search, filters, and NBA."""
+    """Get overdue loans needing collection action — enhanced with search, filters, and NBA.
+
+    Filtering, sorting and paging run in SQL over the collection cases;
+    follow ``next_cursor`` for the next page.
+    """
     try:
-        # Get disbursed loans with profile info
-        query = (
-            select(LoanApplication, User.first_name, User.last_name, User.phone)
-            .join(User, LoanApplication.applicant_id == User.id)
-            .where(LoanApplication.status == LoanStatus.DISBURSED)
+        filters = QueueFilters(
+            search=search, stage=stage, status=status, agent_id=agent_id,
+            ptp_status=ptp_status, nba_action=nba_action, sector=sector,
+            propensity_band=propensity_band, sla_status=sla_status, product_type=product_type,
         )
-
-        # Apply search filter
-        if search:
-            search_pattern = f"%{search}%"
-            query = query.where(
-                or_(
-                    (User.first_name + " " + User.last_name).ilike(search_pattern),
-                    LoanApplication.reference_number.ilike(search_pattern),
-                    User.phone.ilike(search_pattern),
-                    User.email.ilike(search_pattern),
-                )
-            )
-
-        result = await db.execute(query.order_by(LoanApplication.decided_at.asc()))
-        rows = result.all()
-        app_ids = [r[0].id for r in rows]
-        applicant_ids = list({r[0].applicant_id for r in rows})
-
-        case_map: dict[int, CollectionCase] = {}
-        if app_ids:
-            case_result = await db.execute(
-                select(CollectionCase).where(CollectionCase.loan_application_id.in_(app_ids))
-            )
-            case_map = {c.loan_application_id: c for c in case_result.scalars().all()}
-
-        schedule_map: dict[int, list[PaymentSchedule]] = {}
-        if app_ids:
-            sched_result = await db.execute(
-                select(PaymentSchedule)
-                .where(PaymentSchedule.loan_application_id.in_(app_ids))
-                .order_by(PaymentSchedule.loan_application_id, PaymentSchedule.installment_number)
-            )
-            for s in sched_result.scalars().all():
-                schedule_map.setdefault(s.loan_application_id, []).append(s)
-
-        latest_record_map: dict[int, CollectionRecord] = {}
-        if app_ids:
-            record_result = await db.execute(
-                select(CollectionRecord)
-                .where(CollectionRecord.loan_application_id.in_(app_ids))
-                .order_by(CollectionRecord.loan_application_id, CollectionRecord.created_at.desc())
-            )
-            for rec in record_result.scalars().all():
-                if rec.loan_application_id not in latest_record_map:
-                    latest_record_map[rec.loan_application_id] = rec
-
-        profile_map: dict[int, ApplicantProfile] = {}
-        if applicant_ids:
-            profile_result = await db.execute(
-                select(ApplicantProfile).where(ApplicantProfile.user_id.in_(applicant_ids))
-            )
-            profile_map = {p.user_id: p for p in profile_result.scalars().all()}
-
-        agent_name_map: dict[int, str] = {}
-        agent_ids = {c.assigned_agent_id for c in case_map.values() if c.assigned_agent_id}
-        if agent_ids:
-            agent_result = await db.execute(
-                select(User.id, User.first_name, User.last_name).where(User.id.in_(agent_ids))
-            )
-            for uid, fn, ln in agent_result.all():
-                full_name = f"{fn or ''} {ln or ''}".strip()
-                agent_name_map[uid] = full_name or f"Agent {uid}"
-
-        latest_ptp_map: dict[int, PromiseToPay] = {}
-        case_ids = [c.id for c in case_map.values()]
-        if case_ids:
-            ptp_result = await db.execute(
-                select(PromiseToPay)
-                .where(PromiseToPay.collection_case_id.in_(case_ids))
-                .order_by(PromiseToPay.collection_case_id, PromiseToPay.created_at.desc())
+        try:
+            page = await fetch_queue_page(
+                db, filters, QueueSort.parse(sort_by, sort_dir),
+                limit=limit, cursor=cursor, offset=offset,
             )
-            for ptp in ptp_result.scalars().all():
-                if ptp.collection_case_id not in latest_ptp_map:
-                    latest_ptp_map[ptp.collection_case_id] = ptp
-
-        entries = []
-        today = date.today()
-        now = datetime.now(timezone.utc)
-        sector_risk_cache: dict[str, str | None] = {}
-
-        for row in rows:
-            app = row[0]
-            first_name = row[1]
-            last_name = row[2]
-            phone = row[3]
-
-            # Calculate overdue info from payment schedule
-            schedules = schedule_map.get(app.id, [])
-
-            total_due = 0
-            days_past_due = 0
-            total_paid = 0
-            outstanding = float(app.amount_approved or app.amount_requested)
-
-            for s in schedules:
-                total_paid += float(s.amount_paid)
-                if s.status in (ScheduleStatus.OVERDUE, ScheduleStatus.DUE) or (
-                    s.due_date <= today and s.status != ScheduleStatus.PAID
-                ):
-                    overdue_amount = float(s.amount_due) - float(s.amount_paid)
-                    if overdue_amount > 0:
-                        total_due += overdue_amount
-                        dpd = (today - s.due_date).days
-                        if dpd > days_past_due:
-                            days_past_due = dpd
-
-            outstanding = outstanding - total_paid
-
-            # Get preloaded CollectionCase if exists
-            case = case_map.get(app.id)
-
-            # If schedule data is stale/mutated, preserve known delinquency from case metadata.
-            if case:
-                case_dpd = int(case.dpd or 0)
-                case_overdue = float(case.total_overdue or 0)
-                days_past_due = max(days_past_due, case_dpd)
-                total_due = max(total_due, case_overdue)
-                if outstanding < total_due:
-                    outstanding = total_due
-
-            if days_past_due <= 0 and total_due <= 0:
-                continue  # Not overdue
-
-            # Apply stage filter
-            if stage and case:
-                if _ev(case.delinquency_stage) != stage:
-                    continue
-            elif stage and not case:
-                continue
-
-            # Apply status filter
-            if status and case:
-                if _ev(case.status) != status:
-                    continue
-            elif status and not case:
-                continue
-
-            # Apply agent filter
-            if agent_id is not None and case:
-                if case.assigned_agent_id != agent_id:
-                    continue
-            elif agent_id is not None and not case:
-                continue
-
-            # NBA action filter
-            if nba_action and case:
-                if case.next_best_action != nba_action:
-                    continue
-            elif nba_action and not case:
-                continue
-
-            # Product type filter
-            if product_type:
-                loan_purpose = app.purpose.value if hasattr(app.purpose, "value") else str(app.purpose) if app.purpose else None
-                if loan_purpose != product_type:
-                    continue
-
-            # Last contact with details
-            last = latest_record_map.get(app.id)
-            last_contact = last.created_at if last else None
-            next_action = last.next_action_date if last else None
-            last_contact_channel = (last.channel.value if last and hasattr(last.channel, "value") else str(last.channel) if last and last.channel else None)
-            last_contact_outcome = (last.outcome.value if last and hasattr(last.outcome, "value") else str(last.outcome) if last and last.outcome else None)
-
-            # Agent name
-            agent_name = None
-            if case and case.assigned_agent_id:
-                agent_name = agent_name_map.get(case.assigned_agent_id)
-
-            # Profile data for sector/employer
-            profile = profile_map.get(app.applicant_id)
-            employer_name = profile.employer_name if profile else None
-            employer_sector = profile.employer_sector if profile else None
-
-            # Sector filter
-            if sector and employer_sector:
-                if employer_sector.lower() != sector.lower():
-                    continue
-            elif sector and not employer_sector:
-                continue
-
-            # Sector risk rating
-            sector_risk_rating = None
-            if employer_sector:
-                cache_key = employer_sector.lower()
-                if cache_key not in sector_risk_cache:
-                    sr = await _get_sector_risk(employer_sector, db)
-                    sector_risk_cache[cache_key] = sr.get("risk_rating")
-                sector_risk_rating = sector_risk_cache.get(cache_key)
-
-            # PTP status
-            ptp_data = {"status": None, "amount": None, "date": None}
-            if case:
-                latest_ptp = latest_ptp_map.get(case.id)
-                if latest_ptp:
-                    ptp_data = {
-                        "status": _ev(latest_ptp.status),
-                        "amount": float(latest_ptp.amount_promised),
-                        "date": latest_ptp.promise_date,
-                    }
-
-            # PTP status filter
-            if ptp_status:
-                if ptp_status == "none" and ptp_data["status"] is not None:
-                    continue
-                elif ptp_status != "none" and ptp_data["status"] != ptp_status:
-                    continue
-
-            # SLA info
-            sla_deadline_val = None
-            sla_hours_remaining_val = None
-            if case:
-                sla_deadline_val = case.sla_next_contact_deadline or case.sla_first_contact_deadline
-                if sla_deadline_val:
-                    delta = (sla_deadline_val - now).total_seconds() / 3600
-                    sla_hours_remaining_val = round(delta, 1)
-
-            # SLA status filter
-            if sla_status and sla_hours_remaining_val is not None:
-                if sla_status == "breached" and sla_hours_remaining_val > 0:
-                    continue
-                if sla_status == "approaching" and (sla_hours_remaining_val <= 0 or sla_hours_remaining_val > 4):
-                    continue
-            elif sla_status and sla_hours_remaining_val is None:
-                continue
-
-            # Simple propensity estimate for queue (lightweight)
-            prop_score = 50
-            if days_past_due <= 15:
-                prop_score = 70
-            elif days_past_due <= 30:
-                prop_score = 60
-            elif days_past_due <= 60:
-                prop_score = 40
-            elif days_past_due <= 90:
-                prop_score = 25
-            else:
-                prop_score = 15
-            # Adjust by PTP history
-            if ptp_data["status"] == "kept":
-                prop_score = min(100, prop_score + 15)
-            elif ptp_data["status"] == "broken":
-                prop_score = max(0, prop_score - 15)
-
-            prop_trend = "stable"
-            if days_past_due <= 30 and ptp_data["status"] == "kept":
-                prop_trend = "improving"
-            elif days_past_due > 60:
-                prop_trend = "declining"
-
-            # Propensity band filter
-            if propensity_band:
-                band = "high" if prop_score >= 65 else "medium" if prop_score >= 35 else "low"
-                if band != propensity_band:
-                    continue
-
-            loan_purpose = app.purpose.value if hasattr(app.purpose, "value") else str(app.purpose) if app.purpose else None
-
-            entries.append(CollectionQueueEntry(
-                id=app.id,
-                reference_number=app.reference_number,
-                applicant_id=app.applicant_id,
-                applicant_name=f"{first_name} {last_name}",
-                amount_approved=float(app.amount_approved) if app.amount_approved else None,
-                amount_due=total_due,
-                days_past_due=days_past_due,
-                last_contact=last_contact,
-                next_action=next_action,
-                total_paid=total_paid,
-                outstanding_balance=max(outstanding, 0),
-                phone=phone,
-                # Case fields
-                case_id=case.id if case else None,
-                case_status=_ev(case.status) if case else None,
-                delinquency_stage=_ev(case.delinquency_stage) if case else None,
-                assigned_agent_id=case.assigned_agent_id if case else None,
-                assigned_agent_name=agent_name,
-                next_best_action=case.next_best_action if case else None,
-                nba_confidence=case.nba_confidence if case else None,
-                nba_reasoning=case.nba_reasoning if case else None,
-                dispute_active=case.dispute_active if case else False,
-                vulnerability_flag=case.vulnerability_flag if case else False,
-                do_not_contact=case.do_not_contact if case else False,
-                hardship_flag=case.hardship_flag if case else False,
-                priority_score=case.priority_score if case else 0,
-                # New enhanced fields
-                employer_name=employer_name,
-                sector=employer_sector,
-                sector_risk_rating=sector_risk_rating,
-                product_type=loan_purpose,
-                ptp_status=ptp_data["status"],
-                ptp_amount=ptp_data["amount"],
-                ptp_date=ptp_data["date"],
-                last_contact_channel=last_contact_channel,
-                last_contact_outcome=last_contact_outcome,
-                sla_deadline=sla_deadline_val,
-                sla_hours_remaining=sla_hours_remaining_val,
-                propensity_score=prop_score,
-                propensity_trend=prop_trend,
-            ))
-
-        # Sort
-        reverse = sort_dir.lower() == "desc"
-        valid_sorts = {"days_past_due", "amount_due", "outstanding_balance", "priority_score", "propensity_score", "sla_hours_remaining"}
-        sort_key = sort_by if sort_by in valid_sorts else "priority_score"
-        entries.sort(key=lambda x: getattr(x, sort_key, 0) or 0, reverse=reverse)
-
-        # Pagination
-        return entries[offset:offset + limit]
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return CollectionQueuePage(
+            items=await _queue_entries(db, page.rows),
+            total=page.total,
+            total_is_estimate=page.total_is_estimate,
+            next_cursor=page.next_cursor,
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -452,6 +174,108 @@ async def get_collection_queue(
         raise
 
 
+async def _queue_entries(db: AsyncSession, rows) -> list[CollectionQueueEntry]:
+    """Build queue entries for one page of ``fetch_queue_page`` rows."""
+    loan_ids = [r[1].id for r in rows]
+
+    latest_record_map: dict[int, CollectionRecord] = {}
+    if loan_ids:
+        record_result = await db.execute(
+            select(CollectionRecord)
+            .where(CollectionRecord.loan_application_id.in_(loan_ids))
+            .order_by(CollectionRecord.loan_application_id, CollectionRecord.created_at.desc())
+        )
+        for rec in record_result.scalars().all():
+            if rec.loan_application_id not in latest_record_map:
+                latest_record_map[rec.loan_application_id] = rec
+
+    agent_name_map: dict[int, str] = {}
+    agent_ids = {r[0].assigned_agent_id for r in rows if r[0].assigned_agent_id}
+    if agent_ids:
+        agent_result = await db.execute(
+            select(User.id, User.first_name, User.last_name).where(User.id.in_(agent_ids))
+        )
+        for uid, fn, ln in agent_result.all():
+            full_name = f"{fn or ''} {ln or ''}".strip()
+            agent_name_map[uid] = full_name or f"Agent {uid}"
+
+    entries = []
+    now = datetime.now(timezone.utc)
+    sector_risk_cache: dict[str, str | None] = {}
+
+    for case, app, first_name, last_name, phone, employer_name, employer_sector, total_paid, *_ in rows:
+        # Last contact with details
+        last = latest_record_map.get(app.id)
+        last_contact = last.created_at if last else None
+        next_action = last.next_action_date if last else None
+        last_contact_channel = (last.channel.value if last and hasattr(last.channel, "value") else str(last.channel) if last and last.channel else None)
+        last_contact_outcome = (last.outcome.value if last and hasattr(last.outcome, "value") else str(last.outcome) if last and last.outcome else None)
+
+        # Sector risk rating
+        sector_risk_rating = None
+        if employer_sector:
+            cache_key = employer_sector.lower()
+            if cache_key not in sector_risk_cache:
+                sr = await _get_sector_risk(employer_sector, db)
+                sector_risk_cache[cache_key] = sr.get("risk_rating")
+            sector_risk_rating = sector_risk_cache.get(cache_key)
+
+        # SLA info
+        sla_deadline_val = case.sla_next_contact_deadline or case.sla_first_contact_deadline
+        sla_hours_remaining_val = None
+        if sla_deadline_val:
+            sla_hours_remaining_val = round((sla_deadline_val - now).total_seconds() / 3600, 1)
+
+        days_past_due = int(case.dpd or 0)
+        prop_score = case.propensity_score
+        _, prop_trend = propensity_estimate(days_past_due, case.latest_ptp_status)
+        loan_purpose = app.purpose.value if hasattr(app.purpose, "value") else str(app.purpose) if app.purpose else None
+
+        entries.append(CollectionQueueEntry(
+            id=app.id,
+            reference_number=app.reference_number,
+            applicant_id=app.applicant_id,
+            applicant_name=f"{first_name} {last_name}",
+            amount_approved=float(app.amount_approved) if app.amount_approved else None,
+            amount_due=float(case.total_overdue or 0),
+            days_past_due=days_past_due,
+            last_contact=last_contact,
+            next_action=next_action,
+            total_paid=float(total_paid or 0),
+            outstanding_balance=max(float(case.outstanding_balance or 0), 0),
+            phone=phone,
+            # Case fields
+            case_id=case.id,
+            case_status=_ev(case.status),
+            delinquency_stage=_ev(case.delinquency_stage),
+            assigned_agent_id=case.assigned_agent_id,
+            assigned_agent_name=agent_name_map.get(case.assigned_agent_id) if case.assigned_agent_id else None,
+            next_best_action=case.next_best_action,
+            nba_confidence=case.nba_confidence,
+            nba_reasoning=case.nba_reasoning,
+            dispute_active=case.dispute_active,
+            vulnerability_flag=case.vulnerability_flag,
+            do_not_contact=case.do_not_contact,
+            hardship_flag=case.hardship_flag,
+            priority_score=case.priority_score,
+            # New enhanced fields
+            employer_name=employer_name,
+            sector=employer_sector,
+            sector_risk_rating=sector_risk_rating,
+            product_type=loan_purpose,
+            ptp_status=case.latest_ptp_status,
+            ptp_amount=float(case.latest_ptp_amount) if case.latest_ptp_amount is not None else None,
+            ptp_date=case.latest_ptp_date,
+            last_contact_channel=last_contact_channel,
+            last_contact_outcome=last_contact_outcome,
+            sla_deadline=sla_deadline_val,
+            sla_hours_remaining=sla_hours_remaining_val,
+            propensity_score=prop_score,
+            propensity_trend=prop_trend,
+        ))
+    return entries
+
+
 # ══════════════════════════════════════════════════════════════════════════
 # Collection Cases CRUD
 # ══════════════════════════════════════════════════════════════════════════
@@ -1153,6 +977,7 @@ async def create_ptp(
         db.add(ptp)
         await db.flush()
         await db.refresh(ptp)
+        apply_latest_ptp(c, ptp)
 
         return PromiseToPayResponse(
             id=ptp.id,
@@ -1242,6 +1067,8 @@ async def update_ptp(
             ptp.notes = data.notes
 
         await db.flush()
+        if data.status:
+            await refresh_case_ptp(db, [ptp.collection_case_id])
 
         # Re-fetch with agent name
         agent_result = await db.execute(
@@ -1629,11 +1456,17 @@ async def export_queue_csv(
 ):
     """Export collection queue to CSV."""
     try:
-        entries = await get_collection_queue(
-            search=None, stage=None, status=None, agent_id=None,
-            sort_by="days_past_due", sort_dir="desc", limit=10000, offset=0,
-            current_user=current_user, db=db,
-        )
+        entries: list[CollectionQueueEntry] = []
+        sort = QueueSort.parse("days_past_due", "desc")
+        cursor = None
+        while len(entries) < EXPORT_MAX_ROWS:
+            page = await fetch_queue_page(
+                db, QueueFilters(), sort, limit=EXPORT_PAGE_SIZE, cursor=cursor, with_total=False,
+            )
+            entries.extend(await _queue_entries(db, page.rows))
+            cursor = page.next_cursor
+            if not cursor:
+                break
 
         output = io.StringIO()
         writer = csv.writer(output)
@@ -45,8 +45,12 @@ async def list_error_logs(
     user: User = Depends(require_roles(*ADMIN_ROLES)),
     db: AsyncSession = Depends(get_db),
 ):
-    """List error logs with filtering and pagination."""
-    q = select(ErrorLog).order_by(desc(ErrorLog.created_at))
+    """List error logs with filtering and pagination.
+
+    Each row aggregates repeats of one error within an hour
+    (``occurrence_count``); rows are ordered by when they were last seen.
+    """
+    q = select(ErrorLog).order_by(desc(ErrorLog.last_seen_at))
 
     if severity:
         q = q.where(ErrorLog.severity == ErrorSeverity(severity))
@@ -89,16 +93,17 @@ async def error_stats(
     user: User = Depends(require_roles(*ADMIN_ROLES)),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get error statistics for the dashboard."""
+    """Get error statistics for the dashboard (occurrences, not rows)."""
     from datetime import timedelta
 
     since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    occurrences = func.coalesce(func.sum(ErrorLog.occurrence_count), 0)
 
     # Counts by severity
     severity_q = await db.execute(
         select(
             ErrorLog.severity,
-            func.count(ErrorLog.id),
+            occurrences,
         )
         .where(ErrorLog.created_at >= since)
         .group_by(ErrorLog.severity)
@@ -107,13 +112,13 @@ async def error_stats(
 
     # Total unresolved
     unresolved_q = await db.execute(
-        select(func.count(ErrorLog.id)).where(ErrorLog.resolved == False)
+        select(occurrences).where(ErrorLog.resolved == False)
     )
     unresolved = unresolved_q.scalar() or 0
 
     # Total in period
     total_q = await db.execute(
-        select(func.count(ErrorLog.id)).where(ErrorLog.created_at >= since)
+        select(occurrences).where(ErrorLog.created_at >= since)
     )
     total_in_period = total_q.scalar() or 0
 
@@ -121,7 +126,7 @@ async def error_stats(
     top_types_q = await db.execute(
         select(
             ErrorLog.error_type,
-            func.count(ErrorLog.id).label("cnt"),
+            occurrences.label("cnt"),
         )
         .where(ErrorLog.created_at >= since)
         .group_by(ErrorLog.error_type)
@@ -134,7 +139,7 @@ async def error_stats(
     top_paths_q = await db.execute(
         select(
             ErrorLog.request_path,
-            func.count(ErrorLog.id).label("cnt"),
+            occurrences.label("cnt"),
         )
         .where(ErrorLog.created_at >= since, ErrorLog.request_path.isnot(None))
         .group_by(ErrorLog.request_path)
@@ -147,7 +152,7 @@ async def error_stats(
     hourly_q = await db.execute(
         select(
             func.date_trunc("hour", ErrorLog.created_at).label("hour"),
-            func.count(ErrorLog.id).label("cnt"),
+            occurrences.label("cnt"),
         )
         .where(ErrorLog.created_at >= since)
         .group_by("hour")
@@ -290,6 +295,8 @@ def _log_to_dict(log: ErrorLog, *, include_traceback: bool = True) -> dict:
         "error_type": log.error_type,
         "message": _safe_text(log.message, max_len=2000),
         "traceback": _safe_text(log.traceback, max_len=10000) if include_traceback else None,
+        "fingerprint": log.fingerprint,
+        "occurrence_count": log.occurrence_count,
         "module": _safe_text(log.module, max_len=300),
         "function_name": _safe_text(log.function_name, max_len=200),
         "line_number": log.line_number,
@@ -306,4 +313,5 @@ def _log_to_dict(log: ErrorLog, *, include_traceback: bool = True) -> dict:
         "resolved_at": log.resolved_at.isoformat() if log.resolved_at else None,
         "resolution_notes": _safe_text(log.resolution_notes, max_len=5000),
         "created_at": log.created_at.isoformat() if log.created_at else None,
+        "last_seen_at": log.last_seen_at.isoformat() if log.last_seen_at else None,
     }
@@ -33,8 +33,10 @@ from app.models.gl import (
     PeriodStatus,
 )
 from app.services.gl import journal_engine, coa_service, period_service, mapping_engine
-from app.services.gl import export_service, reports_service
+from app.services.gl import accrual_service
+from app.services.gl import export_service, reports_service, balance_engine, period_balances
 from app.services.gl import anomaly_detector, classifier, nl_query, forecasting, reconciliation
+from app.services import file_storage, report_jobs
 from app.services.error_logger import log_error
 
 logger = logging.getLogger(__name__)
@@ -911,21 +913,16 @@ async def get_trial_balance(
     try:
         d = date.fromisoformat(as_of_date) if as_of_date else None
 
-        accounts = await db.execute(
-            select(GLAccount)
-            .where(GLAccount.level <= level, GLAccount.status != AccountStatus.CLOSED)
-            .order_by(GLAccount.account_code)
-        )
-        all_accounts = list(accounts.scalars().all())
+        ledger = await balance_engine.load_balances(db, as_of_date=d, period_id=period_id)
 
         rows = []
         total_dr = 0.0
         total_cr = 0.0
 
-        for acct in all_accounts:
-            balance_data = await coa_service.get_account_balance(
-                db, acct.id, as_of_date=d, period_id=period_id
-            )
+        for acct in ledger.accounts:
+            if acct.level > level or acct.status == AccountStatus.CLOSED:
+                continue
+            balance_data = ledger.balance(acct.id)
             bal = balance_data["balance"]
 
             dr_bal = bal if bal > 0 and acct.account_type == AccountType.DEBIT else (
@@ -1113,6 +1110,78 @@ async def reopen_period(
         raise
 
 
+@router.get("/period-balances/verify")
+async def verify_period_balances(
+    period_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+):
+    """Compare the account period balance snapshots against the journal lines."""
+    try:
+        drifts = await period_balances.verify_period_balances(db, period_id)
+        return {
+            "consistent": not drifts,
+            "drift_count": len(drifts),
+            "drifts": [d.to_dict() for d in drifts[:500]],
+        }
+    except Exception as e:
+        await log_error(e, db=db, module="api.gl", function_name="verify_period_balances")
+        raise
+
+
+@router.post("/period-balances/rebuild")
+async def rebuild_period_balances(
+    period_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+):
+    """Regenerate the snapshots from the journal lines (one period or all)."""
+    try:
+        if period_id and await period_service.get_period(db, period_id) is None:
+            raise HTTPException(status_code=404, detail="Period not found")
+        rows = await period_balances.rebuild_period_balances(db, period_id)
+        return {"rows": rows}
+    except HTTPException:
+        raise
+    except Exception as e:
+        await log_error(e, db=db, module="api.gl", function_name="rebuild_period_balances")
+        raise
+
+
+@router.get("/accrual-batches")
+async def list_accrual_batches(
+    period_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles(*STAFF_ROLES)),
+):
+    """Accrual and provisioning batches with every journal entry each posted."""
+    try:
+        batches = await accrual_service.list_batches(db, period_id=period_id, limit=limit)
+        return [
+            {
+                "id": b.id,
+                "batch_type": b.batch_type.value,
+                "period_id": b.period_id,
+                "status": b.status.value,
+                "loan_count": b.loan_count,
+                "total_amount": float(b.total_amount or 0),
+                "journal_entry_id": b.journal_entry_id,
+                "journal_entry_ids": b.journal_entry_ids
+                or ([b.journal_entry_id] if b.journal_entry_id else []),
+                "error_log": b.error_log,
+                "started_at": _serialize_date(b.started_at),
+                "completed_at": _serialize_date(b.completed_at),
+            }
+            for b in batches
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        await log_error(e, db=db, module="api.gl", function_name="list_accrual_batches")
+        raise
+
+
 # ===================================================================
 # Dashboard Summary
 # ===================================================================
@@ -1134,13 +1203,12 @@ async def dashboard_summary(
             "5-1000",  # Provision Expense
         ]
 
+        ledger = await balance_engine.load_balances(db, period_id=period_id)
         balances = {}
         for code in key_accounts:
-            acct = await coa_service.get_account_by_code(db, code)
+            acct = ledger.get_by_code(code)
             if acct:
-                bal = await coa_service.get_account_balance(
-                    db, acct.id, period_id=period_id, include_children=True,
-                )
+                bal = ledger.balance(acct.id, include_children=True)
                 balances[code] = {
                     "name": acct.name,
                     "balance": bal["balance"],
@@ -1149,12 +1217,17 @@ async def dashboard_summary(
                 }
 
         # Entry counts by status
-        for st in [JournalEntryStatus.DRAFT, JournalEntryStatus.PENDING_APPROVAL, JournalEntryStatus.POSTED]:
-            q = select(sa_func.count(JournalEntry.id)).where(JournalEntry.status == st)
-            if period_id:
-                q = q.where(JournalEntry.accounting_period_id == period_id)
-            count = (await db.execute(q)).scalar() or 0
-            balances[f"entries_{st.value}"] = count
+        counted = [JournalEntryStatus.DRAFT, JournalEntryStatus.PENDING_APPROVAL, JournalEntryStatus.POSTED]
+        q = (
+            select(JournalEntry.status, sa_func.count(JournalEntry.id))
+            .where(JournalEntry.status.in_(counted))
+            .group_by(JournalEntry.status)
+        )
+        if period_id:
+            q = q.where(JournalEntry.accounting_period_id == period_id)
+        counts = dict((await db.execute(q)).all())
+        for st in counted:
+            balances[f"entries_{st.value}"] = counts.get(st, 0)
 
         return balances
     except HTTPException:
@@ -1464,16 +1537,15 @@ async def get_balance_sheet(
         categories = [AccountCategory.ASSET, AccountCategory.LIABILITY, AccountCategory.EQUITY]
         sections = {}
 
+        ledger = await balance_engine.load_balances(db, as_of_date=d, period_id=period_id)
+
         for cat in categories:
-            accounts = await db.execute(
-                select(GLAccount)
-                .where(GLAccount.account_category == cat, GLAccount.status != AccountStatus.CLOSED)
-                .order_by(GLAccount.account_code)
-            )
             items = []
             section_total = 0.0
-            for acct in accounts.scalars().all():
-                bal = await coa_service.get_account_balance(db, acct.id, as_of_date=d, period_id=period_id)
+            for acct in ledger.accounts:
+                if acct.account_category != cat or acct.status == AccountStatus.CLOSED:
+                    continue
+                bal = ledger.balance(acct.id)
                 if bal["balance"] == 0:
                     continue
                 items.append({
@@ -1518,16 +1590,15 @@ async def get_income_statement(
         categories = [AccountCategory.REVENUE, AccountCategory.EXPENSE]
         sections = {}
 
+        ledger = await balance_engine.load_balances(db, as_of_date=d, period_id=period_id)
+
         for cat in categories:
-            accounts = await db.execute(
-                select(GLAccount)
-                .where(GLAccount.account_category == cat, GLAccount.status != AccountStatus.CLOSED)
-                .order_by(GLAccount.account_code)
-            )
             items = []
             section_total = 0.0
-            for acct in accounts.scalars().all():
-                bal = await coa_service.get_account_balance(db, acct.id, as_of_date=d, period_id=period_id)
+            for acct in ledger.accounts:
+                if acct.account_category != cat or acct.status == AccountStatus.CLOSED:
+                    continue
+                bal = ledger.balance(acct.id)
                 if bal["balance"] == 0:
                     continue
                 items.append({
@@ -1657,7 +1728,7 @@ async def delete_filter_preset(
 # ===================================================================
 
 class ExportRequest(BaseModel):
-    format: str  # csv, xlsx, pdf, json, xml
+    format: str  # csv, xlsx, pdf, json, jsonl, xml
     export_type: str = "journal_entries"
     filters: Optional[dict] = None
     columns: Optional[list[str]] = None
@@ -1670,34 +1741,20 @@ async def export_gl_data(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_roles(*STAFF_ROLES)),
 ):
-    """Export GL data in the specified format."""
+    """Export GL data in the specified format.
+
+    Journal lines are read from a server-side cursor and written to file
+    storage as they arrive, so there is no row cap; the stored file is then
+    streamed back.
+    """
     try:
-        from fastapi.responses import Response
+        fmt = data.format.lower()
+        if fmt not in export_service.WRITERS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {data.format}")
 
         # Gather data based on export type
         if data.export_type == "journal_entries":
-            entries_result = await db.execute(
-                select(JournalEntry)
-                .options(selectinload(JournalEntry.lines).selectinload(JournalEntryLine.gl_account))
-                .where(JournalEntry.status == JournalEntryStatus.POSTED)
-                .order_by(JournalEntry.transaction_date.desc())
-                .limit(5000)
-            )
-            entries = entries_result.scalars().all()
-            rows = []
-            for e in entries:
-                for ln in e.lines:
-                    rows.append({
-                        "entry_number": e.entry_number,
-                        "date": str(e.effective_date),
-                        "source_type": e.source_type.value,
-                        "description": ln.description or e.description,
-                        "account_code": ln.gl_account.account_code if ln.gl_account else "",
-                        "account_name": ln.gl_account.name if ln.gl_account else "",
-                        "debit": float(ln.debit_amount),
-                        "credit": float(ln.credit_amount),
-                        "loan_reference": ln.loan_reference or "",
-                    })
+            rows = export_service.journal_line_rows(db, data.filters)
         elif data.export_type == "trial_balance":
             rows = await reports_service.trial_balance_report(db)
         elif data.export_type == "chart_of_accounts":
@@ -1710,10 +1767,10 @@ async def export_gl_data(
         else:
             rows = []
 
-        result_bytes = await export_service.export_data(
+        log = await export_service.export_to_file(
             db,
-            data=rows,
-            format=data.format,
+            rows=rows,
+            format=fmt,
             columns=data.columns,
             title=data.title,
             user_id=current_user.id,
@@ -1721,14 +1778,10 @@ async def export_gl_data(
             filters=data.filters,
         )
 
-        content_type = export_service.get_content_type(data.format)
-        ext = export_service.get_file_extension(data.format)
-        filename = f"gl_export_{data.export_type}{ext}"
-
-        return Response(
-            content=result_bytes,
-            media_type=content_type,
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        return file_storage.file_response(
+            log.file_path,
+            export_service.get_content_type(fmt),
+            f"gl_export_{data.export_type}{export_service.get_file_extension(fmt)}",
         )
     except HTTPException:
         raise
@@ -1774,24 +1827,13 @@ async def generate_report(
             raise HTTPException(status_code=404, detail=f"Unknown report type: {report_type}")
 
         report_def = reports_service.REPORT_REGISTRY[report_type]
-        fn = report_def["fn"]
-
-        # Build kwargs based on report function signature
-        kwargs: dict = {}
-        if period_id:
-            kwargs["period_id"] = period_id
-        if date_from:
-            kwargs["date_from"] = date.fromisoformat(date_from)
-        if date_to:
-            kwargs["date_to"] = date.fromisoformat(date_to)
-        if account_id and report_type == "account_activity":
-            kwargs["account_id"] = account_id
-
-        try:
-            data = await fn(db, **kwargs)
-        except TypeError:
-            # Function doesn't accept some kwargs — retry with just db
-            data = await fn(db)
+        data = await reports_service.run_report(
+            db, report_type,
+            period_id=period_id,
+            date_from=date.fromisoformat(date_from) if date_from else None,
+            date_to=date.fromisoformat(date_to) if date_to else None,
+            account_id=account_id,
+        )
 
         return {
             "report_type": report_type,
@@ -1805,6 +1847,53 @@ async def generate_report(
         raise
 
 
+@router.post("/reports/{report_type}/jobs")
+async def submit_report_job(
+    report_type: str,
+    period_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    account_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles(*STAFF_ROLES)),
+):
+    """Build a standard report in the background.
+
+    Returns the job status; poll ``/api/reports/jobs/{id}`` and fetch the
+    JSON result from its ``download_url``.  Identical requests over
+    unchanged data reuse the stored result.
+    """
+    try:
+        if report_type not in reports_service.REPORT_REGISTRY:
+            raise HTTPException(status_code=404, detail=f"Unknown report type: {report_type}")
+        try:
+            parameters = {
+                "period_id": period_id,
+                "date_from": date.fromisoformat(date_from).isoformat() if date_from else None,
+                "date_to": date.fromisoformat(date_to).isoformat() if date_to else None,
+                "account_id": account_id if report_type == "account_activity" else None,
+            }
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+
+        job, queued = await report_jobs.submit_job(
+            db,
+            report_type=f"{report_jobs.GL_PREFIX}{report_type}",
+            parameters=parameters,
+            user_id=current_user.id,
+        )
+        # The worker must see the job row before it is handed over
+        await db.commit()
+        if queued:
+            await report_jobs.enqueue(db, job)
+        return report_jobs.job_status(job, cached=not queued)
+    except HTTPException:
+        raise
+    except Exception as e:
+        await log_error(e, db=db, module="api.gl", function_name="submit_report_job")
+        raise
+
+
 @router.post("/reports/{report_type}/export")
 async def export_report(
     report_type: str,
@@ -1815,10 +1904,11 @@ async def export_report(
 ):
     """Generate and export a report in the specified format."""
     try:
-        from fastapi.responses import Response
-
         if report_type not in reports_service.REPORT_REGISTRY:
             raise HTTPException(status_code=404, detail=f"Unknown report type: {report_type}")
+        fmt = data.format.lower()
+        if fmt not in export_service.WRITERS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {data.format}")
 
         report_def = reports_service.REPORT_REGISTRY[report_type]
         fn = report_def["fn"]
@@ -1838,24 +1928,20 @@ async def export_report(
         else:
             rows = report_data
 
-        result_bytes = await export_service.export_data(
+        log = await export_service.export_to_file(
             db,
-            data=rows,
-            format=data.format,
+            rows=rows,
+            format=fmt,
             title=report_def["name"],
             user_id=current_user.id,
             export_type=f"report_{report_type}",
             filters=data.filters,
         )
 
-        content_type = export_service.get_content_type(data.format)
-        ext = export_service.get_file_extension(data.format)
-        filename = f"gl_report_{report_type}{ext}"
-
-        return Response(
-            content=result_bytes,
-            media_type=content_type,
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        return file_storage.file_response(
+            log.file_path,
+            export_service.get_content_type(fmt),
+            f"gl_report_{report_type}{export_service.get_file_extension(fmt)}",
         )
     except HTTPException:
         raise
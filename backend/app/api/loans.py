@@ -967,7 +967,7 @@ async def download_consent_pdf(
     """
     try:
         from fastapi.responses import StreamingResponse
-        from app.services.contract_generator import generate_contract_docx as gen_docx
+        from app.services import document_render
         from app.models.catalog import CreditProduct, ProductCategory
         from sqlalchemy.orm import selectinload as _sl
 
@@ -1074,7 +1074,8 @@ async def download_consent_pdf(
         total_repayment = monthly_payment * term_months
         interest_and_fees = total_repayment - (amount_val - downpayment) if total_repayment > (amount_val - downpayment) else 0
 
-        docx_buffer = gen_docx(
+        # Rendered in a worker process and cached (always succeeds — reportlab fallback)
+        pdf_buffer = await document_render.contract_pdf(
             applicant_name=applicant_name,
             applicant_address=applicant_address,
             national_id=profile.national_id if profile else "",
@@ -1093,10 +1094,6 @@ async def download_consent_pdf(
             signature_data_url=application.contract_signature_data or "",
             contact_details=contact_details,
         )
-
-        # Convert DOCX to PDF for download (always succeeds — reportlab fallback)
-        from app.services.docx_to_pdf import convert_docx_to_pdf
-        pdf_buffer = convert_docx_to_pdf(docx_buffer)
         filename = f"hire-purchase-agreement-{application.reference_number}.pdf"
         return StreamingResponse(
             pdf_buffer,
@@ -21,6 +21,7 @@ from app.schemas import (
 )
 from app.auth_utils import get_current_user, require_roles
 from app.services.error_logger import log_error
+from app.services.loan_servicing import refresh_loan_snapshot
 import logging
 
 router = APIRouter()
@@ -374,3 +375,7 @@ async def _apply_payment_to_schedule(db: AsyncSession, app_id: int, amount: floa
             sched.paid_at = datetime.now(timezone.utc)
         else:
             sched.status = ScheduleStatus.PARTIAL
+
+    # The new payment row is pending in the session; the refresh flushes it
+    # together with the schedule changes before recomputing the snapshot.
+    await refresh_loan_snapshot(db, app_id)
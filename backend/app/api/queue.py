@@ -23,6 +23,7 @@ from app.models.queue import (
     StaffQueueProfile, QueueEvent, QueueException,
     AssignmentMode, SLAMode, ExceptionStatus,
 )
+from app.services import dashboard_metrics
 from app.services.queue_priority import explain_priority, recalculate_all_priorities
 from app.services.queue_assignment import (
     suggest_assignment, auto_assign_pending, rebalance, explain_assignment,
@@ -31,6 +32,7 @@ from app.services.queue_ai import (
     generate_handoff_summary, generate_insights, compute_completeness,
     estimate_complexity, analyze_exception_precedent,
 )
+from app.services.queue_sync import reconcile_queue_entries
 from app.services.queue_sla import (
     check_sla_status, pause_sla, resume_sla, calculate_sla_deadline,
     calculate_sla_warning,
@@ -146,89 +148,6 @@ async def _get_or_create_config(db: AsyncSession) -> QueueConfig:
     return config
 
 
-SYNCABLE_STATUSES = [
-    LoanStatus.SUBMITTED,
-    LoanStatus.UNDER_REVIEW,
-    LoanStatus.CREDIT_CHECK,
-    LoanStatus.DECISION_PENDING,
-    LoanStatus.AWAITING_DOCUMENTS,
-]
-
-DECIDED_STATUSES = [
-    LoanStatus.APPROVED,
-    LoanStatus.DECLINED,
-    LoanStatus.DISBURSED,
-    LoanStatus.CANCELLED,
-    LoanStatus.VOIDED,
-]
-
-
-async def _ensure_queue_entries(db: AsyncSession) -> int:
-    """Inline sync: create QueueEntry records for applications that lack one.
-
-    This runs on every queue read so the queue works even without Celery.
-    It is idempotent and fast — only inserts missing entries.
-    """
-    # IDs that already have an entry
-    existing_result = await db.execute(select(QueueEntry.application_id))
-    existing_ids = {row[0] for row in existing_result.all()}
-
-    # Applications that should be in the queue
-    apps_result = await db.execute(
-        select(LoanApplication).where(
-            LoanApplication.status.in_(SYNCABLE_STATUSES),
-        )
-    )
-    apps = apps_result.scalars().all()
-
-    created = 0
-    for app in apps:
-        if app.id in existing_ids:
-            continue
-
-        status_val = QueueEntryStatus.NEW.value
-        if app.status == LoanStatus.AWAITING_DOCUMENTS:
-            status_val = QueueEntryStatus.WAITING_BORROWER.value
-        elif app.assigned_underwriter_id:
-            status_val = QueueEntryStatus.IN_PROGRESS.value
-
-        entry = QueueEntry(
-            application_id=app.id,
-            status=status_val,
-            assigned_to_id=app.assigned_underwriter_id,
-            claimed_by_id=app.assigned_underwriter_id,
-            stage_entered_at=app.submitted_at or app.created_at,
-        )
-        db.add(entry)
-        created += 1
-
-    # Also mark decided applications
-    if existing_ids:
-        decided_apps_result = await db.execute(
-            select(LoanApplication.id).where(
-                LoanApplication.status.in_(DECIDED_STATUSES),
-                LoanApplication.id.in_(existing_ids),
-            )
-        )
-        decided_app_ids = {row[0] for row in decided_apps_result.all()}
-
-        if decided_app_ids:
-            active_result = await db.execute(
-                select(QueueEntry).where(
-                    QueueEntry.application_id.in_(decided_app_ids),
-                    QueueEntry.status != QueueEntryStatus.DECIDED.value,
-                )
-            )
-            for entry in active_result.scalars().all():
-                entry.status = QueueEntryStatus.DECIDED.value
-
-    if created > 0:
-        await db.flush()
-        logger.info("Inline queue sync: created %d entries", created)
-
-    return created
-
-
 def _entry_to_dict(
     entry: QueueEntry,
     application: LoanApplication | None = None,
@@ -327,8 +246,9 @@ async def sync_queue(
 ):
     """Manually sync queue entries from loan applications."""
     try:
-        created = await _ensure_queue_entries(db)
-        return {"message": f"Synced {created} new entries", "created": created}
+        stats = await reconcile_queue_entries(db)
+        created = stats["created"]
+        return {"message": f"Synced {created} new entries", **stats}
     except Exception as e:
         await log_error(e, db=db, module="api.queue", function_name="sync_queue")
         raise
@@ -345,7 +265,6 @@ async def get_shared_queue(
     """The shared prioritized queue -- all unassigned + pool entries."""
     try:
         config = await _get_or_create_config(db)
-        await _ensure_queue_entries(db)
 
         from sqlalchemy.orm import aliased
         Applicant = aliased(User)
@@ -412,7 +331,6 @@ async def get_my_queue(
     """Applications assigned to or suggested for the current user."""
     try:
         config = await _get_or_create_config(db)
-        await _ensure_queue_entries(db)
 
         from sqlalchemy.orm import aliased
         Applicant = aliased(User)
@@ -477,7 +395,6 @@ async def get_waiting_queue(
     """Applications waiting for borrower response."""
     try:
         config = await _get_or_create_config(db)
-        await _ensure_queue_entries(db)
 
         from sqlalchemy.orm import aliased
         Applicant = aliased(User)
@@ -775,93 +692,19 @@ async def get_awareness(
     current_user: User = Depends(require_roles(*STAFF_ROLES)),
     db: AsyncSession = Depends(get_db),
 ):
-    """Ambient stats: pending count, avg turnaround, personal stats, team workload."""
-    try:
-        await _ensure_queue_entries(db)
-        now = datetime.now(timezone.utc)
-        thirty_days_ago = now - timedelta(days=30)
-
-        # Pending count
-        pending_result = await db.execute(
-            select(func.count()).select_from(QueueEntry).where(
-                QueueEntry.status.in_([QueueEntryStatus.NEW.value, QueueEntryStatus.IN_PROGRESS.value])
-            )
-        )
-        pending = pending_result.scalar() or 0
-
-        # Waiting count
-        waiting_result = await db.execute(
-            select(func.count()).select_from(QueueEntry).where(
-                QueueEntry.status == QueueEntryStatus.WAITING_BORROWER.value
-            )
-        )
-        waiting = waiting_result.scalar() or 0
-
-        # Avg turnaround (30 days)
-        avg_result = await db.execute(
-            select(func.avg(
-                func.extract("epoch", LoanApplication.decided_at - LoanApplication.submitted_at) / 3600
-            )).where(
-                LoanApplication.decided_at.is_not(None),
-                LoanApplication.submitted_at.is_not(None),
-                LoanApplication.decided_at >= thirty_days_ago,
-            )
-        )
-        avg_turnaround_hours = avg_result.scalar()
-
-        # Personal stats
-        my_active = await db.execute(
-            select(func.count()).select_from(QueueEntry).where(
-                QueueEntry.assigned_to_id == current_user.id,
-                QueueEntry.status.in_([QueueEntryStatus.IN_PROGRESS.value, QueueEntryStatus.NEW.value]),
-            )
-        )
-        my_count = my_active.scalar() or 0
-
-        # Today's decisions
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        my_decided_result = await db.execute(
-            select(func.count()).select_from(QueueEntry).where(
-                QueueEntry.claimed_by_id == current_user.id,
-                QueueEntry.status == QueueEntryStatus.DECIDED.value,
-                QueueEntry.updated_at >= today_start,
-            )
-        )
-        my_decided_today = my_decided_result.scalar() or 0
-
-        # Team workload
-        team_result = await db.execute(
-            select(
-                User.id,
-                User.first_name,
-                User.last_name,
-                func.coalesce(StaffQueueProfile.current_load_count, 0).label("load"),
-                func.coalesce(StaffQueueProfile.max_concurrent, 10).label("max_load"),
-                func.coalesce(StaffQueueProfile.is_available, True).label("available"),
-            )
-            .outerjoin(StaffQueueProfile, User.id == StaffQueueProfile.user_id)
-            .where(User.role.in_([r.value for r in STAFF_ROLES]), User.is_active == True)
-        )
-        team = [
-            {
-                "user_id": row.id,
-                "name": f"{row.first_name} {row.last_name}",
-                "load": row.load,
-                "max_load": row.max_load,
-                "available": row.available,
-            }
-            for row in team_result.all()
-        ]
+    """Ambient stats: pending count, avg turnaround, personal stats, team workload.
 
+    Team-wide figures are shared across staff through the dashboard cache;
+    the caller's own counts and the queue config are always read fresh.
+    """
+    try:
+        overview = await dashboard_metrics.queue_overview(db, [r.value for r in STAFF_ROLES])
+        personal = await dashboard_metrics.personal_queue_counts(db, current_user.id)
         config = await _get_or_create_config(db)
 
         return {
-            "pending": pending,
-            "waiting": waiting,
-            "avg_turnaround_hours": round(avg_turnaround_hours, 1) if avg_turnaround_hours else None,
-            "my_active": my_count,
-            "my_decided_today": my_decided_today,
-            "team": team,
+            **overview,
+            **personal,
             "config": {
                 "assignment_mode": config.assignment_mode,
                 "stages_enabled": config.stages_enabled,
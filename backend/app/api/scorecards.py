@@ -4,6 +4,7 @@ performance monitoring, batch scoring, and back-testing.
 
 from __future__ import annotations
 
+import asyncio
 import io
 from datetime import date, datetime, timezone
 from typing import Optional
@@ -28,7 +29,7 @@ from app.services.scorecard_engine import (
     score_application, extract_applicant_data, generate_scoring_script,
     parse_scoring_script, parse_scorecard_csv, build_scorecard_from_parsed,
     get_active_scorecards, score_all_models, select_decisioning_model,
-    simulate_impact, what_if_analysis, batch_score_csv,
+    simulate_impact, what_if_analysis, batch_score_summary, compile_scorecard,
 )
 from app.services.scorecard_performance import (
     generate_performance_snapshot, champion_challenger_comparison,
@@ -899,18 +900,18 @@ async def batch_score(
 ):
     """Batch score a CSV file against a scorecard."""
     sc = await _get_scorecard_with_bins(scorecard_id, db)
-    content = (await file.read()).decode("utf-8-sig")
-    results = batch_score_csv(sc, content)
+    # Stream the spooled upload through the batch scorer in a worker thread
+    # so large files neither load fully into memory nor block the loop.
+    compiled = compile_scorecard(sc)
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    loop = asyncio.get_running_loop()
+    try:
+        scored = await loop.run_in_executor(None, batch_score_summary, compiled, lines)
+    finally:
+        lines.detach()
     return {
         "scorecard": {"id": sc.id, "name": sc.name, "version": sc.version},
-        "total_scored": len(results),
-        "results": results[:1000],  # Limit response size
-        "summary": {
-            "avg_score": round(sum(r["total_score"] for r in results) / max(len(results), 1), 1),
-            "approval_rate": round(sum(1 for r in results if r["decision"] == "AUTO_APPROVE") / max(len(results), 1) * 100, 1),
-            "decline_rate": round(sum(1 for r in results if r["decision"] == "AUTO_DECLINE") / max(len(results), 1) * 100, 1),
-            "review_rate": round(sum(1 for r in results if r["decision"] == "MANUAL_REVIEW") / max(len(results), 1) * 100, 1),
-        },
+        **scored,
     }
 
 
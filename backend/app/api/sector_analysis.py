@@ -38,8 +38,8 @@ from app.models.sector_analysis import (
     SECTOR_TAXONOMY,
 )
 from app.auth_utils import require_roles, get_current_user
+from app.services import dashboard_metrics
 from app.services.sector_analysis import (
-    get_portfolio_dashboard,
     get_sector_detail,
     get_sector_heatmap,
     run_stress_test,
@@ -144,8 +144,8 @@ async def dashboard(
     user: User = Depends(require_roles(*STAFF_ROLES)),
     db: AsyncSession = Depends(get_db),
 ):
-    """Real-time portfolio concentration dashboard."""
-    return await get_portfolio_dashboard(db)
+    """Portfolio concentration dashboard (cached for a few seconds)."""
+    return await dashboard_metrics.sector_dashboard(db)
 
 
 # ── Sector Detail (FR-3) ────────────────────────────────────
@@ -34,6 +34,7 @@ from app.schemas import (
     DecisionExplanationResponse,
 )
 from app.services.decision_engine.tree_validator import validate_tree
+from app.services.decision_engine.tree_cache import invalidate_tree
 from app.services.decision_engine.champion_challenger import (
     get_test_comparison, promote_challenger, discard_challenger,
 )
@@ -512,6 +513,7 @@ async def delete_strategy(strategy_id: int, db: AsyncSession = Depends(get_db)):
         )
         strategy_ref = strategy.decision_tree_id
         strategy.decision_tree_id = None
+        invalidate_tree(strategy_ref)
         await db.flush()
         await db.execute(sa_delete(DecisionTree).where(DecisionTree.id == strategy_ref))
 
@@ -803,6 +805,8 @@ async def update_tree(
         # Create new version instead of modifying active
         return await _create_new_tree_version(tree, data, db)
 
+    invalidate_tree(tree.id)
+
     if data.name is not None:
         tree.name = data.name
     if data.description is not None:
@@ -938,9 +942,11 @@ async def activate_tree(tree_id: int, db: AsyncSession = Depends(get_db)):
     for active_tree in active_result.scalars().all():
         active_tree.status = TreeStatus.ARCHIVED
         active_tree.archived_at = datetime.utcnow()
+        invalidate_tree(active_tree.id)
 
     tree.status = TreeStatus.ACTIVE
     tree.activated_at = datetime.utcnow()
+    invalidate_tree(tree.id)
 
     # Update the product's decision_tree_id
     from app.models.catalog import CreditProduct
@@ -25,7 +25,9 @@ from app.models.audit import AuditLog
 from app.models.note import ApplicationNote
 from app.models.credit_report import CreditReport
 from app.models.bank_analysis import BankStatementAnalysis, AnalysisStatus
-from app.models.payment import Payment, PaymentType, PaymentStatus, PaymentSchedule, ScheduleStatus
+from app.models.payment import (
+    Payment, PaymentType, PaymentStatus, PaymentSchedule, ScheduleStatus, LoanServicingSnapshot,
+)
 from app.models.disbursement import Disbursement, DisbursementMethod, DisbursementStatus
 from app.schemas import (
     LoanApplicationResponse,
@@ -53,6 +55,7 @@ from app.services.id_parser import parse_id_images
 
 import logging
 from app.services.error_logger import log_error
+from app.services.loan_servicing import days_past_due, refresh_loan_snapshot
 
 logger = logging.getLogger(__name__)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -1138,6 +1141,9 @@ async def disburse_loan(
         # Fix audit with disbursement id
         audit.new_values = {**audit.new_values, "disbursement_id": disbursement.id}
 
+        # Seed the servicing snapshot from the new schedule
+        await refresh_loan_snapshot(db, application_id)
+
         # ── 9. Post to General Ledger ────────────────────
         try:
             from app.services.gl.mapping_engine import generate_journal_entry, MappingError
@@ -1351,59 +1357,65 @@ async def get_disbursement(
 @router.get("/loans", response_model=list[LoanBookEntry])
 async def get_loan_book(
     status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(require_roles(*UNDERWRITER_ROLES)),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get disbursed loans with enriched data for the loan book."""
+    """Get disbursed loans with enriched data for the loan book.
+
+    Balances, DPD and risk figures come from the loan servicing snapshots;
+    ``limit``/``offset`` page through the book server-side.
+    """
     try:
+        latest_decision = (
+            select(Decision)
+            .where(Decision.loan_application_id == LoanApplication.id)
+            .order_by(Decision.created_at.desc(), Decision.id.desc())
+            .limit(1)
+        )
         query = (
-            select(LoanApplication, User.first_name, User.last_name)
+            select(
+                LoanApplication,
+                User.first_name,
+                User.last_name,
+                LoanServicingSnapshot,
+                func.coalesce(
+                    LoanServicingSnapshot.risk_band,
+                    latest_decision.with_only_columns(Decision.risk_band).scalar_subquery(),
+                ),
+                func.coalesce(
+                    LoanServicingSnapshot.credit_score,
+                    latest_decision.with_only_columns(Decision.credit_score).scalar_subquery(),
+                ),
+            )
             .join(User, LoanApplication.applicant_id == User.id)
-            .order_by(LoanApplication.created_at.desc())
+            .outerjoin(
+                LoanServicingSnapshot,
+                LoanServicingSnapshot.loan_application_id == LoanApplication.id,
+            )
+            .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
         )
         # Loan Book only shows disbursed applications by default
         if status and status != "all":
             query = query.where(LoanApplication.status == LoanStatus(status))
         else:
             query = query.where(LoanApplication.status == LoanStatus.DISBURSED)
+        if offset:
+            query = query.offset(offset)
+        if limit:
+            query = query.limit(limit)
 
         result = await db.execute(query)
         entries = []
         today = date.today()
 
-        for row in result.all():
-            app = row[0]
-            first_name = row[1]
-            last_name = row[2]
-
-            # Get latest decision for risk band / score
-            dec_result = await db.execute(
-                select(Decision)
-                .where(Decision.loan_application_id == app.id)
-                .order_by(Decision.created_at.desc())
-                .limit(1)
-            )
-            decision = dec_result.scalar_one_or_none()
-
-            # Calculate outstanding and DPD from schedule
-            sched_result = await db.execute(
-                select(PaymentSchedule)
-                .where(PaymentSchedule.loan_application_id == app.id)
-                .order_by(PaymentSchedule.installment_number)
-            )
-            schedules = sched_result.scalars().all()
-            total_paid = sum(float(s.amount_paid) for s in schedules)
-            outstanding = float(app.amount_approved or app.amount_requested) - total_paid if app.amount_approved else None
-            days_past_due = 0
-            next_payment = None
-            for s in schedules:
-                if s.status != "paid":
-                    if s.due_date <= today and float(s.amount_paid) < float(s.amount_due):
-                        dpd = (today - s.due_date).days
-                        if dpd > days_past_due:
-                            days_past_due = dpd
-                    if next_payment is None and s.due_date >= today:
-                        next_payment = s.due_date
+        for app, first_name, last_name, snap, risk_band, credit_score in result.all():
+            total_paid = float(snap.total_paid) if snap else 0.0
+            outstanding = float(app.amount_approved) - total_paid if app.amount_approved else None
+            next_payment = snap.next_due_date if snap else None
+            if next_payment is not None and next_payment < today:
+                next_payment = None
 
             entries.append(LoanBookEntry(
                 id=app.id,
@@ -1416,11 +1428,11 @@ async def get_loan_book(
                 interest_rate=float(app.interest_rate) if app.interest_rate else None,
                 monthly_payment=float(app.monthly_payment) if app.monthly_payment else None,
                 status=app.status.value,
-                risk_band=decision.risk_band if decision else None,
-                credit_score=decision.credit_score if decision else None,
+                risk_band=risk_band,
+                credit_score=credit_score,
                 disbursed_date=app.disbursed_at or app.decided_at if app.status == LoanStatus.DISBURSED else None,
                 outstanding_balance=max(outstanding, 0) if outstanding is not None else None,
-                days_past_due=days_past_due,
+                days_past_due=days_past_due(snap.oldest_unpaid_due_date, today) if snap else 0,
                 next_payment_date=next_payment,
                 purpose=app.purpose.value,
                 created_at=app.created_at,
@@ -1857,7 +1869,7 @@ async def generate_contract_docx(
     """Generate a contract DOCX from the template, pre-populated with application details."""
     try:
         from fastapi.responses import StreamingResponse
-        from app.services.contract_generator import generate_contract_docx as gen_docx
+        from app.services import document_render
         from app.models.catalog import CreditProduct, ProductCategory
 
         # Load application with items
@@ -1955,7 +1967,7 @@ async def generate_contract_docx(
         total_repayment = monthly_payment * term_months
         interest_and_fees = total_repayment - (amount - downpayment) if total_repayment > (amount - downpayment) else 0
 
-        docx_buffer = gen_docx(
+        docx_buffer = await document_render.contract_docx(
             applicant_name=applicant_name,
             applicant_address=applicant_address,
             national_id=profile.national_id if profile else "",
@@ -41,6 +41,7 @@ from app.schemas import (
     PendingActionDecision,
     ResetPasswordRequest,
 )
+from app.services import permission_cache, session_cache
 from app.services.error_logger import log_error
 
 logger = logging.getLogger(__name__)
@@ -370,6 +371,7 @@ async def suspend_user(
             UserSession.is_active.is_(True),
         ).values(is_active=False)
     )
+    session_cache.revoke_on_commit(db, user_id=user_id)
 
     await _audit(
         db, "user", user_id, "suspend", current_user.id,
@@ -428,6 +430,7 @@ async def deactivate_user(
             UserSession.is_active.is_(True),
         ).values(is_active=False)
     )
+    session_cache.revoke_on_commit(db, user_id=user_id)
 
     await _audit(
         db, "user", user_id, "deactivate", current_user.id,
@@ -485,6 +488,7 @@ async def reset_user_password(
             UserSession.is_active.is_(True),
         ).values(is_active=False)
     )
+    session_cache.revoke_on_commit(db, user_id=user_id)
 
     await _audit(db, "user", user_id, "password_reset", current_user.id)
     return {"status": "ok", "message": "Password reset. User must change on next login."}
@@ -555,6 +559,7 @@ async def assign_roles(
         db.add(ura)
 
     await db.flush()
+    permission_cache.invalidate_on_commit(db)
     await _audit(
         db, "user", user_id, "roles_assigned", current_user.id,
         new_values={"role_ids": data.role_ids},
@@ -645,6 +650,7 @@ async def create_role(
             db.add(rp)
 
     await db.flush()
+    permission_cache.invalidate_on_commit(db)
     await _audit(
         db, "role", role.id, "create", current_user.id,
         new_values={"name": role.name, "permissions": data.permission_codes},
@@ -688,6 +694,7 @@ async def update_role(
                 db.add(rp)
 
     await db.flush()
+    permission_cache.invalidate_on_commit(db)
     await _audit(db, "role", role.id, "update", current_user.id)
     return await get_role(role.id, current_user, db)
 
@@ -744,6 +751,7 @@ async def delete_role(
     )
     await db.delete(role)
     await db.flush()
+    permission_cache.invalidate_on_commit(db)
 
     await _audit(
         db, "role", role_id, "delete", current_user.id,
@@ -798,6 +806,7 @@ async def delete_user(
     )
     await db.delete(user)
     await db.flush()
+    permission_cache.invalidate_on_commit(db)
 
     await _audit(
         db, "user", user_id, "delete", current_user.id,
@@ -907,6 +916,7 @@ async def _execute_pending_action(
                 granted_by=approver.id, is_primary=(i == 0),
             )
             db.add(ura)
+        permission_cache.invalidate_on_commit(db)
     elif action.action_type == "deactivate":
         user_id = action.target_user_id
         if user_id:
@@ -976,6 +986,7 @@ async def revoke_all_sessions(
             UserSession.is_active.is_(True),
         ).values(is_active=False)
     )
+    session_cache.revoke_on_commit(db, user_id=user_id)
 
     await _audit(db, "user", user_id, "sessions_revoked", current_user.id)
     return {"status": "ok", "sessions_revoked": count}
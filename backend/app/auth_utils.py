@@ -8,13 +8,14 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
 from app.database import get_db
 from app.models.user import User, UserRole
+from app.services import permission_cache, session_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -128,25 +129,31 @@ async def get_current_user(
     except (JWTError, ValueError, TypeError):
         raise credentials_exception
 
-    # Check session revocation if jti is present
+    # Session revocation check: a recently validated jti is served from the
+    # session cache; otherwise one query checks the session and loads the user.
     token_jti = payload.get("jti")
     if token_jti:
         from app.models.session import UserSession
-        # Avoid ORM stale-row flush errors when sessions are concurrently revoked:
-        # update heartbeat directly and treat zero updated rows as invalid session.
-        update_result = await db.execute(
-            update(UserSession)
-            .where(
-                UserSession.token_jti == token_jti,
-                UserSession.is_active.is_(True),
+        user = await session_cache.cached_user(db, token_jti, user_id)
+        if user is None:
+            generation = session_cache.generation()
+            result = await db.execute(
+                select(User)
+                .join(UserSession, UserSession.user_id == User.id)
+                .where(
+                    User.id == user_id,
+                    UserSession.token_jti == token_jti,
+                    UserSession.is_active.is_(True),
+                )
             )
-            .values(last_activity_at=datetime.now(timezone.utc))
-        )
-        if update_result.rowcount == 0:
-            raise credentials_exception
-
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+            user = result.scalar_one_or_none()
+            if user is None:
+                raise credentials_exception
+            session_cache.remember(token_jti, user, generation)
+        session_cache.heartbeats.touch(token_jti)
+    else:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
     if user is None or not user.is_active:
         raise credentials_exception
     # Check account status
@@ -204,51 +211,16 @@ def require_roles(*roles: UserRole):
 def require_permission(*permission_codes: str):
     """Dependency factory that checks the user has at least one of the required permissions.
 
-    Resolves the user's effective permissions from their RBAC role assignments.
-    Falls back to legacy role: admin gets everything, underwriters get a reasonable set.
+    Resolves the user's effective permissions (inherited through parent roles)
+    from the in-process RBAC cache, so the check costs no queries once warm.
+    Falls back to legacy role: admin gets everything.
     """
     async def permission_checker(
         current_user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db),
     ) -> User:
-        from app.models.rbac import UserRoleAssignment, RolePermission, Permission, Role
-
-        # Collect all role IDs assigned to this user (including parent roles)
-        ura_result = await db.execute(
-            select(UserRoleAssignment.role_id).where(
-                UserRoleAssignment.user_id == current_user.id,
-            )
-        )
-        role_ids = [r[0] for r in ura_result.all()]
-
-        # Walk parent chain for inherited permissions
-        all_role_ids = set(role_ids)
-        to_check = list(role_ids)
-        while to_check:
-            parent_result = await db.execute(
-                select(Role.parent_role_id).where(
-                    Role.id.in_(to_check),
-                    Role.parent_role_id.isnot(None),
-                )
-            )
-            parents = [r[0] for r in parent_result.all()]
-            new_parents = [p for p in parents if p not in all_role_ids]
-            all_role_ids.update(new_parents)
-            to_check = new_parents
-
-        if all_role_ids:
-            # Check if any of the user's roles have the required permission
-            perm_result = await db.execute(
-                select(Permission.code).join(
-                    RolePermission, RolePermission.permission_id == Permission.id
-                ).where(
-                    RolePermission.role_id.in_(all_role_ids),
-                    Permission.code.in_(permission_codes),
-                )
-            )
-            found = perm_result.scalars().all()
-            if found:
-                return current_user
+        if await permission_cache.has_any_permission(db, current_user.id, permission_codes):
+            return current_user
 
         # Fallback: legacy role admin gets everything
         if current_user.role == UserRole.ADMIN:
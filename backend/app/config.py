@@ -75,6 +75,11 @@ class Settings(BaseSettings):
     upload_dir: str = Field(default="./uploads")
     max_upload_size_mb: int = Field(default=10)
 
+    # ── Document Rendering ───────────────────────────────────
+    document_workers: int = Field(default=2, description="Processes rendering contracts and PDFs")
+    pdf_cache_max_age_days: int = Field(default=30, description="Delete cached PDFs older than this")
+    pdf_cache_max_mb: int = Field(default=500, description="Trim the PDF cache, oldest first, to this size")
+
     # ── Lender / Company Info ────────────────────────────────
     lender_name: str = Field(default="Zotta")
     lender_address: str = Field(
@@ -88,6 +93,10 @@ class Settings(BaseSettings):
     conversation_followup_2_days: int = Field(default=3)
     conversation_expire_days: int = Field(default=7)
 
+    # ── Monitoring ───────────────────────────────────────────
+    slow_request_ms: int = Field(default=1000, description="Log requests slower than this")
+    metrics_token: str = Field(default="", description="Bearer token required by /metrics when set")
+
     # ── Frontend ─────────────────────────────────────────────
     vite_api_url: str = Field(default="")
 
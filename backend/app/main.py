@@ -5,9 +5,9 @@ from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -15,7 +15,7 @@ from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
 from app.database import engine, Base, async_session
-from app.middleware.error_capture import ErrorCaptureMiddleware
+from app.middleware import RequestMiddleware
 from app.api import (
     auth,
     loans,
@@ -44,6 +44,11 @@ from app.seed_gl import seed_gl_data
 from app.seed_scorecard import seed_scorecard_data
 from app.seed_sector import seed_sector_data
 from app.seed_users import seed_user_management
+from app.services import (
+    document_render, error_log_buffer, loan_servicing, permission_cache, request_metrics,
+    session_cache,
+)
+from app.services.gl import period_balances
 
 
 async def _add_missing_columns(conn):
@@ -57,6 +62,62 @@ async def _add_missing_columns(conn):
         "ALTER TABLE decisions ADD COLUMN IF NOT EXISTS strategy_id INTEGER REFERENCES decision_strategies(id)",
         "ALTER TABLE decisions ADD COLUMN IF NOT EXISTS tree_version INTEGER",
         "ALTER TABLE decisions ADD COLUMN IF NOT EXISTS routing_path JSONB",
+        # 029: loan servicing snapshots
+        "ALTER TABLE loan_servicing_snapshots ADD COLUMN IF NOT EXISTS outstanding_fees NUMERIC(12, 2) NOT NULL DEFAULT 0",
+        # 030: denormalised collection queue fields
+        "ALTER TABLE collection_cases ADD COLUMN IF NOT EXISTS outstanding_balance NUMERIC(12, 2) NOT NULL DEFAULT 0",
+        "ALTER TABLE collection_cases ADD COLUMN IF NOT EXISTS latest_ptp_status VARCHAR(20)",
+        "ALTER TABLE collection_cases ADD COLUMN IF NOT EXISTS latest_ptp_amount NUMERIC(12, 2)",
+        "ALTER TABLE collection_cases ADD COLUMN IF NOT EXISTS latest_ptp_date DATE",
+        "ALTER TABLE collection_cases ADD COLUMN IF NOT EXISTS propensity_score INTEGER NOT NULL DEFAULT 50",
+        "CREATE INDEX IF NOT EXISTS ix_cc_queue_priority ON collection_cases (priority_score, id)",
+        "CREATE INDEX IF NOT EXISTS ix_cc_queue_dpd ON collection_cases (dpd, id)",
+        "CREATE INDEX IF NOT EXISTS ix_cc_queue_overdue ON collection_cases (total_overdue, id)",
+        "CREATE INDEX IF NOT EXISTS ix_cc_queue_outstanding ON collection_cases (outstanding_balance, id)",
+        "CREATE INDEX IF NOT EXISTS ix_cc_queue_propensity ON collection_cases (propensity_score, id)",
+        "DROP INDEX IF EXISTS ix_cc_queue_sla_deadline",
+        "CREATE INDEX IF NOT EXISTS ix_cc_queue_sla ON collection_cases "
+        "(coalesce(sla_next_contact_deadline, sla_first_contact_deadline, '9999-12-31 00:00:00+00:00'), id)",
+        "CREATE INDEX IF NOT EXISTS ix_cc_latest_ptp_status ON collection_cases (latest_ptp_status)",
+        # Same backfill as 030; only cases that have never had it set
+        """UPDATE collection_cases c
+           SET latest_ptp_status = lower(p.status::text),
+               latest_ptp_amount = p.amount_promised,
+               latest_ptp_date = p.promise_date
+           FROM (
+               SELECT DISTINCT ON (collection_case_id)
+                      collection_case_id, status, amount_promised, promise_date
+               FROM promises_to_pay
+               ORDER BY collection_case_id, created_at DESC, id DESC
+           ) p
+           WHERE p.collection_case_id = c.id AND c.latest_ptp_status IS NULL""",
+        # 032/033: stored report files and background report jobs
+        "ALTER TABLE report_history ADD COLUMN IF NOT EXISTS file_path VARCHAR(500)",
+        "ALTER TABLE report_history ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'completed'",
+        "ALTER TABLE report_history ADD COLUMN IF NOT EXISTS progress INTEGER NOT NULL DEFAULT 100",
+        "ALTER TABLE report_history ADD COLUMN IF NOT EXISTS error_message TEXT",
+        "ALTER TABLE report_history ADD COLUMN IF NOT EXISTS cache_key VARCHAR(64)",
+        "ALTER TABLE report_history ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ",
+        "ALTER TABLE report_history ADD COLUMN IF NOT EXISTS completed_at TIMESTAMPTZ",
+        "CREATE INDEX IF NOT EXISTS ix_report_history_cache_key ON report_history (cache_key)",
+        # 034: aggregated error logs
+        "ALTER TABLE error_logs ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(40)",
+        "ALTER TABLE error_logs ADD COLUMN IF NOT EXISTS occurrence_count INTEGER NOT NULL DEFAULT 1",
+        "ALTER TABLE error_logs ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMPTZ",
+        "UPDATE error_logs SET last_seen_at = created_at WHERE last_seen_at IS NULL",
+        "ALTER TABLE error_logs ALTER COLUMN last_seen_at SET DEFAULT now()",
+        "ALTER TABLE error_logs ALTER COLUMN last_seen_at SET NOT NULL",
+        "CREATE INDEX IF NOT EXISTS ix_error_logs_fingerprint_created ON error_logs (fingerprint, created_at)",
+        # 035: every journal entry of an accrual batch
+        "ALTER TABLE gl_accrual_batches ADD COLUMN IF NOT EXISTS journal_entry_ids JSON",
+        """UPDATE gl_accrual_batches b
+           SET journal_entry_ids = coalesce(
+               (SELECT json_agg(je.id ORDER BY je.id)
+                FROM gl_journal_entries je
+                WHERE je.source_reference IN ('ACCRUAL-BATCH-' || b.id, 'PROVISION-BATCH-' || b.id)),
+               CASE WHEN b.journal_entry_id IS NOT NULL THEN json_build_array(b.journal_entry_id) END
+           )
+           WHERE b.journal_entry_ids IS NULL""",
     ]
     from sqlalchemy import text
     for stmt in stmts:
@@ -70,6 +131,11 @@ async def lifespan(app: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
             await _add_missing_columns(conn)
+        # Balance queries read the period snapshots, so fill them before
+        # anything reports on a ledger posted before the table existed
+        async with async_session() as db:
+            await period_balances.backfill_period_balances(db)
+            await db.commit()
         async with async_session() as db:
             await seed_catalog_data(db)
         async with async_session() as db:
@@ -82,7 +148,15 @@ async def lifespan(app: FastAPI):
             await seed_user_management(db)
         async with async_session() as db:
             await _ensure_fallback_strategy(db)
+        # Dev has no Celery beat to run the nightly aging pass
+        async with async_session() as db:
+            await loan_servicing.age_snapshots(db)
+            await db.commit()
     yield
+    document_render.shutdown()
+    await error_log_buffer.buffer.stop()
+    await permission_cache.stop()
+    await session_cache.stop()
 
 
 async def _ensure_fallback_strategy(db):
@@ -193,30 +267,11 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# ── Security headers middleware ──────────────────────────────────
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Adds standard security headers to every response."""
-
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-        if settings.environment != "development":
-            response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains"
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'self'; script-src 'self'; style-src 'self' 'unsafe-inline'; "
-                "img-src 'self' data:; connect-src 'self'"
-            )
-        return response
+# Per-request query counting for /metrics and the slow-request log
+request_metrics.install_query_hooks()
 
-
-# Error capture middleware (outermost — catches everything)
-app.add_middleware(ErrorCaptureMiddleware)
-
-# Security headers
-app.add_middleware(SecurityHeadersMiddleware)
+# Security headers, response timing and error capture (one ASGI layer, inside CORS)
+app.add_middleware(RequestMiddleware)
 
 # CORS
 app.add_middleware(
@@ -254,3 +309,13 @@ app.include_router(strategies.router, prefix="/api", tags=["Decision Strategy Ma
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "service": "zotta-api", "version": "0.2.0"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint: per-route latency and DB query histograms."""
+    if settings.metrics_token and request.headers.get("authorization") != f"Bearer {settings.metrics_token}":
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(
+        request_metrics.render_metrics(), media_type="text/plain; version=0.0.4",
+    )
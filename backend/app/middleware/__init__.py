@@ -1,3 +1,3 @@
-from app.middleware.error_capture import ErrorCaptureMiddleware
+from app.middleware.request_middleware import RequestMiddleware
 
-__all__ = ["ErrorCaptureMiddleware"]
+__all__ = ["RequestMiddleware"]
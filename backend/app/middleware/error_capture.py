@@ -1,18 +1,19 @@
-"""FastAPI middleware that captures unhandled exceptions and logs them to the DB.
+"""Capture of failed requests into the error_logs table.
 
 Every 5xx response is automatically recorded in the error_logs table
-so admins can monitor system health from the UI.
+so admins can monitor system health from the UI.  ``RequestMiddleware``
+drives this; the helpers here keep the common path cheap: the request
+body is copied only as the endpoint reads it, and the Authorization
+token is decoded only when an error is actually recorded.
 """
 
 from __future__ import annotations
 
 import logging
-import time
 from typing import Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import Message, Receive, Scope
 
 from app.models.error_log import ErrorSeverity
 from app.services.error_logger import log_error_standalone
@@ -34,95 +35,87 @@ _SENSITIVE_PATHS = {
 # Max body size to capture (avoid storing huge payloads)
 _MAX_BODY_SIZE = 4096
 
-
-class ErrorCaptureMiddleware(BaseHTTPMiddleware):
-    """Catches unhandled exceptions, returns 500, and persists the error."""
-
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        start = time.time()
-        request_body: Optional[str] = None
-
-        # Try to read request body for context (skip sensitive endpoints)
-        _is_sensitive = any(request.url.path.startswith(p) for p in _SENSITIVE_PATHS)
-        if request.method in ("POST", "PUT", "PATCH") and not _is_sensitive:
-            try:
-                body_bytes = await request.body()
-                if len(body_bytes) <= _MAX_BODY_SIZE:
-                    request_body = body_bytes.decode("utf-8", errors="replace")
-            except Exception:
-                pass
-
-        # Extract user info from auth if available
-        user_id: Optional[int] = None
-        user_email: Optional[str] = None
-        try:
-            from app.config import settings
-            from jose import jwt as jose_jwt
-            auth_header = request.headers.get("authorization", "")
-            if auth_header.startswith("Bearer "):
-                token = auth_header[7:]
-                payload = jose_jwt.decode(token, settings.secret_key, algorithms=["HS256"])
-                user_id = int(payload.get("sub", 0)) or None
-                user_email = payload.get("email") or None
-        except Exception:
-            pass  # auth extraction is best-effort
-
-        ip_address = request.client.host if request.client else None
-
-        try:
-            response = await call_next(request)
-            elapsed_ms = round((time.time() - start) * 1000, 2)
-
-            # Log only server-side failures (5xx). Client-side 4xx outcomes
-            # are often expected validation/business responses.
-            if response.status_code >= 500:
-                await log_error_standalone(
-                    Exception(f"HTTP {response.status_code} on {request.method} {request.url.path}"),
-                    severity=ErrorSeverity.ERROR,
-                    module="middleware.error_capture",
-                    function_name="dispatch",
-                    request_method=request.method,
-                    request_path=str(request.url.path),
-                    request_body=request_body,
-                    status_code=response.status_code,
-                    response_time_ms=elapsed_ms,
-                    user_id=user_id,
-                    user_email=user_email,
-                    ip_address=ip_address,
-                )
-
-            return response
-
-        except Exception as exc:
-            elapsed_ms = round((time.time() - start) * 1000, 2)
-
-            # Determine severity
-            from fastapi import HTTPException
-            if isinstance(exc, HTTPException) and exc.status_code < 500:
-                # 4xx errors from HTTPException — don't log these as errors
-                raise
-
-            severity = ErrorSeverity.CRITICAL if "database" in str(exc).lower() else ErrorSeverity.ERROR
-
-            await log_error_standalone(
-                exc,
-                severity=severity,
-                module="middleware.error_capture",
-                request_method=request.method,
-                request_path=str(request.url.path),
-                request_body=request_body,
-                status_code=500,
-                response_time_ms=elapsed_ms,
-                user_id=user_id,
-                user_email=user_email,
-                ip_address=ip_address,
-            )
-
-            logger.exception("Unhandled exception on %s %s", request.method, request.url.path)
-
-            return JSONResponse(
-                status_code=500,
-                content={"detail": "Internal Server Error"},
-            )
+_BODY_METHODS = ("POST", "PUT", "PATCH")
+
+
+class BodyRecorder:
+    """Wraps ``receive`` to keep a copy of the first bytes the app reads.
+
+    Nothing is read ahead of the endpoint, and copying stops once the
+    body is known to exceed :data:`_MAX_BODY_SIZE` (such bodies are not
+    recorded at all).
+    """
+
+    def __init__(self, receive: Receive):
+        self._receive = receive
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self.too_large = False
+
+    @classmethod
+    def wrap(cls, scope: Scope, receive: Receive) -> Optional["BodyRecorder"]:
+        path = scope.get("path", "")
+        if scope["method"] not in _BODY_METHODS or any(path.startswith(p) for p in _SENSITIVE_PATHS):
+            return None
+        return cls(receive)
+
+    async def receive(self) -> Message:
+        message = await self._receive()
+        if message["type"] == "http.request" and not self.too_large:
+            chunk = message.get("body", b"")
+            self._size += len(chunk)
+            if self._size > _MAX_BODY_SIZE:
+                self.too_large = True
+                self._chunks.clear()
+            elif chunk:
+                self._chunks.append(chunk)
+        return message
+
+    @property
+    def text(self) -> Optional[str]:
+        if self.too_large:
+            return None
+        return b"".join(self._chunks).decode("utf-8", errors="replace")
+
+
+def _user_from_token(headers: Headers) -> tuple[Optional[int], Optional[str]]:
+    """Best-effort (user_id, email) from the bearer token."""
+    try:
+        from app.config import settings
+        from jose import jwt as jose_jwt
+        auth_header = headers.get("authorization", "")
+        if auth_header.startswith("Bearer "):
+            payload = jose_jwt.decode(auth_header[7:], settings.secret_key, algorithms=["HS256"])
+            return int(payload.get("sub", 0)) or None, payload.get("email") or None
+    except Exception:
+        pass  # auth extraction is best-effort
+    return None, None
+
+
+async def record_request_error(
+    scope: Scope,
+    exc: Exception,
+    *,
+    status_code: int,
+    elapsed_ms: float,
+    body: Optional[BodyRecorder],
+    severity: ErrorSeverity = ErrorSeverity.ERROR,
+    function_name: Optional[str] = None,
+) -> None:
+    """Persist a failed request with its HTTP context."""
+    user_id, user_email = _user_from_token(Headers(scope=scope))
+    client = scope.get("client")
+    await log_error_standalone(
+        exc,
+        severity=severity,
+        module="middleware.error_capture",
+        function_name=function_name,
+        request_method=scope["method"],
+        request_path=scope["path"],
+        request_body=body.text if body else None,
+        status_code=status_code,
+        response_time_ms=elapsed_ms,
+        user_id=user_id,
+        user_email=user_email,
+        ip_address=client[0] if client else None,
+    )
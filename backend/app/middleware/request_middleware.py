@@ -0,0 +1,112 @@
+"""Per-request middleware: security headers, timing, metrics and error capture.
+
+A single pure-ASGI layer instead of one ``BaseHTTPMiddleware`` per
+concern.  Headers are added by wrapping ``send``, so streaming responses
+pass straight through, and nothing about the request is read or decoded
+unless an error is being recorded (see ``error_capture``).
+"""
+
+from __future__ import annotations
+
+import time
+
+from fastapi import HTTPException
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.middleware.error_capture import BodyRecorder, logger, record_request_error
+from app.models.error_log import ErrorSeverity
+from app.services import request_metrics
+
+
+def _security_headers() -> list[tuple[str, str]]:
+    headers = [
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-Frame-Options", "DENY"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+        ("Permissions-Policy", "camera=(), microphone=(), geolocation=()"),
+    ]
+    if settings.environment != "development":
+        headers += [
+            ("Strict-Transport-Security", "max-age=63072000; includeSubDomains"),
+            ("Content-Security-Policy",
+             "default-src 'self'; script-src 'self'; style-src 'self' 'unsafe-inline'; "
+             "img-src 'self' data:; connect-src 'self'"),
+        ]
+    return headers
+
+
+class RequestMiddleware:
+    """Adds security and ``X-Response-Time`` headers, records 5xx failures and
+    feeds the per-route latency and query-count metrics.
+
+    Unhandled exceptions are logged and turned into a JSON 500 when the
+    response has not started yet; 5xx responses returned by endpoints are
+    recorded once the response completes.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.headers = _security_headers()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.monotonic()
+        body = BodyRecorder.wrap(scope, receive)
+        status_code: int | None = None
+
+        def elapsed_ms() -> float:
+            return round((time.monotonic() - start) * 1000, 2)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                for name, value in self.headers:
+                    headers[name] = value
+                headers["X-Response-Time"] = f"{round(elapsed_ms(), 1)}ms"
+            await send(message)
+
+        stats, stats_token = request_metrics.start_request()
+        try:
+            try:
+                await self.app(scope, body.receive if body else receive, send_wrapper)
+            except Exception as exc:
+                if isinstance(exc, HTTPException) and exc.status_code < 500:
+                    # 4xx errors from HTTPException — don't log these as errors
+                    raise
+                severity = ErrorSeverity.CRITICAL if "database" in str(exc).lower() else ErrorSeverity.ERROR
+                await record_request_error(
+                    scope, exc, status_code=500, elapsed_ms=elapsed_ms(), body=body, severity=severity,
+                )
+                logger.exception("Unhandled exception on %s %s", scope["method"], scope["path"])
+                if status_code is not None:
+                    # Response already under way; let the server close the connection
+                    raise
+                response = JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+                await response(scope, receive, send_wrapper)
+                return
+
+            # Log only server-side failures (5xx). Client-side 4xx outcomes
+            # are often expected validation/business responses.
+            if status_code is not None and status_code >= 500:
+                await record_request_error(
+                    scope,
+                    Exception(f"HTTP {status_code} on {scope['method']} {scope['path']}"),
+                    status_code=status_code,
+                    elapsed_ms=elapsed_ms(),
+                    body=body,
+                    function_name="__call__",
+                )
+        finally:
+            request_metrics.end_request(stats_token)
+            request_metrics.observe_request(
+                scope["method"], request_metrics.route_label(scope), status_code or 500,
+                time.monotonic() - start, stats,
+            )
@@ -0,0 +1,56 @@
+"""Materialized per-period GL account balances.
+
+Creates: account_period_balances table (backfilled from posted journal lines).
+Adds index: gl_journal_entries.accounting_period_id.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "027"
+down_revision = "026"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "account_period_balances",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("gl_account_id", sa.Integer, sa.ForeignKey("gl_accounts.id"), nullable=False),
+        sa.Column("accounting_period_id", sa.Integer, sa.ForeignKey("gl_accounting_periods.id"), nullable=False),
+        sa.Column("debit_total", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("credit_total", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("is_sealed", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column("sealed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("gl_account_id", "accounting_period_id", name="uq_account_period_balance"),
+    )
+    op.create_index("ix_apb_period", "account_period_balances", ["accounting_period_id"])
+    op.create_index("ix_gl_je_period", "gl_journal_entries", ["accounting_period_id"])
+
+    # Backfill from the ledger; closed and locked periods start out sealed.
+    op.execute(
+        """
+        INSERT INTO account_period_balances
+            (gl_account_id, accounting_period_id, debit_total, credit_total, is_sealed, sealed_at)
+        SELECT l.gl_account_id,
+               e.accounting_period_id,
+               SUM(l.debit_amount),
+               SUM(l.credit_amount),
+               lower(p.status::text) IN ('closed', 'locked'),
+               CASE WHEN lower(p.status::text) IN ('closed', 'locked') THEN now() END
+        FROM gl_journal_entry_lines l
+        JOIN gl_journal_entries e ON e.id = l.journal_entry_id
+        JOIN gl_accounting_periods p ON p.id = e.accounting_period_id
+        WHERE lower(e.status::text) = 'posted'
+        GROUP BY l.gl_account_id, e.accounting_period_id, p.status
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_gl_je_period", table_name="gl_journal_entries")
+    op.drop_index("ix_apb_period", table_name="account_period_balances")
+    op.drop_table("account_period_balances")
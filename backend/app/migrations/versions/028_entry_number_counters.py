@@ -0,0 +1,36 @@
+"""Per-year journal entry number counters.
+
+Creates: gl_entry_number_counters table, seeded from existing entry numbers.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "028"
+down_revision = "027"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "gl_entry_number_counters",
+        sa.Column("year", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("last_value", sa.Integer, nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO gl_entry_number_counters (year, last_value)
+        SELECT CAST(split_part(entry_number, '-', 2) AS integer),
+               MAX(CAST(split_part(entry_number, '-', 3) AS integer))
+        FROM gl_journal_entries
+        WHERE entry_number ~ '^JE-[0-9]{4}-[0-9]+$'
+        GROUP BY 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("gl_entry_number_counters")
@@ -0,0 +1,178 @@
+"""Denormalized per-loan servicing snapshots.
+
+Creates: loan_servicing_snapshots table, backfilled for every disbursed
+loan (the same figures ``services.loan_servicing.snapshot_query`` produced
+at this revision) so the loan book and dashboards are right before the
+first aging pass.  From then on rows are kept current by the application.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "029"
+down_revision = "028"
+branch_labels = None
+depends_on = None
+
+
+def _money(name: str, nullable: bool = False) -> sa.Column:
+    if nullable:
+        return sa.Column(name, sa.Numeric(12, 2), nullable=True)
+    return sa.Column(name, sa.Numeric(12, 2), nullable=False, server_default="0")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "loan_servicing_snapshots",
+        sa.Column(
+            "loan_application_id", sa.Integer,
+            sa.ForeignKey("loan_applications.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        _money("principal_amount"),
+        _money("total_paid"),
+        _money("outstanding_balance"),
+        _money("outstanding_principal"),
+        _money("outstanding_interest"),
+        _money("outstanding_fees"),
+        _money("overdue_amount"),
+        _money("overdue_1_30"),
+        _money("overdue_31_60"),
+        _money("overdue_61_90"),
+        _money("overdue_90_plus"),
+        sa.Column("oldest_unpaid_due_date", sa.Date, nullable=True),
+        sa.Column("days_past_due", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("arrears_bucket", sa.String(10), nullable=False, server_default="current"),
+        sa.Column("next_due_date", sa.Date, nullable=True),
+        _money("next_due_amount", nullable=True),
+        sa.Column("last_payment_date", sa.Date, nullable=True),
+        _money("last_payment_amount", nullable=True),
+        _money("interest_collected"),
+        sa.Column("risk_band", sa.String(5), nullable=True),
+        sa.Column("credit_score", sa.Integer, nullable=True),
+        sa.Column("as_of_date", sa.Date, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_lss_days_past_due", "loan_servicing_snapshots", ["days_past_due"])
+    op.create_index("ix_lss_arrears_bucket", "loan_servicing_snapshots", ["arrears_bucket"])
+    op.create_index("ix_lss_oldest_unpaid_due", "loan_servicing_snapshots", ["oldest_unpaid_due_date"])
+    op.create_index("ix_lss_next_due_date", "loan_servicing_snapshots", ["next_due_date"])
+    op.create_index("ix_lss_as_of_date", "loan_servicing_snapshots", ["as_of_date"])
+
+    # Repayments settle fees, then interest, then principal
+    op.execute(
+        """
+        INSERT INTO loan_servicing_snapshots (
+            loan_application_id, principal_amount, total_paid, outstanding_balance,
+            outstanding_principal, outstanding_interest, outstanding_fees, overdue_amount,
+            overdue_1_30, overdue_31_60, overdue_61_90, overdue_90_plus,
+            oldest_unpaid_due_date, days_past_due, arrears_bucket, next_due_date,
+            next_due_amount, last_payment_date, last_payment_amount, interest_collected,
+            risk_band, credit_score, as_of_date
+        )
+        SELECT
+            la.id,
+            coalesce(la.amount_approved, la.amount_requested),
+            r.total_paid,
+            coalesce(la.amount_approved, la.amount_requested) - r.total_paid,
+            r.outstanding_principal,
+            r.outstanding_interest,
+            r.outstanding_fees,
+            r.overdue_amount,
+            r.overdue_1_30,
+            r.overdue_31_60,
+            r.overdue_61_90,
+            r.overdue_90_plus,
+            r.oldest_unpaid_due_date,
+            CASE WHEN r.oldest_unpaid_due_date < CURRENT_DATE
+                 THEN CURRENT_DATE - r.oldest_unpaid_due_date ELSE 0 END,
+            CASE WHEN r.oldest_unpaid_due_date IS NULL OR r.oldest_unpaid_due_date >= CURRENT_DATE
+                     THEN 'current'
+                 WHEN r.oldest_unpaid_due_date >= CURRENT_DATE - 30 THEN '1-30'
+                 WHEN r.oldest_unpaid_due_date >= CURRENT_DATE - 60 THEN '31-60'
+                 WHEN r.oldest_unpaid_due_date >= CURRENT_DATE - 90 THEN '61-90'
+                 ELSE '90+' END,
+            r.next_due_date,
+            (SELECT sum(ps.amount_due - ps.amount_paid) FROM payment_schedules ps
+             WHERE ps.loan_application_id = la.id AND ps.status != 'PAID'
+               AND ps.due_date = r.next_due_date),
+            lp.payment_date,
+            lp.amount,
+            r.interest_collected,
+            ld.risk_band,
+            ld.credit_score,
+            CURRENT_DATE
+        FROM loan_applications la
+        JOIN (
+            SELECT
+                loan_application_id,
+                coalesce(sum(amount_paid), 0) AS total_paid,
+                coalesce(sum(CASE WHEN status != 'PAID' AND amount_due - amount_paid > 0
+                                  THEN CASE WHEN amount_due - amount_paid < principal
+                                            THEN amount_due - amount_paid ELSE principal END
+                                  ELSE 0 END), 0)
+                    AS outstanding_principal,
+                coalesce(sum(CASE WHEN status != 'PAID' AND amount_due - amount_paid - principal > 0
+                                  THEN CASE WHEN amount_due - amount_paid - principal < interest
+                                            THEN amount_due - amount_paid - principal ELSE interest END
+                                  ELSE 0 END), 0)
+                    AS outstanding_interest,
+                coalesce(sum(CASE WHEN status != 'PAID'
+                                   AND amount_due - amount_paid - principal - interest > 0
+                                  THEN CASE WHEN amount_due - amount_paid - principal - interest < fee
+                                            THEN amount_due - amount_paid - principal - interest
+                                            ELSE fee END
+                                  ELSE 0 END), 0)
+                    AS outstanding_fees,
+                coalesce(sum(CASE WHEN status != 'PAID' AND amount_paid < amount_due
+                                   AND due_date < CURRENT_DATE
+                                  THEN amount_due - amount_paid ELSE 0 END), 0) AS overdue_amount,
+                coalesce(sum(CASE WHEN status != 'PAID' AND amount_paid < amount_due
+                                   AND due_date BETWEEN CURRENT_DATE - 30 AND CURRENT_DATE - 1
+                                  THEN amount_due - amount_paid ELSE 0 END), 0) AS overdue_1_30,
+                coalesce(sum(CASE WHEN status != 'PAID' AND amount_paid < amount_due
+                                   AND due_date BETWEEN CURRENT_DATE - 60 AND CURRENT_DATE - 31
+                                  THEN amount_due - amount_paid ELSE 0 END), 0) AS overdue_31_60,
+                coalesce(sum(CASE WHEN status != 'PAID' AND amount_paid < amount_due
+                                   AND due_date BETWEEN CURRENT_DATE - 90 AND CURRENT_DATE - 61
+                                  THEN amount_due - amount_paid ELSE 0 END), 0) AS overdue_61_90,
+                coalesce(sum(CASE WHEN status != 'PAID' AND amount_paid < amount_due
+                                   AND due_date <= CURRENT_DATE - 91
+                                  THEN amount_due - amount_paid ELSE 0 END), 0) AS overdue_90_plus,
+                min(CASE WHEN status != 'PAID' AND amount_paid < amount_due THEN due_date END)
+                    AS oldest_unpaid_due_date,
+                min(CASE WHEN status != 'PAID' AND due_date >= CURRENT_DATE THEN due_date END)
+                    AS next_due_date,
+                coalesce(sum(CASE WHEN status = 'PAID' THEN interest ELSE 0 END), 0)
+                    AS interest_collected
+            FROM payment_schedules
+            GROUP BY loan_application_id
+        ) r ON r.loan_application_id = la.id
+        LEFT JOIN LATERAL (
+            SELECT payment_date, amount FROM payments p
+            WHERE p.loan_application_id = la.id AND p.status = 'COMPLETED'
+              AND p.payment_type != 'DISBURSEMENT'
+            ORDER BY p.payment_date DESC, p.id DESC
+            LIMIT 1
+        ) lp ON true
+        LEFT JOIN LATERAL (
+            SELECT risk_band, credit_score FROM decisions d
+            WHERE d.loan_application_id = la.id
+            ORDER BY d.created_at DESC, d.id DESC
+            LIMIT 1
+        ) ld ON true
+        WHERE la.status = 'DISBURSED'
+        """
+    )
+
+
+def downgrade() -> None:
+    for name in (
+        "ix_lss_as_of_date",
+        "ix_lss_next_due_date",
+        "ix_lss_oldest_unpaid_due",
+        "ix_lss_arrears_bucket",
+        "ix_lss_days_past_due",
+    ):
+        op.drop_index(name, table_name="loan_servicing_snapshots")
+    op.drop_table("loan_servicing_snapshots")
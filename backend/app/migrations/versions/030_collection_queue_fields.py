@@ -0,0 +1,75 @@
+"""Work-queue fields on collection cases.
+
+Adds to collection_cases: outstanding_balance, latest_ptp_status,
+latest_ptp_amount, latest_ptp_date, propensity_score, plus keyset indexes
+for every queue sort and an expression index on the effective SLA deadline.
+Latest-PTP fields are backfilled here; balances and propensity are filled
+by the next case sync.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "030"
+down_revision = "029"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("collection_cases", sa.Column("outstanding_balance", sa.Numeric(12, 2), nullable=False, server_default="0"))
+    op.add_column("collection_cases", sa.Column("latest_ptp_status", sa.String(20), nullable=True))
+    op.add_column("collection_cases", sa.Column("latest_ptp_amount", sa.Numeric(12, 2), nullable=True))
+    op.add_column("collection_cases", sa.Column("latest_ptp_date", sa.Date, nullable=True))
+    op.add_column("collection_cases", sa.Column("propensity_score", sa.Integer, nullable=False, server_default="50"))
+
+    op.create_index("ix_cc_queue_priority", "collection_cases", ["priority_score", "id"])
+    op.create_index("ix_cc_queue_dpd", "collection_cases", ["dpd", "id"])
+    op.create_index("ix_cc_queue_overdue", "collection_cases", ["total_overdue", "id"])
+    op.create_index("ix_cc_queue_outstanding", "collection_cases", ["outstanding_balance", "id"])
+    op.create_index("ix_cc_queue_propensity", "collection_cases", ["propensity_score", "id"])
+    # Exactly the queue's SLA sort key, "no deadline" literal included
+    op.create_index(
+        "ix_cc_queue_sla",
+        "collection_cases",
+        [sa.text("coalesce(sla_next_contact_deadline, sla_first_contact_deadline, '9999-12-31 00:00:00+00:00')"), "id"],
+    )
+    op.create_index("ix_cc_latest_ptp_status", "collection_cases", ["latest_ptp_status"])
+
+    op.execute(
+        """
+        UPDATE collection_cases c
+        SET latest_ptp_status = lower(p.status::text),
+            latest_ptp_amount = p.amount_promised,
+            latest_ptp_date = p.promise_date
+        FROM (
+            SELECT DISTINCT ON (collection_case_id)
+                   collection_case_id, status, amount_promised, promise_date
+            FROM promises_to_pay
+            ORDER BY collection_case_id, created_at DESC, id DESC
+        ) p
+        WHERE p.collection_case_id = c.id
+        """
+    )
+
+
+def downgrade() -> None:
+    for name in (
+        "ix_cc_latest_ptp_status",
+        "ix_cc_queue_sla",
+        "ix_cc_queue_propensity",
+        "ix_cc_queue_outstanding",
+        "ix_cc_queue_overdue",
+        "ix_cc_queue_dpd",
+        "ix_cc_queue_priority",
+    ):
+        op.drop_index(name, table_name="collection_cases")
+    for column in (
+        "propensity_score",
+        "latest_ptp_date",
+        "latest_ptp_amount",
+        "latest_ptp_status",
+        "outstanding_balance",
+    ):
+        op.drop_column("collection_cases", column)
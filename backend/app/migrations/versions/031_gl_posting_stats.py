@@ -0,0 +1,87 @@
+"""Rolling GL posting statistics for anomaly detection.
+
+Creates: gl_posting_stats (backfilled from the last 100 posted entries per
+source type) and gl_account_combinations (backfilled from every posted
+entry).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "031"
+down_revision = "030"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "gl_posting_stats",
+        sa.Column("source_type", sa.String(30), primary_key=True),
+        sa.Column("sample_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("mean", sa.Float, nullable=False, server_default="0"),
+        sa.Column("m2", sa.Float, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "gl_account_combinations",
+        sa.Column("source_type", sa.String(30), primary_key=True),
+        sa.Column("signature", sa.String(32), primary_key=True),
+        sa.Column("first_entry_id", sa.Integer, nullable=False),
+        sa.Column("seen_count", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_gl_acc_combo_first_entry", "gl_account_combinations", ["source_type", "first_entry_id"],
+    )
+
+    op.execute(
+        """
+        WITH totals AS (
+            SELECT e.id,
+                   lower(e.source_type::text) AS source_type,
+                   SUM(l.debit_amount)::float8 AS amount,
+                   row_number() OVER (PARTITION BY e.source_type ORDER BY e.id DESC) AS rn
+            FROM gl_journal_entries e
+            JOIN gl_journal_entry_lines l ON l.journal_entry_id = e.id
+            WHERE lower(e.status::text) = 'posted'
+            GROUP BY e.id, e.source_type
+        )
+        INSERT INTO gl_posting_stats (source_type, sample_count, mean, m2)
+        SELECT source_type,
+               COUNT(*),
+               AVG(amount),
+               COALESCE(VAR_SAMP(amount), 0) * (COUNT(*) - 1)
+        FROM totals
+        WHERE rn <= 100
+        GROUP BY source_type
+        """
+    )
+    op.execute(
+        """
+        WITH accounts AS (
+            SELECT DISTINCT e.id, lower(e.source_type::text) AS source_type,
+                   e.created_at, l.gl_account_id
+            FROM gl_journal_entries e
+            JOIN gl_journal_entry_lines l ON l.journal_entry_id = e.id
+            WHERE lower(e.status::text) = 'posted'
+        ), signatures AS (
+            SELECT id, source_type, created_at,
+                   md5(string_agg(gl_account_id::text, ',' ORDER BY gl_account_id)) AS signature
+            FROM accounts
+            GROUP BY id, source_type, created_at
+        )
+        INSERT INTO gl_account_combinations
+            (source_type, signature, first_entry_id, seen_count, last_seen_at)
+        SELECT source_type, signature, MIN(id), COUNT(*), MAX(created_at)
+        FROM signatures
+        GROUP BY source_type, signature
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_gl_acc_combo_first_entry", table_name="gl_account_combinations")
+    op.drop_table("gl_account_combinations")
+    op.drop_table("gl_posting_stats")
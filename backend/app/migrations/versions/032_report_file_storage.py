@@ -0,0 +1,22 @@
+"""Store generated reports as files instead of inline base64.
+
+Adds: report_history.file_path.  Existing rows keep their base64
+file_data and are still served from it.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "032"
+down_revision = "031"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("report_history", sa.Column("file_path", sa.String(500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("report_history", "file_path")
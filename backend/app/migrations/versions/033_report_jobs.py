@@ -0,0 +1,31 @@
+"""Background report jobs with a result cache.
+
+Adds to report_history: status, progress, error_message, cache_key,
+started_at and completed_at.  Existing rows were generated synchronously,
+so they are marked completed.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "033"
+down_revision = "032"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("report_history", sa.Column("status", sa.String(20), nullable=False, server_default="completed"))
+    op.add_column("report_history", sa.Column("progress", sa.Integer, nullable=False, server_default="100"))
+    op.add_column("report_history", sa.Column("error_message", sa.Text, nullable=True))
+    op.add_column("report_history", sa.Column("cache_key", sa.String(64), nullable=True))
+    op.add_column("report_history", sa.Column("started_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("report_history", sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_report_history_cache_key", "report_history", ["cache_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_history_cache_key", table_name="report_history")
+    for column in ("completed_at", "started_at", "cache_key", "error_message", "progress", "status"):
+        op.drop_column("report_history", column)
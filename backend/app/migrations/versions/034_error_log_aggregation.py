@@ -0,0 +1,29 @@
+"""Aggregate repeated errors into one error_logs row per hour.
+
+Adds fingerprint (hash of error type, module and line), occurrence_count
+and last_seen_at.  Existing rows count once, last seen when created.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "034"
+down_revision = "033"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("error_logs", sa.Column("fingerprint", sa.String(40), nullable=True))
+    op.add_column("error_logs", sa.Column("occurrence_count", sa.Integer, nullable=False, server_default="1"))
+    op.add_column("error_logs", sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE error_logs SET last_seen_at = created_at")
+    op.alter_column("error_logs", "last_seen_at", nullable=False, server_default=sa.func.now())
+    op.create_index("ix_error_logs_fingerprint_created", "error_logs", ["fingerprint", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_error_logs_fingerprint_created", table_name="error_logs")
+    for column in ("last_seen_at", "occurrence_count", "fingerprint"):
+        op.drop_column("error_logs", column)
@@ -0,0 +1,35 @@
+"""Record every journal entry an accrual batch posted.
+
+Adds gl_accrual_batches.journal_entry_ids.  A batch split by branch or
+product posts several entries; existing batches are backfilled from the
+entries carrying their source reference, falling back to the single
+journal_entry_id.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "035"
+down_revision = "034"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("gl_accrual_batches", sa.Column("journal_entry_ids", sa.JSON, nullable=True))
+    op.execute(
+        """
+        UPDATE gl_accrual_batches b
+        SET journal_entry_ids = coalesce(
+            (SELECT json_agg(je.id ORDER BY je.id)
+             FROM gl_journal_entries je
+             WHERE je.source_reference IN ('ACCRUAL-BATCH-' || b.id, 'PROVISION-BATCH-' || b.id)),
+            CASE WHEN b.journal_entry_id IS NOT NULL THEN json_build_array(b.journal_entry_id) END
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("gl_accrual_batches", "journal_entry_ids")
@@ -24,7 +24,7 @@ from app.models.conversation import (
     ConversationEntryPoint,
     MessageRole,
 )
-from app.models.payment import Payment, PaymentSchedule
+from app.models.payment import Payment, PaymentSchedule, LoanServicingSnapshot
 from app.models.disbursement import Disbursement
 from app.models.collection import CollectionRecord, CollectionChat
 from app.models.collections_ext import (
@@ -33,7 +33,7 @@ from app.models.collections_ext import (
     CaseStatus, DelinquencyStage, PTPStatus,
     SettlementOfferType, SettlementStatus,
 )
-from app.models.report import ReportHistory
+from app.models.report import ReportHistory, ReportJobStatus
 from app.models.bank_analysis import BankStatementAnalysis
 from app.models.credit_bureau_alert import (
     CreditBureauAlert,
@@ -120,6 +120,8 @@ from app.models.gl import (
     AccountingPeriod,
     JournalEntry,
     JournalEntryLine,
+    JournalEntryCounter,
+    AccountPeriodBalance,
     GLMappingTemplate,
     GLMappingTemplateLine,
     AccrualBatch,
@@ -127,6 +129,8 @@ from app.models.gl import (
     GLExportSchedule,
     GLExportLog,
     GLAnomaly,
+    GLPostingStats,
+    GLAccountCombination,
 )
 
 __all__ = [
@@ -166,6 +170,7 @@ __all__ = [
     "MessageRole",
     "Payment",
     "PaymentSchedule",
+    "LoanServicingSnapshot",
     "Disbursement",
     "CollectionRecord",
     "CollectionChat",
@@ -182,6 +187,7 @@ __all__ = [
     "SettlementOfferType",
     "SettlementStatus",
     "ReportHistory",
+    "ReportJobStatus",
     "Merchant",
     "Branch",
     "ProductCategory",
@@ -267,6 +273,8 @@ __all__ = [
     "AccountingPeriod",
     "JournalEntry",
     "JournalEntryLine",
+    "JournalEntryCounter",
+    "AccountPeriodBalance",
     "GLMappingTemplate",
     "GLMappingTemplateLine",
     "AccrualBatch",
@@ -274,4 +282,6 @@ __all__ = [
     "GLExportSchedule",
     "GLExportLog",
     "GLAnomaly",
+    "GLPostingStats",
+    "GLAccountCombination",
 ]
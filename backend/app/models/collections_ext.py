@@ -6,7 +6,7 @@ from decimal import Decimal
 
 from sqlalchemy import (
     String, Integer, Enum, DateTime, Date, ForeignKey, Text,
-    Float, Numeric, Boolean, JSON, func,
+    Float, Numeric, Boolean, JSON, Index, func, text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -76,6 +76,36 @@ def dpd_to_stage(dpd: int) -> DelinquencyStage:
     return DelinquencyStage.SEVERE_90_PLUS
 
 
+def propensity_estimate(dpd: int, ptp_status: str | None) -> tuple[int, str]:
+    """Lightweight (score, trend) propensity-to-pay used by the work queue."""
+    if dpd <= 15:
+        score = 70
+    elif dpd <= 30:
+        score = 60
+    elif dpd <= 60:
+        score = 40
+    elif dpd <= 90:
+        score = 25
+    else:
+        score = 15
+    # Adjust by PTP history
+    if ptp_status == "kept":
+        score = min(100, score + 15)
+    elif ptp_status == "broken":
+        score = max(0, score - 15)
+
+    trend = "stable"
+    if dpd <= 30 and ptp_status == "kept":
+        trend = "improving"
+    elif dpd > 60:
+        trend = "declining"
+    return score, trend
+
+
+def propensity_band(score: int) -> str:
+    return "high" if score >= 65 else "medium" if score >= 35 else "low"
+
+
 # ── Models ──────────────────────────────────────────────────
 
 class CollectionCase(Base):
@@ -130,6 +160,16 @@ class CollectionCase(Base):
 
     jurisdiction: Mapped[str | None] = mapped_column(String(5), nullable=True)
 
+    # Work-queue fields, kept current by the case sync and PTP changes so
+    # the queue can filter and sort in SQL
+    outstanding_balance: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=0, nullable=False,
+    )
+    latest_ptp_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    latest_ptp_amount: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    latest_ptp_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    propensity_score: Mapped[int] = mapped_column(Integer, default=50, nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False,
     )
@@ -138,6 +178,24 @@ class CollectionCase(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        Index("ix_cc_queue_priority", "priority_score", "id"),
+        Index("ix_cc_queue_dpd", "dpd", "id"),
+        Index("ix_cc_queue_overdue", "total_overdue", "id"),
+        Index("ix_cc_queue_outstanding", "outstanding_balance", "id"),
+        Index("ix_cc_queue_propensity", "propensity_score", "id"),
+        # Exactly collections_queue.SLA_DEADLINE, "no deadline" literal included
+        Index(
+            "ix_cc_queue_sla",
+            text(
+                "coalesce(sla_next_contact_deadline, sla_first_contact_deadline, "
+                "'9999-12-31 00:00:00+00:00')"
+            ),
+            "id",
+        ),
+        Index("ix_cc_latest_ptp_status", "latest_ptp_status"),
+    )
+
     # Relationships
     loan_application = relationship("LoanApplication", backref="collection_case")
     assigned_agent = relationship("User", foreign_keys=[assigned_agent_id])
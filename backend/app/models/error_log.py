@@ -3,7 +3,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import String, Text, Integer, DateTime, Enum, Float, func
+from sqlalchemy import String, Text, Integer, DateTime, Enum, Float, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -17,8 +17,15 @@ class ErrorSeverity(str, enum.Enum):
 
 
 class ErrorLog(Base):
-    """Application error captured by middleware or explicit logging."""
+    """Application error captured by middleware or explicit logging.
+
+    Repeats of the same error (same fingerprint) within an hour are folded
+    into one row: ``occurrence_count`` and ``last_seen_at`` track them.
+    """
     __tablename__ = "error_logs"
+    __table_args__ = (
+        Index("ix_error_logs_fingerprint_created", "fingerprint", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -29,6 +36,8 @@ class ErrorLog(Base):
     error_type: Mapped[str] = mapped_column(String(200), nullable=False)
     message: Mapped[str] = mapped_column(Text, nullable=False)
     traceback: Mapped[str | None] = mapped_column(Text, nullable=True)
+    fingerprint: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    occurrence_count: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
 
     # Where it happened
     module: Mapped[str | None] = mapped_column(String(300), nullable=True)
@@ -56,3 +65,6 @@ class ErrorLog(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False,
     )
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False,
+    )
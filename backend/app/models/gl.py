@@ -19,6 +19,7 @@ from sqlalchemy import (
     String,
     Numeric,
     Integer,
+    Float,
     Boolean,
     Enum,
     DateTime,
@@ -279,6 +280,7 @@ class JournalEntry(Base):
         Index("ix_gl_je_transaction_date", "transaction_date"),
         Index("ix_gl_je_source", "source_type", "source_reference"),
         Index("ix_gl_je_status", "status"),
+        Index("ix_gl_je_period", "accounting_period_id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -385,6 +387,15 @@ class JournalEntry(Base):
         return self.total_debits == self.total_credits
 
 
+class JournalEntryCounter(Base):
+    """Last journal entry number issued per calendar year (``JE-YYYY-NNNNNN``)."""
+
+    __tablename__ = "gl_entry_number_counters"
+
+    year: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    last_value: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 class JournalEntryLine(Base):
     """Individual debit or credit line within a journal entry."""
 
@@ -431,6 +442,45 @@ class JournalEntryLine(Base):
     gl_account = relationship("GLAccount", back_populates="journal_lines")
 
 
+class AccountPeriodBalance(Base):
+    """Posted debit/credit totals per account per accounting period.
+
+    Maintained incrementally by the journal engine as entries are posted
+    and reversed, so balances are read from these rows instead of summing
+    every journal line.  Sealed (rebuilt from the raw lines) when the
+    period closes.
+    """
+
+    __tablename__ = "account_period_balances"
+    __table_args__ = (
+        UniqueConstraint(
+            "gl_account_id", "accounting_period_id", name="uq_account_period_balance"
+        ),
+        Index("ix_apb_period", "accounting_period_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    gl_account_id: Mapped[int] = mapped_column(
+        ForeignKey("gl_accounts.id"), nullable=False
+    )
+    accounting_period_id: Mapped[int] = mapped_column(
+        ForeignKey("gl_accounting_periods.id"), nullable=False
+    )
+    debit_total: Mapped[Decimal] = mapped_column(
+        Numeric(18, 2), default=Decimal("0.00"), nullable=False
+    )
+    credit_total: Mapped[Decimal] = mapped_column(
+        Numeric(18, 2), default=Decimal("0.00"), nullable=False
+    )
+    is_sealed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    sealed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
 # ===================================================================
 # Phase 2 — Automation Models
 # ===================================================================
@@ -515,6 +565,9 @@ class AccrualBatch(Base):
     journal_entry_id: Mapped[int | None] = mapped_column(
         ForeignKey("gl_journal_entries.id"), nullable=True
     )
+    # Every entry the batch posted (one per branch/product when split);
+    # journal_entry_id is the first of them
+    journal_entry_ids: Mapped[list[int] | None] = mapped_column(JSON, nullable=True)
 
     started_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
@@ -633,3 +686,43 @@ class GLAnomaly(Base):
 
     # Relationships
     journal_entry = relationship("JournalEntry", back_populates="anomalies")
+
+
+class GLPostingStats(Base):
+    """Rolling amount statistics of posted entries, per source type.
+
+    Welford running mean and sum of squared deviations (``m2``) of entry
+    totals, updated as entries post.  The sample count is capped at the
+    detector's window, so older postings fade out instead of accumulating.
+    """
+
+    __tablename__ = "gl_posting_stats"
+
+    source_type: Mapped[str] = mapped_column(String(30), primary_key=True)
+    sample_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class GLAccountCombination(Base):
+    """Account combinations seen on posted entries, per source type.
+
+    ``signature`` is an md5 of the entry's distinct account ids in ascending
+    order; ``first_entry_id`` is the entry that introduced the combination.
+    """
+
+    __tablename__ = "gl_account_combinations"
+    __table_args__ = (
+        Index("ix_gl_acc_combo_first_entry", "source_type", "first_entry_id"),
+    )
+
+    source_type: Mapped[str] = mapped_column(String(30), primary_key=True)
+    signature: Mapped[str] = mapped_column(String(32), primary_key=True)
+    first_entry_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    seen_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
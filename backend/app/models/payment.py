@@ -1,9 +1,9 @@
-"""Payment and PaymentSchedule models."""
+"""Payment, PaymentSchedule and LoanServicingSnapshot models."""
 
 import enum
 from datetime import datetime, date
 from sqlalchemy import (
-    String, Numeric, Integer, Enum, DateTime, Date, ForeignKey, Text, func
+    String, Numeric, Integer, Enum, DateTime, Date, ForeignKey, Text, Index, func
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -83,3 +83,56 @@ class PaymentSchedule(Base):
     )
 
     loan_application = relationship("LoanApplication", backref="payment_schedules")
+
+
+class LoanServicingSnapshot(Base):
+    """Denormalized servicing figures for one loan.
+
+    Derived from the loan's schedule, payments and latest decision by
+    ``services.loan_servicing``; refreshed whenever a payment is applied or
+    the loan is disbursed, and aged nightly.  Date-dependent columns are as
+    of ``as_of_date``.
+    """
+    __tablename__ = "loan_servicing_snapshots"
+
+    loan_application_id: Mapped[int] = mapped_column(
+        ForeignKey("loan_applications.id", ondelete="CASCADE"), primary_key=True
+    )
+    principal_amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    total_paid: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    outstanding_balance: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    outstanding_principal: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    outstanding_interest: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    outstanding_fees: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+
+    # Arrears — unpaid amounts on instalments due before as_of_date
+    overdue_amount: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    overdue_1_30: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    overdue_31_60: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    overdue_61_90: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    overdue_90_plus: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    oldest_unpaid_due_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    days_past_due: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    arrears_bucket: Mapped[str] = mapped_column(String(10), default="current", nullable=False)
+
+    next_due_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    next_due_amount: Mapped[float | None] = mapped_column(Numeric(12, 2), nullable=True)
+    last_payment_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    last_payment_amount: Mapped[float | None] = mapped_column(Numeric(12, 2), nullable=True)
+    interest_collected: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+
+    risk_band: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    credit_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    as_of_date: Mapped[date] = mapped_column(Date, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_lss_days_past_due", "days_past_due"),
+        Index("ix_lss_arrears_bucket", "arrears_bucket"),
+        Index("ix_lss_oldest_unpaid_due", "oldest_unpaid_due_date"),
+        Index("ix_lss_next_due_date", "next_due_date"),
+        Index("ix_lss_as_of_date", "as_of_date"),
+    )
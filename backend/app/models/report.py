@@ -1,5 +1,6 @@
 """Report history model for tracking generated reports."""
 
+import enum
 from datetime import datetime
 from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, JSON, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -7,7 +8,16 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
+class ReportJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class ReportHistory(Base):
+    """A generated report; also the job record while it is being built."""
+
     __tablename__ = "report_history"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -17,10 +27,20 @@ class ReportHistory(Base):
         ForeignKey("users.id"), nullable=False
     )
     parameters: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    file_data: Mapped[str | None] = mapped_column(Text, nullable=True)  # base64 encoded
+    file_data: Mapped[str | None] = mapped_column(Text, nullable=True)  # legacy: base64 encoded
+    file_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
     file_format: Mapped[str] = mapped_column(String(10), default="csv")
+    status: Mapped[str] = mapped_column(
+        String(20), default=ReportJobStatus.PENDING.value, nullable=False
+    )
+    progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # sha256 of (report_type, parameters, data watermark) — identical requests share a result
+    cache_key: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     user = relationship("User")
@@ -902,6 +902,13 @@ class CollectionQueueEntry(BaseModel):
     propensity_trend: Optional[str] = None
 
 
+class CollectionQueuePage(BaseModel):
+    items: list[CollectionQueueEntry]
+    total: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
 # ── Collection Case ──────────────────────────────────
 
 class CollectionCaseResponse(BaseModel):
@@ -1100,7 +1107,11 @@ class ReportHistoryResponse(BaseModel):
     generated_by: int
     parameters: Optional[dict]
     file_format: str
+    status: str
+    progress: int
+    error_message: Optional[str] = None
     created_at: datetime
+    completed_at: Optional[datetime] = None
 
     model_config = {"from_attributes": True}
 
@@ -0,0 +1,29 @@
+"""Helpers for set-based writes — ``UPDATE … FROM (VALUES …)``.
+
+Batch jobs compute per-row results in Python and write them back in one
+statement per chunk instead of one ORM UPDATE per row::
+
+    v = values_table("v", {"id": Integer, "score": Float}, rows)
+    await db.execute(update(QueueEntry).where(QueueEntry.id == v.c.id)
+                     .values(priority_score=v.c.score))
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from sqlalchemy import column, values
+
+# Rows per statement; keeps bind parameters well under the driver's 32767 limit
+VALUES_CHUNK = 2000
+
+
+def values_table(name: str, columns: dict[str, Any], rows: Sequence[tuple]):
+    """A named ``(VALUES …)`` relation with typed columns, for joining in UPDATE/SELECT."""
+    return values(*(column(n, t) for n, t in columns.items()), name=name).data(list(rows))
+
+
+def chunks(rows: Sequence[Any], size: int = VALUES_CHUNK) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
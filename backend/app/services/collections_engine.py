@@ -12,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.loan import LoanApplication, LoanStatus
-from app.models.payment import PaymentSchedule, ScheduleStatus, Payment, PaymentStatus
+from app.models.payment import Payment, PaymentStatus, LoanServicingSnapshot
 from app.models.collection import CollectionRecord
 from app.models.collections_ext import (
     CollectionCase,
@@ -27,7 +27,9 @@ from app.models.collections_ext import (
     SLAConfig,
     CollectionsDashboardSnapshot,
     dpd_to_stage,
+    propensity_estimate,
 )
+from app.services.loan_servicing import age_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -47,30 +49,21 @@ async def sync_collection_cases(db: AsyncSession) -> dict[str, int]:
     today = date.today()
     stats: dict[str, int] = {"created": 0, "updated": 0, "closed": 0}
 
-    # Find all disbursed loans that have at least one overdue schedule line
-    overdue_sq = (
-        select(
-            PaymentSchedule.loan_application_id,
-            func.min(PaymentSchedule.due_date).label("earliest_overdue"),
-            func.sum(PaymentSchedule.amount_due - PaymentSchedule.amount_paid).label("total_overdue"),
-        )
-        .where(
-            PaymentSchedule.status.in_([ScheduleStatus.OVERDUE, ScheduleStatus.DUE, ScheduleStatus.PARTIAL]),
-            PaymentSchedule.due_date < today,
-            PaymentSchedule.amount_paid < PaymentSchedule.amount_due,
-        )
-        .group_by(PaymentSchedule.loan_application_id)
-        .subquery()
-    )
-
+    # Disbursed loans with overdue instalments, from the servicing snapshots
+    # (aged first, so rows reflect today's arrears)
+    await age_snapshots(db, today)
     loans_q = (
         select(
             LoanApplication.id,
-            overdue_sq.c.earliest_overdue,
-            overdue_sq.c.total_overdue,
+            LoanServicingSnapshot.oldest_unpaid_due_date,
+            LoanServicingSnapshot.overdue_amount,
+            LoanServicingSnapshot.outstanding_balance,
+        )
+        .join(LoanServicingSnapshot, LoanServicingSnapshot.loan_application_id == LoanApplication.id)
+        .where(
+            LoanApplication.status == LoanStatus.DISBURSED,
+            LoanServicingSnapshot.overdue_amount > 0,
         )
-        .join(overdue_sq, LoanApplication.id == overdue_sq.c.loan_application_id)
-        .where(LoanApplication.status == LoanStatus.DISBURSED)
     )
     rows = (await db.execute(loans_q)).all()
 
@@ -83,11 +76,12 @@ async def sync_collection_cases(db: AsyncSession) -> dict[str, int]:
     }
 
     active_loan_ids: set[int] = set()
-    for loan_id, earliest_overdue, total_overdue in rows:
+    for loan_id, earliest_overdue, total_overdue, outstanding in rows:
         active_loan_ids.add(loan_id)
         dpd = (today - earliest_overdue).days
         stage = dpd_to_stage(dpd)
         total_overdue_dec = Decimal(str(total_overdue)) if total_overdue else Decimal("0")
+        outstanding_dec = max(Decimal(str(outstanding or 0)), total_overdue_dec)
         priority = _compute_priority(dpd, float(total_overdue_dec))
 
         if loan_id in existing_cases:
@@ -95,7 +89,9 @@ async def sync_collection_cases(db: AsyncSession) -> dict[str, int]:
             cc.dpd = dpd
             cc.delinquency_stage = stage
             cc.total_overdue = total_overdue_dec
+            cc.outstanding_balance = outstanding_dec
             cc.priority_score = priority
+            cc.propensity_score = propensity_estimate(dpd, cc.latest_ptp_status)[0]
             if cc.status == CaseStatus.OPEN and dpd > 0:
                 cc.status = CaseStatus.IN_PROGRESS
             stats["updated"] += 1
@@ -105,7 +101,9 @@ async def sync_collection_cases(db: AsyncSession) -> dict[str, int]:
                 dpd=dpd,
                 delinquency_stage=stage,
                 total_overdue=total_overdue_dec,
+                outstanding_balance=outstanding_dec,
                 priority_score=priority,
+                propensity_score=propensity_estimate(dpd, None)[0],
                 status=CaseStatus.OPEN,
             )
             # Set SLA deadline for first contact
@@ -133,6 +131,40 @@ def _compute_priority(dpd: int, total_overdue: float) -> float:
     return round(dpd_factor * 0.4 + amount_factor * 0.6, 4)
 
 
+def apply_latest_ptp(case: CollectionCase, ptp: PromiseToPay | None) -> None:
+    """Copy a case's latest PTP onto it and re-derive its propensity score."""
+    status = ptp.status if ptp else None
+    case.latest_ptp_status = status.value if hasattr(status, "value") else status
+    case.latest_ptp_amount = ptp.amount_promised if ptp else None
+    case.latest_ptp_date = ptp.promise_date if ptp else None
+    case.propensity_score = propensity_estimate(case.dpd or 0, case.latest_ptp_status)[0]
+
+
+async def refresh_case_ptp(db: AsyncSession, case_ids) -> None:
+    """Re-read the latest PTP of each case in *case_ids* after PTPs changed."""
+    case_ids = list(set(case_ids))
+    if not case_ids:
+        return
+    await db.flush()
+    cases = (await db.execute(
+        select(CollectionCase).where(CollectionCase.id.in_(case_ids))
+    )).scalars().all()
+    ptps = (await db.execute(
+        select(PromiseToPay)
+        .where(PromiseToPay.collection_case_id.in_(case_ids))
+        .order_by(
+            PromiseToPay.collection_case_id,
+            PromiseToPay.created_at.desc(),
+            PromiseToPay.id.desc(),
+        )
+    )).scalars().all()
+    latest: dict[int, PromiseToPay] = {}
+    for ptp in ptps:
+        latest.setdefault(ptp.collection_case_id, ptp)
+    for c in cases:
+        apply_latest_ptp(c, latest.get(c.id))
+
+
 async def _get_sla_for_stage(db: AsyncSession, stage_value: str) -> SLAConfig | None:
     q = select(SLAConfig).where(SLAConfig.delinquency_stage == stage_value, SLAConfig.is_active == True)
     return (await db.execute(q)).scalars().first()
@@ -398,16 +430,19 @@ async def check_ptp_status(db: AsyncSession) -> dict[str, int]:
     ptps_q = select(PromiseToPay).where(PromiseToPay.status == PTPStatus.PENDING)
     ptps = (await db.execute(ptps_q)).scalars().all()
 
+    broken_case_ids: list[int] = []
     for ptp in ptps:
         if ptp.promise_date < cutoff:
             ptp.status = PTPStatus.BROKEN
             ptp.broken_at = datetime.now(timezone.utc)
+            broken_case_ids.append(ptp.collection_case_id)
             stats["broken"] += 1
         elif ptp.promise_date <= today and not ptp.reminded_at:
             # Due today or in grace window — mark as reminded
             ptp.reminded_at = datetime.now(timezone.utc)
             stats["reminded"] += 1
 
+    await refresh_case_ptp(db, broken_case_ids)
     await db.flush()
     return stats
 
@@ -0,0 +1,293 @@
+"""Collections work queue — filtered, sorted and keyset-paginated in SQL.
+
+Every filter the queue screen offers maps onto a column of
+``CollectionCase`` (kept current by the case sync and PTP changes), the
+loan, the applicant or their profile, so a page costs one indexed range
+scan plus a bounded count.  Pages are addressed by an opaque cursor that
+encodes the last row's sort value and case id.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import DateTime, and_, false, func, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collections_ext import CaseStatus, CollectionCase, DelinquencyStage
+from app.models.loan import ApplicantProfile, LoanApplication, LoanPurpose, LoanStatus
+from app.models.payment import LoanServicingSnapshot
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Totals are counted exactly up to this many rows, then reported as "at least"
+COUNT_CAP = 10_000
+
+# Hours before the SLA deadline at which a case counts as "approaching"
+SLA_APPROACHING_HOURS = 4
+
+# Cases without an SLA deadline sort as if it were infinitely far away
+_NO_DEADLINE = datetime(9999, 12, 31, tzinfo=timezone.utc)
+
+# Effective SLA deadline.  Sorting, paging and the SLA filters all use this
+# exact expression, which ix_cc_queue_sla indexes; the sentinel is rendered
+# inline rather than bound so the planner can match it to the index.
+SLA_DEADLINE = func.coalesce(
+    CollectionCase.sla_next_contact_deadline,
+    CollectionCase.sla_first_contact_deadline,
+    literal(_NO_DEADLINE, DateTime(timezone=True), literal_execute=True),
+)
+
+SORT_COLUMNS = {
+    "priority_score": CollectionCase.priority_score,
+    "days_past_due": CollectionCase.dpd,
+    "amount_due": CollectionCase.total_overdue,
+    "outstanding_balance": CollectionCase.outstanding_balance,
+    "propensity_score": CollectionCase.propensity_score,
+    "sla_hours_remaining": SLA_DEADLINE,
+}
+DEFAULT_SORT = "priority_score"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a page cursor is malformed or was issued for another sort."""
+
+
+@dataclass
+class QueueFilters:
+    search: str | None = None
+    stage: str | None = None
+    status: str | None = None
+    agent_id: int | None = None
+    ptp_status: str | None = None
+    nba_action: str | None = None
+    sector: str | None = None
+    propensity_band: str | None = None
+    sla_status: str | None = None
+    product_type: str | None = None
+
+
+@dataclass
+class QueuePage:
+    rows: list[Any]
+    total: int
+    total_is_estimate: bool = False
+    next_cursor: str | None = None
+
+
+@dataclass
+class QueueSort:
+    key: str = DEFAULT_SORT
+    descending: bool = True
+
+    @classmethod
+    def parse(cls, sort_by: str | None, sort_dir: str | None) -> "QueueSort":
+        key = sort_by if sort_by in SORT_COLUMNS else DEFAULT_SORT
+        return cls(key=key, descending=(sort_dir or "desc").lower() == "desc")
+
+    @property
+    def column(self):
+        return SORT_COLUMNS[self.key]
+
+
+# ────────────────────────────────────────────────────────────────────
+# Cursor encoding
+# ────────────────────────────────────────────────────────────────────
+
+def encode_cursor(sort: QueueSort, value: Any, case_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    payload = {"k": sort.key, "d": "desc" if sort.descending else "asc", "v": value, "id": case_id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: QueueSort) -> tuple[Any, int]:
+    """Return the ``(sort value, case id)`` a cursor points after."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, direction, value, case_id = payload["k"], payload["d"], payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("Malformed queue cursor") from exc
+    if key != sort.key or direction != ("desc" if sort.descending else "asc"):
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    try:
+        if key == "sla_hours_remaining":
+            value = datetime.fromisoformat(value)
+        elif key in ("amount_due", "outstanding_balance"):
+            value = Decimal(value)
+    except (ValueError, TypeError, ArithmeticError) as exc:
+        raise InvalidCursor("Malformed queue cursor") from exc
+    return value, case_id
+
+
+# ────────────────────────────────────────────────────────────────────
+# Query building
+# ────────────────────────────────────────────────────────────────────
+
+def _enum_match(column, enum_cls, value: str):
+    try:
+        return column == enum_cls(value)
+    except ValueError:
+        return false()
+
+
+def filter_conditions(filters: QueueFilters, now: datetime) -> list:
+    """WHERE clauses for the queue; unknown enum values match nothing."""
+    cc = CollectionCase
+    conds = [
+        LoanApplication.status == LoanStatus.DISBURSED,
+        or_(cc.dpd > 0, cc.total_overdue > 0),
+    ]
+    if filters.status:
+        conds.append(_enum_match(cc.status, CaseStatus, filters.status))
+    else:
+        conds.append(cc.status.notin_([CaseStatus.CLOSED, CaseStatus.WRITTEN_OFF]))
+
+    if filters.search:
+        pattern = f"%{filters.search}%"
+        conds.append(or_(
+            (User.first_name + " " + User.last_name).ilike(pattern),
+            LoanApplication.reference_number.ilike(pattern),
+            User.phone.ilike(pattern),
+            User.email.ilike(pattern),
+        ))
+    if filters.stage:
+        conds.append(_enum_match(cc.delinquency_stage, DelinquencyStage, filters.stage))
+    if filters.agent_id is not None:
+        conds.append(cc.assigned_agent_id == filters.agent_id)
+    if filters.nba_action:
+        conds.append(cc.next_best_action == filters.nba_action)
+    if filters.product_type:
+        conds.append(_enum_match(LoanApplication.purpose, LoanPurpose, filters.product_type))
+    if filters.sector:
+        conds.append(func.lower(ApplicantProfile.employer_sector) == filters.sector.lower())
+
+    if filters.ptp_status == "none":
+        conds.append(cc.latest_ptp_status.is_(None))
+    elif filters.ptp_status:
+        conds.append(cc.latest_ptp_status == filters.ptp_status)
+
+    if filters.propensity_band == "high":
+        conds.append(cc.propensity_score >= 65)
+    elif filters.propensity_band == "medium":
+        conds.append(and_(cc.propensity_score >= 35, cc.propensity_score < 65))
+    elif filters.propensity_band == "low":
+        conds.append(cc.propensity_score < 35)
+    elif filters.propensity_band:
+        conds.append(false())
+
+    if filters.sla_status == "breached":
+        conds.append(SLA_DEADLINE <= now)
+    elif filters.sla_status == "approaching":
+        conds.append(and_(
+            SLA_DEADLINE > now,
+            SLA_DEADLINE <= now + timedelta(hours=SLA_APPROACHING_HOURS),
+        ))
+    elif filters.sla_status:
+        conds.append(false())
+    return conds
+
+
+def base_query(filters: QueueFilters, now: datetime):
+    """Filtered queue rows: case, loan, applicant contact, profile and paid total."""
+    return (
+        select(
+            CollectionCase,
+            LoanApplication,
+            User.first_name,
+            User.last_name,
+            User.phone,
+            ApplicantProfile.employer_name,
+            ApplicantProfile.employer_sector,
+            LoanServicingSnapshot.total_paid,
+        )
+        .join(LoanApplication, LoanApplication.id == CollectionCase.loan_application_id)
+        .join(User, User.id == LoanApplication.applicant_id)
+        .outerjoin(ApplicantProfile, ApplicantProfile.user_id == LoanApplication.applicant_id)
+        .outerjoin(
+            LoanServicingSnapshot,
+            LoanServicingSnapshot.loan_application_id == LoanApplication.id,
+        )
+        .where(*filter_conditions(filters, now))
+    )
+
+
+async def count_queue(db: AsyncSession, filters: QueueFilters, now: datetime) -> tuple[int, bool]:
+    """``(total, is_estimate)`` — exact up to :data:`COUNT_CAP` rows."""
+    capped = (
+        base_query(filters, now)
+        .with_only_columns(CollectionCase.id)
+        .limit(COUNT_CAP + 1)
+        .subquery()
+    )
+    n = (await db.execute(select(func.count()).select_from(capped))).scalar() or 0
+    return min(n, COUNT_CAP), n > COUNT_CAP
+
+
+def page_query(
+    filters: QueueFilters,
+    sort: QueueSort,
+    now: datetime,
+    *,
+    cursor: str | None = None,
+    offset: int = 0,
+):
+    """Ordered queue rows starting after *cursor* (or at *offset*).
+
+    Rows carry an extra ``sort_value`` column for building the next cursor.
+    """
+    sort_col = sort.column
+    if sort.descending:
+        order = (sort_col.desc(), CollectionCase.id.desc())
+    else:
+        order = (sort_col.asc(), CollectionCase.id.asc())
+    query = base_query(filters, now).add_columns(sort_col.label("sort_value")).order_by(*order)
+
+    if cursor:
+        value, case_id = decode_cursor(cursor, sort)
+        key = tuple_(sort_col, CollectionCase.id)
+        after = tuple_(value, case_id)
+        query = query.where(key < after if sort.descending else key > after)
+    elif offset:
+        query = query.offset(offset)
+    return query
+
+
+async def fetch_queue_page(
+    db: AsyncSession,
+    filters: QueueFilters,
+    sort: QueueSort,
+    *,
+    limit: int,
+    cursor: str | None = None,
+    offset: int = 0,
+    with_total: bool = True,
+) -> QueuePage:
+    """One page of the queue, ordered by *sort* with the case id as tie-breaker.
+
+    With a *cursor* the page starts right after the row it encodes and
+    *offset* is ignored.  Raises :class:`InvalidCursor` for a bad cursor.
+    """
+    now = datetime.now(timezone.utc)
+    query = page_query(filters, sort, now, cursor=cursor, offset=offset)
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, last.sort_value, last[0].id)
+
+    total, estimate = (0, False)
+    if with_total:
+        total, estimate = await count_queue(db, filters, now)
+    return QueuePage(rows=rows, total=total, total_is_estimate=estimate, next_cursor=next_cursor)
@@ -0,0 +1,292 @@
+"""Aggregates behind the staff dashboards.
+
+Each dashboard is computed from a handful of aggregate statements —
+``FILTER`` clauses fold what used to be a query per figure into one row —
+and served through :mod:`app.services.metrics_cache` with a short TTL, so
+the staff landing pages share one computation per window.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.decision import Decision
+from app.models.loan import LoanApplication, LoanStatus
+from app.models.payment import LoanServicingSnapshot
+from app.models.queue import QueueEntry, QueueEntryStatus, StaffQueueProfile
+from app.models.user import User
+from app.services.loan_servicing import ARREARS_BUCKETS, CURRENT
+from app.services.metrics_cache import DASHBOARD_TTL, cached
+from app.services.sector_analysis import get_portfolio_dashboard
+
+BUCKET_LABELS = {
+    "1-30": "1–30 days",
+    "31-60": "31–60 days",
+    "61-90": "61–90 days",
+    "90+": "90+ days",
+}
+# Remaining principal in these buckets is assumed to default
+LOSS_BUCKETS = ("61-90", "90+")
+
+_QUEUE_ACTIVE = (QueueEntryStatus.NEW.value, QueueEntryStatus.IN_PROGRESS.value)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Back-office loan dashboard
+# ────────────────────────────────────────────────────────────────────
+
+def _application_totals():
+    la = LoanApplication
+    funded = la.status.in_([LoanStatus.DISBURSED, LoanStatus.ACCEPTED])
+    return select(
+        func.count().label("total"),
+        *(func.count().filter(la.status == s).label(f"n_{s.value}") for s in LoanStatus),
+        func.coalesce(func.sum(la.amount_approved).filter(la.status == LoanStatus.DISBURSED), 0)
+        .label("total_disbursed"),
+        # NULL when either timestamp is missing, which avg() skips
+        func.avg(extract("epoch", la.decided_at) - extract("epoch", la.submitted_at))
+        .label("avg_processing_seconds"),
+        func.avg(la.amount_requested).label("avg_loan"),
+        func.coalesce(func.sum(
+            la.amount_approved * la.interest_rate / 100.0 * la.term_months / 12.0
+        ).filter(funded), 0).label("projected_interest"),
+        func.coalesce(func.sum(la.amount_approved).filter(funded), 0).label("total_principal"),
+    ).subquery("apps")
+
+
+def _arrears_totals():
+    snap = LoanServicingSnapshot
+    loan_outstanding = snap.outstanding_principal + snap.outstanding_interest + snap.outstanding_fees
+    columns = []
+    for key, _, _, col in ARREARS_BUCKETS:
+        overdue_col = getattr(snap, col)
+        columns += [
+            func.count().filter(overdue_col > 0).label(f"{col}_count"),
+            func.coalesce(func.sum(overdue_col), 0).label(f"{col}_overdue"),
+            # Outstanding is attributed to the loan's highest bucket
+            func.coalesce(func.sum(loan_outstanding).filter(snap.arrears_bucket == key), 0)
+            .label(f"{col}_outstanding"),
+        ]
+    return (
+        select(
+            func.count().filter(snap.arrears_bucket != CURRENT).label("delinquent"),
+            func.coalesce(func.sum(snap.interest_collected), 0).label("interest_collected"),
+            *columns,
+        )
+        .select_from(snap)
+        .join(LoanApplication, LoanApplication.id == snap.loan_application_id)
+        .where(LoanApplication.status == LoanStatus.DISBURSED)
+        .subquery("arrears")
+    )
+
+
+def _arrears_summary(row) -> tuple[dict, dict]:
+    """(ArrearsSummary fields, bucket key -> outstanding) from the totals row."""
+    buckets = []
+    outstanding_by_key = {}
+    for key, _, _, col in ARREARS_BUCKETS:
+        outstanding = float(getattr(row, f"{col}_outstanding") or 0)
+        outstanding_by_key[key] = outstanding
+        buckets.append({
+            "label": BUCKET_LABELS[key],
+            "loan_count": getattr(row, f"{col}_count") or 0,
+            "total_outstanding": round(outstanding, 2),
+            "total_overdue": round(float(getattr(row, f"{col}_overdue") or 0), 2),
+        })
+    summary = {
+        "total_delinquent_loans": row.delinquent or 0,
+        "total_overdue_amount": round(sum(b["total_overdue"] for b in buckets), 2),
+        "total_outstanding_at_risk": round(sum(outstanding_by_key.values()), 2),
+        "buckets": buckets,
+    }
+    return summary, outstanding_by_key
+
+
+async def _volume_series(db: AsyncSession, now: datetime) -> tuple[list[dict], list[dict]]:
+    """Monthly volume over 12 months and daily volume over 30, from one daily rollup."""
+    la = LoanApplication
+    recent = la.created_at >= now - timedelta(days=30)
+    day = func.date(la.created_at).label("day")
+    rows = (await db.execute(
+        select(
+            day,
+            func.count(),
+            func.coalesce(func.sum(la.amount_requested), 0),
+            func.count().filter(recent),
+            func.coalesce(func.sum(la.amount_requested).filter(recent), 0),
+        )
+        .where(la.created_at >= now - timedelta(days=365))
+        .group_by(day)
+        .order_by(day)
+    )).all()
+
+    months: dict[tuple[int, int], list] = defaultdict(lambda: [0, 0.0])
+    daily = []
+    for d, count, volume, recent_count, recent_volume in rows:
+        month = months[(d.year, d.month)]
+        month[0] += count
+        month[1] += float(volume)
+        if recent_count:
+            daily.append({"date": str(d), "count": recent_count, "volume": float(recent_volume)})
+    monthly = [
+        {"year": year, "month": month, "count": count, "volume": volume}
+        for (year, month), (count, volume) in months.items()
+    ]
+    return monthly, daily
+
+
+async def compute_loan_dashboard(db: AsyncSession) -> dict:
+    """Back-office dashboard metrics as a ``DashboardMetrics``-shaped dict."""
+    now = datetime.now(timezone.utc)
+    apps = _application_totals()
+    arrears = _arrears_totals()
+    totals = (await db.execute(select(apps, arrears))).one()
+
+    status_counts = {
+        s.value: getattr(totals, f"n_{s.value}")
+        for s in LoanStatus
+        if getattr(totals, f"n_{s.value}")
+    }
+    pending = status_counts.get("submitted", 0) + status_counts.get("under_review", 0)
+    approved = status_counts.get("approved", 0) + status_counts.get("disbursed", 0)
+    declined = status_counts.get("declined", 0)
+    decided = approved + declined
+    approval_rate = (approved / decided * 100) if decided > 0 else 0
+
+    avg_seconds = totals.avg_processing_seconds
+    projected_interest = float(totals.projected_interest or 0)
+    total_principal = float(totals.total_principal or 0)
+
+    risk_rows = await db.execute(
+        select(Decision.risk_band, func.count(Decision.id))
+        .where(Decision.risk_band.isnot(None))
+        .group_by(Decision.risk_band)
+    )
+    risk_dist = {band: count for band, count in risk_rows.all()}
+    monthly, daily = await _volume_series(db, now)
+
+    arrears_summary, outstanding_by_key = _arrears_summary(totals)
+    interest_collected = float(totals.interest_collected or 0)
+    expected_default_loss = sum(outstanding_by_key[key] for key in LOSS_BUCKETS)
+
+    return {
+        "total_applications": totals.total or 0,
+        "pending_review": pending,
+        "approved": approved,
+        "declined": declined,
+        "total_disbursed": float(totals.total_disbursed or 0),
+        "approval_rate": round(approval_rate, 1),
+        "avg_processing_days": round(float(avg_seconds) / 86400, 1) if avg_seconds else 0,
+        "avg_loan_amount": round(float(totals.avg_loan or 0), 2),
+        "applications_by_status": status_counts,
+        "risk_distribution": risk_dist,
+        "monthly_volume": monthly,
+        "projected_interest_income": round(projected_interest, 2),
+        "total_principal_disbursed": round(total_principal, 2),
+        # Simple profit projection: interest less ~2% provision cost
+        "projected_profit": round(projected_interest - total_principal * 0.02, 2),
+        "daily_volume": daily,
+        "arrears_summary": arrears_summary,
+        "interest_collected": round(interest_collected, 2),
+        "expected_default_loss": round(expected_default_loss, 2),
+        "net_pnl": round(interest_collected - expected_default_loss, 2),
+    }
+
+
+async def loan_dashboard(db: AsyncSession) -> dict:
+    return await cached("dashboard:loans", DASHBOARD_TTL, lambda: compute_loan_dashboard(db))
+
+
+# ────────────────────────────────────────────────────────────────────
+# Queue awareness
+# ────────────────────────────────────────────────────────────────────
+
+async def compute_queue_overview(db: AsyncSession, staff_roles: list[str]) -> dict:
+    """Team-wide queue figures: one FILTER aggregate plus the team roster."""
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    la = LoanApplication
+    avg_turnaround = (
+        select(func.avg(func.extract("epoch", la.decided_at - la.submitted_at) / 3600))
+        .where(
+            la.decided_at.is_not(None),
+            la.submitted_at.is_not(None),
+            la.decided_at >= thirty_days_ago,
+        )
+        .scalar_subquery()
+    )
+    row = (await db.execute(
+        select(
+            func.count().filter(QueueEntry.status.in_(_QUEUE_ACTIVE)).label("pending"),
+            func.count().filter(QueueEntry.status == QueueEntryStatus.WAITING_BORROWER.value)
+            .label("waiting"),
+            avg_turnaround.label("avg_turnaround_hours"),
+        ).select_from(QueueEntry)
+    )).one()
+
+    team_result = await db.execute(
+        select(
+            User.id,
+            User.first_name,
+            User.last_name,
+            func.coalesce(StaffQueueProfile.current_load_count, 0).label("load"),
+            func.coalesce(StaffQueueProfile.max_concurrent, 10).label("max_load"),
+            func.coalesce(StaffQueueProfile.is_available, True).label("available"),
+        )
+        .outerjoin(StaffQueueProfile, User.id == StaffQueueProfile.user_id)
+        .where(User.role.in_(staff_roles), User.is_active == True)
+    )
+    hours = row.avg_turnaround_hours
+    return {
+        "pending": row.pending or 0,
+        "waiting": row.waiting or 0,
+        "avg_turnaround_hours": round(float(hours), 1) if hours else None,
+        "team": [
+            {
+                "user_id": t.id,
+                "name": f"{t.first_name} {t.last_name}",
+                "load": t.load,
+                "max_load": t.max_load,
+                "available": t.available,
+            }
+            for t in team_result.all()
+        ],
+    }
+
+
+async def queue_overview(db: AsyncSession, staff_roles: list[str]) -> dict:
+    return await cached(
+        "dashboard:queue", DASHBOARD_TTL, lambda: compute_queue_overview(db, staff_roles),
+    )
+
+
+async def personal_queue_counts(db: AsyncSession, user_id: int) -> dict:
+    """The caller's own active entries and today's decisions (not cached)."""
+    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    row = (await db.execute(
+        select(
+            func.count().filter(
+                QueueEntry.assigned_to_id == user_id,
+                QueueEntry.status.in_(_QUEUE_ACTIVE),
+            ).label("my_active"),
+            func.count().filter(
+                QueueEntry.claimed_by_id == user_id,
+                QueueEntry.status == QueueEntryStatus.DECIDED.value,
+                QueueEntry.updated_at >= today_start,
+            ).label("my_decided_today"),
+        ).where(
+            (QueueEntry.assigned_to_id == user_id) | (QueueEntry.claimed_by_id == user_id)
+        )
+    )).one()
+    return {"my_active": row.my_active or 0, "my_decided_today": row.my_decided_today or 0}
+
+
+# ────────────────────────────────────────────────────────────────────
+# Sector concentration
+# ────────────────────────────────────────────────────────────────────
+
+async def sector_dashboard(db: AsyncSession) -> dict:
+    """Portfolio concentration dashboard; services needing fresh figures call
+    ``sector_analysis.get_portfolio_dashboard`` directly."""
+    return await cached("dashboard:sectors", DASHBOARD_TTL, lambda: get_portfolio_dashboard(db))
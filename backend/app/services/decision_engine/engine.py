@@ -23,15 +23,18 @@ from app.models.decision import Decision, DecisionOutcome, DecisionRulesConfig
 from app.models.credit_report import CreditReport
 from app.models.audit import AuditLog
 from app.models.strategy import (
-    DecisionStrategy, DecisionTree, DecisionTreeNode,
+    DecisionStrategy, DecisionTreeNode,
     Assessment,
     DecisionAuditTrail, TreeStatus, StrategyStatus,
 )
 from app.services.decision_engine.scoring import ScoringInput, calculate_score
-from app.services.decision_engine.rules import RuleInput, evaluate_rules, DEFAULT_RULES
+from app.services.decision_engine.rules import (
+    RuleInput, CompiledRules, evaluate_rules, get_compiled_rules, DEFAULT_RULES,
+)
 from app.services.decision_engine.tree_router import (
     build_routing_context, route_application as tree_route,
 )
+from app.services.decision_engine.tree_cache import load_compiled_tree
 from app.services.decision_engine.strategy_executor import (
     execute_strategy as exec_strategy,
     execute_assessment as exec_assessment,
@@ -134,7 +137,10 @@ async def run_decision_engine(
         .order_by(DecisionRulesConfig.version.desc())
     )
     active_rules = rules_result_db.scalars().first()
-    rules_config = (active_rules.rules if active_rules and active_rules.rules else DEFAULT_RULES)
+    rules_config = get_compiled_rules(
+        active_rules.rules if active_rules and active_rules.rules else DEFAULT_RULES,
+        active_rules.version if active_rules and active_rules.rules else None,
+    )
     rules_version = active_rules.version if active_rules else 1
 
     # Check bureau data for active judgments / problematic debt
@@ -249,7 +255,7 @@ async def _run_legacy_path(
     application,
     scoring_result,
     rule_input: RuleInput,
-    rules_config: dict,
+    rules_config: CompiledRules,
     rules_version: int,
     scorecard_results: list,
     db: AsyncSession,
@@ -330,19 +336,21 @@ async def _run_tree_path(
     rule_input: RuleInput,
     scorecard_score_for_rules: float | None,
     scorecard_results: list,
-    rules_config: dict,
+    rules_config: CompiledRules,
     rules_version: int,
     db: AsyncSession,
 ) -> Decision:
     """Route through the decision tree and execute the assigned strategy."""
     product = application.credit_product
 
-    tree_result = await db.execute(
-        select(DecisionTree)
-        .where(DecisionTree.id == product.decision_tree_id)
-        .options(selectinload(DecisionTree.nodes))
-    )
-    tree = tree_result.scalar_one_or_none()
+    try:
+        tree = await load_compiled_tree(product.decision_tree_id, db)
+    except ValueError as e:
+        logger.error("Tree %s could not be compiled: %s", product.decision_tree_id, e)
+        return await _run_legacy_path(
+            application, scoring_result, rule_input,
+            rules_config, rules_version, scorecard_results, db,
+        )
 
     if tree is None:
         logger.warning(
@@ -360,7 +368,7 @@ async def _run_tree_path(
     # Route through tree
     default_strategy_id = tree.default_strategy_id or getattr(product, "default_strategy_id", None)
     try:
-        routing_result = tree_route(routing_context, tree.nodes, default_strategy_id)
+        routing_result = tree_route(routing_context, tree, default_strategy_id)
     except ValueError as e:
         logger.error("Tree routing failed for app %s: %s", application.id, e)
         return await _run_legacy_path(
@@ -384,6 +392,7 @@ async def _run_tree_path(
             assessment_rules=assessment_obj.rules or [],
             rule_input=rule_input,
             score_cutoffs=assessment_obj.score_cutoffs,
+            assessment=assessment_obj,
         )
         strategy = None
     else:
@@ -458,7 +467,7 @@ async def _run_tree_path(
         strategy_id=strategy.id if strategy else None,
         tree_version=tree.version,
         routing_path={
-            "tree_id": tree.id,
+            "tree_id": tree.tree_id,
             "tree_name": tree.name,
             "path": [
                 {
@@ -518,7 +527,7 @@ async def _run_tree_path(
     await db.flush()
     audit_trail = DecisionAuditTrail(
         decision_id=decision.id,
-        tree_id=tree.id,
+        tree_id=tree.tree_id,
         tree_version=tree.version,
         routing_path=[
             {
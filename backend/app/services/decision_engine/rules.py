@@ -8,8 +8,10 @@ enabled or disabled independently.
 The registry is stored in DecisionRulesConfig.rules JSON column.
 """
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from app.services.occupation_benchmarks import (
     check_income_benchmark,
@@ -366,37 +368,61 @@ def get_active_registry(rules_config: Optional[dict] = None) -> dict[str, dict]:
     return registry
 
 
-def _compare(value, operator: str, threshold) -> bool:
-    """Generic comparison for simple threshold rules."""
-    # Normalise strings for case-insensitive comparison
-    v = value.strip().lower() if isinstance(value, str) else value
-    t = threshold.strip().lower() if isinstance(threshold, str) else threshold
+def _norm(x):
+    return x.strip().lower() if isinstance(x, str) else x
+
+
+def bind_comparator(operator: str, threshold) -> Callable[[Any], bool]:
+    """Return a predicate ``f(value)`` equivalent to ``_compare(value, operator, threshold)``.
+
+    The threshold is normalised (and ``in``/``not_in`` lists lowered into a
+    set) once, so repeated evaluations only normalise the input value.
+    """
+    t = _norm(threshold)
 
     if operator == "gte":
-        return v >= t
-    elif operator == "lte":
-        return v <= t
-    elif operator == "gt":
-        return v > t
-    elif operator == "lt":
-        return v < t
-    elif operator == "eq":
-        return v == t
-    elif operator == "neq":
-        return v != t
-    elif operator == "in":
-        if isinstance(threshold, list):
-            normed = [x.strip().lower() if isinstance(x, str) else x for x in threshold]
-            return v in normed
-        return v in t
-    elif operator == "not_in":
+        return lambda value: _norm(value) >= t
+    if operator == "lte":
+        return lambda value: _norm(value) <= t
+    if operator == "gt":
+        return lambda value: _norm(value) > t
+    if operator == "lt":
+        return lambda value: _norm(value) < t
+    if operator == "eq":
+        return lambda value: _norm(value) == t
+    if operator == "neq":
+        return lambda value: _norm(value) != t
+    if operator in ("in", "not_in"):
         if isinstance(threshold, list):
-            normed = [x.strip().lower() if isinstance(x, str) else x for x in threshold]
-            return v not in normed
-        return v not in t
-    elif operator == "between":
-        return t[0] <= v <= t[1]
-    return True
+            members_seq = tuple(_norm(x) for x in threshold)
+            try:
+                members = frozenset(members_seq)
+            except TypeError:
+                members = None
+
+            def contains(value) -> bool:
+                v = _norm(value)
+                if members is not None:
+                    try:
+                        return v in members
+                    except TypeError:
+                        pass
+                return v in members_seq
+        else:
+            def contains(value) -> bool:
+                return _norm(value) in t
+
+        if operator == "in":
+            return contains
+        return lambda value: not contains(value)
+    if operator == "between":
+        return lambda value: t[0] <= _norm(value) <= t[1]
+    return lambda value: True
+
+
+def _compare(value, operator: str, threshold) -> bool:
+    """Generic comparison for simple threshold rules."""
+    return bind_comparator(operator, threshold)(value)
 
 
 def _get_field_value(input_data: RuleInput, field_name: str):
@@ -410,215 +436,366 @@ def _get_field_value(input_data: RuleInput, field_name: str):
     return getattr(input_data, field_name, None)
 
 
-# ── Main evaluator ──────────────────────────────────────────────────────
+# ── Compiled rules program ──────────────────────────────────────────────
 
-def evaluate_rules(
-    input_data: RuleInput,
+RuleEvaluator = Callable[[RuleInput], Optional[RuleResult]]
+
+
+@dataclass
+class CompiledRules:
+    """A rules config with its registry merged and every rule pre-bound.
+
+    Built once per ``DecisionRulesConfig.version`` by
+    :func:`get_compiled_rules`; evaluating it produces exactly the same
+    ``RulesOutput`` as evaluating the raw config.
+    """
+    version: Optional[int]
+    config: dict
+    registry: dict[str, dict]
+    evaluators: list[tuple[str, RuleEvaluator]]
+    rate_table: dict
+    band_limits: dict
+    auto_approve_score: Any
+
+
+_compiled_lock = threading.Lock()
+_compiled_by_version: "OrderedDict[Any, CompiledRules]" = OrderedDict()
+_COMPILED_CACHE_SIZE = 16
+
+
+def get_compiled_rules(
     rules_config: Optional[dict] = None,
-) -> RulesOutput:
-    """Evaluate all business rules against the application data."""
-    config = (rules_config or DEFAULT_RULES).get("rules", DEFAULT_RULES["rules"])
-    registry = get_active_registry(rules_config)
+    version: Optional[int] = None,
+) -> CompiledRules:
+    """Return the compiled program for ``rules_config``.
+
+    Saved configs are immutable per version, so when ``version`` is given
+    the compilation is cached and shared by every caller in the process.
+    The built-in defaults are cached as well.  Any other ad-hoc config is
+    compiled on each call.
+    """
+    if version is not None:
+        key = ("version", version)
+    elif rules_config is None or rules_config is DEFAULT_RULES:
+        key = ("default",)
+    else:
+        return compile_rules(rules_config)
 
-    results: list[RuleResult] = []
-    hard_fails: list[str] = []
-    soft_fails: list[str] = []
-    refer_reasons: list[str] = []
+    with _compiled_lock:
+        program = _compiled_by_version.get(key)
+        if program is not None:
+            _compiled_by_version.move_to_end(key)
+            return program
+
+    program = compile_rules(rules_config, version)
+    with _compiled_lock:
+        _compiled_by_version[key] = program
+        while len(_compiled_by_version) > _COMPILED_CACHE_SIZE:
+            _compiled_by_version.popitem(last=False)
+    return program
 
-    def _record(r: RuleResult):
-        results.append(r)
-        if not r.passed:
-            if r.severity == "hard":
-                hard_fails.append(r.message)
-            elif r.severity == "refer":
-                refer_reasons.append(r.message)
-            elif r.severity == "soft":
-                soft_fails.append(r.message)
-
-    # Map outcome string to severity
-    def _outcome_to_severity(outcome: str, default: str) -> str:
-        return {"decline": "hard", "refer": "refer", "pass": "soft"}.get(outcome, default)
 
+def compile_rules(
+    rules_config: Optional[dict] = None,
+    version: Optional[int] = None,
+) -> CompiledRules:
+    """Merge the registry and bind every rule of ``rules_config`` ahead of time."""
+    config = (rules_config or DEFAULT_RULES).get("rules", DEFAULT_RULES["rules"])
+    registry = get_active_registry(rules_config)
+
+    evaluators: list[tuple[str, RuleEvaluator]] = []
     for rule_id in sorted(registry.keys()):
         rule = registry[rule_id]
-        if not rule.get("enabled", True):
-            results.append(RuleResult(rule_id, rule["name"], True, "Rule disabled", "soft"))
-            continue
+        evaluators.append((rule_id, _compile_rule(rule_id, rule, config, registry)))
 
-        outcome = rule.get("outcome", "decline")
-        if outcome == "disable":
-            results.append(RuleResult(rule_id, rule["name"], True, "Rule disabled", "soft"))
-            continue
+    rate_table = config.get("interest_rate_by_risk_band", {})
+    band_limits = config.get("max_loan_by_risk_band", {})
+
+    return CompiledRules(
+        version=version,
+        config=config,
+        registry=registry,
+        evaluators=evaluators,
+        rate_table=rate_table,
+        band_limits=band_limits,
+        auto_approve_score=config.get("auto_approve_score", 551),
+    )
 
-        severity = _outcome_to_severity(outcome, rule.get("severity", "hard"))
-        rtype = rule.get("type", "threshold")
 
-        # ── Custom / threshold rules (data-driven) ───────────────────
-        if rtype == "threshold" or rule.get("is_custom"):
-            _evaluate_threshold_rule(rule_id, rule, input_data, severity, _record)
-            continue
+def _outcome_to_severity(outcome: str, default: str) -> str:
+    """Map outcome string to severity."""
+    return {"decline": "hard", "refer": "refer", "pass": "soft"}.get(outcome, default)
+
+
+def _compile_rule(rule_id: str, rule: dict, config: dict, registry: dict) -> RuleEvaluator:
+    outcome = rule.get("outcome", "decline")
+    if not rule.get("enabled", True) or outcome == "disable":
+        name = rule["name"]
+        return lambda input_data: RuleResult(rule_id, name, True, "Rule disabled", "soft")
+
+    severity = _outcome_to_severity(outcome, rule.get("severity", "hard"))
+    rtype = rule.get("type", "threshold")
 
-        # ── Complex built-in rules (bespoke logic) ───────────────────
-        if rule_id == "R01":
+    # ── Custom / threshold rules (data-driven) ───────────────────────
+    if rtype == "threshold" or rule.get("is_custom"):
+        return _compile_threshold_rule(rule_id, rule, severity)
+
+    # ── Complex built-in rules (bespoke logic) ───────────────────────
+    name = rule["name"]
+
+    if rule_id == "R01":
+        thresh = rule.get("threshold", config.get("min_age", 18))
+
+        def r01(input_data: RuleInput) -> RuleResult:
             val = input_data.applicant_age
-            thresh = rule.get("threshold", config.get("min_age", 18))
             if val < thresh:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    f"Applicant age {val} is below minimum {thresh}", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "Age meets minimum requirement"))
+                return RuleResult(rule_id, name, False,
+                    f"Applicant age {val} is below minimum {thresh}", severity)
+            return RuleResult(rule_id, name, True, "Age meets minimum requirement")
+        return r01
 
-        elif rule_id == "R02":
+    if rule_id == "R02":
+        max_mat = rule.get("threshold", config.get("max_maturity_age", 75))
+
+        def r02(input_data: RuleInput) -> RuleResult:
             maturity_age = input_data.applicant_age + input_data.term_months / 12
-            max_mat = rule.get("threshold", config.get("max_maturity_age", 75))
             if maturity_age > max_mat:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    f"Age at loan maturity ({maturity_age:.0f}) exceeds maximum {max_mat}", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True,
-                    f"Age at maturity ({maturity_age:.0f}) within limit"))
-
-        elif rule_id == "R04":
+                return RuleResult(rule_id, name, False,
+                    f"Age at loan maturity ({maturity_age:.0f}) exceeds maximum {max_mat}", severity)
+            return RuleResult(rule_id, name, True,
+                f"Age at maturity ({maturity_age:.0f}) within limit")
+        return r02
+
+    if rule_id == "R04":
+        def r04(input_data: RuleInput) -> RuleResult:
             emp = (input_data.employment_type or "").lower()
             if emp in ("not_employed", "unemployed", "not employed"):
-                _record(RuleResult(rule_id, rule["name"], False,
-                    "Applicant is not employed", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "Employment status acceptable"))
+                return RuleResult(rule_id, name, False, "Applicant is not employed", severity)
+            return RuleResult(rule_id, name, True, "Employment status acceptable")
+        return r04
 
-        elif rule_id == "R05":
+    if rule_id == "R05":
+        def r05(input_data: RuleInput) -> RuleResult:
             if input_data.has_active_debt_bureau:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    "Active outstanding debt found on credit bureau", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "No problematic bureau debt"))
+                return RuleResult(rule_id, name, False,
+                    "Active outstanding debt found on credit bureau", severity)
+            return RuleResult(rule_id, name, True, "No problematic bureau debt")
+        return r05
 
-        elif rule_id == "R06":
+    if rule_id == "R06":
+        def r06(input_data: RuleInput) -> RuleResult:
             if input_data.has_court_judgment:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    "Court judgment found on record", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "No court judgments"))
+                return RuleResult(rule_id, name, False, "Court judgment found on record", severity)
+            return RuleResult(rule_id, name, True, "No court judgments")
+        return r06
 
-        elif rule_id == "R07":
+    if rule_id == "R07":
+        def r07(input_data: RuleInput) -> RuleResult:
             if input_data.has_duplicate_within_30_days:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    "Duplicate application found within 30 days", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "No duplicate applications"))
+                return RuleResult(rule_id, name, False,
+                    "Duplicate application found within 30 days", severity)
+            return RuleResult(rule_id, name, True, "No duplicate applications")
+        return r07
 
-        elif rule_id == "R11":
+    if rule_id == "R11":
+        def r11(input_data: RuleInput) -> RuleResult:
             emp = (input_data.employment_type or "").lower()
             if emp in ("self_employed", "self-employed", "self employed"):
-                _record(RuleResult(rule_id, rule["name"], False,
-                    "Self-employed applicant requires manual review", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "Not self-employed"))
-
-        elif rule_id == "R12":
-            max_dsr = rule.get("threshold", config.get("max_dsr", 0.40))
-            extreme_dsr = registry.get("R08", {}).get("threshold", config.get("extreme_dsr", 1.0))
-            if input_data.debt_to_income_ratio <= extreme_dsr:
-                if input_data.debt_to_income_ratio > max_dsr:
-                    _record(RuleResult(rule_id, rule["name"], False,
-                        f"Debt service ratio {input_data.debt_to_income_ratio:.1%} exceeds {max_dsr:.0%}", severity))
-                else:
-                    _record(RuleResult(rule_id, rule["name"], True, "DSR within acceptable range"))
-
-        elif rule_id == "R14":
-            band_limits = config.get("max_loan_by_risk_band", {})
+                return RuleResult(rule_id, name, False,
+                    "Self-employed applicant requires manual review", severity)
+            return RuleResult(rule_id, name, True, "Not self-employed")
+        return r11
+
+    if rule_id == "R12":
+        max_dsr = rule.get("threshold", config.get("max_dsr", 0.40))
+        extreme_dsr = registry.get("R08", {}).get("threshold", config.get("extreme_dsr", 1.0))
+
+        def r12(input_data: RuleInput) -> Optional[RuleResult]:
+            dsr = input_data.debt_to_income_ratio
+            if dsr <= extreme_dsr:
+                if dsr > max_dsr:
+                    return RuleResult(rule_id, name, False,
+                        f"Debt service ratio {dsr:.1%} exceeds {max_dsr:.0%}", severity)
+                return RuleResult(rule_id, name, True, "DSR within acceptable range")
+            return None
+        return r12
+
+    if rule_id == "R14":
+        band_limits = config.get("max_loan_by_risk_band", {})
+
+        def r14(input_data: RuleInput) -> RuleResult:
             max_for_band = band_limits.get(input_data.risk_band, 999_999_999) if band_limits else 999_999_999
             if input_data.loan_amount_requested > max_for_band:
                 sev = severity if max_for_band > 0 else "hard"
-                _record(RuleResult(rule_id, rule["name"], False,
+                return RuleResult(rule_id, name, False,
                     f"Requested TTD {input_data.loan_amount_requested:,.2f} exceeds max TTD {max_for_band:,.2f} for risk band {input_data.risk_band}",
-                    sev))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True,
-                    f"Amount within limit for risk band {input_data.risk_band}"))
-
-        elif rule_id == "R15":
-            blacklist = rule.get("threshold", config.get("blacklisted_national_ids", []))
-            if isinstance(blacklist, list) and input_data.national_id in blacklist:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    "Applicant is on the blacklist", severity))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "Not on blacklist"))
-
-        elif rule_id == "R16":
+                    sev)
+            return RuleResult(rule_id, name, True,
+                f"Amount within limit for risk band {input_data.risk_band}")
+        return r14
+
+    if rule_id == "R15":
+        blacklist = rule.get("threshold", config.get("blacklisted_national_ids", []))
+        if isinstance(blacklist, list):
+            try:
+                blocked = frozenset(blacklist)
+            except TypeError:
+                blocked = tuple(blacklist)
+        else:
+            blocked = frozenset()
+
+        def r15(input_data: RuleInput) -> RuleResult:
+            if input_data.national_id in blocked:
+                return RuleResult(rule_id, name, False, "Applicant is on the blacklist", severity)
+            return RuleResult(rule_id, name, True, "Not on blacklist")
+        return r15
+
+    if rule_id == "R16":
+        def r16(input_data: RuleInput) -> RuleResult:
             if not input_data.is_id_verified:
-                _record(RuleResult(rule_id, rule["name"], False, "ID not yet verified", "soft"))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, "ID verified"))
+                return RuleResult(rule_id, name, False, "ID not yet verified", "soft")
+            return RuleResult(rule_id, name, True, "ID verified")
+        return r16
 
-        elif rule_id == "R17":
+    if rule_id == "R17":
+        def r17(input_data: RuleInput) -> RuleResult:
             income_check = check_income_benchmark(input_data.monthly_income, input_data.job_title)
             if income_check["flagged"]:
-                _record(RuleResult(rule_id, rule["name"], False, income_check["message"], "soft"))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, income_check["message"]))
+                return RuleResult(rule_id, name, False, income_check["message"], "soft")
+            return RuleResult(rule_id, name, True, income_check["message"])
+        return r17
 
-        elif rule_id == "R18":
+    if rule_id == "R18":
+        def r18(input_data: RuleInput) -> RuleResult:
             expense_check = check_expense_benchmark(input_data.monthly_expenses, input_data.job_title)
             if expense_check["flagged"]:
-                _record(RuleResult(rule_id, rule["name"], False, expense_check["message"], "soft"))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True, expense_check["message"]))
-
-        elif rule_id == "R20":
-            thresholds = rule.get("threshold", {})
-            if isinstance(thresholds, dict):
-                auto_decline = thresholds.get("auto_decline_score", config.get("auto_decline_score", 400))
-                refer_max = thresholds.get("refer_score_max", config.get("refer_score_max", 550))
-            else:
-                auto_decline = config.get("auto_decline_score", 400)
-                refer_max = config.get("refer_score_max", 550)
-
-            if input_data.credit_score < auto_decline:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    f"Credit score {input_data.credit_score} below decline threshold {auto_decline}", "hard"))
-            elif input_data.credit_score <= refer_max:
-                _record(RuleResult(rule_id, rule["name"], False,
-                    f"Credit score {input_data.credit_score} in refer range ({auto_decline}-{refer_max})", "refer"))
-            else:
-                _record(RuleResult(rule_id, rule["name"], True,
-                    f"Credit score {input_data.credit_score} above approval threshold"))
-
-        elif rule_id == "R21":
-            # Scorecard score rule — uses the score from the scorecard engine
-            if input_data.scorecard_score is None:
-                _record(RuleResult(rule_id, rule["name"], True,
-                    "No scorecard score available — rule skipped", "soft"))
-            else:
-                thresholds = rule.get("threshold", {})
-                if isinstance(thresholds, dict):
-                    sc_decline = thresholds.get("auto_decline", 480)
-                    sc_approve = thresholds.get("auto_approve", 650)
-                else:
-                    sc_decline = 480
-                    sc_approve = 650
-
-                score = input_data.scorecard_score
-                if score < sc_decline:
-                    _record(RuleResult(rule_id, rule["name"], False,
-                        f"Scorecard score {score:.0f} below decline threshold {sc_decline}", severity))
-                elif score < sc_approve:
-                    _record(RuleResult(rule_id, rule["name"], False,
-                        f"Scorecard score {score:.0f} in manual review range ({sc_decline}-{sc_approve})", "refer"))
-                else:
-                    _record(RuleResult(rule_id, rule["name"], True,
-                        f"Scorecard score {score:.0f} above auto-approve threshold {sc_approve}"))
-
+                return RuleResult(rule_id, name, False, expense_check["message"], "soft")
+            return RuleResult(rule_id, name, True, expense_check["message"])
+        return r18
+
+    if rule_id == "R20":
+        thresholds = rule.get("threshold", {})
+        if isinstance(thresholds, dict):
+            auto_decline = thresholds.get("auto_decline_score", config.get("auto_decline_score", 400))
+            refer_max = thresholds.get("refer_score_max", config.get("refer_score_max", 550))
         else:
-            # Unknown complex rule — skip
-            _record(RuleResult(rule_id, rule["name"], True, "Rule not evaluated (unknown complex type)"))
+            auto_decline = config.get("auto_decline_score", 400)
+            refer_max = config.get("refer_score_max", 550)
+
+        def r20(input_data: RuleInput) -> RuleResult:
+            score = input_data.credit_score
+            if score < auto_decline:
+                return RuleResult(rule_id, name, False,
+                    f"Credit score {score} below decline threshold {auto_decline}", "hard")
+            if score <= refer_max:
+                return RuleResult(rule_id, name, False,
+                    f"Credit score {score} in refer range ({auto_decline}-{refer_max})", "refer")
+            return RuleResult(rule_id, name, True,
+                f"Credit score {score} above approval threshold")
+        return r20
+
+    if rule_id == "R21":
+        # Scorecard score rule — uses the score from the scorecard engine
+        thresholds = rule.get("threshold", {})
+        if isinstance(thresholds, dict):
+            sc_decline = thresholds.get("auto_decline", 480)
+            sc_approve = thresholds.get("auto_approve", 650)
+        else:
+            sc_decline = 480
+            sc_approve = 650
+
+        def r21(input_data: RuleInput) -> RuleResult:
+            score = input_data.scorecard_score
+            if score is None:
+                return RuleResult(rule_id, name, True,
+                    "No scorecard score available — rule skipped", "soft")
+            if score < sc_decline:
+                return RuleResult(rule_id, name, False,
+                    f"Scorecard score {score:.0f} below decline threshold {sc_decline}", severity)
+            if score < sc_approve:
+                return RuleResult(rule_id, name, False,
+                    f"Scorecard score {score:.0f} in manual review range ({sc_decline}-{sc_approve})", "refer")
+            return RuleResult(rule_id, name, True,
+                f"Scorecard score {score:.0f} above auto-approve threshold {sc_approve}")
+        return r21
+
+    # Unknown complex rule — skip
+    return lambda input_data: RuleResult(
+        rule_id, name, True, "Rule not evaluated (unknown complex type)",
+    )
+
+
+def _compile_threshold_rule(rule_id: str, rule: dict, severity: str) -> RuleEvaluator:
+    """Bind a simple data-driven threshold rule (including AI-generated custom rules)."""
+    field_name = rule.get("field", "")
+    operator = rule.get("operator", "gte")
+    threshold = rule.get("threshold")
+    name = rule.get("name", rule_id)
+    matcher = bind_comparator(operator, threshold) if threshold is not None else None
+
+    def evaluate(input_data: RuleInput) -> RuleResult:
+        value = _get_field_value(input_data, field_name)
+        if value is None:
+            return RuleResult(rule_id, name, True,
+                f"Field '{field_name}' not available — rule skipped", "soft")
+
+        if matcher is None:
+            return RuleResult(rule_id, name, True,
+                f"No threshold configured — rule skipped", "soft")
+
+        # Both built-in and custom threshold rules express the ACCEPTABLE condition:
+        #   "monthly_income gte 500"  → value must be >= 500; match means pass.
+        #   "debt_to_income_ratio lte 0.30" → value must be <= 0.30; match means pass.
+        if matcher(value):
+            return RuleResult(rule_id, name, True,
+                f"{field_name} ({value}) meets requirement")
+        return RuleResult(rule_id, name, False,
+            f"{field_name} ({value}) fails check ({operator} {threshold})", severity)
+
+    return evaluate
+
+
+# ── Main evaluator ──────────────────────────────────────────────────────
+
+def evaluate_rules(
+    input_data: RuleInput,
+    rules_config: Optional[dict | CompiledRules] = None,
+) -> RulesOutput:
+    """Evaluate all business rules against the application data.
+
+    ``rules_config`` may be a raw config dict or a :class:`CompiledRules`
+    program from :func:`get_compiled_rules`.
+    """
+    if isinstance(rules_config, CompiledRules):
+        program = rules_config
+    else:
+        program = get_compiled_rules(rules_config)
+
+    results: list[RuleResult] = []
+    hard_fails: list[str] = []
+    soft_fails: list[str] = []
+    refer_reasons: list[str] = []
+
+    for _rule_id, evaluate in program.evaluators:
+        r = evaluate(input_data)
+        if r is None:
+            continue
+        results.append(r)
+        if r.passed:
+            continue
+        if r.severity == "hard":
+            hard_fails.append(r.message)
+        elif r.severity == "refer":
+            refer_reasons.append(r.message)
+        elif r.severity == "soft":
+            soft_fails.append(r.message)
 
     # ── Determine outcome ────────────────────────────────────────────────
-    rate_table = config.get("interest_rate_by_risk_band", {})
+    rate_table = program.rate_table
     suggested_rate = rate_table.get(input_data.risk_band, 12.0) if rate_table else 12.0
-    band_limits_final = config.get("max_loan_by_risk_band", {})
+    band_limits_final = program.band_limits
     max_for_band = band_limits_final.get(input_data.risk_band, input_data.loan_amount_requested) if band_limits_final else input_data.loan_amount_requested
-    auto_approve_score = config.get("auto_approve_score", 551)
+    auto_approve_score = program.auto_approve_score
 
     # Benchmarks for the response
     income_check = check_income_benchmark(input_data.monthly_income, input_data.job_title)
@@ -647,41 +824,3 @@ def evaluate_rules(
         expense_benchmark=expense_check,
     )
 
-
-def _evaluate_threshold_rule(
-    rule_id: str,
-    rule: dict,
-    input_data: RuleInput,
-    severity: str,
-    record_fn,
-):
-    """Evaluate a simple data-driven threshold rule (including AI-generated custom rules)."""
-    field_name = rule.get("field", "")
-    operator = rule.get("operator", "gte")
-    threshold = rule.get("threshold")
-    name = rule.get("name", rule_id)
-
-    value = _get_field_value(input_data, field_name)
-    if value is None:
-        record_fn(RuleResult(rule_id, name, True,
-            f"Field '{field_name}' not available — rule skipped", "soft"))
-        return
-
-    if threshold is None:
-        record_fn(RuleResult(rule_id, name, True,
-            f"No threshold configured — rule skipped", "soft"))
-        return
-
-    comparison = _compare(value, operator, threshold)
-
-    # Both built-in and custom threshold rules express the ACCEPTABLE condition:
-    #   "monthly_income gte 500"  → value must be >= 500; match means pass.
-    #   "debt_to_income_ratio lte 0.30" → value must be <= 0.30; match means pass.
-    passed = comparison
-
-    if passed:
-        record_fn(RuleResult(rule_id, name, True,
-            f"{field_name} ({value}) meets requirement"))
-    else:
-        record_fn(RuleResult(rule_id, name, False,
-            f"{field_name} ({value}) fails check ({operator} {threshold})", severity))
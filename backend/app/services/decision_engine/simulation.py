@@ -17,15 +17,16 @@ from sqlalchemy.orm import selectinload
 
 from app.models.loan import LoanApplication, ApplicantProfile
 from app.models.decision import Decision
-from app.models.strategy import DecisionTree, DecisionStrategy, TreeStatus
+from app.models.strategy import DecisionStrategy, TreeStatus
 from app.services.decision_engine.tree_router import (
     build_routing_context, route_application, RoutingResult, RoutingContext,
 )
+from app.services.decision_engine.tree_cache import load_compiled_tree
 from app.services.decision_engine.strategy_executor import (
     execute_strategy, StrategyResult,
 )
 from app.services.decision_engine.rules import (
-    RuleInput, evaluate_rules, DEFAULT_RULES,
+    RuleInput, evaluate_rules, get_compiled_rules, DEFAULT_RULES,
 )
 from app.services.decision_engine.scoring import ScoringInput, calculate_score
 
@@ -33,6 +34,7 @@ from app.services.decision_engine.scoring import ScoringInput, calculate_score
 @dataclass
 class ReplayResult:
     total_applications: int = 0
+    # The first ``sample_size`` replayed rows; the summary covers them all
     results: list[dict] = field(default_factory=list)
     summary: dict = field(default_factory=dict)
 
@@ -66,137 +68,208 @@ class ImpactAnalysis:
     refers_new: int = 0
     newly_approved: int = 0
     newly_declined: int = 0
+    total_changed: int = 0
+    # The first ``sample_size`` changed decisions; ``total_changed`` counts all
     changed_decisions: list[dict] = field(default_factory=list)
 
 
-async def replay_historical(
-    tree_id: int | None,
-    strategy_id: int | None,
+REPLAY_CHUNK_SIZE = 500
+REPLAY_SAMPLE_SIZE = 200
+
+
+@dataclass
+class _ReplayConfig:
+    """A tree/strategy/rules combination, resolved once per replay."""
+    strategy_id: int | None
+    strategy: DecisionStrategy | None
+    tree: Any = None
+    tree_error: bool = False
+    rules_program: Any = None
+    # Strategies the tree routes to, fetched once each
+    routed_strategies: dict[int | None, DecisionStrategy | None] = field(default_factory=dict)
+
+
+async def load_replay_batch(
     application_ids: list[int],
     db: AsyncSession,
-    rules_config: dict | None = None,
-) -> ReplayResult:
-    """Replay a list of historical applications through a new tree/strategy.
-
-    Returns what the new tree/strategy would have decided for each application,
-    compared to what was actually decided.
+) -> tuple[
+    dict[int, tuple[LoanApplication, ApplicantProfile | None]],
+    dict[int, str | None],
+]:
+    """Load applications, profiles and latest decisions for a set of ids.
+
+    Two round trips regardless of batch size: applications outer-joined to
+    their profiles, and the most recent decision outcome per application
+    (``DISTINCT ON`` the application id).
     """
-    result = ReplayResult(total_applications=len(application_ids))
+    if not application_ids:
+        return {}, {}
 
-    tree = None
-    tree_nodes = []
-    default_strategy_id = None
-    if tree_id:
-        tree_result = await db.execute(
-            select(DecisionTree)
-            .where(DecisionTree.id == tree_id)
-            .options(selectinload(DecisionTree.nodes))
+    app_rows = await db.execute(
+        select(LoanApplication, ApplicantProfile)
+        .outerjoin(ApplicantProfile, ApplicantProfile.user_id == LoanApplication.applicant_id)
+        .where(LoanApplication.id.in_(application_ids))
+        .options(selectinload(LoanApplication.credit_product))
+    )
+    applications = {app.id: (app, profile) for app, profile in app_rows.all()}
+
+    dec_rows = await db.execute(
+        select(Decision.loan_application_id, Decision.final_outcome)
+        .where(Decision.loan_application_id.in_(application_ids))
+        .distinct(Decision.loan_application_id)
+        .order_by(
+            Decision.loan_application_id,
+            Decision.created_at.desc(),
+            Decision.id.desc(),
         )
-        tree = tree_result.scalar_one_or_none()
-        if tree:
-            tree_nodes = tree.nodes
-            default_strategy_id = tree.default_strategy_id
+    )
+    latest_outcomes: dict[int, str | None] = {}
+    for app_id, outcome in dec_rows.all():
+        latest_outcomes.setdefault(app_id, outcome)
+    return applications, latest_outcomes
 
-    strategy = None
+
+async def _iter_replay_batches(application_ids: list[int], db: AsyncSession, chunk_size: int):
+    """Yield ``(chunk, applications, latest_outcomes)`` per ``chunk_size`` ids."""
+    for offset in range(0, len(application_ids), chunk_size):
+        chunk = application_ids[offset:offset + chunk_size]
+        applications, latest_outcomes = await load_replay_batch(list(set(chunk)), db)
+        yield chunk, applications, latest_outcomes
+
+
+async def _prepare_replay(
+    tree_id: int | None,
+    strategy_id: int | None,
+    db: AsyncSession,
+    rules_program,
+) -> _ReplayConfig:
+    config = _ReplayConfig(strategy_id=strategy_id, strategy=None, rules_program=rules_program)
+    if tree_id:
+        try:
+            config.tree = await load_compiled_tree(tree_id, db)
+        except ValueError:
+            config.tree_error = True
     if strategy_id:
         strat_result = await db.execute(
             select(DecisionStrategy).where(DecisionStrategy.id == strategy_id)
         )
-        strategy = strat_result.scalar_one_or_none()
+        config.strategy = strat_result.scalar_one_or_none()
+    return config
 
-    outcomes = {"approve": 0, "decline": 0, "refer": 0}
-    original_outcomes = {"approve": 0, "decline": 0, "refer": 0}
 
-    for app_id in application_ids:
-        app_result = await db.execute(
-            select(LoanApplication)
-            .where(LoanApplication.id == app_id)
-            .options(selectinload(LoanApplication.credit_product))
-        )
-        application = app_result.scalar_one_or_none()
-        if not application:
-            continue
+async def _replay_one(
+    config: _ReplayConfig,
+    application: LoanApplication,
+    profile: ApplicantProfile | None,
+    db: AsyncSession,
+) -> tuple[str, list[str], dict]:
+    """What *config* decides for one application: (outcome, reasons, routing)."""
+    rule_input = _build_rule_input(application, profile)
+    tree = config.tree
+
+    if config.tree_error:
+        return "error", [], {}
+
+    if tree and tree.node_count:
+        ctx = build_routing_context(application, profile, {})
+        try:
+            routing = route_application(ctx, tree, tree.default_strategy_id)
+        except ValueError:
+            return "error", [], {}
+        routing_info = {
+            "strategy_id": routing.strategy_id,
+            "path": [s.node_key for s in routing.path],
+            "used_default": routing.used_default,
+        }
+
+        assigned_strategy = config.strategy
+        if routing.strategy_id != (config.strategy_id or 0):
+            if routing.strategy_id not in config.routed_strategies:
+                s_res = await db.execute(
+                    select(DecisionStrategy).where(
+                        DecisionStrategy.id == routing.strategy_id,
+                    )
+                )
+                config.routed_strategies[routing.strategy_id] = s_res.scalar_one_or_none()
+            assigned_strategy = config.routed_strategies[routing.strategy_id]
 
-        profile_result = await db.execute(
-            select(ApplicantProfile).where(
-                ApplicantProfile.user_id == application.applicant_id,
+        if not assigned_strategy:
+            return "unknown", [], routing_info
+        try:
+            strat_res = execute_strategy(
+                strategy=assigned_strategy,
+                rule_input=rule_input,
+                rules_config=config.rules_program,
+                routing_params=routing.strategy_params,
             )
+        except ValueError:
+            return "error", [], routing_info
+        return strat_res.outcome, strat_res.reasons, routing_info
+
+    if config.strategy:
+        strat_res = execute_strategy(
+            strategy=config.strategy,
+            rule_input=rule_input,
+            rules_config=config.rules_program,
         )
-        profile = profile_result.scalar_one_or_none()
+        return strat_res.outcome, strat_res.reasons, {}
 
-        # Get original decision
-        dec_result = await db.execute(
-            select(Decision)
-            .where(Decision.loan_application_id == app_id)
-            .order_by(Decision.created_at.desc())
-        )
-        original_decision = dec_result.scalars().first()
+    rules_out = evaluate_rules(rule_input, config.rules_program)
+    return _normalize_outcome(rules_out.outcome), rules_out.reasons, {}
 
-        original_outcome = _normalize_outcome(
-            original_decision.final_outcome if original_decision else "unknown"
-        )
-        original_outcomes[original_outcome] = original_outcomes.get(original_outcome, 0) + 1
 
-        # Build input for simulation
-        rule_input = _build_rule_input(application, profile)
+async def replay_historical(
+    tree_id: int | None,
+    strategy_id: int | None,
+    application_ids: list[int],
+    db: AsyncSession,
+    rules_config: dict | None = None,
+    chunk_size: int = REPLAY_CHUNK_SIZE,
+    sample_size: int = REPLAY_SAMPLE_SIZE,
+) -> ReplayResult:
+    """Replay a list of historical applications through a new tree/strategy.
 
-        new_outcome = "unknown"
-        new_reasons: list[str] = []
-        routing_info: dict = {}
+    Returns what the new tree/strategy would have decided, compared to what
+    was actually decided.  Applications are loaded in ``chunk_size``
+    batches and the summary is accumulated as they stream by; only the
+    first ``sample_size`` rows are kept, so memory does not grow with the
+    number of applications.
+    """
+    result = ReplayResult(total_applications=len(application_ids))
+    config = await _prepare_replay(tree_id, strategy_id, db, get_compiled_rules(rules_config))
 
-        if tree and tree_nodes:
-            ctx = build_routing_context(application, profile, {})
-            try:
-                routing = route_application(ctx, tree_nodes, default_strategy_id)
-                routing_info = {
-                    "strategy_id": routing.strategy_id,
-                    "path": [s.node_key for s in routing.path],
-                    "used_default": routing.used_default,
-                }
-
-                assigned_strategy = strategy
-                if routing.strategy_id != (strategy_id or 0):
-                    s_res = await db.execute(
-                        select(DecisionStrategy).where(
-                            DecisionStrategy.id == routing.strategy_id,
-                        )
-                    )
-                    assigned_strategy = s_res.scalar_one_or_none()
-
-                if assigned_strategy:
-                    strat_res = execute_strategy(
-                        strategy=assigned_strategy,
-                        rule_input=rule_input,
-                        rules_config=rules_config,
-                        routing_params=routing.strategy_params,
-                    )
-                    new_outcome = strat_res.outcome
-                    new_reasons = strat_res.reasons
-            except ValueError:
-                new_outcome = "error"
-        elif strategy:
-            strat_res = execute_strategy(
-                strategy=strategy,
-                rule_input=rule_input,
-                rules_config=rules_config,
+    outcomes = {"approve": 0, "decline": 0, "refer": 0}
+    original_outcomes = {"approve": 0, "decline": 0, "refer": 0}
+    total_changed = 0
+
+    async for chunk, applications, latest_outcomes in _iter_replay_batches(
+        application_ids, db, chunk_size,
+    ):
+        for app_id in chunk:
+            loaded = applications.get(app_id)
+            if not loaded:
+                continue
+            application, profile = loaded
+
+            original_outcome = _normalize_outcome(latest_outcomes.get(app_id, "unknown"))
+            original_outcomes[original_outcome] = original_outcomes.get(original_outcome, 0) + 1
+
+            new_outcome, new_reasons, routing_info = await _replay_one(
+                config, application, profile, db,
             )
-            new_outcome = strat_res.outcome
-            new_reasons = strat_res.reasons
-        else:
-            rules_out = evaluate_rules(rule_input, rules_config or DEFAULT_RULES)
-            new_outcome = _normalize_outcome(rules_out.outcome)
-            new_reasons = rules_out.reasons
-
-        outcomes[new_outcome] = outcomes.get(new_outcome, 0) + 1
-
-        result.results.append({
-            "application_id": app_id,
-            "original_outcome": original_outcome,
-            "new_outcome": new_outcome,
-            "changed": original_outcome != new_outcome,
-            "new_reasons": new_reasons,
-            "routing": routing_info,
-        })
+            outcomes[new_outcome] = outcomes.get(new_outcome, 0) + 1
+            changed = original_outcome != new_outcome
+            total_changed += changed
+
+            if len(result.results) < sample_size:
+                result.results.append({
+                    "application_id": app_id,
+                    "original_outcome": original_outcome,
+                    "new_outcome": new_outcome,
+                    "changed": changed,
+                    "new_reasons": new_reasons,
+                    "routing": routing_info,
+                })
 
     result.summary = {
         "original": original_outcomes,
@@ -205,7 +278,7 @@ async def replay_historical(
             (outcomes.get("approve", 0) - original_outcomes.get("approve", 0))
             / max(len(application_ids), 1) * 100
         ),
-        "total_changed": sum(1 for r in result.results if r["changed"]),
+        "total_changed": total_changed,
     }
 
     return result
@@ -263,17 +336,20 @@ async def trace_application(
 
     # Tree routing
     if tree_id:
-        tree_result = await db.execute(
-            select(DecisionTree)
-            .where(DecisionTree.id == tree_id)
-            .options(selectinload(DecisionTree.nodes))
-        )
-        tree = tree_result.scalar_one_or_none()
-
-        if tree and tree.nodes:
+        try:
+            tree = await load_compiled_tree(tree_id, db)
+        except ValueError as e:
+            tree = None
+            trace.steps.append(TraceStep(
+                step_type="error",
+                label="Routing Error",
+                details=str(e),
+            ))
+
+        if tree and tree.node_count:
             ctx = build_routing_context(application, profile, {}, overrides)
             try:
-                routing = route_application(ctx, tree.nodes, tree.default_strategy_id)
+                routing = route_application(ctx, tree, tree.default_strategy_id)
                 for step in routing.path:
                     trace.steps.append(TraceStep(
                         step_type="routing",
@@ -353,53 +429,53 @@ async def impact_analysis(
     application_ids: list[int],
     db: AsyncSession,
     rules_config: dict | None = None,
+    chunk_size: int = REPLAY_CHUNK_SIZE,
+    sample_size: int = REPLAY_SAMPLE_SIZE,
 ) -> ImpactAnalysis:
-    """Compare two configurations side by side on the same applications."""
-    old_replay = await replay_historical(
-        tree_id=old_tree_id,
-        strategy_id=old_strategy_id,
-        application_ids=application_ids,
-        db=db,
-        rules_config=rules_config,
-    )
+    """Compare two configurations side by side on the same applications.
 
-    new_replay = await replay_historical(
-        tree_id=new_tree_id,
-        strategy_id=new_strategy_id,
-        application_ids=application_ids,
-        db=db,
-        rules_config=rules_config,
-    )
+    Each batch is loaded once and replayed through both configurations;
+    only counts and the first ``sample_size`` changed decisions are kept.
+    """
+    rules_program = get_compiled_rules(rules_config)
+    old_config = await _prepare_replay(old_tree_id, old_strategy_id, db, rules_program)
+    new_config = await _prepare_replay(new_tree_id, new_strategy_id, db, rules_program)
 
     analysis = ImpactAnalysis(total_compared=len(application_ids))
-    analysis.approvals_old = old_replay.summary.get("new", {}).get("approve", 0)
-    analysis.approvals_new = new_replay.summary.get("new", {}).get("approve", 0)
-    analysis.declines_old = old_replay.summary.get("new", {}).get("decline", 0)
-    analysis.declines_new = new_replay.summary.get("new", {}).get("decline", 0)
-    analysis.refers_old = old_replay.summary.get("new", {}).get("refer", 0)
-    analysis.refers_new = new_replay.summary.get("new", {}).get("refer", 0)
-
-    old_map = {r["application_id"]: r for r in old_replay.results}
-    new_map = {r["application_id"]: r for r in new_replay.results}
-
-    for app_id in application_ids:
-        old_r = old_map.get(app_id, {})
-        new_r = new_map.get(app_id, {})
-        old_out = old_r.get("new_outcome", "unknown")
-        new_out = new_r.get("new_outcome", "unknown")
-
-        if old_out != new_out:
-            if new_out == "approve" and old_out != "approve":
+    old_counts = {"approve": 0, "decline": 0, "refer": 0}
+    new_counts = {"approve": 0, "decline": 0, "refer": 0}
+
+    async for chunk, applications, _ in _iter_replay_batches(application_ids, db, chunk_size):
+        for app_id in chunk:
+            loaded = applications.get(app_id)
+            if not loaded:
+                continue
+            application, profile = loaded
+            old_out, _, _ = await _replay_one(old_config, application, profile, db)
+            new_out, _, _ = await _replay_one(new_config, application, profile, db)
+            old_counts[old_out] = old_counts.get(old_out, 0) + 1
+            new_counts[new_out] = new_counts.get(new_out, 0) + 1
+
+            if old_out == new_out:
+                continue
+            if new_out == "approve":
                 analysis.newly_approved += 1
-            elif new_out == "decline" and old_out != "decline":
+            elif new_out == "decline":
                 analysis.newly_declined += 1
-
-            analysis.changed_decisions.append({
-                "application_id": app_id,
-                "old_outcome": old_out,
-                "new_outcome": new_out,
-            })
-
+            analysis.total_changed += 1
+            if len(analysis.changed_decisions) < sample_size:
+                analysis.changed_decisions.append({
+                    "application_id": app_id,
+                    "old_outcome": old_out,
+                    "new_outcome": new_out,
+                })
+
+    analysis.approvals_old = old_counts["approve"]
+    analysis.approvals_new = new_counts["approve"]
+    analysis.declines_old = old_counts["decline"]
+    analysis.declines_new = new_counts["decline"]
+    analysis.refers_old = old_counts["refer"]
+    analysis.refers_new = new_counts["refer"]
     return analysis
 
 
@@ -10,13 +10,17 @@ Supports four evaluation modes:
 
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
+from sqlalchemy import inspect as sa_inspect
+
 from app.models.strategy import DecisionStrategy, EvaluationMode
 from app.services.decision_engine.rules import (
-    RuleInput, RulesOutput, RuleResult, evaluate_rules, get_active_registry,
-    DEFAULT_RULES, _compare, _get_field_value,
+    RuleInput, RulesOutput, RuleResult, CompiledRules, evaluate_rules, get_active_registry,
+    DEFAULT_RULES, bind_comparator, _compare, _get_field_value,
 )
 
 
@@ -64,7 +68,7 @@ class StrategyResult:
 def execute_strategy(
     strategy: DecisionStrategy,
     rule_input: RuleInput,
-    rules_config: dict | None = None,
+    rules_config: dict | CompiledRules | None = None,
     routing_params: dict | None = None,
     scorecard_score: float | None = None,
     portfolio_data: dict | None = None,
@@ -74,7 +78,7 @@ def execute_strategy(
     Args:
         strategy: The DecisionStrategy to execute
         rule_input: Prepared RuleInput with application data
-        rules_config: Optional rules config override (for sequential mode)
+        rules_config: Optional rules config or compiled program (for sequential mode)
         routing_params: Parameter overrides from the tree terminal node
         scorecard_score: Pre-computed scorecard score (if available)
         portfolio_data: Current portfolio state for concentration checks
@@ -100,7 +104,7 @@ def execute_strategy(
 def _execute_sequential(
     strategy: DecisionStrategy,
     rule_input: RuleInput,
-    rules_config: dict | None,
+    rules_config: dict | CompiledRules | None,
     routing_params: dict | None,
 ) -> StrategyResult:
     """Delegate to existing evaluate_rules() — the existing single-strategy path."""
@@ -146,7 +150,9 @@ def _execute_dual_path(
 
     # Step 1: Policy Knock-Outs
     knock_outs = strategy.knock_out_rules or []
-    ko_failures = _evaluate_rule_set(knock_outs, rule_input, "hard")
+    ko_failures = _evaluate_rule_set(
+        knock_outs, rule_input, "hard", _rule_set_key(strategy, "knock_out"),
+    )
 
     steps.append(EvaluationStep(
         step_name="Policy Knock-Outs",
@@ -239,7 +245,9 @@ def _execute_dual_path(
 
     # Step 5: Policy Overlays
     overlays = strategy.overlay_rules or []
-    overlay_failures = _evaluate_rule_set(overlays, rule_input, "refer")
+    overlay_failures = _evaluate_rule_set(
+        overlays, rule_input, "refer", _rule_set_key(strategy, "overlay"),
+    )
     overlay_upgrades = [
         f for f in overlay_failures if f.get("action") == "upgrade"
     ]
@@ -412,7 +420,9 @@ def _execute_hybrid(
 
     # Phase 1: Knock-outs (hard rules)
     knock_outs = strategy.knock_out_rules or []
-    ko_failures = _evaluate_rule_set(knock_outs, rule_input, "hard")
+    ko_failures = _evaluate_rule_set(
+        knock_outs, rule_input, "hard", _rule_set_key(strategy, "knock_out"),
+    )
 
     steps.append(EvaluationStep(
         step_name="Knock-Out Rules",
@@ -489,55 +499,130 @@ def _execute_hybrid(
 
 # ── Helper functions ───────────────────────────────────────────────
 
+@dataclass
+class _CompiledSetRule:
+    rule: dict
+    rule_id: str
+    name: str
+    field_name: str
+    operator: str
+    threshold: Any
+    matcher: Any
+    trigger_mode: bool
+    fail_on_null: bool
+    has_severity: bool
+    severity: str | None
+    reason_code: str
+    action: str
+
+
+_rule_set_lock = threading.Lock()
+_rule_set_cache: "OrderedDict[tuple, list[_CompiledSetRule]]" = OrderedDict()
+_RULE_SET_CACHE_SIZE = 256
+
+
+def _rule_set_key(owner: Any, part: str) -> tuple | None:
+    """Cache key for one of *owner*'s rule lists; None if it should not be cached.
+
+    Rule lists live in JSON columns that can be edited in place without a
+    version bump, but every edit moves the row's ``updated_at``, so the row
+    identity plus ``updated_at`` names the content.  Unsaved, modified or
+    partly loaded rows (and test doubles) are compiled on each call.
+    """
+    state = sa_inspect(owner, raiseerr=False) if owner is not None else None
+    if state is None or state.identity is None or state.modified:
+        return None
+    updated_at = state.dict.get("updated_at")
+    if updated_at is None:
+        return None
+    return (type(owner).__name__, state.identity, updated_at, part)
+
+
+def _compile_rule_set(rules: list[dict], key: tuple | None = None) -> list[_CompiledSetRule]:
+    """Bind a strategy/assessment rule list, reusing the compilation cached under *key*."""
+    if key is not None:
+        with _rule_set_lock:
+            compiled = _rule_set_cache.get(key)
+            if compiled is not None:
+                _rule_set_cache.move_to_end(key)
+                return compiled
+
+    compiled = []
+    for rule in rules:
+        if not rule.get("enabled", True):
+            continue
+        threshold = rule.get("threshold")
+        operator = rule.get("operator", "gte")
+        compiled.append(_CompiledSetRule(
+            rule=rule,
+            rule_id=rule.get("rule_id", ""),
+            name=rule.get("name", ""),
+            field_name=rule.get("field", ""),
+            operator=operator,
+            threshold=threshold,
+            matcher=bind_comparator(operator, threshold) if threshold is not None else None,
+            trigger_mode=rule.get("trigger_mode", False),
+            fail_on_null=rule.get("fail_on_null", False),
+            has_severity="severity" in rule,
+            severity=rule.get("severity"),
+            reason_code=rule.get("reason_code", rule.get("rule_id", "")),
+            action=rule.get("action", "restrict"),
+        ))
+
+    if key is None:
+        return compiled
+    with _rule_set_lock:
+        _rule_set_cache[key] = compiled
+        while len(_rule_set_cache) > _RULE_SET_CACHE_SIZE:
+            _rule_set_cache.popitem(last=False)
+    return compiled
+
+
 def _evaluate_rule_set(
     rules: list[dict],
     rule_input: RuleInput,
     default_severity: str,
+    cache_key: tuple | None = None,
 ) -> list[dict]:
     """Evaluate a list of rule definitions against the input. Returns failures."""
     failures = []
-    for rule in rules:
-        if not rule.get("enabled", True):
-            continue
-        field_name = rule.get("field", "")
-        operator = rule.get("operator", "gte")
-        threshold = rule.get("threshold")
+    for cr in _compile_rule_set(rules, cache_key):
+        field_name = cr.field_name
         value = _get_field_value(rule_input, field_name)
 
         if value is None:
-            if rule.get("fail_on_null", False):
+            if cr.fail_on_null:
                 failures.append({
-                    "rule_id": rule.get("rule_id", ""),
-                    "name": rule.get("name", ""),
+                    "rule_id": cr.rule_id,
+                    "name": cr.name,
                     "message": f"{field_name} not available",
-                    "severity": rule.get("severity", default_severity),
-                    "reason_code": rule.get("reason_code", rule.get("rule_id", "")),
-                    "action": rule.get("action", "restrict"),
+                    "severity": cr.severity if cr.has_severity else default_severity,
+                    "reason_code": cr.reason_code,
+                    "action": cr.action,
                 })
             continue
 
-        if threshold is None:
+        if cr.matcher is None:
             continue
 
-        matched = _compare(value, operator, threshold)
-
-        trigger_mode = rule.get("trigger_mode", False)
-        failed = matched if trigger_mode else not matched
+        matched = cr.matcher(value)
+        failed = matched if cr.trigger_mode else not matched
 
         if failed:
-            if trigger_mode:
-                msg = rule.get("message", f"{field_name} ({value}) matched {operator} {threshold} — rule triggered")
+            operator, threshold = cr.operator, cr.threshold
+            if cr.trigger_mode:
+                msg = cr.rule.get("message", f"{field_name} ({value}) matched {operator} {threshold} — rule triggered")
             else:
-                msg = rule.get("message", f"{field_name} ({value}) fails {operator} {threshold}")
+                msg = cr.rule.get("message", f"{field_name} ({value}) fails {operator} {threshold}")
             failures.append({
-                "rule_id": rule.get("rule_id", ""),
-                "name": rule.get("name", ""),
+                "rule_id": cr.rule_id,
+                "name": cr.name,
                 "message": msg,
-                "severity": rule.get("severity", default_severity),
-                "reason_code": rule.get("reason_code", rule.get("rule_id", "")),
+                "severity": cr.severity if cr.has_severity else default_severity,
+                "reason_code": cr.reason_code,
                 "value": value,
                 "threshold": threshold,
-                "action": rule.get("action", "restrict"),
+                "action": cr.action,
             })
 
     return failures
@@ -668,9 +753,13 @@ def execute_assessment(
     assessment_rules: list[dict],
     rule_input: RuleInput,
     score_cutoffs: dict | None = None,
+    assessment: Any = None,
 ) -> StrategyResult:
     """Execute an Assessment's rules against the input data.
 
+    Pass the ``Assessment`` row the rules came from as *assessment* to reuse
+    their compiled form across applications.
+
     Assessment rules use TRIGGER mode: the rule fires (causes decline/refer)
     when the condition IS true. E.g. "job_title eq janitor" means
     "decline when job_title is janitor".
@@ -698,7 +787,9 @@ def execute_assessment(
 
     all_rule_results: list[dict] = []
 
-    hard_failures = _evaluate_rule_set(hard_rules, rule_input, "hard")
+    hard_failures = _evaluate_rule_set(
+        hard_rules, rule_input, "hard", _rule_set_key(assessment, "hard"),
+    )
     for r in hard_rules:
         rid = r.get("rule_id", "")
         is_failure = any(f.get("rule_id") == rid for f in hard_failures)
@@ -727,7 +818,9 @@ def execute_assessment(
             rules_output=None,
         )
 
-    refer_failures = _evaluate_rule_set(refer_rules, rule_input, "refer")
+    refer_failures = _evaluate_rule_set(
+        refer_rules, rule_input, "refer", _rule_set_key(assessment, "refer"),
+    )
     for r in refer_rules:
         rid = r.get("rule_id", "")
         is_failure = any(f.get("rule_id") == rid for f in refer_failures)
@@ -0,0 +1,99 @@
+"""Process-wide cache of compiled decision trees.
+
+Only active trees are cached, keyed by ``tree_id`` and stamped with the
+tree's ``(version, activated_at)``.  Each load reads that stamp — one
+primary-key lookup instead of loading and compiling every node — and only
+serves a compilation whose stamp still matches.  Archived trees can be
+edited in place and activated again without a version bump, but
+activation always sets a new ``activated_at``, so every worker notices
+the change on its next load.  :func:`invalidate_tree` just frees this
+process's copy early.
+
+Draft and archived trees are compiled on every load and never cached.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.strategy import DecisionTree, TreeStatus
+from app.services.decision_engine.tree_router import CompiledTree, compile_tree
+
+TreeStamp = tuple[int, datetime | None]
+
+_lock = threading.Lock()
+_compiled: dict[int, tuple[TreeStamp, CompiledTree]] = {}
+
+
+def compile_decision_tree(tree: DecisionTree) -> CompiledTree:
+    """Compile a loaded ``DecisionTree`` (with nodes) into its routing form."""
+    return compile_tree(
+        tree.nodes,
+        tree_id=tree.id,
+        version=tree.version,
+        name=tree.name,
+        default_strategy_id=tree.default_strategy_id,
+    )
+
+
+def get_cached_tree(tree_id: int, stamp: TreeStamp) -> CompiledTree | None:
+    """Return the cached compilation for ``tree_id`` if it was cached under *stamp*."""
+    with _lock:
+        entry = _compiled.get(tree_id)
+    if entry is None or entry[0] != stamp:
+        return None
+    return entry[1]
+
+
+def cache_tree(compiled: CompiledTree, stamp: TreeStamp) -> None:
+    if compiled.tree_id is None:
+        return
+    with _lock:
+        _compiled[compiled.tree_id] = (stamp, compiled)
+
+
+def invalidate_tree(tree_id: int | None = None) -> None:
+    """Drop cached compilations for one tree, or all trees when ``tree_id`` is None."""
+    with _lock:
+        if tree_id is None:
+            _compiled.clear()
+        else:
+            _compiled.pop(tree_id, None)
+
+
+async def load_compiled_tree(tree_id: int, db: AsyncSession) -> CompiledTree | None:
+    """Return the compiled tree for ``tree_id``, loading it on a cache miss.
+
+    Raises ``ValueError`` if the stored tree cannot be compiled (e.g. a
+    non-numeric range bound).
+    """
+    head = (await db.execute(
+        select(DecisionTree.version, DecisionTree.activated_at, DecisionTree.status)
+        .where(DecisionTree.id == tree_id)
+    )).one_or_none()
+    if head is None:
+        return None
+    if head.status == TreeStatus.ACTIVE:
+        cached = get_cached_tree(tree_id, (head.version, head.activated_at))
+        if cached is not None:
+            return cached
+
+    result = await db.execute(
+        select(DecisionTree)
+        .where(DecisionTree.id == tree_id)
+        .options(selectinload(DecisionTree.nodes))
+    )
+    tree = result.scalar_one_or_none()
+    if tree is None:
+        return None
+
+    compiled = compile_decision_tree(tree)
+    if tree.status == TreeStatus.ACTIVE:
+        # Stamp with what was actually compiled, not the earlier read
+        cache_tree(compiled, (tree.version, tree.activated_at))
+    return compiled
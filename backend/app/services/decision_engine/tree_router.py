@@ -9,7 +9,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, Optional
+import operator as _op
+from typing import Any, Callable, Optional
 
 from app.models.strategy import (
     DecisionTree,
@@ -197,19 +198,220 @@ def _calculate_age(dob) -> int:
     return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
 
 
+# ── Compiled tree ──────────────────────────────────────────────────
+
+_CATCH_ALL_NAMES = ("other", "all_others", "catch_all")
+
+
+@dataclass
+class CompiledNode:
+    """A tree node with its branch index and thresholds resolved up front."""
+
+    node_id: Any
+    node_key: str
+    label: str | None
+    node_type: Any
+    node_type_value: str
+    condition_type: Any
+    attribute: str | None
+    attribute_field: str | None
+    operator: str
+    branches: dict
+    null_branch: str | None
+    compound_conditions: list
+    compound_logic: str
+    strategy_id: int | None
+    strategy_params: dict | None
+    assessment_id: int | None
+    is_terminal: bool = False
+    is_passthrough: bool = False
+    null_fallback: str = "Other"
+    catch_all: str = "Other"
+    true_branch: str | None = None
+    false_branch: str | None = None
+    matcher: Any = None
+    categorical: list[tuple[str, frozenset[str], str]] = field(default_factory=list)
+    ranges: list[tuple[str, float | None, float | None]] = field(default_factory=list)
+    compound: list[tuple[str, str | None, Any]] = field(default_factory=list)
+    children: list["CompiledNode"] = field(default_factory=list)
+    child_by_label: dict[str, "CompiledNode"] = field(default_factory=dict)
+    child_by_label_lower: dict[str, "CompiledNode"] = field(default_factory=dict)
+
+
+@dataclass
+class CompiledTree:
+    """Immutable, pre-indexed form of a decision tree used for routing.
+
+    Children are indexed by branch label and thresholds are parsed once, so
+    routing an application costs O(depth) instead of O(nodes) per level.
+    """
+
+    root: CompiledNode | None
+    node_count: int = 0
+    tree_id: int | None = None
+    version: int | None = None
+    name: str | None = None
+    default_strategy_id: int | None = None
+
+
+def compile_tree(
+    nodes: list[DecisionTreeNode],
+    tree_id: int | None = None,
+    version: int | None = None,
+    name: str | None = None,
+    default_strategy_id: int | None = None,
+) -> CompiledTree:
+    """Compile tree nodes into a :class:`CompiledTree`.
+
+    Pure function — the nodes are only read, never modified, so the result
+    can be shared between requests.
+    """
+    compiled_by_id: dict[Any, CompiledNode] = {}
+    ordered: list[tuple[DecisionTreeNode, CompiledNode]] = []
+    for n in nodes:
+        cn = _compile_node(n)
+        ordered.append((n, cn))
+        compiled_by_id.setdefault(n.id, cn)
+
+    # Index children in list order so first-match semantics are preserved
+    for n, cn in ordered:
+        parent = compiled_by_id.get(n.parent_node_id) if n.parent_node_id is not None else None
+        if parent is None:
+            continue
+        parent.children.append(cn)
+        label = n.branch_label
+        parent.child_by_label.setdefault(label, cn)
+        parent.child_by_label_lower.setdefault((label or "").lower(), cn)
+
+    root = next((cn for n, cn in ordered if n.is_root), None)
+    if root is None:
+        root = next((cn for n, cn in ordered if n.parent_node_id is None), None)
+
+    return CompiledTree(
+        root=root,
+        node_count=len(ordered),
+        tree_id=tree_id,
+        version=version,
+        name=name,
+        default_strategy_id=default_strategy_id,
+    )
+
+
+def _compile_node(node: DecisionTreeNode) -> CompiledNode:
+    node_type = node.node_type
+    branches = node.branches or {}
+    branch_keys = list(branches.keys())
+
+    if node_type is None:
+        type_value = "condition"
+    elif hasattr(node_type, "value"):
+        type_value = node_type.value
+    else:
+        type_value = str(node_type)
+
+    cn = CompiledNode(
+        node_id=node.id,
+        node_key=node.node_key,
+        label=node.label,
+        node_type=node_type,
+        node_type_value=type_value,
+        condition_type=node.condition_type,
+        attribute=node.attribute,
+        attribute_field=_resolve_context_field(node.attribute or ""),
+        operator=(node.operator or "eq").lower(),
+        branches=branches,
+        null_branch=node.null_branch,
+        compound_conditions=node.compound_conditions or [],
+        compound_logic=(node.compound_logic or "AND").upper(),
+        strategy_id=node.strategy_id,
+        strategy_params=node.strategy_params,
+        assessment_id=getattr(node, "assessment_id", None),
+    )
+
+    cn.is_terminal = node_type in (NodeType.STRATEGY, NodeType.ASSESSMENT)
+    cn.is_passthrough = (
+        node_type == NodeType.ANNOTATION
+        or (node_type == NodeType.CONDITION and not node.attribute and not node.branches)
+    )
+
+    if "Other" in branches:
+        cn.null_fallback = "Other"
+    elif "other" in branches:
+        cn.null_fallback = "other"
+    else:
+        cn.null_fallback = branch_keys[0] if branch_keys else "Other"
+
+    cn.catch_all = next(
+        (b for b in branches if b.lower() in _CATCH_ALL_NAMES), "Other",
+    )
+
+    if len(branch_keys) >= 2:
+        cn.true_branch, cn.false_branch = branch_keys[0], branch_keys[1]
+    elif branch_keys:
+        cn.true_branch = branch_keys[0]
+
+    if len(branch_keys) >= 2:
+        true_config = branches.get(cn.true_branch)
+        threshold = true_config.get("value") if isinstance(true_config, dict) else None
+        cn.matcher = _bind_comparator(cn.operator, threshold)
+
+    for branch_name, branch_config in branches.items():
+        if branch_name.lower() in _CATCH_ALL_NAMES:
+            continue
+        values = branch_config.get("values", []) if isinstance(branch_config, dict) else []
+        cn.categorical.append((
+            branch_name,
+            frozenset(str(v).lower().strip() for v in values),
+            branch_name.lower().strip(),
+        ))
+        if isinstance(branch_config, dict):
+            cn.ranges.append((
+                branch_name,
+                _parse_bound(node, branch_config.get("min")),
+                _parse_bound(node, branch_config.get("max")),
+            ))
+
+    for cond in cn.compound_conditions:
+        attr = cond.get("attribute", "")
+        cn.compound.append((
+            attr,
+            _resolve_context_field(attr),
+            _bind_comparator(str(cond.get("operator", "eq")), cond.get("value")),
+        ))
+
+    return cn
+
+
+def _parse_bound(node: DecisionTreeNode, bound: Any) -> float | None:
+    if bound is None:
+        return None
+    try:
+        return float(bound)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid range bound {bound!r} at node '{node.node_key}'")
+
+
 # ── Tree traversal ─────────────────────────────────────────────────
 
 def route_application(
     context: RoutingContext,
-    nodes: list[DecisionTreeNode],
+    nodes: list[DecisionTreeNode] | CompiledTree,
     default_strategy_id: int | None = None,
 ) -> RoutingResult:
     """Traverse the decision tree and return the assigned strategy.
 
     This is a pure function — no database calls, no side effects.
-    The tree nodes and context are passed in directly.
+    The tree nodes (or a pre-built :class:`CompiledTree`) and context are
+    passed in directly.
     """
-    if not nodes:
+    if isinstance(nodes, CompiledTree):
+        tree = nodes
+    elif nodes:
+        tree = compile_tree(nodes)
+    else:
+        tree = CompiledTree(root=None)
+
+    if tree.node_count == 0:
         if default_strategy_id:
             return RoutingResult(
                 strategy_id=default_strategy_id,
@@ -218,16 +420,11 @@ def route_application(
             )
         raise ValueError("Empty tree and no default strategy configured")
 
-    node_map: dict[str, DecisionTreeNode] = {n.node_key: n for n in nodes}
-
-    root = next((n for n in nodes if n.is_root), None)
-    if root is None:
-        root = next((n for n in nodes if n.parent_node_id is None), None)
-    if root is None:
+    if tree.root is None:
         raise ValueError("Decision tree has no root node")
 
     path: list[RoutingStep] = []
-    current = root
+    current = tree.root
     visited: set[str] = set()
 
     while current is not None:
@@ -236,39 +433,34 @@ def route_application(
         visited.add(current.node_key)
 
         # Terminal: strategy or assessment assignment
-        if current.node_type in (NodeType.STRATEGY, NodeType.ASSESSMENT):
+        if current.is_terminal:
             path.append(RoutingStep(
                 node_key=current.node_key,
                 node_label=current.label,
                 attribute=None,
                 actual_value=None,
                 branch_taken="terminal",
-                node_type=current.node_type.value if hasattr(current.node_type, 'value') else str(current.node_type),
+                node_type=current.node_type_value,
             ))
             return RoutingResult(
                 strategy_id=current.strategy_id,
                 strategy_params=current.strategy_params,
-                assessment_id=getattr(current, 'assessment_id', None),
+                assessment_id=current.assessment_id,
                 path=path,
             )
 
         # Annotation nodes or condition nodes with no branches — skip to child
-        is_passthrough = (
-            current.node_type == NodeType.ANNOTATION
-            or (current.node_type == NodeType.CONDITION and not current.attribute and not current.branches)
-        )
-        if is_passthrough:
-            children = [n for n in nodes if n.parent_node_id == current.id]
-            if children:
+        if current.is_passthrough:
+            if current.children:
                 path.append(RoutingStep(
                     node_key=current.node_key,
                     node_label=current.label,
                     attribute=None,
                     actual_value=None,
                     branch_taken="passthrough",
-                    node_type=current.node_type.value if hasattr(current.node_type, 'value') else str(current.node_type),
+                    node_type=current.node_type_value,
                 ))
-                current = children[0]
+                current = current.children[0]
             else:
                 current = None
             continue
@@ -282,10 +474,10 @@ def route_application(
             attribute=current.attribute,
             actual_value=actual_value,
             branch_taken=branch_taken,
-            node_type=current.node_type.value if current.node_type else "condition",
+            node_type=current.node_type_value,
         ))
 
-        next_node = _find_child(nodes, current, branch_taken, node_map)
+        next_node = _find_child(current, branch_taken)
 
         if next_node is None:
             # Fall through to default strategy
@@ -315,7 +507,7 @@ def route_application(
 
 
 def _evaluate_node(
-    node: DecisionTreeNode,
+    node: CompiledNode,
     context: RoutingContext,
 ) -> tuple[str, Any]:
     """Evaluate a condition/scorecard_gate node and return (branch_name, actual_value)."""
@@ -326,19 +518,13 @@ def _evaluate_node(
     if node.condition_type == ConditionType.COMPOUND:
         return _evaluate_compound(node, context)
 
-    attribute = node.attribute or ""
-    actual_value = _get_context_value(context, attribute)
+    actual_value = _get_context_value(context, node.attribute_field)
 
     # Null handling
     if actual_value is None or actual_value == "":
         if node.null_branch:
             return node.null_branch, None
-        branches = node.branches or {}
-        if "Other" in branches:
-            return "Other", None
-        if "other" in branches:
-            return "other", None
-        return next(iter(branches.keys()), "Other"), None
+        return node.null_fallback, None
 
     if node.condition_type == ConditionType.BINARY:
         return _evaluate_binary(node, actual_value)
@@ -351,82 +537,45 @@ def _evaluate_node(
     return _evaluate_categorical(node, actual_value)
 
 
-def _evaluate_binary(node: DecisionTreeNode, value: Any) -> tuple[str, Any]:
+def _evaluate_binary(node: CompiledNode, value: Any) -> tuple[str, Any]:
     """Binary split: evaluate to one of two branches."""
-    branches = node.branches or {}
-    operator = (node.operator or "eq").lower()
-
-    branch_keys = list(branches.keys())
-    if len(branch_keys) < 2:
-        return branch_keys[0] if branch_keys else "Other", value
+    if node.false_branch is None:
+        return node.true_branch or "Other", value
 
-    true_branch = branch_keys[0]
-    false_branch = branch_keys[1]
+    return (node.true_branch if node.matcher(value) else node.false_branch), value
 
-    threshold = branches.get(true_branch, {}).get("value")
 
-    result = _compare_value(value, operator, threshold)
-    return (true_branch if result else false_branch), value
-
-
-def _evaluate_categorical(node: DecisionTreeNode, value: Any) -> tuple[str, Any]:
+def _evaluate_categorical(node: CompiledNode, value: Any) -> tuple[str, Any]:
     """Categorical split: match value to a named branch."""
-    branches = node.branches or {}
     str_value = str(value).lower().strip()
 
-    for branch_name, branch_config in branches.items():
-        if branch_name.lower() in ("other", "all_others", "catch_all"):
-            continue
-        branch_values = branch_config.get("values", []) if isinstance(branch_config, dict) else []
-        if str_value in [str(v).lower().strip() for v in branch_values]:
-            return branch_name, value
-        if str_value == branch_name.lower().strip():
+    for branch_name, branch_values, branch_lower in node.categorical:
+        if str_value in branch_values or str_value == branch_lower:
             return branch_name, value
 
     # No match — fall to Other/catch-all
-    for branch_name in branches:
-        if branch_name.lower() in ("other", "all_others", "catch_all"):
-            return branch_name, value
-
-    return "Other", value
+    return node.catch_all, value
 
 
-def _evaluate_numeric_range(node: DecisionTreeNode, value: Any) -> tuple[str, Any]:
+def _evaluate_numeric_range(node: CompiledNode, value: Any) -> tuple[str, Any]:
     """Numeric range split: find the band the value falls into."""
-    branches = node.branches or {}
     try:
         num_value = float(value)
     except (TypeError, ValueError):
-        for branch_name in branches:
-            if branch_name.lower() in ("other", "all_others", "catch_all"):
-                return branch_name, value
-        return "Other", value
+        return node.catch_all, value
 
-    for branch_name, branch_config in branches.items():
-        if branch_name.lower() in ("other", "all_others", "catch_all"):
+    for branch_name, low, high in node.ranges:
+        if low is not None and num_value < low:
             continue
-        if not isinstance(branch_config, dict):
+        if high is not None and num_value >= high:
             continue
-        low = branch_config.get("min")
-        high = branch_config.get("max")
-
-        in_range = True
-        if low is not None and num_value < float(low):
-            in_range = False
-        if high is not None and num_value >= float(high):
-            in_range = False
-        if in_range:
-            return branch_name, value
+        return branch_name, value
 
-    for branch_name in branches:
-        if branch_name.lower() in ("other", "all_others", "catch_all"):
-            return branch_name, value
-
-    return "Other", value
+    return node.catch_all, value
 
 
 def _evaluate_scorecard_gate(
-    node: DecisionTreeNode,
+    node: CompiledNode,
     context: RoutingContext,
 ) -> tuple[str, Any]:
     """Scorecard gate: route based on score bands defined in branches."""
@@ -440,117 +589,136 @@ def _evaluate_scorecard_gate(
 
 
 def _evaluate_compound(
-    node: DecisionTreeNode,
+    node: CompiledNode,
     context: RoutingContext,
 ) -> tuple[str, Any]:
     """Compound condition: multiple conditions combined with AND/OR."""
-    conditions = node.compound_conditions or []
-    logic = (node.compound_logic or "AND").upper()
-    branches = node.branches or {}
-
-    branch_keys = list(branches.keys())
-    if len(branch_keys) < 2:
-        return branch_keys[0] if branch_keys else "Other", None
-
-    true_branch = branch_keys[0]
-    false_branch = branch_keys[1]
+    if node.false_branch is None:
+        return node.true_branch or "Other", None
 
     results = []
     values_seen = {}
-    for cond in conditions:
-        attr = cond.get("attribute", "")
-        op = cond.get("operator", "eq")
-        threshold = cond.get("value")
-        val = _get_context_value(context, attr)
+    for attr, attr_field, matcher in node.compound:
+        val = _get_context_value(context, attr_field)
         values_seen[attr] = val
         if val is None:
             results.append(False)
         else:
-            results.append(_compare_value(val, op, threshold))
+            results.append(matcher(val))
 
-    if logic == "AND":
+    if node.compound_logic == "AND":
         matched = all(results)
     else:
         matched = any(results)
 
-    return (true_branch if matched else false_branch), values_seen
+    return (node.true_branch if matched else node.false_branch), values_seen
 
 
-def _find_child(
-    nodes: list[DecisionTreeNode],
-    parent: DecisionTreeNode,
-    branch_label: str,
-    node_map: dict[str, DecisionTreeNode],
-) -> DecisionTreeNode | None:
+def _find_child(parent: CompiledNode, branch_label: str) -> CompiledNode | None:
     """Find the child node for a given branch label."""
-    for n in nodes:
-        if n.parent_node_id == parent.id and n.branch_label == branch_label:
-            return n
-    branch_lower = branch_label.lower()
-    for n in nodes:
-        if n.parent_node_id == parent.id and (n.branch_label or "").lower() == branch_lower:
-            return n
-    children = [n for n in nodes if n.parent_node_id == parent.id]
-    if len(children) == 1:
-        return children[0]
+    child = parent.child_by_label.get(branch_label)
+    if child is not None:
+        return child
+    child = parent.child_by_label_lower.get(branch_label.lower())
+    if child is not None:
+        return child
+    if len(parent.children) == 1:
+        return parent.children[0]
     return None
 
 
-def _get_context_value(context: RoutingContext, attribute: str) -> Any:
-    """Retrieve an attribute value from the routing context."""
+def _resolve_context_field(attribute: str) -> str | None:
+    """Map a node attribute name onto a RoutingContext field name."""
     if not attribute:
         return None
     attr_clean = attribute.strip().lower().replace(" ", "_").replace("-", "_")
-    # Direct attribute lookup
-    if hasattr(context, attr_clean):
-        return getattr(context, attr_clean)
-    # Try without underscores
-    for field_name in context.__dataclass_fields__:
+    if attr_clean in RoutingContext.__dataclass_fields__:
+        return attr_clean
+    for field_name in RoutingContext.__dataclass_fields__:
         if field_name.lower() == attr_clean:
-            return getattr(context, field_name)
+            return field_name
     return None
 
 
-def _compare_value(value: Any, operator: str, threshold: Any) -> bool:
-    """Generic comparison."""
-    if value is None or threshold is None:
-        return False
+def _get_context_value(context: RoutingContext, field_name: str | None) -> Any:
+    """Retrieve a pre-resolved attribute value from the routing context."""
+    if field_name is None:
+        return None
+    return getattr(context, field_name, None)
 
-    op = operator.lower()
 
-    try:
-        if op in ("gte", ">="):
-            return float(value) >= float(threshold)
-        elif op in ("lte", "<="):
-            return float(value) <= float(threshold)
-        elif op in ("gt", ">"):
-            return float(value) > float(threshold)
-        elif op in ("lt", "<"):
-            return float(value) < float(threshold)
-    except (TypeError, ValueError):
-        pass
+def _normalize(value: Any) -> str:
+    return str(value).lower().strip()
+
+
+def _bind_comparator(operator: str, threshold: Any) -> Callable[[Any], bool]:
+    """Return a one-argument predicate equivalent to comparing against ``threshold``.
+
+    The threshold is parsed and normalised once here instead of on every
+    evaluation.  Semantics mirror the historical per-call comparison: numeric
+    operators fall back to string equality when either side is not numeric.
+    """
+    if threshold is None:
+        return lambda value: False
+
+    op = operator.lower()
+    text = _normalize(threshold)
+
+    def string_eq(value: Any) -> bool:
+        return value is not None and _normalize(value) == text
+
+    numeric = {
+        "gte": _op.ge, ">=": _op.ge,
+        "lte": _op.le, "<=": _op.le,
+        "gt": _op.gt, ">": _op.gt,
+        "lt": _op.lt, "<": _op.lt,
+    }.get(op)
+    if numeric is not None:
+        try:
+            bound = float(threshold)
+        except (TypeError, ValueError):
+            return string_eq
+
+        def compare_numeric(value: Any) -> bool:
+            if value is None:
+                return False
+            try:
+                return numeric(float(value), bound)
+            except (TypeError, ValueError):
+                return _normalize(value) == text
+        return compare_numeric
 
     if op in ("eq", "==", "equals"):
-        return str(value).lower().strip() == str(threshold).lower().strip()
-    elif op in ("neq", "!=", "not_equals"):
-        return str(value).lower().strip() != str(threshold).lower().strip()
-    elif op == "in":
-        if isinstance(threshold, list):
-            return str(value).lower().strip() in [str(v).lower().strip() for v in threshold]
-        return str(value).lower().strip() in str(threshold).lower().strip()
-    elif op == "not_in":
-        if isinstance(threshold, list):
-            return str(value).lower().strip() not in [str(v).lower().strip() for v in threshold]
-        return str(value).lower().strip() not in str(threshold).lower().strip()
-    elif op == "between":
-        if isinstance(threshold, (list, tuple)) and len(threshold) >= 2:
+        return string_eq
+    if op in ("neq", "!=", "not_equals"):
+        return lambda value: value is not None and _normalize(value) != text
+    if op in ("in", "not_in"):
+        members: frozenset[str] | str = (
+            frozenset(_normalize(v) for v in threshold)
+            if isinstance(threshold, list) else text
+        )
+        if op == "in":
+            return lambda value: value is not None and _normalize(value) in members
+        return lambda value: value is not None and _normalize(value) not in members
+    if op == "between":
+        if not (isinstance(threshold, (list, tuple)) and len(threshold) >= 2):
+            return string_eq
+        try:
+            low, high = float(threshold[0]), float(threshold[1])
+        except (TypeError, ValueError):
+            return lambda value: False
+
+        def compare_between(value: Any) -> bool:
+            if value is None:
+                return False
             try:
-                return float(threshold[0]) <= float(value) <= float(threshold[1])
+                return low <= float(value) <= high
             except (TypeError, ValueError):
                 return False
-    elif op in ("true", "is_true"):
-        return bool(value) is True
-    elif op in ("false", "is_false"):
-        return bool(value) is False
+        return compare_between
+    if op in ("true", "is_true"):
+        return lambda value: value is not None and bool(value) is True
+    if op in ("false", "is_false"):
+        return lambda value: value is not None and bool(value) is False
 
-    return str(value).lower().strip() == str(threshold).lower().strip()
+    return string_eq
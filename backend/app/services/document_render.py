@@ -0,0 +1,234 @@
+"""Contract and PDF rendering off the event loop.
+
+python-docx, reportlab and LibreOffice conversions are CPU-bound or wait
+on a subprocess for seconds, which stalls every other request on the
+worker when run inside an endpoint.  This module runs them in a bounded
+process pool (``settings.document_workers`` processes, each keeping its
+own warm LibreOffice, see ``docx_to_pdf``) and awaits the result.
+
+Generated PDFs are cached on disk under a hash of their inputs, the
+contract template and :data:`RENDER_VERSION`, so downloading the same
+signed contract again is a file read.  Concurrent requests for the same
+document share one render.  A contract that fell back to the reportlab
+converter is served but not cached, so a transient LibreOffice failure
+does not pin the degraded rendering.  :func:`prune_cache` (nightly Celery
+beat) drops files past ``settings.pdf_cache_max_age_days`` and trims the
+directory to ``settings.pdf_cache_max_mb``, so rendered contracts with
+borrower data are not kept indefinitely.
+"""
+
+import asyncio
+import functools
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from app.config import settings
+from app.services import file_storage
+from app.services.contract_generator import TEMPLATE_PATH, generate_contract_docx
+from app.services.docx_to_pdf import convert_docx_to_pdf_with_source
+from app.services.reporting import generate_consent_pdf
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering output changes so cached PDFs are rebuilt
+RENDER_VERSION = 1
+CACHE_AREA = "pdf-cache"
+
+_pool: ProcessPoolExecutor | None = None
+_inflight: dict[str, asyncio.Future] = {}
+
+
+# ────────────────────────────────────────────────────────────────────
+# Worker pool
+# ────────────────────────────────────────────────────────────────────
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and DB pool is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=max(settings.document_workers, 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown(wait: bool = True) -> None:
+    """Stop the worker processes (and their LibreOffice listeners)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=wait, cancel_futures=True)
+        _pool = None
+
+
+async def _run(fn: Callable[[dict], Any], fields: dict) -> Any:
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(), fn, fields)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed mid-conversion); start a fresh pool next time
+        logger.error("Document worker pool broke; restarting it on next use")
+        shutdown(wait=False)
+        raise
+
+
+# Worker-side entry points — module level so they pickle.  PDF renderers
+# return ``(pdf_bytes, cacheable)``.
+
+def _contract_docx_bytes(fields: dict) -> bytes:
+    return generate_contract_docx(**fields).getvalue()
+
+
+def _contract_pdf_bytes(fields: dict) -> tuple[bytes, bool]:
+    pdf, via_libreoffice = convert_docx_to_pdf_with_source(generate_contract_docx(**fields))
+    return pdf.getvalue(), via_libreoffice
+
+
+def _consent_pdf_bytes(fields: dict) -> tuple[bytes, bool]:
+    return generate_consent_pdf(**fields).getvalue(), True
+
+
+# ────────────────────────────────────────────────────────────────────
+# PDF cache
+# ────────────────────────────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=1)
+def _template_digest() -> str:
+    try:
+        with open(TEMPLATE_PATH, "rb") as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+    except OSError:
+        return "no-template"
+
+
+def cache_key(kind: str, fields: dict[str, Any]) -> str:
+    payload = json.dumps(
+        [kind, RENDER_VERSION, _template_digest(), fields], sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(settings.upload_dir, CACHE_AREA, f"{key}.pdf")
+
+
+def _read_cached(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as fh:
+            return fh.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_cached(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+async def _render_to_cache(
+    path: str, fn: Callable[[dict], tuple[bytes, bool]], fields: dict,
+) -> bytes:
+    data, cacheable = await _run(fn, fields)
+    if not cacheable:
+        logger.warning("Not caching fallback rendering for %s", os.path.basename(path))
+        return data
+    try:
+        _write_cached(path, data)
+    except OSError:
+        logger.warning("Could not cache rendered PDF at %s", path, exc_info=True)
+    return data
+
+
+async def _cached_pdf(
+    kind: str, fn: Callable[[dict], tuple[bytes, bool]], fields: dict,
+) -> io.BytesIO:
+    key = cache_key(kind, fields)
+    path = _cache_path(key)
+    data = _read_cached(path)
+    if data is None:
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(_render_to_cache(path, fn, fields))
+            _inflight[key] = task
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield: one caller disconnecting must not cancel the shared render
+        data = await asyncio.shield(task)
+    return io.BytesIO(data)
+
+
+def prune_cache(now: float | None = None) -> int:
+    """Delete expired cached PDFs, then the oldest until under the size cap.
+
+    Returns the number of files removed.
+    """
+    directory = os.path.join(settings.upload_dir, CACHE_AREA)
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+
+    now = time.time() if now is None else now
+    max_age = settings.pdf_cache_max_age_days * 86400
+    max_bytes = settings.pdf_cache_max_mb * 1024 * 1024
+
+    files = []
+    for entry in entries:
+        try:
+            st = entry.stat()
+        except FileNotFoundError:
+            continue
+        if entry.is_file():
+            files.append((st.st_mtime, st.st_size, entry.path))
+
+    removed = 0
+    kept = []
+    for mtime, size, path in sorted(files):
+        # Leftover temp files of an interrupted write count as expired too
+        if now - mtime > max_age or (path.endswith(".tmp") and now - mtime > 3600):
+            file_storage.remove_file(path)
+            removed += 1
+        else:
+            kept.append((size, path))
+
+    total = sum(size for size, _ in kept)
+    for size, path in kept:
+        if total <= max_bytes:
+            break
+        file_storage.remove_file(path)
+        total -= size
+        removed += 1
+
+    if removed:
+        logger.info("Pruned %d cached PDFs", removed)
+    return removed
+
+
+# ────────────────────────────────────────────────────────────────────
+# Public API
+# ────────────────────────────────────────────────────────────────────
+
+async def contract_docx(**fields) -> io.BytesIO:
+    """``generate_contract_docx`` in a worker process (not cached: drafts change)."""
+    return io.BytesIO(await _run(_contract_docx_bytes, fields))
+
+
+async def contract_pdf(**fields) -> io.BytesIO:
+    """The contract as PDF, rendered in a worker process and cached."""
+    return await _cached_pdf("contract", _contract_pdf_bytes, fields)
+
+
+async def consent_pdf(**fields) -> io.BytesIO:
+    """``generate_consent_pdf`` in a worker process, cached."""
+    return await _cached_pdf("consent", _consent_pdf_bytes, fields)
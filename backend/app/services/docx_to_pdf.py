@@ -3,19 +3,35 @@
 Strategy:
 1. Try LibreOffice headless (best fidelity) if available.
 2. Fall back to pure-Python conversion via reportlab (always available).
+
+Conversion blocks for seconds, so API code goes through
+``app.services.document_render``, which runs it in worker processes.
+Each process keeps LibreOffice warm: with unoserver installed, one
+listener is started per process and documents are handed to it with
+``unoconvert``; otherwise ``soffice`` runs per document but reuses a
+per-process user profile, skipping most of its start-up cost.
 """
 
+import atexit
 import io
 import os
 import re
 import shutil
+import socket
 import subprocess
 import tempfile
+import time
 import logging
 import base64
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+CONVERT_TIMEOUT = 60
+LISTENER_STARTUP_TIMEOUT = 30
+# After the listener fails to start, convert cold for this long before retrying
+LISTENER_RETRY_AFTER = 300
+
 
 # ── LibreOffice approach ──────────────────────────────────────────────────
 
@@ -35,10 +51,134 @@ def _find_libreoffice() -> str | None:
     return None
 
 
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ListenerUnavailable(RuntimeError):
+    """The unoserver listener could not be started."""
+
+
+class _LibreOfficeListener:
+    """A unoserver process kept running for the life of this process."""
+
+    def __init__(self, server_bin: str, client_bin: str):
+        self.server_bin = server_bin
+        self.client_bin = client_bin
+        self.port = _free_port()
+        self.uno_port = _free_port()
+        self.proc: subprocess.Popen | None = None
+        self.disabled_until = 0.0
+
+    def available(self) -> bool:
+        """False while backing off after a failed start."""
+        return time.monotonic() >= self.disabled_until
+
+    def _accepting(self) -> bool:
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=0.5):
+                return True
+        except OSError:
+            return False
+
+    def start(self) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            return
+        self.proc = subprocess.Popen(
+            [self.server_bin, "--interface", "127.0.0.1",
+             "--port", str(self.port), "--uno-port", str(self.uno_port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + LISTENER_STARTUP_TIMEOUT
+        while not self._accepting():
+            if self.proc.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                # Don't make every document wait out the start-up timeout
+                self.disabled_until = time.monotonic() + LISTENER_RETRY_AFTER
+                logger.warning(
+                    "LibreOffice listener did not start; converting without it for %ds",
+                    LISTENER_RETRY_AFTER,
+                )
+                raise ListenerUnavailable("LibreOffice listener did not start")
+            time.sleep(0.2)
+        logger.info("LibreOffice listener started on port %d (pid %d)", self.port, os.getpid())
+
+    def stop(self) -> None:
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        self.start()
+        try:
+            result = subprocess.run(
+                [self.client_bin, "--host", "127.0.0.1", "--port", str(self.port),
+                 "--convert-to", "pdf", docx_path, pdf_path],
+                capture_output=True, text=True, timeout=CONVERT_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            # The listener is likely hung; restart it on the next document
+            self.stop()
+            raise
+        if result.returncode != 0:
+            # Restart on the next document rather than reuse a wedged listener
+            self.stop()
+            raise RuntimeError(f"unoconvert failed (rc={result.returncode}): {result.stderr}")
+
+
+_listener: _LibreOfficeListener | None = None
+_profile_dir: str | None = None
+
+
+def _get_listener() -> _LibreOfficeListener | None:
+    global _listener
+    if _listener is None:
+        server_bin, client_bin = shutil.which("unoserver"), shutil.which("unoconvert")
+        if not (server_bin and client_bin):
+            return None
+        _listener = _LibreOfficeListener(server_bin, client_bin)
+        atexit.register(_listener.stop)
+    return _listener
+
+
+def _get_profile_dir() -> str:
+    """Per-process LibreOffice profile, created once instead of per document."""
+    global _profile_dir
+    if _profile_dir is None:
+        _profile_dir = tempfile.mkdtemp(prefix="zotta-lo-")
+        atexit.register(shutil.rmtree, _profile_dir, True)
+    return _profile_dir
+
+
+def _convert_cold(lo_bin: str, docx_path: str, outdir: str) -> None:
+    profile = _get_profile_dir()
+    env = os.environ.copy()
+    env["HOME"] = profile
+    result = subprocess.run(
+        [lo_bin, f"-env:UserInstallation={Path(profile).as_uri()}",
+         "--headless", "--norestore", "--convert-to", "pdf",
+         "--outdir", outdir, docx_path],
+        capture_output=True, text=True, timeout=CONVERT_TIMEOUT, env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"LibreOffice failed (rc={result.returncode}): {result.stderr}")
+
+
 def _convert_with_libreoffice(docx_buffer: io.BytesIO) -> io.BytesIO:
     """Convert DOCX to PDF using LibreOffice headless."""
+    listener = _get_listener()
+    if listener is not None and not listener.available():
+        listener = None
     lo_bin = _find_libreoffice()
-    if not lo_bin:
+    if not listener and not lo_bin:
         raise RuntimeError("LibreOffice not found")
 
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -48,17 +188,19 @@ def _convert_with_libreoffice(docx_buffer: io.BytesIO) -> io.BytesIO:
         with open(docx_path, "wb") as f:
             f.write(docx_buffer.getvalue())
 
-        env = os.environ.copy()
-        env["HOME"] = tmpdir
-
-        result = subprocess.run(
-            [lo_bin, "--headless", "--norestore", "--convert-to", "pdf",
-             "--outdir", tmpdir, docx_path],
-            capture_output=True, text=True, timeout=60, env=env,
-        )
+        converted = False
+        if listener:
+            try:
+                listener.convert(docx_path, pdf_path)
+                converted = True
+            except ListenerUnavailable:
+                if not lo_bin:
+                    raise
+        if not converted:
+            _convert_cold(lo_bin, docx_path, tmpdir)
 
-        if result.returncode != 0 or not os.path.exists(pdf_path):
-            raise RuntimeError(f"LibreOffice failed (rc={result.returncode}): {result.stderr}")
+        if not os.path.exists(pdf_path):
+            raise RuntimeError("LibreOffice produced no PDF")
 
         with open(pdf_path, "rb") as f:
             buf = io.BytesIO(f.read())
@@ -276,12 +418,21 @@ def convert_docx_to_pdf(docx_buffer: io.BytesIO) -> io.BytesIO:
     Tries LibreOffice first (best quality), falls back to reportlab
     (pure Python, always works).
     """
+    return convert_docx_to_pdf_with_source(docx_buffer)[0]
+
+
+def convert_docx_to_pdf_with_source(docx_buffer: io.BytesIO) -> tuple[io.BytesIO, bool]:
+    """Like :func:`convert_docx_to_pdf`, also saying whether LibreOffice made the PDF.
+
+    A ``False`` second element means the reportlab fallback ran, e.g. after
+    a transient LibreOffice failure, so the result should not be kept.
+    """
     # Try LibreOffice first
     try:
-        return _convert_with_libreoffice(docx_buffer)
+        return _convert_with_libreoffice(docx_buffer), True
     except Exception as e:
         logger.info("LibreOffice not available (%s), using reportlab fallback", e)
 
     # Fall back to reportlab
     docx_buffer.seek(0)
-    return _convert_with_reportlab(docx_buffer)
+    return _convert_with_reportlab(docx_buffer), False
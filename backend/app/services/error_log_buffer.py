@@ -0,0 +1,181 @@
+"""Buffered, aggregated writes of error logs captured outside a request session.
+
+``log_error_standalone`` used to open a session and INSERT inside the
+failing request, so an incident producing hundreds of 5xx per second put
+hundreds of extra writes per second on a database that was probably the
+cause.  Records now go into a bounded in-process buffer keyed by
+fingerprint: repeats only bump a counter, and a background task writes
+the batch in one transaction about once a second — folding each
+fingerprint into the open row for the current hour, or inserting one.
+
+When the buffer is full, new fingerprints are dropped (the error has
+already gone to the Python logger) and the number dropped is reported
+at the next flush.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.error_log import ErrorLog
+
+logger = logging.getLogger("zotta.errors")
+
+# Distinct fingerprints held between flushes
+MAX_PENDING = 1000
+# Seconds between flushes while errors keep arriving
+FLUSH_INTERVAL = 1.0
+# Flush early once this many distinct errors are waiting
+FLUSH_BATCH = 200
+
+
+@dataclass
+class _Pending:
+    record: dict[str, Any]
+    count: int
+    last_seen_at: datetime
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def write_batch(db: AsyncSession, items: list[_Pending]) -> None:
+    """Fold pending errors into this hour's open rows, inserting the rest."""
+    hour_start = _now().replace(minute=0, second=0, microsecond=0)
+    open_rows = await db.execute(
+        select(ErrorLog.fingerprint, func.max(ErrorLog.id))
+        .where(
+            ErrorLog.fingerprint.in_([item.record["fingerprint"] for item in items]),
+            ErrorLog.resolved == False,
+            ErrorLog.created_at >= hour_start,
+        )
+        .group_by(ErrorLog.fingerprint)
+    )
+    existing = dict(open_rows.all())
+
+    updates, inserts = [], []
+    for item in items:
+        row_id = existing.get(item.record["fingerprint"])
+        if row_id is not None:
+            updates.append({"row_id": row_id, "n": item.count, "seen": item.last_seen_at})
+        else:
+            inserts.append({
+                **item.record,
+                "occurrence_count": item.count,
+                "last_seen_at": item.last_seen_at,
+            })
+
+    table = ErrorLog.__table__
+    if updates:
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(
+                occurrence_count=table.c.occurrence_count + bindparam("n"),
+                last_seen_at=bindparam("seen"),
+            ),
+            updates,
+        )
+    if inserts:
+        await db.execute(insert(table), inserts)
+
+
+class ErrorLogBuffer:
+    def __init__(
+        self,
+        *,
+        max_pending: int = MAX_PENDING,
+        flush_interval: float = FLUSH_INTERVAL,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._pending: dict[str, _Pending] = {}
+        self._dropped = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, record: dict[str, Any]) -> bool:
+        """Queue a record; False if it was dropped because the buffer is full."""
+        key = record["fingerprint"]
+        seen = _now()
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.count += 1
+            pending.last_seen_at = seen
+            return True
+        if len(self._pending) >= self.max_pending:
+            self._dropped += 1
+            return False
+        self._pending[key] = _Pending(record, 1, seen)
+        self._ensure_flusher()
+        if len(self._pending) >= FLUSH_BATCH:
+            self._wake.set()
+        return True
+
+    def _ensure_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        # Runs while errors keep arriving; the next error restarts it
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything pending; returns the number of distinct errors written."""
+        if self._dropped:
+            logger.warning("Error log buffer full: %d errors were logged but not stored", self._dropped)
+            self._dropped = 0
+        if not self._pending:
+            return 0
+        batch, self._pending = list(self._pending.values()), {}
+
+        factory = self._session_factory
+        if factory is None:
+            from app.database import async_session as factory
+        try:
+            async with factory() as db:
+                await write_batch(db, batch)
+                await db.commit()
+        except Exception as db_err:
+            # Never let error-logging itself crash the app
+            logger.warning(
+                "Failed to store %d buffered error logs: %s",
+                sum(item.count for item in batch), db_err,
+            )
+            return 0
+        return len(batch)
+
+    async def stop(self) -> None:
+        """Stop the flusher and write what is left (app shutdown)."""
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            # Wake it so it flushes now and exits once the buffer is empty
+            self._wake.set()
+            await task
+        self._task = None
+        await self.flush()
+
+
+buffer = ErrorLogBuffer()
@@ -8,11 +8,13 @@ Usage:
     except Exception as e:
         await log_error(e, db=db, module="my_module", function_name="my_func")
 
-    # 2. Middleware captures unhandled request errors automatically.
+    # 2. Middleware captures unhandled request errors automatically
+    #    (buffered and aggregated, see error_log_buffer).
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import traceback as tb_module
 from datetime import datetime, timezone
@@ -21,6 +23,7 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.error_log import ErrorLog, ErrorSeverity
+from app.services import error_log_buffer
 
 logger = logging.getLogger("zotta.errors")
 
@@ -35,35 +38,53 @@ def _sanitize_text(value: object, *, max_len: Optional[int] = None) -> str:
     return text
 
 
-async def log_error(
+def _fingerprint(
+    error_type: str,
+    module: Optional[str],
     exc: Exception,
-    *,
-    db: Optional[AsyncSession] = None,
-    severity: ErrorSeverity = ErrorSeverity.ERROR,
-    module: Optional[str] = None,
-    function_name: Optional[str] = None,
-    line_number: Optional[int] = None,
-    request_method: Optional[str] = None,
-    request_path: Optional[str] = None,
-    request_body: Optional[str] = None,
-    status_code: Optional[int] = None,
-    response_time_ms: Optional[float] = None,
-    user_id: Optional[int] = None,
-    user_email: Optional[str] = None,
-    ip_address: Optional[str] = None,
-) -> Optional[ErrorLog]:
-    """Log an exception to the database and Python logger.
-
-    If no db session is available, falls back to Python logging only.
-    Returns the created ErrorLog row (or None if DB write failed/skipped).
+    line_number: Optional[int],
+    request_path: Optional[str],
+) -> str:
+    """Identity of "the same error": its type, module and line.
+
+    The line is where the exception was raised (from the traceback) when
+    there is one; synthetic errors without a traceback, like the
+    middleware's "HTTP 503 on ..." entries, are told apart by path.
     """
+    if exc.__traceback__:
+        frame = exc.__traceback__
+        while frame.tb_next:
+            frame = frame.tb_next
+        where = f"{frame.tb_frame.f_code.co_filename}:{frame.tb_lineno}"
+    else:
+        where = str(line_number) if line_number else (request_path or "")
+    return hashlib.sha1(f"{error_type}|{module or ''}|{where}".encode()).hexdigest()
 
+
+def _build_record(
+    exc: Exception,
+    *,
+    severity: ErrorSeverity,
+    module: Optional[str],
+    function_name: Optional[str],
+    line_number: Optional[int],
+    request_method: Optional[str],
+    request_path: Optional[str],
+    request_body: Optional[str],
+    status_code: Optional[int],
+    response_time_ms: Optional[float],
+    user_id: Optional[int],
+    user_email: Optional[str],
+    ip_address: Optional[str],
+) -> dict:
+    """Log *exc* to the Python logger and return its ``ErrorLog`` column values."""
     error_type = type(exc).__name__
     message = _sanitize_text(exc, max_len=2000)
     traceback_str = _sanitize_text(
         "".join(tb_module.format_exception(type(exc), exc, exc.__traceback__)),
         max_len=10000,
     )
+    fingerprint = _fingerprint(error_type, module, exc, line_number, request_path)
 
     # Auto-detect module/function/line from traceback if not provided
     if exc.__traceback__ and not module:
@@ -80,27 +101,69 @@ async def log_error(
         log_msg = f"{request_method or '?'} {request_path} -> {log_msg}"
     logger.error(log_msg, exc_info=exc)
 
+    return dict(
+        severity=severity,
+        error_type=error_type,
+        message=message,
+        traceback=traceback_str,
+        fingerprint=fingerprint,
+        module=_sanitize_text(module, max_len=300) if module else None,
+        function_name=_sanitize_text(function_name, max_len=200) if function_name else None,
+        line_number=line_number,
+        request_method=request_method,
+        request_path=_sanitize_text(request_path, max_len=500) if request_path else None,
+        request_body=_sanitize_text(request_body, max_len=5000) if request_body else None,
+        status_code=status_code,
+        response_time_ms=response_time_ms,
+        user_id=user_id,
+        user_email=_sanitize_text(user_email, max_len=200) if user_email else None,
+        ip_address=_sanitize_text(ip_address, max_len=45) if ip_address else None,
+    )
+
+
+async def log_error(
+    exc: Exception,
+    *,
+    db: Optional[AsyncSession] = None,
+    severity: ErrorSeverity = ErrorSeverity.ERROR,
+    module: Optional[str] = None,
+    function_name: Optional[str] = None,
+    line_number: Optional[int] = None,
+    request_method: Optional[str] = None,
+    request_path: Optional[str] = None,
+    request_body: Optional[str] = None,
+    status_code: Optional[int] = None,
+    response_time_ms: Optional[float] = None,
+    user_id: Optional[int] = None,
+    user_email: Optional[str] = None,
+    ip_address: Optional[str] = None,
+) -> Optional[ErrorLog]:
+    """Log an exception to the database and Python logger.
+
+    If no db session is available, falls back to Python logging only.
+    Returns the created ErrorLog row (or None if DB write failed/skipped).
+    """
+    record = _build_record(
+        exc,
+        severity=severity,
+        module=module,
+        function_name=function_name,
+        line_number=line_number,
+        request_method=request_method,
+        request_path=request_path,
+        request_body=request_body,
+        status_code=status_code,
+        response_time_ms=response_time_ms,
+        user_id=user_id,
+        user_email=user_email,
+        ip_address=ip_address,
+    )
+
     if db is None:
         return None
 
     try:
-        entry = ErrorLog(
-            severity=severity,
-            error_type=error_type,
-            message=message,
-            traceback=traceback_str,
-            module=_sanitize_text(module, max_len=300) if module else None,
-            function_name=_sanitize_text(function_name, max_len=200) if function_name else None,
-            line_number=line_number,
-            request_method=request_method,
-            request_path=_sanitize_text(request_path, max_len=500) if request_path else None,
-            request_body=_sanitize_text(request_body, max_len=5000) if request_body else None,
-            status_code=status_code,
-            response_time_ms=response_time_ms,
-            user_id=user_id,
-            user_email=_sanitize_text(user_email, max_len=200) if user_email else None,
-            ip_address=_sanitize_text(ip_address, max_len=45) if ip_address else None,
-        )
+        entry = ErrorLog(**record)
         db.add(entry)
         await db.flush()
         return entry
@@ -124,29 +187,26 @@ async def log_error_standalone(
     user_id: Optional[int] = None,
     user_email: Optional[str] = None,
     ip_address: Optional[str] = None,
-) -> Optional[ErrorLog]:
-    """Log an error using a standalone DB session (for middleware use)."""
-    from app.database import async_session
+) -> None:
+    """Log an error outside any request session (for middleware use).
 
-    try:
-        async with async_session() as db:
-            entry = await log_error(
-                exc,
-                db=db,
-                severity=severity,
-                module=module,
-                function_name=function_name,
-                request_method=request_method,
-                request_path=request_path,
-                request_body=request_body,
-                status_code=status_code,
-                response_time_ms=response_time_ms,
-                user_id=user_id,
-                user_email=user_email,
-                ip_address=ip_address,
-            )
-            await db.commit()
-            return entry
-    except Exception as db_err:
-        logger.warning("Failed standalone error log: %s", db_err)
-        return None
+    The record is queued in ``error_log_buffer`` and written in a batch
+    shortly after, folded with identical errors, so the failing request
+    never waits on the database.
+    """
+    record = _build_record(
+        exc,
+        severity=severity,
+        module=module,
+        function_name=function_name,
+        line_number=None,
+        request_method=request_method,
+        request_path=request_path,
+        request_body=request_body,
+        status_code=status_code,
+        response_time_ms=response_time_ms,
+        user_id=user_id,
+        user_email=user_email,
+        ip_address=ip_address,
+    )
+    error_log_buffer.buffer.add(record)
@@ -0,0 +1,56 @@
+"""Local file storage for generated exports and reports.
+
+Generated files are written under ``settings.upload_dir/<area>/`` with random
+names; callers keep the returned path on their audit/history row and serve
+it back with :func:`file_response`, which streams it in fixed-size chunks so
+large files never sit in memory.
+"""
+
+import os
+import uuid
+from typing import Iterator
+
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.config import settings
+
+# Bytes read per chunk when serving a stored file
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def new_file_path(area: str, extension: str) -> str:
+    """Return a fresh path under ``upload_dir/<area>``, creating the directory."""
+    directory = os.path.join(settings.upload_dir, area)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{uuid.uuid4().hex}{extension}")
+
+
+def remove_file(path: str | None) -> None:
+    """Delete a stored file, ignoring one that is already gone."""
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def iter_file(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as fh:
+        while chunk := fh.read(chunk_size):
+            yield chunk
+
+
+def file_response(
+    path: str, media_type: str, filename: str, *, delete_after: bool = False,
+) -> StreamingResponse:
+    """Stream a stored file as an attachment, optionally deleting it once sent."""
+    return StreamingResponse(
+        iter_file(path),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(os.path.getsize(path)),
+        },
+        background=BackgroundTask(remove_file, path) if delete_after else None,
+    )
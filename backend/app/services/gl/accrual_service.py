@@ -5,8 +5,11 @@ Handles automated batch operations for:
 - Loan loss provisioning based on aging/risk classification
 - Fee assessment batches
 
-Each batch creates a single consolidated journal entry with
-individual lines per loan.
+Each batch posts a consolidated journal entry with individual lines per
+loan through ``journal_engine.post_line_batch`` — optionally one entry per
+branch or per credit product; the batch row records every entry it
+posted.  Loans are streamed as plain columns, so a batch never holds more
+than the line columns in memory.
 """
 
 import logging
@@ -24,31 +27,78 @@ from app.models.gl import (
     JournalSourceType,
     GLAccount,
 )
-from app.services.gl.journal_engine import create_journal_entry
+from app.services.gl.journal_engine import LineBatch, post_line_batch
 from app.services.gl.coa_service import get_account_by_code
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip while streaming loans
+LOAN_FETCH_SIZE = 5000
+
+SPLIT_OPTIONS = (None, "branch", "product")
+
 
 class AccrualError(Exception):
     """Accrual processing error."""
 
 
+def _loan_columns(split_by: str | None):
+    """Loan columns needed for a batch, with branch/product names for splitting."""
+    from app.models.catalog import Branch, CreditProduct
+    from app.models.loan import LoanApplication
+
+    if split_by not in SPLIT_OPTIONS:
+        raise AccrualError(f"Unknown split option '{split_by}'")
+    return (
+        select(
+            LoanApplication.id,
+            LoanApplication.interest_rate,
+            LoanApplication.amount_approved,
+            Branch.id.label("branch_id"),
+            Branch.name.label("branch_name"),
+            CreditProduct.id.label("product_id"),
+            CreditProduct.name.label("product_name"),
+        )
+        .outerjoin(Branch, LoanApplication.branch_id == Branch.id)
+        .outerjoin(CreditProduct, LoanApplication.credit_product_id == CreditProduct.id)
+        .order_by(LoanApplication.id)
+        .execution_options(yield_per=LOAN_FETCH_SIZE)
+    )
+
+
+def _split_key(row, split_by: str | None) -> str | None:
+    if split_by == "branch":
+        return f"{row.branch_name} #{row.branch_id}" if row.branch_id else "No branch"
+    if split_by == "product":
+        return f"{row.product_name} #{row.product_id}" if row.product_id else "No product"
+    return None
+
+
+def _finish_batch(batch: AccrualBatch, entries: list, loan_count: int, total: Decimal) -> None:
+    batch.status = AccrualBatchStatus.COMPLETED
+    batch.loan_count = loan_count
+    batch.total_amount = total
+    batch.journal_entry_ids = [e.id for e in entries]
+    batch.journal_entry_id = entries[0].id if entries else None
+    batch.completed_at = datetime.now(timezone.utc)
+
+
 async def run_interest_accrual(
     db: AsyncSession,
     period_id: int,
     *,
     user_id: int | None = None,
+    split_by: str | None = None,
 ) -> AccrualBatch:
     """Process interest accrual for all active loans in a period.
 
-    Creates a single journal entry:
+    Creates a journal entry (one per branch or product with *split_by*):
     - DR: Interest Receivable (1-3001)
     - CR: Interest Income (4-1000)
 
     Each loan gets its own line pair.
     """
-    from app.models.loan import LoanApplication
+    from app.models.loan import LoanApplication, LoanStatus
 
     # Get period
     period_result = await db.execute(
@@ -57,6 +107,11 @@ async def run_interest_accrual(
     period = period_result.scalar_one_or_none()
     if not period:
         raise AccrualError(f"Period {period_id} not found")
+    query = _loan_columns(split_by).where(
+        LoanApplication.status == LoanStatus.DISBURSED,
+        LoanApplication.interest_rate > 0,
+        LoanApplication.amount_approved > 0,
+    )
 
     # Create batch record
     batch = AccrualBatch(
@@ -69,22 +124,6 @@ async def run_interest_accrual(
     await db.flush()
 
     try:
-        # Get active loans (disbursed status)
-        loans_result = await db.execute(
-            select(LoanApplication).where(
-                LoanApplication.status == "disbursed"
-            )
-        )
-        active_loans = list(loans_result.scalars().all())
-
-        if not active_loans:
-            batch.status = AccrualBatchStatus.COMPLETED
-            batch.loan_count = 0
-            batch.total_amount = Decimal("0")
-            batch.completed_at = datetime.now(timezone.utc)
-            await db.flush()
-            return batch
-
         # Get accounts
         interest_receivable = await get_account_by_code(db, "1-3001")
         interest_income = await get_account_by_code(db, "4-1000")
@@ -96,83 +135,60 @@ async def run_interest_accrual(
             )
 
         # Calculate accrued interest per loan
-        lines = []
+        lines = LineBatch()
         total_interest = Decimal("0")
         loan_count = 0
+        days_in_period = (period.end_date - period.start_date).days + 1
 
-        for loan in active_loans:
+        async for row in await db.stream(query):
             # Daily interest = (principal * annual_rate) / 365
             # Monthly accrual = daily * days_in_period
-            rate = Decimal(str(getattr(loan, "approved_rate", 0) or 0)) / 100
-            principal = Decimal(str(getattr(loan, "approved_amount", 0) or 0))
-
-            if rate <= 0 or principal <= 0:
-                continue
-
-            days_in_period = (period.end_date - period.start_date).days + 1
+            rate = Decimal(str(row.interest_rate)) / 100
+            principal = Decimal(str(row.amount_approved))
             daily_interest = (principal * rate) / 365
             accrued = (daily_interest * days_in_period).quantize(Decimal("0.01"))
 
             if accrued <= 0:
                 continue
 
-            loan_ref = f"LOAN-{loan.id}"
-
-            # DR Interest Receivable
-            lines.append({
-                "gl_account_id": interest_receivable.id,
-                "debit_amount": float(accrued),
-                "credit_amount": 0.0,
-                "description": f"Interest accrual for {loan_ref}",
-                "loan_reference": loan_ref,
-            })
-            # CR Interest Income
-            lines.append({
-                "gl_account_id": interest_income.id,
-                "debit_amount": 0.0,
-                "credit_amount": float(accrued),
-                "description": f"Interest income accrual for {loan_ref}",
-                "loan_reference": loan_ref,
-            })
+            loan_ref = f"LOAN-{row.id}"
+            lines.add_pair(
+                interest_receivable.id,
+                interest_income.id,
+                accrued,
+                debit_description=f"Interest accrual for {loan_ref}",
+                credit_description=f"Interest income accrual for {loan_ref}",
+                loan_reference=loan_ref,
+                branch=row.branch_name[:100] if row.branch_name else None,
+                split_key=_split_key(row, split_by),
+            )
 
             total_interest += accrued
             loan_count += 1
 
-        if not lines:
-            batch.status = AccrualBatchStatus.COMPLETED
-            batch.loan_count = 0
-            batch.total_amount = Decimal("0")
-            batch.completed_at = datetime.now(timezone.utc)
-            await db.flush()
-            return batch
-
-        # Create single consolidated journal entry
-        entry = await create_journal_entry(
-            db,
-            lines=lines,
-            source_type=JournalSourceType.INTEREST_ACCRUAL,
-            source_reference=f"ACCRUAL-BATCH-{batch.id}",
-            description=f"Interest accrual for {period.name} ({loan_count} loans)",
-            effective_date=period.end_date,
-            created_by=user_id,
-            auto_post=True,
-            narrative=(
-                f"Automated interest accrual batch for {period.name}. "
-                f"Processed {loan_count} active loans with total accrued interest "
-                f"of ${float(total_interest):,.2f}."
-            ),
-        )
+        entries = []
+        if loan_count:
+            entries = await post_line_batch(
+                db,
+                lines,
+                source_type=JournalSourceType.INTEREST_ACCRUAL,
+                source_reference=f"ACCRUAL-BATCH-{batch.id}",
+                description=f"Interest accrual for {period.name} ({loan_count} loans)",
+                effective_date=period.end_date,
+                created_by=user_id,
+                narrative=(
+                    f"Automated interest accrual batch for {period.name}. "
+                    f"Processed {loan_count} active loans with total accrued interest "
+                    f"of ${float(total_interest):,.2f}."
+                ),
+            )
 
-        batch.status = AccrualBatchStatus.COMPLETED
-        batch.loan_count = loan_count
-        batch.total_amount = total_interest
-        batch.journal_entry_id = entry.id
-        batch.completed_at = datetime.now(timezone.utc)
+        _finish_batch(batch, entries, loan_count, total_interest)
         await db.flush()
 
         logger.info(
-            "Interest accrual batch %d completed: %d loans, total %s",
-            batch.id, loan_count, total_interest,
+            "Interest accrual batch %d completed: %d loans in %d entries, total %s",
+            batch.id, loan_count, len(entries), total_interest,
         )
 
     except Exception as e:
@@ -186,11 +202,29 @@ async def run_interest_accrual(
     return batch
 
 
+# Provision rate by days-past-due band (inclusive bounds)
+PROVISION_RATES = {
+    (0, 0): Decimal("0.01"),      # Current
+    (1, 30): Decimal("0.05"),      # Watch
+    (31, 60): Decimal("0.20"),     # Substandard
+    (61, 90): Decimal("0.50"),     # Doubtful
+    (91, 99999): Decimal("1.00"),  # Loss
+}
+
+
+def provision_rate(dpd: int) -> Decimal:
+    for (low, high), rate in PROVISION_RATES.items():
+        if low <= dpd <= high:
+            return rate
+    return Decimal("0.01")
+
+
 async def run_provisioning(
     db: AsyncSession,
     period_id: int,
     *,
     user_id: int | None = None,
+    split_by: str | None = None,
 ) -> AccrualBatch:
     """Run loan loss provisioning based on aging classification.
 
@@ -201,11 +235,14 @@ async def run_provisioning(
     - Doubtful (61-90 DPD): 50%
     - Loss (90+ DPD): 100%
 
-    Creates a journal entry:
+    Days past due come from the loan's collection case, if it has one.
+
+    Creates a journal entry (one per branch or product with *split_by*):
     - DR: Provision Expense (5-1000)
     - CR: Allowance for Loan Losses (2-2000)
     """
-    from app.models.loan import LoanApplication
+    from app.models.collections_ext import CollectionCase
+    from app.models.loan import LoanApplication, LoanStatus
 
     period_result = await db.execute(
         select(AccountingPeriod).where(AccountingPeriod.id == period_id)
@@ -214,6 +251,24 @@ async def run_provisioning(
     if not period:
         raise AccrualError(f"Period {period_id} not found")
 
+    case_dpd = (
+        select(
+            CollectionCase.loan_application_id,
+            sa_func.max(CollectionCase.dpd).label("dpd"),
+        )
+        .group_by(CollectionCase.loan_application_id)
+        .subquery()
+    )
+    query = (
+        _loan_columns(split_by)
+        .add_columns(sa_func.coalesce(case_dpd.c.dpd, 0).label("dpd"))
+        .outerjoin(case_dpd, case_dpd.c.loan_application_id == LoanApplication.id)
+        .where(
+            LoanApplication.status == LoanStatus.DISBURSED,
+            LoanApplication.amount_approved > 0,
+        )
+    )
+
     batch = AccrualBatch(
         batch_type=AccrualBatchType.PROVISION,
         period_id=period_id,
@@ -233,97 +288,57 @@ async def run_provisioning(
                 "Required accounts not found: 5-1000 or 2-2000"
             )
 
-        # Get active loans
-        loans_result = await db.execute(
-            select(LoanApplication).where(
-                LoanApplication.status.in_(["disbursed", "delinquent", "default"])
-            )
-        )
-        active_loans = list(loans_result.scalars().all())
-
-        lines = []
+        lines = LineBatch()
         total_provision = Decimal("0")
         loan_count = 0
 
-        provision_rates = {
-            (0, 0): Decimal("0.01"),      # Current
-            (1, 30): Decimal("0.05"),      # Watch
-            (31, 60): Decimal("0.20"),     # Substandard
-            (61, 90): Decimal("0.50"),     # Doubtful
-            (91, 99999): Decimal("1.00"),  # Loss
-        }
-
-        for loan in active_loans:
-            principal = Decimal(str(getattr(loan, "approved_amount", 0) or 0))
-            dpd = getattr(loan, "days_past_due", 0) or 0
-
-            if principal <= 0:
-                continue
-
-            rate = Decimal("0.01")
-            for (low, high), r in provision_rates.items():
-                if low <= dpd <= high:
-                    rate = r
-                    break
+        async for row in await db.stream(query):
+            principal = Decimal(str(row.amount_approved))
+            dpd = row.dpd or 0
+            rate = provision_rate(dpd)
 
             provision_amount = (principal * rate).quantize(Decimal("0.01"))
             if provision_amount <= 0:
                 continue
 
-            loan_ref = f"LOAN-{loan.id}"
-
-            lines.append({
-                "gl_account_id": provision_expense.id,
-                "debit_amount": float(provision_amount),
-                "credit_amount": 0.0,
-                "description": f"Provision for {loan_ref} ({dpd} DPD, {float(rate)*100:.0f}%)",
-                "loan_reference": loan_ref,
-            })
-            lines.append({
-                "gl_account_id": allowance.id,
-                "debit_amount": 0.0,
-                "credit_amount": float(provision_amount),
-                "description": f"Allowance for {loan_ref}",
-                "loan_reference": loan_ref,
-            })
+            loan_ref = f"LOAN-{row.id}"
+            lines.add_pair(
+                provision_expense.id,
+                allowance.id,
+                provision_amount,
+                debit_description=f"Provision for {loan_ref} ({dpd} DPD, {float(rate)*100:.0f}%)",
+                credit_description=f"Allowance for {loan_ref}",
+                loan_reference=loan_ref,
+                branch=row.branch_name[:100] if row.branch_name else None,
+                split_key=_split_key(row, split_by),
+            )
 
             total_provision += provision_amount
             loan_count += 1
 
-        if not lines:
-            batch.status = AccrualBatchStatus.COMPLETED
-            batch.loan_count = 0
-            batch.total_amount = Decimal("0")
-            batch.completed_at = datetime.now(timezone.utc)
-            await db.flush()
-            return batch
-
-        entry = await create_journal_entry(
-            db,
-            lines=lines,
-            source_type=JournalSourceType.PROVISION,
-            source_reference=f"PROVISION-BATCH-{batch.id}",
-            description=f"Loan loss provisioning for {period.name} ({loan_count} loans)",
-            effective_date=period.end_date,
-            created_by=user_id,
-            auto_post=True,
-            narrative=(
-                f"Automated provisioning batch for {period.name}. "
-                f"Assessed {loan_count} loans with total provision of "
-                f"${float(total_provision):,.2f}."
-            ),
-        )
+        entries = []
+        if loan_count:
+            entries = await post_line_batch(
+                db,
+                lines,
+                source_type=JournalSourceType.PROVISION,
+                source_reference=f"PROVISION-BATCH-{batch.id}",
+                description=f"Loan loss provisioning for {period.name} ({loan_count} loans)",
+                effective_date=period.end_date,
+                created_by=user_id,
+                narrative=(
+                    f"Automated provisioning batch for {period.name}. "
+                    f"Assessed {loan_count} loans with total provision of "
+                    f"${float(total_provision):,.2f}."
+                ),
+            )
 
-        batch.status = AccrualBatchStatus.COMPLETED
-        batch.loan_count = loan_count
-        batch.total_amount = total_provision
-        batch.journal_entry_id = entry.id
-        batch.completed_at = datetime.now(timezone.utc)
+        _finish_batch(batch, entries, loan_count, total_provision)
         await db.flush()
 
         logger.info(
-            "Provisioning batch %d completed: %d loans, total %s",
-            batch.id, loan_count, total_provision,
+            "Provisioning batch %d completed: %d loans in %d entries, total %s",
+            batch.id, loan_count, len(entries), total_provision,
         )
 
     except Exception as e:
@@ -335,3 +350,17 @@ async def run_provisioning(
         raise
 
     return batch
+
+
+async def list_batches(
+    db: AsyncSession,
+    *,
+    period_id: int | None = None,
+    limit: int = 100,
+) -> list[AccrualBatch]:
+    """Most recent accrual/provisioning batches, optionally for one period."""
+    q = select(AccrualBatch).order_by(AccrualBatch.id.desc()).limit(limit)
+    if period_id:
+        q = q.where(AccrualBatch.period_id == period_id)
+    result = await db.execute(q)
+    return list(result.scalars().all())
@@ -13,14 +13,19 @@ Optionally uses OpenAI for enhanced explanations.
 """
 
 import logging
-import statistics
-from datetime import datetime, timezone
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 from sqlalchemy import select, func as sa_func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.gl import (
+    AccountType,
+    GLAccount,
+    GLAccountCombination,
+    GLPostingStats,
     JournalEntry,
     JournalEntryLine,
     JournalEntryStatus,
@@ -29,9 +34,19 @@ from app.models.gl import (
     AnomalyType,
     AnomalyStatus,
 )
+from app.services.gl.balance_engine import posted_totals_query
+from app.services.gl.posting_stats import (
+    STATS_WINDOW,
+    RollingStats,
+    account_signature,
+    source_key,
+)
 
 logger = logging.getLogger(__name__)
 
+# Postings of a source type needed before amount outliers are flagged
+MIN_SAMPLES = 5
+
 
 class AnomalyResult:
     """Result of anomaly detection for a single entry."""
@@ -54,107 +69,44 @@ class AnomalyResult:
 
 
 # ---------------------------------------------------------------------------
-# Detection checks
+# Flag rules
 # ---------------------------------------------------------------------------
 
-async def _check_amount_outlier(
-    db: AsyncSession, entry: JournalEntry, result: AnomalyResult
-) -> None:
-    """Flag if the entry amount is a statistical outlier."""
-    # Get recent entry totals for the same source type
-    recent = await db.execute(
-        select(JournalEntryLine.debit_amount)
-        .join(JournalEntry, JournalEntryLine.journal_entry_id == JournalEntry.id)
-        .where(
-            JournalEntry.source_type == entry.source_type,
-            JournalEntry.status == JournalEntryStatus.POSTED,
-            JournalEntry.id != entry.id,
-        )
-        .order_by(JournalEntry.id.desc())
-        .limit(100)
-    )
-    amounts = [float(row[0]) for row in recent.all() if row[0] > 0]
-
-    if len(amounts) < 5:
+def _flag_amount(result: AnomalyResult, amount: float, stats: RollingStats | None) -> None:
+    """Flag if the entry amount is a statistical outlier for its source type."""
+    if stats is None or stats.count < MIN_SAMPLES:
         return  # Not enough data for statistics
 
-    mean = statistics.mean(amounts)
-    stdev = statistics.stdev(amounts) if len(amounts) > 1 else 0
-
+    mean, stdev = stats.mean, stats.stdev
     if stdev == 0:
         return
 
-    entry_amount = float(entry.total_debits)
-    z_score = abs(entry_amount - mean) / stdev
-
+    z_score = abs(amount - mean) / stdev
     if z_score > 3:
         result.add_flag(
             AnomalyType.AMOUNT, 40,
-            f"Amount ${entry_amount:,.2f} is {z_score:.1f} standard deviations from the mean "
+            f"Amount ${amount:,.2f} is {z_score:.1f} standard deviations from the mean "
             f"(mean: ${mean:,.2f}, stdev: ${stdev:,.2f})"
         )
     elif z_score > 2:
         result.add_flag(
             AnomalyType.AMOUNT, 20,
-            f"Amount ${entry_amount:,.2f} is {z_score:.1f} standard deviations from the mean"
+            f"Amount ${amount:,.2f} is {z_score:.1f} standard deviations from the mean"
         )
 
 
-async def _check_unusual_pattern(
-    db: AsyncSession, entry: JournalEntry, result: AnomalyResult
-) -> None:
-    """Flag unusual account combinations."""
-    if not entry.lines:
-        return
-
-    account_ids = sorted([ln.gl_account_id for ln in entry.lines])
-
-    # Check if this combination has been seen before
-    recent_entries = await db.execute(
-        select(JournalEntry.id)
-        .where(
-            JournalEntry.source_type == entry.source_type,
-            JournalEntry.status == JournalEntryStatus.POSTED,
-            JournalEntry.id != entry.id,
-        )
-        .order_by(JournalEntry.id.desc())
-        .limit(50)
-    )
-    seen_combos = set()
-    for (eid,) in recent_entries.all():
-        lines_result = await db.execute(
-            select(JournalEntryLine.gl_account_id)
-            .where(JournalEntryLine.journal_entry_id == eid)
-        )
-        combo = tuple(sorted([r[0] for r in lines_result.all()]))
-        seen_combos.add(combo)
-
-    if tuple(account_ids) not in seen_combos and seen_combos:
+def _flag_pattern(result: AnomalyResult, first_entry_id: int | None, entry_id: int, has_history: bool) -> None:
+    """Flag an account combination not used by any earlier entry of this type."""
+    is_new = first_entry_id is None or first_entry_id >= entry_id
+    if is_new and has_history:
         result.add_flag(
             AnomalyType.PATTERN, 15,
             "This account combination has not been used before for this entry type"
         )
 
 
-async def _check_velocity(
-    db: AsyncSession, entry: JournalEntry, result: AnomalyResult
-) -> None:
+def _flag_velocity(result: AnomalyResult, count: int) -> None:
     """Flag high-velocity posting by the same user."""
-    if not entry.created_by:
-        return
-
-    # Count entries created by this user in the last hour
-    from datetime import timedelta
-    one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-    count_result = await db.execute(
-        select(sa_func.count(JournalEntry.id))
-        .where(
-            JournalEntry.created_by == entry.created_by,
-            JournalEntry.created_at >= one_hour_ago,
-        )
-    )
-    count = count_result.scalar() or 0
-
     if count > 50:
         result.add_flag(
             AnomalyType.VELOCITY, 30,
@@ -167,37 +119,128 @@ async def _check_velocity(
         )
 
 
-async def _check_balance_direction(
-    db: AsyncSession, entry: JournalEntry, result: AnomalyResult
-) -> None:
-    """Flag if an account balance moves in an unexpected direction."""
-    from app.services.gl.coa_service import get_account_balance, get_account
-    from app.models.gl import AccountType
-
-    for ln in (entry.lines or []):
-        acct = await get_account(db, ln.gl_account_id)
-        if not acct:
-            continue
-
-        bal = await get_account_balance(db, ln.gl_account_id)
-        balance = bal["balance"]
+def _flag_balance(result: AnomalyResult, accounts: list[tuple]) -> None:
+    """Flag the first account whose balance runs against its normal side.
 
+    *accounts* holds ``(account, debit_total, credit_total)`` per line.
+    """
+    for acct, dr, cr in accounts:
+        dr, cr = dr or 0, cr or 0
         # Asset/Expense accounts should have debit (positive) balance
         # Liability/Equity/Revenue should have credit (positive) balance
-        if acct.account_type == AccountType.DEBIT and balance < -1000:
-            result.add_flag(
-                AnomalyType.BALANCE, 25,
-                f"Account {acct.account_code} ({acct.name}) has unusual credit balance: "
-                f"${abs(balance):,.2f} (expected debit-normal)"
-            )
-            break
-        elif acct.account_type == AccountType.CREDIT and balance < -1000:
-            result.add_flag(
-                AnomalyType.BALANCE, 25,
-                f"Account {acct.account_code} ({acct.name}) has unusual debit balance: "
-                f"${abs(balance):,.2f} (expected credit-normal)"
-            )
-            break
+        if acct.account_type == AccountType.DEBIT:
+            balance = float(dr - cr)
+            if balance < -1000:
+                result.add_flag(
+                    AnomalyType.BALANCE, 25,
+                    f"Account {acct.account_code} ({acct.name}) has unusual credit balance: "
+                    f"${abs(balance):,.2f} (expected debit-normal)"
+                )
+                break
+        else:
+            balance = float(cr - dr)
+            if balance < -1000:
+                result.add_flag(
+                    AnomalyType.BALANCE, 25,
+                    f"Account {acct.account_code} ({acct.name}) has unusual debit balance: "
+                    f"${abs(balance):,.2f} (expected credit-normal)"
+                )
+                break
+
+
+def _finish(result: AnomalyResult) -> AnomalyResult:
+    if result.has_anomalies:
+        result.explanation = "; ".join(f["reason"] for f in result.flags)
+    else:
+        result.explanation = "No anomalies detected"
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Lookups — each a single query however many lines the entries have
+# ---------------------------------------------------------------------------
+
+async def _load_stats(db: AsyncSession, source_types: list[str]) -> dict[str, RollingStats]:
+    rows = await db.execute(
+        select(GLPostingStats).where(GLPostingStats.source_type.in_(source_types))
+    )
+    return {
+        r.source_type: RollingStats(r.sample_count, r.mean, r.m2)
+        for r in rows.scalars().all()
+    }
+
+
+async def _in_stats_window(db: AsyncSession, entries: list[JournalEntry]) -> set[int]:
+    """Ids of *entries* still among the last :data:`STATS_WINDOW` postings of their type.
+
+    Only those are still part of the capped rolling statistics; an older
+    entry's amount has aged out and must not be taken back out again.
+    """
+    if not entries:
+        return set()
+    rank = sa_func.row_number().over(
+        partition_by=JournalEntry.source_type,
+        order_by=(
+            sa_func.coalesce(JournalEntry.posted_at, JournalEntry.created_at).desc(),
+            JournalEntry.id.desc(),
+        ),
+    )
+    recent = (
+        select(JournalEntry.id.label("id"), rank.label("rank"))
+        .where(
+            JournalEntry.status == JournalEntryStatus.POSTED,
+            JournalEntry.source_type.in_(sorted({e.source_type for e in entries}, key=source_key)),
+        )
+        .subquery()
+    )
+    rows = await db.execute(
+        select(recent.c.id).where(
+            recent.c.rank <= STATS_WINDOW,
+            recent.c.id.in_(sorted(e.id for e in entries)),
+        )
+    )
+    return set(rows.scalars().all())
+
+
+async def _load_combinations(
+    db: AsyncSession, keys: set[tuple[str, str]]
+) -> tuple[dict[tuple[str, str], int], dict[str, int]]:
+    """First entry per (source type, signature) in *keys*, and oldest per source type."""
+    if not keys:
+        return {}, {}
+    sources = sorted({src for src, _ in keys})
+    first = await db.execute(
+        select(
+            GLAccountCombination.source_type,
+            GLAccountCombination.signature,
+            GLAccountCombination.first_entry_id,
+        ).where(
+            GLAccountCombination.source_type.in_(sources),
+            GLAccountCombination.signature.in_(sorted({sig for _, sig in keys})),
+        )
+    )
+    oldest = await db.execute(
+        select(GLAccountCombination.source_type, sa_func.min(GLAccountCombination.first_entry_id))
+        .where(GLAccountCombination.source_type.in_(sources))
+        .group_by(GLAccountCombination.source_type)
+    )
+    return (
+        {(src, sig): fid for src, sig, fid in first.all()},
+        dict(oldest.all()),
+    )
+
+
+async def _load_account_balances(db: AsyncSession, account_ids: set[int]) -> dict[int, tuple]:
+    """``{account_id: (account, debit_total, credit_total)}`` over all posted lines."""
+    if not account_ids:
+        return {}
+    totals = posted_totals_query(account_ids=sorted(account_ids)).subquery()
+    rows = await db.execute(
+        select(GLAccount, totals.c.dr, totals.c.cr)
+        .outerjoin(totals, totals.c.gl_account_id == GLAccount.id)
+        .where(GLAccount.id.in_(sorted(account_ids)))
+    )
+    return {acct.id: (acct, dr, cr) for acct, dr, cr in rows.all()}
 
 
 # ---------------------------------------------------------------------------
@@ -210,40 +253,135 @@ async def analyze_entry(
 ) -> AnomalyResult:
     """Run all anomaly checks on a journal entry.
 
+    Reads the rolling statistics kept by :mod:`posting_stats` — a fixed
+    handful of queries regardless of history or line count.  A posted
+    entry still inside the statistics window is taken back out before its
+    amount is scored; one re-scored after ageing out is scored as is.
     Returns an AnomalyResult with risk score and flags.
     """
     result = AnomalyResult()
+    src = source_key(entry.source_type)
+    lines = entry.lines or []
+
+    amount = float(entry.total_debits)
+    stats = (await _load_stats(db, [src])).get(src)
+    if (
+        stats is not None
+        and entry.status == JournalEntryStatus.POSTED
+        and entry.id in await _in_stats_window(db, [entry])
+    ):
+        # Posting already folded this entry in; don't score it against itself
+        stats = stats.without(amount)
+    _flag_amount(result, amount, stats)
+
+    if lines:
+        key = (src, account_signature(ln.gl_account_id for ln in lines))
+        first, oldest = await _load_combinations(db, {key})
+        has_history = oldest.get(src) is not None and oldest[src] < entry.id
+        _flag_pattern(result, first.get(key), entry.id, has_history)
+
+    if entry.created_by:
+        one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+        count_result = await db.execute(
+            select(sa_func.count(JournalEntry.id))
+            .where(
+                JournalEntry.created_by == entry.created_by,
+                JournalEntry.created_at >= one_hour_ago,
+            )
+        )
+        _flag_velocity(result, count_result.scalar() or 0)
 
-    await _check_amount_outlier(db, entry, result)
-    await _check_unusual_pattern(db, entry, result)
-    await _check_velocity(db, entry, result)
-    await _check_balance_direction(db, entry, result)
-
-    # Build explanation
-    if result.has_anomalies:
-        explanations = [f["reason"] for f in result.flags]
-        result.explanation = "; ".join(explanations)
-    else:
-        result.explanation = "No anomalies detected"
+    balances = await _load_account_balances(db, {ln.gl_account_id for ln in lines})
+    _flag_balance(result, [balances[ln.gl_account_id] for ln in lines if ln.gl_account_id in balances])
 
-    return result
+    return _finish(result)
 
 
-async def detect_and_store(
+async def analyze_period(
     db: AsyncSession,
-    entry_id: int,
-) -> list[GLAnomaly]:
-    """Run anomaly detection on an entry and persist results."""
-    from app.services.gl.journal_engine import get_journal_entry
-
-    entry = await get_journal_entry(db, entry_id)
-    if not entry:
-        return []
-
-    result = await analyze_entry(db, entry)
+    period_id: int,
+    *,
+    only_unscored: bool = True,
+) -> dict[int, AnomalyResult]:
+    """Score every posted entry of a period in one pass.
+
+    Loads the period's entries and lines, the statistics, signatures and
+    balances once each.  Velocity counts the same user's entries in the
+    hour before each entry.  Each amount is scored against the statistics
+    with that entry taken out, if it is still inside the window.  With *only_unscored*, entries that already
+    carry an ``anomaly_score`` are skipped.
+    """
+    entries = (await db.execute(
+        select(JournalEntry)
+        .where(
+            JournalEntry.accounting_period_id == period_id,
+            JournalEntry.status == JournalEntryStatus.POSTED,
+        )
+        .order_by(JournalEntry.id)
+    )).scalars().all()
 
-    # Store anomaly score in entry metadata
-    meta = entry.metadata_ or {}
+    line_rows = (await db.execute(
+        select(JournalEntryLine.journal_entry_id, JournalEntryLine.gl_account_id, JournalEntryLine.debit_amount)
+        .join(JournalEntry, JournalEntryLine.journal_entry_id == JournalEntry.id)
+        .where(
+            JournalEntry.accounting_period_id == period_id,
+            JournalEntry.status == JournalEntryStatus.POSTED,
+        )
+        .order_by(JournalEntryLine.journal_entry_id, JournalEntryLine.line_number)
+    )).all()
+    accounts: dict[int, list[int]] = defaultdict(list)
+    amounts: dict[int, Decimal] = defaultdict(Decimal)
+    for entry_id, account_id, debit in line_rows:
+        accounts[entry_id].append(account_id)
+        amounts[entry_id] += debit or 0
+
+    # Per-user posting times, for the trailing one-hour velocity window
+    times: dict[int, list[datetime]] = defaultdict(list)
+    for e in entries:
+        if e.created_by and e.created_at:
+            times[e.created_by].append(e.created_at)
+    for ts in times.values():
+        ts.sort()
+
+    targets = [
+        e for e in entries
+        if not (only_unscored and e.metadata_ and "anomaly_score" in e.metadata_)
+    ]
+    sources = sorted({source_key(e.source_type) for e in targets})
+    keys = {
+        (source_key(e.source_type), account_signature(accounts[e.id]))
+        for e in targets if accounts[e.id]
+    }
+    stats = await _load_stats(db, sources)
+    first, oldest = await _load_combinations(db, keys)
+    balances = await _load_account_balances(db, {a for e in targets for a in accounts[e.id]})
+    in_window = await _in_stats_window(db, targets)
+
+    results: dict[int, AnomalyResult] = {}
+    for e in targets:
+        result = AnomalyResult()
+        src = source_key(e.source_type)
+        amount = float(amounts[e.id])
+        own = stats.get(src)
+        if own is not None and e.id in in_window:
+            own = own.without(amount)
+        _flag_amount(result, amount, own)
+        if accounts[e.id]:
+            key = (src, account_signature(accounts[e.id]))
+            has_history = oldest.get(src) is not None and oldest[src] < e.id
+            _flag_pattern(result, first.get(key), e.id, has_history)
+        if e.created_by and e.created_at:
+            ts = times[e.created_by]
+            count = bisect_right(ts, e.created_at) - bisect_left(ts, e.created_at - timedelta(hours=1))
+            _flag_velocity(result, count)
+        _flag_balance(result, [balances[a] for a in accounts[e.id] if a in balances])
+        results[e.id] = _finish(result)
+    return results
+
+
+def _store_result(db: AsyncSession, entry: JournalEntry, result: AnomalyResult) -> list[GLAnomaly]:
+    """Record the score on the entry and add one GLAnomaly per flag."""
+    meta = dict(entry.metadata_ or {})
     meta["anomaly_score"] = result.risk_score
     meta["anomaly_explanation"] = result.explanation
     entry.metadata_ = meta
@@ -251,7 +389,7 @@ async def detect_and_store(
     anomalies = []
     for flag in result.flags:
         anomaly = GLAnomaly(
-            journal_entry_id=entry_id,
+            journal_entry_id=entry.id,
             anomaly_type=flag["type"],
             risk_score=flag["score"],
             explanation=flag["reason"],
@@ -259,7 +397,41 @@ async def detect_and_store(
         )
         db.add(anomaly)
         anomalies.append(anomaly)
+    return anomalies
+
+
+async def detect_and_store_period(db: AsyncSession, period_id: int) -> list[GLAnomaly]:
+    """Batch-score a period's unscored posted entries and persist the results."""
+    results = await analyze_period(db, period_id)
+    if not results:
+        return []
+    entries = (await db.execute(
+        select(JournalEntry).where(JournalEntry.id.in_(list(results)))
+    )).scalars().all()
+
+    anomalies = []
+    for entry in entries:
+        anomalies += _store_result(db, entry, results[entry.id])
+    await db.flush()
+    logger.info(
+        "Scored %d entries of period %d: %d anomalies", len(results), period_id, len(anomalies),
+    )
+    return anomalies
 
+
+async def detect_and_store(
+    db: AsyncSession,
+    entry_id: int,
+) -> list[GLAnomaly]:
+    """Run anomaly detection on an entry and persist results."""
+    from app.services.gl.journal_engine import get_journal_entry
+
+    entry = await get_journal_entry(db, entry_id)
+    if not entry:
+        return []
+
+    result = await analyze_entry(db, entry)
+    anomalies = _store_result(db, entry, result)
     await db.flush()
     return anomalies
 
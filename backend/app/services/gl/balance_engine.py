@@ -0,0 +1,214 @@
+"""GL balance engine.
+
+Loads the whole chart of accounts together with every account's posted
+debit/credit totals in a single grouped query, then answers balance
+questions — per account or rolled up the ``parent_id`` hierarchy — from
+memory.  Reports that need many balances (trial balance, financial
+statements, dashboard cards) should load one :class:`LedgerBalances`
+instead of calling ``coa_service.get_account_balance`` per account.
+
+Totals are read from the ``account_period_balances`` snapshots for every
+period that ends on or before the cut-off (the opening balance), plus the
+raw journal lines of the period containing the cut-off and of entries with
+no accounting period (the current delta).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import and_, or_, select, union_all, func as sa_func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gl import (
+    AccountingPeriod,
+    AccountPeriodBalance,
+    GLAccount,
+    AccountType,
+    JournalEntry,
+    JournalEntryLine,
+    JournalEntryStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+_ZERO = Decimal("0")
+
+
+class LedgerBalances:
+    """Posted totals for every account, with hierarchical roll-ups.
+
+    Balances follow ``coa_service.get_account_balance``: debits minus
+    credits for debit-normal accounts, credits minus debits otherwise, and a
+    roll-up is signed by the normal side of the account it is rolled up to.
+    """
+
+    def __init__(self, rows: list[tuple[GLAccount, Decimal | None, Decimal | None]]):
+        # ``rows`` arrive ordered by account code, which every list below keeps
+        self.accounts: list[GLAccount] = []
+        self._by_id: dict[int, GLAccount] = {}
+        self._by_code: dict[str, GLAccount] = {}
+        self._own: dict[int, tuple[Decimal, Decimal]] = {}
+        self._children: dict[int, list[int]] = {}
+        self._rolled: dict[int, tuple[Decimal, Decimal]] = {}
+
+        for account, dr, cr in rows:
+            self.accounts.append(account)
+            self._by_id[account.id] = account
+            self._by_code[account.account_code] = account
+            self._own[account.id] = (dr or _ZERO, cr or _ZERO)
+            if account.parent_id is not None:
+                self._children.setdefault(account.parent_id, []).append(account.id)
+
+    # -- lookups ----------------------------------------------------------
+
+    def get(self, account_id: int) -> GLAccount | None:
+        return self._by_id.get(account_id)
+
+    def get_by_code(self, code: str) -> GLAccount | None:
+        return self._by_code.get(code)
+
+    def children_of(self, account_id: int) -> list[GLAccount]:
+        """Direct children of an account, in account-code order."""
+        return [self._by_id[cid] for cid in self._children.get(account_id, [])]
+
+    # -- totals -----------------------------------------------------------
+
+    def totals(self, account_id: int, *, include_children: bool = False) -> tuple[Decimal, Decimal]:
+        """``(debit_total, credit_total)`` for an account, optionally with descendants."""
+        if not include_children:
+            return self._own.get(account_id, (_ZERO, _ZERO))
+        if account_id not in self._rolled:
+            self._roll_up(account_id)
+        return self._rolled[account_id]
+
+    def _roll_up(self, root_id: int) -> None:
+        # Iterative post-order walk so deep hierarchies cannot hit the
+        # recursion limit; sub-totals are memoised for later calls.
+        stack: list[tuple[int, bool]] = [(root_id, False)]
+        visiting: set[int] = set()
+        while stack:
+            account_id, expanded = stack.pop()
+            if account_id in self._rolled:
+                continue
+            if not expanded:
+                if account_id in visiting:  # cycle in parent_id — ignore the back edge
+                    continue
+                visiting.add(account_id)
+                stack.append((account_id, True))
+                for cid in self._children.get(account_id, []):
+                    if cid not in self._rolled:
+                        stack.append((cid, False))
+                continue
+            dr, cr = self._own.get(account_id, (_ZERO, _ZERO))
+            for cid in self._children.get(account_id, []):
+                c_dr, c_cr = self._rolled.get(cid, (_ZERO, _ZERO))
+                dr += c_dr
+                cr += c_cr
+            self._rolled[account_id] = (dr, cr)
+
+    def balance(self, account_id: int, *, include_children: bool = False) -> dict:
+        """Same shape as ``coa_service.get_account_balance``."""
+        dr_total, cr_total = self.totals(account_id, include_children=include_children)
+        account = self._by_id.get(account_id)
+        if account and account.account_type == AccountType.DEBIT:
+            balance = dr_total - cr_total
+        else:
+            balance = cr_total - dr_total
+        return {
+            "debit_total": float(dr_total),
+            "credit_total": float(cr_total),
+            "balance": float(balance),
+        }
+
+
+def posted_totals_query(
+    *,
+    as_of_date: date | None = None,
+    period_id: int | None = None,
+    account_ids=None,
+):
+    """Grouped ``(gl_account_id, dr, cr)`` totals over posted journal lines.
+
+    Equivalent to summing every posted line with ``effective_date <=
+    as_of_date`` and/or in ``period_id``, but periods wholly before the
+    cut-off are read from their snapshot rows.  *account_ids* (a list or an
+    id-selecting subquery) restricts the accounts.
+    """
+    snapshot = select(
+        AccountPeriodBalance.gl_account_id.label("gl_account_id"),
+        AccountPeriodBalance.debit_total.label("dr"),
+        AccountPeriodBalance.credit_total.label("cr"),
+    )
+    delta = (
+        select(
+            JournalEntryLine.gl_account_id.label("gl_account_id"),
+            JournalEntryLine.debit_amount.label("dr"),
+            JournalEntryLine.credit_amount.label("cr"),
+        )
+        .join(JournalEntry, JournalEntryLine.journal_entry_id == JournalEntry.id)
+        .where(JournalEntry.status == JournalEntryStatus.POSTED)
+    )
+    if period_id:
+        snapshot = snapshot.where(AccountPeriodBalance.accounting_period_id == period_id)
+        delta = delta.where(JournalEntry.accounting_period_id == period_id)
+    if account_ids is not None:
+        snapshot = snapshot.where(AccountPeriodBalance.gl_account_id.in_(account_ids))
+        delta = delta.where(JournalEntryLine.gl_account_id.in_(account_ids))
+
+    if as_of_date:
+        # Opening balance: periods that end on or before the cut-off.  The
+        # delta covers the period straddling it, up to the cut-off itself.
+        snapshot = snapshot.where(
+            AccountPeriodBalance.accounting_period_id.in_(
+                select(AccountingPeriod.id).where(AccountingPeriod.end_date <= as_of_date)
+            )
+        )
+        delta = (
+            delta.outerjoin(AccountingPeriod, JournalEntry.accounting_period_id == AccountingPeriod.id)
+            .where(
+                JournalEntry.effective_date <= as_of_date,
+                or_(
+                    JournalEntry.accounting_period_id.is_(None),
+                    and_(
+                        AccountingPeriod.start_date <= as_of_date,
+                        AccountingPeriod.end_date > as_of_date,
+                    ),
+                ),
+            )
+        )
+        parts = union_all(snapshot, delta)
+    elif period_id:
+        parts = snapshot
+    else:
+        parts = union_all(
+            snapshot, delta.where(JournalEntry.accounting_period_id.is_(None))
+        )
+
+    parts = parts.subquery("posted_parts")
+    return (
+        select(
+            parts.c.gl_account_id.label("gl_account_id"),
+            sa_func.sum(parts.c.dr).label("dr"),
+            sa_func.sum(parts.c.cr).label("cr"),
+        )
+        .group_by(parts.c.gl_account_id)
+    )
+
+
+async def load_balances(
+    db: AsyncSession,
+    *,
+    as_of_date: date | None = None,
+    period_id: int | None = None,
+) -> LedgerBalances:
+    """Load every account with its posted totals in one round trip."""
+    totals = posted_totals_query(as_of_date=as_of_date, period_id=period_id).subquery()
+    result = await db.execute(
+        select(GLAccount, totals.c.dr, totals.c.cr)
+        .outerjoin(totals, totals.c.gl_account_id == GLAccount.id)
+        .order_by(GLAccount.account_code)
+    )
+    return LedgerBalances([(acct, dr, cr) for acct, dr, cr in result.all()])
@@ -23,6 +23,7 @@ from app.models.gl import (
     Currency,
     JournalEntryLine,
 )
+from app.services.gl.balance_engine import posted_totals_query
 
 logger = logging.getLogger(__name__)
 
@@ -299,16 +300,23 @@ async def close_account(
     )
 
 
-async def _collect_descendant_ids(db: AsyncSession, account_id: int) -> list[int]:
-    """Recursively gather all descendant account IDs (children, grandchildren, etc.)."""
-    result = await db.execute(
-        select(GLAccount.id).where(GLAccount.parent_id == account_id)
+def _descendant_ids_cte(account_id: int):
+    """Recursive CTE yielding the IDs of every descendant of *account_id*."""
+    tree = (
+        select(GLAccount.id)
+        .where(GLAccount.parent_id == account_id)
+        .cte("descendants", recursive=True)
     )
-    child_ids = list(result.scalars().all())
-    all_ids = list(child_ids)
-    for cid in child_ids:
-        all_ids.extend(await _collect_descendant_ids(db, cid))
-    return all_ids
+    return tree.union_all(
+        select(GLAccount.id).where(GLAccount.parent_id == tree.c.id)
+    )
+
+
+async def _collect_descendant_ids(db: AsyncSession, account_id: int) -> list[int]:
+    """Gather all descendant account IDs (children, grandchildren, etc.) in one query."""
+    tree = _descendant_ids_cte(account_id)
+    result = await db.execute(select(tree.c.id))
+    return list(result.scalars().all())
 
 
 async def get_account_balance(
@@ -327,29 +335,25 @@ async def get_account_balance(
 
     If *include_children* is True, aggregates postings across
     the account **and** all its descendants in the hierarchy.
-    """
-    from app.models.gl import JournalEntry, JournalEntryStatus
 
+    For many accounts at once use ``balance_engine.load_balances``.
+    """
     # Determine which account IDs to aggregate
-    account_ids = [account_id]
     if include_children:
-        account_ids.extend(await _collect_descendant_ids(db, account_id))
-
-    q = (
-        select(
-            sa_func.coalesce(sa_func.sum(JournalEntryLine.debit_amount), 0).label("dr"),
-            sa_func.coalesce(sa_func.sum(JournalEntryLine.credit_amount), 0).label("cr"),
-        )
-        .join(JournalEntry, JournalEntryLine.journal_entry_id == JournalEntry.id)
-        .where(
-            JournalEntryLine.gl_account_id.in_(account_ids),
-            JournalEntry.status == JournalEntryStatus.POSTED,
+        tree = _descendant_ids_cte(account_id)
+        account_ids = select(GLAccount.id).where(
+            (GLAccount.id == account_id) | GLAccount.id.in_(select(tree.c.id))
         )
+    else:
+        account_ids = [account_id]
+
+    totals = posted_totals_query(
+        as_of_date=as_of_date, period_id=period_id, account_ids=account_ids,
+    ).subquery()
+    q = select(
+        sa_func.coalesce(sa_func.sum(totals.c.dr), 0).label("dr"),
+        sa_func.coalesce(sa_func.sum(totals.c.cr), 0).label("cr"),
     )
-    if as_of_date:
-        q = q.where(JournalEntry.effective_date <= as_of_date)
-    if period_id:
-        q = q.where(JournalEntry.accounting_period_id == period_id)
 
     result = await db.execute(q)
     row = result.one()
@@ -1,31 +1,51 @@
 """Multi-format GL export service.
 
-Supports CSV, Excel, PDF, JSON, and XML export for:
+Supports CSV, Excel, PDF, JSON, JSON-lines and XML export for:
 - Journal entries (filtered)
 - Trial balance
 - Account ledger
 - Financial statements
 - Custom reports
 
-All exports are logged for audit purposes.
+Exports are written incrementally: rows arrive in batches (from a list or
+from a server-side cursor) and each format's writer appends them to a file,
+so a full-year ledger is exported in constant memory.  Finished files are
+archived to file storage and every export is logged for audit purposes.
 """
 
 import csv
 import io
 import json
 import logging
-from datetime import datetime, timezone
+from contextlib import aclosing
+from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Any
+from typing import Any, AsyncIterator, BinaryIO, Iterable
 from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
 
-from sqlalchemy import select
+from sqlalchemy import select, func as sa_func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.gl import GLExportLog
+from app.models.gl import (
+    GLAccount,
+    GLExportLog,
+    JournalEntry,
+    JournalEntryLine,
+    JournalEntryStatus,
+    JournalSourceType,
+)
+from app.services import file_storage
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip from the journal-line cursor
+EXPORT_FETCH_SIZE = 1000
+# Rows handed to a writer at a time
+WRITE_BATCH_SIZE = 500
+# PDF tables are laid out in memory; bigger exports belong in CSV/XLSX/JSONL
+PDF_MAX_ROWS = 5000
+
 
 class DecimalEncoder(json.JSONEncoder):
     """JSON encoder that handles Decimal types."""
@@ -35,6 +55,337 @@ class DecimalEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def _header(col_name: str) -> str:
+    return col_name.replace("_", " ").title()
+
+
+# ---------------------------------------------------------------------------
+# Incremental writers
+# ---------------------------------------------------------------------------
+
+class _Writer:
+    """Appends batches of row dicts to a binary file in one format."""
+
+    # Maximum rows the format can hold (None = unlimited)
+    limit: int | None = None
+
+    def __init__(self, fh: BinaryIO, columns: list[str], **options: Any):
+        self.fh = fh
+        self.columns = columns
+        self.truncated = False
+
+    def write(self, rows: list[dict]) -> None:
+        raise NotImplementedError
+
+    def close(self, count: int) -> None:
+        pass
+
+
+class _CsvWriter(_Writer):
+    def __init__(self, fh, columns, **options):
+        super().__init__(fh, columns)
+        if columns:
+            self._emit([columns])
+
+    def _emit(self, rows: list[list]) -> None:
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        self.fh.write(buf.getvalue().encode("utf-8"))
+
+    def write(self, rows):
+        self._emit([[row.get(c) for c in self.columns] for row in rows])
+
+
+class _JsonWriter(_Writer):
+    """``{"exported_at", "metadata", "data": [...], "record_count"}`` written as it goes."""
+
+    def __init__(self, fh, columns, *, metadata: dict | None = None, **options):
+        super().__init__(fh, columns)
+        head = {"exported_at": datetime.now(timezone.utc).isoformat()}
+        if metadata:
+            head["metadata"] = metadata
+        self.fh.write(json.dumps(head, cls=DecimalEncoder)[:-1].encode("utf-8") + b', "data": [')
+        self._sep = "\n"
+
+    def write(self, rows):
+        body = ",\n".join(json.dumps(row, cls=DecimalEncoder) for row in rows)
+        self.fh.write((self._sep + body).encode("utf-8"))
+        self._sep = ",\n"
+
+    def close(self, count):
+        self.fh.write(f'\n], "record_count": {count}}}\n'.encode("utf-8"))
+
+
+class _JsonLinesWriter(_Writer):
+    def write(self, rows):
+        self.fh.write("".join(
+            json.dumps(row, cls=DecimalEncoder) + "\n" for row in rows
+        ).encode("utf-8"))
+
+
+class _XmlWriter(_Writer):
+    """Root element opened up front, one child per row.
+
+    ``record_count`` is a root attribute when known in advance (list
+    exports); streamed exports close with a ``<RecordCount>`` element.
+    """
+
+    def __init__(
+        self, fh, columns, *,
+        record_count: int | None = None,
+        root_tag: str = "GLExport",
+        row_tag: str = "Entry",
+        **options,
+    ):
+        super().__init__(fh, columns)
+        self._root_tag = root_tag
+        self._row_tag = row_tag
+        self._count_known = record_count is not None
+        attrs = f" exported_at={quoteattr(datetime.now(timezone.utc).isoformat())}"
+        if self._count_known:
+            attrs += f" record_count={quoteattr(str(record_count))}"
+        self.fh.write(f"<?xml version='1.0' encoding='utf-8'?>\n<{root_tag}{attrs}>".encode("utf-8"))
+
+    def write(self, rows):
+        parts = []
+        for row in rows:
+            entry_el = ET.Element(self._row_tag)
+            for key, value in row.items():
+                child = ET.SubElement(entry_el, key)
+                child.text = str(value) if value is not None else ""
+            parts.append(ET.tostring(entry_el, encoding="unicode"))
+        self.fh.write("".join(parts).encode("utf-8"))
+
+    def close(self, count):
+        tail = "" if self._count_known else f"<RecordCount>{escape(str(count))}</RecordCount>"
+        self.fh.write(f"{tail}</{self._root_tag}>".encode("utf-8"))
+
+
+class _ExcelWriter(_Writer):
+    """openpyxl write-only workbook: rows are serialised as they are appended."""
+
+    def __init__(self, fh, columns, *, sheet_name: str = "GL Export", **options):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, Alignment, PatternFill
+        from openpyxl.utils import get_column_letter
+
+        super().__init__(fh, columns)
+        self._cell = WriteOnlyCell
+        self._letter = get_column_letter
+        self._header_font = Font(bold=True, color="FFFFFF")
+        self._header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
+        self._center = Alignment(horizontal="center")
+        self._right = Alignment(horizontal="right")
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(sheet_name[:31])
+        self._started = False
+
+    def _start(self, sample: list[dict]) -> None:
+        # Write-only sheets need widths and panes before the first row
+        ws = self._ws
+        for col_idx, col_name in enumerate(self.columns, 1):
+            max_len = max(
+                [len(str(col_name))] + [len(str(row.get(col_name, ""))) for row in sample[:100]]
+            )
+            ws.column_dimensions[self._letter(col_idx)].width = min(max_len + 2, 40)
+        ws.freeze_panes = "A2"
+        header = []
+        for col_name in self.columns:
+            cell = self._cell(ws, value=_header(col_name))
+            cell.font = self._header_font
+            cell.fill = self._header_fill
+            cell.alignment = self._center
+            header.append(cell)
+        ws.append(header)
+        self._started = True
+
+    def _value(self, value):
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            cell = self._cell(self._ws, value=value)
+            cell.number_format = "#,##0.00"
+            cell.alignment = self._right
+            return cell
+        return value
+
+    def write(self, rows):
+        if not self._started:
+            self._start(rows)
+        for row in rows:
+            self._ws.append([self._value(row.get(c)) for c in self.columns])
+
+    def close(self, count):
+        if not self._started:
+            self._start([])
+        if self.columns:
+            self._ws.auto_filter.ref = f"A1:{self._letter(len(self.columns))}{count + 1}"
+        self._wb.save(self.fh)
+
+
+class _PdfWriter(_Writer):
+    """reportlab table; the document is laid out at close, so rows are capped."""
+
+    limit = PDF_MAX_ROWS
+
+    def __init__(self, fh, columns, *, title: str = "GL Export Report", **options):
+        from reportlab.platypus import SimpleDocTemplate  # noqa: F401 — fail early if missing
+
+        super().__init__(fh, columns)
+        self._title = title
+        self._rows: list[list[str]] = []
+
+    def write(self, rows):
+        self._rows.extend(
+            [
+                f"{row.get(c, ''):,.2f}" if isinstance(row.get(c), (int, float, Decimal)) else str(row.get(c, ""))
+                for c in self.columns
+            ]
+            for row in rows
+        )
+
+    def close(self, count):
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter, landscape
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+
+        doc = SimpleDocTemplate(self.fh, pagesize=landscape(letter))
+        styles = getSampleStyleSheet()
+        elements = []
+
+        # Title
+        elements.append(Paragraph(self._title, styles["Title"]))
+        elements.append(Spacer(1, 0.25 * inch))
+        summary = (
+            f"Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')} | "
+            f"Records: {count}"
+        )
+        if self.truncated:
+            summary += " (truncated — export as CSV or Excel for the full set)"
+        elements.append(Paragraph(summary, styles["Normal"]))
+        elements.append(Spacer(1, 0.25 * inch))
+
+        if not self._rows:
+            elements.append(Paragraph("No data to display.", styles["Normal"]))
+            doc.build(elements)
+            return
+
+        table = Table([[_header(c) for c in self.columns]] + self._rows, repeatRows=1)
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1F4E79")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 8),
+            ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+            ("TOPPADDING", (0, 0), (-1, 0), 8),
+            ("FONTSIZE", (0, 1), (-1, -1), 7),
+            ("ALIGN", (0, 1), (-1, -1), "LEFT"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F5F5F5")]),
+        ]))
+
+        elements.append(table)
+        doc.build(elements)
+
+
+WRITERS: dict[str, type[_Writer]] = {
+    "csv": _CsvWriter,
+    "json": _JsonWriter,
+    "jsonl": _JsonLinesWriter,
+    "xml": _XmlWriter,
+    "xlsx": _ExcelWriter,
+    "pdf": _PdfWriter,
+}
+
+
+class _ExportRun:
+    """Feeds batches to a writer, resolving columns from the first batch."""
+
+    def __init__(self, fmt: str, fh: BinaryIO, columns: list[str] | None, options: dict):
+        self.fmt = fmt
+        self.fh = fh
+        self.columns = columns
+        self.options = options
+        self.writer: _Writer | None = None
+        self.count = 0
+
+    def _open(self, batch: list[dict]) -> _Writer:
+        cols = self.columns or (list(batch[0].keys()) if batch else [])
+        try:
+            return WRITERS[self.fmt](self.fh, cols, **self.options)
+        except ImportError:
+            logger.warning("%s writer unavailable — falling back to CSV", self.fmt)
+            return _CsvWriter(self.fh, cols)
+
+    def feed(self, batch: list[dict]) -> bool:
+        """Write *batch*; False once the writer can take no more rows."""
+        if self.writer is None:
+            self.writer = self._open(batch)
+        limit = self.writer.limit
+        if limit is not None and self.count + len(batch) > limit:
+            batch = batch[: limit - self.count]
+            self.writer.truncated = True
+        if batch:
+            self.writer.write(batch)
+            self.count += len(batch)
+        return not self.writer.truncated
+
+    def finish(self) -> int:
+        if self.writer is None:
+            self.writer = self._open([])
+        self.writer.close(self.count)
+        return self.count
+
+
+async def _aiter(rows: Iterable[dict] | AsyncIterator[dict]) -> AsyncIterator[dict]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+async def write_export(
+    fh: BinaryIO,
+    rows: Iterable[dict] | AsyncIterator[dict],
+    format: str,
+    *,
+    columns: list[str] | None = None,
+    **options: Any,
+) -> tuple[int, bool]:
+    """Write *rows* to *fh* in batches; returns (rows written, truncated)."""
+    run = _ExportRun(format, fh, columns, options)
+    batch: list[dict] = []
+    # Close a generator source (and its cursor) if the writer stops early
+    source = rows if hasattr(rows, "aclose") else _aiter(rows)
+    async with aclosing(source):
+        async for row in source:
+            batch.append(row)
+            if len(batch) >= WRITE_BATCH_SIZE:
+                if not run.feed(batch):
+                    batch = []
+                    break
+                batch = []
+    if batch:
+        run.feed(batch)
+    count = run.finish()
+    return count, run.writer.truncated
+
+
+def _render(format: str, data: list[dict], columns: list[str] | None = None, **options) -> bytes:
+    """Render an in-memory list with the incremental writer for *format*."""
+    output = io.BytesIO()
+    run = _ExportRun(format, output, columns, options)
+    for start in range(0, len(data), WRITE_BATCH_SIZE):
+        if not run.feed(data[start:start + WRITE_BATCH_SIZE]):
+            break
+    run.finish()
+    return output.getvalue()
+
+
 # ---------------------------------------------------------------------------
 # Format renderers
 # ---------------------------------------------------------------------------
@@ -46,25 +397,17 @@ def export_csv(
     """Render data as CSV bytes."""
     if not data:
         return b""
-    cols = columns or list(data[0].keys())
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=cols, extrasaction="ignore")
-    writer.writeheader()
-    for row in data:
-        writer.writerow({k: row.get(k) for k in cols})
-    return output.getvalue().encode("utf-8")
+    return _render("csv", data, columns)
 
 
 def export_json(data: list[dict], metadata: dict | None = None) -> bytes:
     """Render data as JSON with optional metadata envelope."""
-    envelope = {
-        "exported_at": datetime.now(timezone.utc).isoformat(),
-        "record_count": len(data),
-        "data": data,
-    }
-    if metadata:
-        envelope["metadata"] = metadata
-    return json.dumps(envelope, cls=DecimalEncoder, indent=2).encode("utf-8")
+    return _render("json", data, metadata=metadata)
+
+
+def export_jsonl(data: list[dict]) -> bytes:
+    """Render data as JSON lines (one object per line)."""
+    return _render("jsonl", data)
 
 
 def export_xml(
@@ -73,17 +416,7 @@ def export_xml(
     row_tag: str = "Entry",
 ) -> bytes:
     """Render data as XML bytes."""
-    root = ET.Element(root_tag)
-    root.set("exported_at", datetime.now(timezone.utc).isoformat())
-    root.set("record_count", str(len(data)))
-
-    for row in data:
-        entry_el = ET.SubElement(root, row_tag)
-        for key, value in row.items():
-            child = ET.SubElement(entry_el, key)
-            child.text = str(value) if value is not None else ""
-
-    return ET.tostring(root, encoding="unicode", xml_declaration=True).encode("utf-8")
+    return _render("xml", data, record_count=len(data), root_tag=root_tag, row_tag=row_tag)
 
 
 def export_excel(
@@ -92,54 +425,7 @@ def export_excel(
     sheet_name: str = "GL Export",
 ) -> bytes:
     """Render data as Excel (.xlsx) bytes using openpyxl."""
-    try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill, numbers
-    except ImportError:
-        logger.warning("openpyxl not installed — falling back to CSV")
-        return export_csv(data, columns)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = sheet_name
-
-    cols = columns or (list(data[0].keys()) if data else [])
-
-    # Header row
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-    for col_idx, col_name in enumerate(cols, 1):
-        cell = ws.cell(row=1, column=col_idx, value=col_name.replace("_", " ").title())
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center")
-
-    # Data rows
-    number_format = '#,##0.00'
-    for row_idx, row in enumerate(data, 2):
-        for col_idx, col_name in enumerate(cols, 1):
-            value = row.get(col_name)
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if isinstance(value, (int, float, Decimal)):
-                cell.number_format = number_format
-                cell.alignment = Alignment(horizontal="right")
-
-    # Auto-filter and freeze panes
-    if cols:
-        ws.auto_filter.ref = f"A1:{chr(64 + len(cols))}{len(data) + 1}"
-    ws.freeze_panes = "A2"
-
-    # Auto-width
-    for col_idx, col_name in enumerate(cols, 1):
-        max_len = max(
-            len(str(col_name)),
-            *(len(str(row.get(col_name, ""))) for row in data[:100]),
-        ) if data else len(str(col_name))
-        ws.column_dimensions[chr(64 + col_idx) if col_idx <= 26 else f"A{chr(64 + col_idx - 26)}"].width = min(max_len + 2, 40)
-
-    output = io.BytesIO()
-    wb.save(output)
-    return output.getvalue()
+    return _render("xlsx", data, columns, sheet_name=sheet_name)
 
 
 def export_pdf(
@@ -147,107 +433,119 @@ def export_pdf(
     columns: list[str] | None = None,
     title: str = "GL Export Report",
 ) -> bytes:
-    """Render data as PDF using reportlab."""
-    try:
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter, landscape
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
-    except ImportError:
-        logger.warning("reportlab not installed — falling back to CSV")
-        return export_csv(data, columns)
+    """Render data as PDF using reportlab (first ``PDF_MAX_ROWS`` rows)."""
+    return _render("pdf", data, columns, title=title)
 
-    output = io.BytesIO()
-    doc = SimpleDocTemplate(output, pagesize=landscape(letter))
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # Title
-    elements.append(Paragraph(title, styles["Title"]))
-    elements.append(Spacer(1, 0.25 * inch))
-    elements.append(Paragraph(
-        f"Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')} | "
-        f"Records: {len(data)}",
-        styles["Normal"],
-    ))
-    elements.append(Spacer(1, 0.25 * inch))
 
-    if not data:
-        elements.append(Paragraph("No data to display.", styles["Normal"]))
-        doc.build(elements)
-        return output.getvalue()
-
-    cols = columns or list(data[0].keys())
-
-    # Build table data
-    table_data = [[c.replace("_", " ").title() for c in cols]]
-    for row in data:
-        table_data.append([
-            f"{row.get(c, ''):,.2f}" if isinstance(row.get(c), (int, float, Decimal)) else str(row.get(c, ""))
-            for c in cols
-        ])
-
-    # Create table
-    table = Table(table_data, repeatRows=1)
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1F4E79")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, 0), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-        ("TOPPADDING", (0, 0), (-1, 0), 8),
-        ("FONTSIZE", (0, 1), (-1, -1), 7),
-        ("ALIGN", (0, 1), (-1, -1), "LEFT"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F5F5F5")]),
-    ]))
-
-    elements.append(table)
-    doc.build(elements)
-    return output.getvalue()
+# ---------------------------------------------------------------------------
+# Row sources
+# ---------------------------------------------------------------------------
+
+def _filter_date(filters: dict, key: str) -> date | None:
+    try:
+        return date.fromisoformat(str(filters[key])) if filters.get(key) else None
+    except ValueError:
+        return None
+
+
+async def journal_line_rows(
+    db: AsyncSession, filters: dict | None = None,
+) -> AsyncIterator[dict]:
+    """Posted journal lines, newest first, from a server-side cursor.
+
+    Supported filters: ``date_from``/``date_to`` (effective date, ISO),
+    ``source_type`` and ``period_id``; unparseable values are ignored.
+    """
+    filters = filters or {}
+    query = (
+        select(
+            JournalEntry.entry_number,
+            JournalEntry.effective_date,
+            JournalEntry.source_type,
+            sa_func.coalesce(
+                sa_func.nullif(JournalEntryLine.description, ""), JournalEntry.description
+            ).label("description"),
+            GLAccount.account_code,
+            GLAccount.name.label("account_name"),
+            JournalEntryLine.debit_amount,
+            JournalEntryLine.credit_amount,
+            JournalEntryLine.loan_reference,
+        )
+        .join(JournalEntryLine, JournalEntryLine.journal_entry_id == JournalEntry.id)
+        .outerjoin(GLAccount, JournalEntryLine.gl_account_id == GLAccount.id)
+        .where(JournalEntry.status == JournalEntryStatus.POSTED)
+        .order_by(
+            JournalEntry.transaction_date.desc(),
+            JournalEntry.id.desc(),
+            JournalEntryLine.line_number,
+        )
+        .execution_options(yield_per=EXPORT_FETCH_SIZE)
+    )
+    if date_from := _filter_date(filters, "date_from"):
+        query = query.where(JournalEntry.effective_date >= date_from)
+    if date_to := _filter_date(filters, "date_to"):
+        query = query.where(JournalEntry.effective_date <= date_to)
+    if filters.get("source_type"):
+        try:
+            query = query.where(JournalEntry.source_type == JournalSourceType(filters["source_type"]))
+        except ValueError:
+            pass
+    if filters.get("period_id"):
+        try:
+            query = query.where(JournalEntry.accounting_period_id == int(filters["period_id"]))
+        except (TypeError, ValueError):
+            pass
+
+    result = await db.stream(query)
+    try:
+        async for row in result:
+            yield {
+                "entry_number": row.entry_number,
+                "date": str(row.effective_date),
+                "source_type": row.source_type.value,
+                "description": row.description,
+                "account_code": row.account_code or "",
+                "account_name": row.account_name or "",
+                "debit": float(row.debit_amount),
+                "credit": float(row.credit_amount),
+                "loan_reference": row.loan_reference or "",
+            }
+    finally:
+        await result.close()
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-EXPORTERS = {
-    "csv": export_csv,
-    "json": export_json,
-    "xml": export_xml,
-    "xlsx": export_excel,
-    "pdf": export_pdf,
-}
-
-
-async def export_data(
+async def export_to_file(
     db: AsyncSession,
     *,
-    data: list[dict],
+    rows: Iterable[dict] | AsyncIterator[dict],
     format: str,
     columns: list[str] | None = None,
     title: str = "GL Export",
     user_id: int,
     export_type: str = "journal_entries",
     filters: dict | None = None,
-) -> bytes:
-    """Export data in the requested format and log the export."""
+) -> GLExportLog:
+    """Write an export to file storage and log it; the log row holds the path."""
     fmt = format.lower()
-    if fmt not in EXPORTERS:
-        raise ValueError(f"Unsupported format: {fmt}. Supported: {list(EXPORTERS.keys())}")
-
-    exporter = EXPORTERS[fmt]
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported format: {fmt}. Supported: {list(WRITERS.keys())}")
 
-    if fmt == "pdf":
-        result = exporter(data, columns=columns, title=title)
-    elif fmt in ("json",):
-        result = exporter(data, metadata={"title": title, "filters": filters})
-    elif fmt == "xml":
-        result = exporter(data)
-    else:
-        result = exporter(data, columns=columns)
+    path = file_storage.new_file_path("exports", get_file_extension(fmt))
+    try:
+        with open(path, "wb") as fh:
+            count, truncated = await write_export(
+                fh, rows, fmt,
+                columns=columns,
+                title=title,
+                metadata={"title": title, "filters": filters},
+            )
+    except BaseException:
+        file_storage.remove_file(path)
+        raise
 
     # Log export
     log = GLExportLog(
@@ -255,16 +553,17 @@ async def export_data(
         export_type=export_type,
         format=fmt,
         filters=filters,
-        row_count=len(data),
+        row_count=count,
+        file_path=path,
     )
     db.add(log)
     await db.flush()
 
     logger.info(
-        "Exported %d rows as %s (type=%s) for user %d",
-        len(data), fmt, export_type, user_id,
+        "Exported %d rows as %s (type=%s) for user %d%s",
+        count, fmt, export_type, user_id, " (truncated)" if truncated else "",
     )
-    return result
+    return log
 
 
 def get_content_type(format: str) -> str:
@@ -272,6 +571,7 @@ def get_content_type(format: str) -> str:
     return {
         "csv": "text/csv",
         "json": "application/json",
+        "jsonl": "application/x-ndjson",
         "xml": "application/xml",
         "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         "pdf": "application/pdf",
@@ -283,6 +583,7 @@ def get_file_extension(format: str) -> str:
     return {
         "csv": ".csv",
         "json": ".json",
+        "jsonl": ".jsonl",
         "xml": ".xml",
         "xlsx": ".xlsx",
         "pdf": ".pdf",
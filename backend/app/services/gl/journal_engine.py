@@ -13,17 +13,20 @@ via reversing entries.
 """
 
 import logging
+from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import select, func as sa_func
+from sqlalchemy import Integer, cast, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.gl import (
     JournalEntry,
     JournalEntryLine,
+    JournalEntryCounter,
     JournalEntryStatus,
     JournalSourceType,
     AccountingPeriod,
@@ -32,6 +35,7 @@ from app.models.gl import (
     GLAccount,
     AccountStatus,
 )
+from app.services.gl import period_balances, posting_stats
 
 logger = logging.getLogger(__name__)
 
@@ -60,23 +64,57 @@ class AccountFrozenError(JournalEngineError):
 # Entry-number generation
 # ---------------------------------------------------------------------------
 
-async def _next_entry_number(db: AsyncSession) -> str:
-    """Generate the next sequential entry number: JE-YYYY-NNNNNN."""
+async def reserve_entry_numbers(db: AsyncSession, count: int = 1) -> list[str]:
+    """Claim *count* consecutive entry numbers ``JE-YYYY-NNNNNN``, usually in one round trip.
+
+    Numbers come from the year's row in ``gl_entry_number_counters``,
+    advanced with an UPDATE that returns the new high-water mark.  The row
+    stays locked until the caller's transaction ends, so concurrent
+    posters queue behind each other instead of colliding on the unique
+    index, and numbers from a rolled-back transaction are issued again.
+
+    The first reservation of a year creates the row, seeded from the
+    highest well-formed number already posted that year — a counter table
+    created empty on an existing database must not restart at 000001.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
     year = datetime.now(timezone.utc).year
     prefix = f"JE-{year}-"
 
-    result = await db.execute(
-        select(sa_func.max(JournalEntry.entry_number))
-        .where(JournalEntry.entry_number.like(f"{prefix}%"))
-    )
-    last = result.scalar_one_or_none()
+    last = (await db.execute(
+        update(JournalEntryCounter)
+        .where(JournalEntryCounter.year == year)
+        .values(last_value=JournalEntryCounter.last_value + count)
+        .returning(JournalEntryCounter.last_value)
+    )).scalar_one_or_none()
+
+    if last is None:
+        posted = (
+            select(func.coalesce(func.max(
+                cast(func.split_part(JournalEntry.entry_number, "-", 3), Integer)
+            ), 0))
+            .where(
+                JournalEntry.entry_number.like(f"{prefix}%"),
+                # Same guard as migration 028: a legacy or manual number
+                # with a suffix must not break the integer cast
+                JournalEntry.entry_number.regexp_match(f"^{prefix}[0-9]+$"),
+            )
+            .scalar_subquery()
+        )
+        stmt = pg_insert(JournalEntryCounter).values(year=year, last_value=posted + count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JournalEntryCounter.year],
+            set_={"last_value": JournalEntryCounter.last_value + count},
+        ).returning(JournalEntryCounter.last_value)
+        last = (await db.execute(stmt)).scalar_one()
+
+    return [f"{prefix}{seq:06d}" for seq in range(last - count + 1, last + 1)]
 
-    if last:
-        seq = int(last.replace(prefix, "")) + 1
-    else:
-        seq = 1
 
-    return f"{prefix}{seq:06d}"
+async def _next_entry_number(db: AsyncSession) -> str:
+    """Generate the next sequential entry number: JE-YYYY-NNNNNN."""
+    return (await reserve_entry_numbers(db, 1))[0]
 
 
 # ---------------------------------------------------------------------------
@@ -171,7 +209,7 @@ async def create_journal_entry(
     _validate_balance(lines)
 
     # 2. Account validation
-    account_ids = [ln["gl_account_id"] for ln in lines]
+    account_ids = list(dict.fromkeys(ln["gl_account_id"] for ln in lines))
     await _validate_accounts(db, account_ids)
 
     # 3. Currency lookup
@@ -247,6 +285,9 @@ async def create_journal_entry(
 
     await db.flush()
     await db.refresh(entry, ["lines"])
+    if status == JournalEntryStatus.POSTED:
+        await period_balances.apply_entry(db, entry)
+        await posting_stats.observe_entry(db, entry)
     logger.info("Created journal entry %s (status=%s)", entry.entry_number, entry.status.value)
     return entry
 
@@ -336,6 +377,8 @@ async def post_entry(
     entry.posted_at = now
     entry.posting_date = now.date()
     await db.flush()
+    await period_balances.apply_entry(db, entry)
+    await posting_stats.observe_entry(db, entry)
     logger.info("Posted %s by user %d", entry.entry_number, poster_id)
     return entry
 
@@ -425,6 +468,7 @@ async def reverse_entry(
     original.reversed_by_id = reversal.id
     original.status = JournalEntryStatus.REVERSED
     await db.flush()
+    await period_balances.apply_entry(db, original, sign=-1)
 
     logger.info(
         "Reversed %s → %s by user %d",
@@ -433,3 +477,219 @@ async def reverse_entry(
         reverser_id,
     )
     return reversal
+
+
+# ---------------------------------------------------------------------------
+# Bulk posting
+# ---------------------------------------------------------------------------
+
+# Lines per multi-row INSERT statement
+BULK_INSERT_CHUNK = 5000
+
+_ZERO = Decimal("0")
+
+
+@dataclass
+class LineBatch:
+    """Journal lines held column-wise for :func:`post_line_batch`.
+
+    Amounts are Decimals already rounded to cents.  ``split_key`` assigns
+    each line to an entry (e.g. a branch or product label); lines with the
+    same key are posted together and every group must balance by itself.
+    """
+    gl_account_id: list[int] = field(default_factory=list)
+    debit_amount: list[Decimal] = field(default_factory=list)
+    credit_amount: list[Decimal] = field(default_factory=list)
+    description: list[str | None] = field(default_factory=list)
+    loan_reference: list[str | None] = field(default_factory=list)
+    branch: list[str | None] = field(default_factory=list)
+    split_key: list[str | None] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.gl_account_id)
+
+    def add(
+        self,
+        gl_account_id: int,
+        debit_amount: Decimal = _ZERO,
+        credit_amount: Decimal = _ZERO,
+        *,
+        description: str | None = None,
+        loan_reference: str | None = None,
+        branch: str | None = None,
+        split_key: str | None = None,
+    ) -> None:
+        self.gl_account_id.append(gl_account_id)
+        self.debit_amount.append(debit_amount)
+        self.credit_amount.append(credit_amount)
+        self.description.append(description)
+        self.loan_reference.append(loan_reference)
+        self.branch.append(branch)
+        self.split_key.append(split_key)
+
+    def add_pair(
+        self,
+        debit_account_id: int,
+        credit_account_id: int,
+        amount: Decimal,
+        *,
+        debit_description: str | None = None,
+        credit_description: str | None = None,
+        loan_reference: str | None = None,
+        branch: str | None = None,
+        split_key: str | None = None,
+    ) -> None:
+        """Append a balanced DR/CR line pair for *amount*."""
+        self.add(
+            debit_account_id, amount, _ZERO, description=debit_description,
+            loan_reference=loan_reference, branch=branch, split_key=split_key,
+        )
+        self.add(
+            credit_account_id, _ZERO, amount, description=credit_description,
+            loan_reference=loan_reference, branch=branch, split_key=split_key,
+        )
+
+
+@dataclass
+class _GroupTotals:
+    indices: list[int] = field(default_factory=list)
+    debit: Decimal = _ZERO
+    credit: Decimal = _ZERO
+
+
+def _summarize_batch(
+    batch: LineBatch,
+) -> tuple[dict[str | None, _GroupTotals], dict[int, tuple[Decimal, Decimal]]]:
+    """Single pass over a batch: per-split-key totals and per-account movement.
+
+    Raises :class:`BalanceError` if any group is unbalanced or zero.
+    """
+    groups: dict[str | None, _GroupTotals] = {}
+    per_account: dict[int, tuple[Decimal, Decimal]] = {}
+    for i, (aid, dr, cr, key) in enumerate(zip(
+        batch.gl_account_id, batch.debit_amount, batch.credit_amount, batch.split_key,
+    )):
+        g = groups.get(key)
+        if g is None:
+            g = groups[key] = _GroupTotals()
+        g.indices.append(i)
+        g.debit += dr
+        g.credit += cr
+        a_dr, a_cr = per_account.get(aid, (_ZERO, _ZERO))
+        per_account[aid] = (a_dr + dr, a_cr + cr)
+
+    for key, g in groups.items():
+        label = f" ({key})" if key is not None else ""
+        if g.debit != g.credit:
+            raise BalanceError(
+                f"Entry{label} is not balanced: debits={g.debit}, credits={g.credit}"
+            )
+        if g.debit == 0:
+            raise BalanceError(
+                f"Entry{label} has zero total — at least one non-zero line required"
+            )
+    return groups, per_account
+
+
+async def post_line_batch(
+    db: AsyncSession,
+    batch: LineBatch,
+    *,
+    source_type: JournalSourceType,
+    source_reference: str | None = None,
+    description: str,
+    effective_date: date | None = None,
+    currency_code: str = "JMD",
+    exchange_rate: Decimal = Decimal("1.000000"),
+    created_by: int | None = None,
+    metadata: dict | None = None,
+    narrative: str | None = None,
+) -> list[JournalEntry]:
+    """Post a large columnar batch of lines as one POSTED entry per split key.
+
+    Balance and account status are validated once for the whole batch, and
+    lines are written with multi-row INSERTs of :data:`BULK_INSERT_CHUNK`
+    rows instead of one ORM object each.  Entries are returned in the order
+    their split keys first appear; their ``lines`` are not loaded.
+    """
+    if len(batch) < 2:
+        raise JournalEngineError("A journal entry requires at least two lines")
+
+    groups, per_account = _summarize_batch(batch)
+    await _validate_accounts(db, sorted(per_account))
+
+    cur_result = await db.execute(
+        select(Currency).where(Currency.code == currency_code)
+    )
+    currency = cur_result.scalar_one_or_none()
+    if not currency:
+        raise JournalEngineError(f"Currency '{currency_code}' not found")
+
+    today = date.today()
+    eff_date = effective_date or today
+    period = await _find_period_for_date(db, eff_date)
+    if period and period.status in (PeriodStatus.CLOSED, PeriodStatus.LOCKED):
+        raise PeriodClosedError(
+            f"Cannot auto-post: period {period.name} is {period.status.value}"
+        )
+
+    now = datetime.now(timezone.utc)
+    numbers = await reserve_entry_numbers(db, len(groups))
+    entries = []
+    observations = []
+    for entry_number, (key, g) in zip(numbers, groups.items()):
+        entry = JournalEntry(
+            entry_number=entry_number,
+            transaction_date=today,
+            effective_date=eff_date,
+            posting_date=today,
+            accounting_period_id=period.id if period else None,
+            source_type=source_type,
+            source_reference=source_reference,
+            description=description if key is None else f"{description} — {key}",
+            currency_id=currency.id,
+            exchange_rate=exchange_rate,
+            status=JournalEntryStatus.POSTED,
+            created_by=created_by,
+            posted_by=created_by,
+            posted_at=now,
+            metadata_=metadata,
+            narrative=narrative,
+        )
+        db.add(entry)
+        await db.flush()
+
+        for start in range(0, len(g.indices), BULK_INSERT_CHUNK):
+            rows = []
+            for line_number, i in enumerate(g.indices[start:start + BULK_INSERT_CHUNK], start=start + 1):
+                dr = batch.debit_amount[i]
+                cr = batch.credit_amount[i]
+                rows.append({
+                    "journal_entry_id": entry.id,
+                    "line_number": line_number,
+                    "gl_account_id": batch.gl_account_id[i],
+                    "debit_amount": dr,
+                    "credit_amount": cr,
+                    "base_currency_amount": abs((dr - cr) * exchange_rate),
+                    "description": batch.description[i],
+                    "branch": batch.branch[i],
+                    "loan_reference": batch.loan_reference[i],
+                })
+            await db.execute(insert(JournalEntryLine), rows)
+
+        entries.append(entry)
+        observations.append(posting_stats.PostingObservation(
+            entry_id=entry.id,
+            source_type=posting_stats.source_key(source_type),
+            amount=float(g.debit),
+            account_ids=[batch.gl_account_id[i] for i in g.indices],
+        ))
+        logger.info(
+            "Bulk-posted journal entry %s (%d lines, %s)",
+            entry.entry_number, len(g.indices), g.debit,
+        )
+
+    if period:
+        await period_balances.apply_deltas(db, period.id, per_account)
+    await posting_stats.observe(db, observations)
+    return entries
@@ -0,0 +1,259 @@
+"""Maintenance of the ``account_period_balances`` snapshot table.
+
+Each row holds the posted debit/credit totals of one account in one
+accounting period.  The journal engine keeps the rows current as entries
+are posted (+) and reversed (−, the original leaves POSTED status);
+``period_service.close_period`` seals a period by rebuilding its rows from
+the raw lines.  Entries without an accounting period are never
+snapshotted — balance queries read those from the lines directly.
+
+:func:`verify_period_balances` and :func:`rebuild_period_balances` compare
+the table against, and regenerate it from, the journal lines;
+:func:`backfill_period_balances` does the latter once for a database whose
+table was created after entries had already been posted.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import delete, select, update, func as sa_func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gl import (
+    AccountingPeriod,
+    AccountPeriodBalance,
+    JournalEntry,
+    JournalEntryLine,
+    JournalEntryStatus,
+    PeriodStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+_ZERO = Decimal("0")
+
+
+@dataclass
+class BalanceDrift:
+    """A snapshot row that disagrees with the journal lines."""
+    gl_account_id: int
+    accounting_period_id: int
+    stored_debit: Decimal
+    stored_credit: Decimal
+    ledger_debit: Decimal
+    ledger_credit: Decimal
+
+    def to_dict(self) -> dict:
+        return {
+            "gl_account_id": self.gl_account_id,
+            "accounting_period_id": self.accounting_period_id,
+            "stored_debit": float(self.stored_debit),
+            "stored_credit": float(self.stored_credit),
+            "ledger_debit": float(self.ledger_debit),
+            "ledger_credit": float(self.ledger_credit),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Incremental maintenance
+# ---------------------------------------------------------------------------
+
+def entry_deltas(
+    lines: Iterable[JournalEntryLine], sign: int = 1
+) -> dict[int, tuple[Decimal, Decimal]]:
+    """Per-account ``(debit, credit)`` movement of a set of lines, times *sign*."""
+    deltas: dict[int, tuple[Decimal, Decimal]] = {}
+    for ln in lines:
+        dr, cr = deltas.get(ln.gl_account_id, (_ZERO, _ZERO))
+        deltas[ln.gl_account_id] = (
+            dr + sign * Decimal(ln.debit_amount or 0),
+            cr + sign * Decimal(ln.credit_amount or 0),
+        )
+    return deltas
+
+
+async def apply_entry(db: AsyncSession, entry: JournalEntry, *, sign: int = 1) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) an entry's lines from its period's rows.
+
+    A single upsert keyed on (account, period), so concurrent postings to
+    the same account accumulate instead of overwriting each other.
+    """
+    if entry.accounting_period_id is None:
+        return
+    await apply_deltas(db, entry.accounting_period_id, entry_deltas(entry.lines, sign))
+
+
+async def apply_deltas(
+    db: AsyncSession,
+    period_id: int,
+    deltas: dict[int, tuple[Decimal, Decimal]],
+) -> None:
+    """Upsert per-account ``(debit, credit)`` movements into one period's rows."""
+    if not deltas:
+        return
+
+    stmt = pg_insert(AccountPeriodBalance).values([
+        {
+            "gl_account_id": account_id,
+            "accounting_period_id": period_id,
+            "debit_total": dr,
+            "credit_total": cr,
+        }
+        for account_id, (dr, cr) in sorted(deltas.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_account_period_balance",
+        set_={
+            "debit_total": AccountPeriodBalance.debit_total + stmt.excluded.debit_total,
+            "credit_total": AccountPeriodBalance.credit_total + stmt.excluded.credit_total,
+            "updated_at": sa_func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+# ---------------------------------------------------------------------------
+# Rebuild / verify / seal
+# ---------------------------------------------------------------------------
+
+def ledger_totals_query(period_id: int | None = None):
+    """Posted totals grouped by (account, period), straight from the journal lines."""
+    q = (
+        select(
+            JournalEntryLine.gl_account_id.label("gl_account_id"),
+            JournalEntry.accounting_period_id.label("accounting_period_id"),
+            sa_func.sum(JournalEntryLine.debit_amount).label("dr"),
+            sa_func.sum(JournalEntryLine.credit_amount).label("cr"),
+        )
+        .join(JournalEntry, JournalEntryLine.journal_entry_id == JournalEntry.id)
+        .where(
+            JournalEntry.status == JournalEntryStatus.POSTED,
+            JournalEntry.accounting_period_id.is_not(None),
+        )
+        .group_by(JournalEntryLine.gl_account_id, JournalEntry.accounting_period_id)
+    )
+    if period_id:
+        q = q.where(JournalEntry.accounting_period_id == period_id)
+    return q
+
+
+async def rebuild_period_balances(db: AsyncSession, period_id: int | None = None) -> int:
+    """Regenerate snapshot rows from the journal lines.
+
+    Rebuilds one period, or every period when *period_id* is None; rows of
+    closed and locked periods come back sealed.  Returns the number of rows
+    written.
+    """
+    purge = delete(AccountPeriodBalance)
+    if period_id:
+        purge = purge.where(AccountPeriodBalance.accounting_period_id == period_id)
+    await db.execute(purge)
+
+    rows = (await db.execute(ledger_totals_query(period_id))).all()
+    if rows:
+        await db.execute(
+            pg_insert(AccountPeriodBalance).values([
+                {
+                    "gl_account_id": r.gl_account_id,
+                    "accounting_period_id": r.accounting_period_id,
+                    "debit_total": r.dr or _ZERO,
+                    "credit_total": r.cr or _ZERO,
+                }
+                for r in rows
+            ])
+        )
+
+    closed = select(AccountingPeriod.id).where(
+        AccountingPeriod.status.in_([PeriodStatus.CLOSED, PeriodStatus.LOCKED])
+    )
+    if period_id:
+        closed = closed.where(AccountingPeriod.id == period_id)
+    await _mark_sealed(db, closed)
+    await db.flush()
+    logger.info(
+        "Rebuilt %d account period balance rows (period=%s)", len(rows), period_id or "all"
+    )
+    return len(rows)
+
+
+async def backfill_period_balances(db: AsyncSession) -> int:
+    """Rebuild every period's rows if the table is still empty.
+
+    A no-op once any row exists, so it is cheap to call on every startup.
+    """
+    has_rows = (
+        await db.execute(select(AccountPeriodBalance.id).limit(1))
+    ).scalar_one_or_none()
+    if has_rows is not None:
+        return 0
+    return await rebuild_period_balances(db)
+
+
+async def verify_period_balances(
+    db: AsyncSession, period_id: int | None = None
+) -> list[BalanceDrift]:
+    """List every (account, period) whose snapshot differs from the journal lines."""
+    stored_q = select(
+        AccountPeriodBalance.gl_account_id,
+        AccountPeriodBalance.accounting_period_id,
+        AccountPeriodBalance.debit_total,
+        AccountPeriodBalance.credit_total,
+    )
+    if period_id:
+        stored_q = stored_q.where(AccountPeriodBalance.accounting_period_id == period_id)
+
+    stored = {
+        (r.gl_account_id, r.accounting_period_id): (r.debit_total, r.credit_total)
+        for r in (await db.execute(stored_q)).all()
+    }
+    ledger = {
+        (r.gl_account_id, r.accounting_period_id): (r.dr or _ZERO, r.cr or _ZERO)
+        for r in (await db.execute(ledger_totals_query(period_id))).all()
+    }
+    return compare_totals(stored, ledger)
+
+
+def compare_totals(
+    stored: dict[tuple[int, int], tuple[Decimal, Decimal]],
+    ledger: dict[tuple[int, int], tuple[Decimal, Decimal]],
+) -> list[BalanceDrift]:
+    """Diff two ``(account, period) → (dr, cr)`` maps; missing keys count as zero."""
+    drifts = []
+    for key in sorted(stored.keys() | ledger.keys()):
+        s_dr, s_cr = stored.get(key, (_ZERO, _ZERO))
+        l_dr, l_cr = ledger.get(key, (_ZERO, _ZERO))
+        if s_dr != l_dr or s_cr != l_cr:
+            drifts.append(BalanceDrift(key[0], key[1], s_dr, s_cr, l_dr, l_cr))
+    return drifts
+
+
+async def seal_period(db: AsyncSession, period_id: int) -> int:
+    """Rebuild a period's rows from the journal lines and mark them sealed."""
+    count = await rebuild_period_balances(db, period_id)
+    await _mark_sealed(db, [period_id])
+    return count
+
+
+async def unseal_period(db: AsyncSession, period_id: int) -> None:
+    await db.execute(
+        update(AccountPeriodBalance)
+        .where(AccountPeriodBalance.accounting_period_id == period_id)
+        .values(is_sealed=False, sealed_at=None)
+    )
+
+
+async def _mark_sealed(db: AsyncSession, period_ids) -> None:
+    await db.execute(
+        update(AccountPeriodBalance)
+        .where(
+            AccountPeriodBalance.accounting_period_id.in_(period_ids),
+            AccountPeriodBalance.is_sealed.is_(False),
+        )
+        .values(is_sealed=True, sealed_at=datetime.now(timezone.utc))
+    )
@@ -17,14 +17,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.gl import (
     AccountingPeriod,
+    AccountPeriodBalance,
     PeriodStatus,
     GLAccount,
     AccountCategory,
     JournalEntry,
-    JournalEntryLine,
     JournalEntryStatus,
     JournalSourceType,
 )
+from app.services.gl import anomaly_detector, period_balances
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +145,8 @@ async def close_period(
     period.status = PeriodStatus.CLOSED
     period.closed_by = user_id
     period.closed_at = datetime.now(timezone.utc)
+    await period_balances.seal_period(db, period_id)
+    await anomaly_detector.detect_and_store_period(db, period_id)
     await db.flush()
     logger.info("Closed period %s by user %d", period.name, user_id)
     return period
@@ -180,6 +183,7 @@ async def reopen_period(
     period.status = PeriodStatus.OPEN
     period.closed_by = None
     period.closed_at = None
+    await period_balances.unseal_period(db, period_id)
     await db.flush()
     logger.info("Reopened period %s by user %d", period.name, user_id)
     return period
@@ -224,24 +228,23 @@ async def generate_year_end_closing(
     )
     accounts = list(revenue_expense_accounts.scalars().all())
 
+    # Fiscal-year totals come from the per-period balance snapshots
+    totals_result = await db.execute(
+        select(
+            AccountPeriodBalance.gl_account_id,
+            sa_func.sum(AccountPeriodBalance.debit_total).label("dr"),
+            sa_func.sum(AccountPeriodBalance.credit_total).label("cr"),
+        )
+        .where(AccountPeriodBalance.accounting_period_id.in_(period_ids))
+        .group_by(AccountPeriodBalance.gl_account_id)
+    )
+    totals = {row.gl_account_id: (row.dr, row.cr) for row in totals_result.all()}
+
     lines = []
     for acct in accounts:
-        # Sum posted entries for this account in the fiscal year
-        result = await db.execute(
-            select(
-                sa_func.coalesce(sa_func.sum(JournalEntryLine.debit_amount), 0).label("dr"),
-                sa_func.coalesce(sa_func.sum(JournalEntryLine.credit_amount), 0).label("cr"),
-            )
-            .join(JournalEntry, JournalEntryLine.journal_entry_id == JournalEntry.id)
-            .where(
-                JournalEntryLine.gl_account_id == acct.id,
-                JournalEntry.status == JournalEntryStatus.POSTED,
-                JournalEntry.accounting_period_id.in_(period_ids),
-            )
-        )
-        row = result.one()
-        dr = Decimal(str(row.dr or 0))
-        cr = Decimal(str(row.cr or 0))
+        dr, cr = totals.get(acct.id, (0, 0))
+        dr = Decimal(str(dr or 0))
+        cr = Decimal(str(cr or 0))
         net = dr - cr  # positive = debit balance, negative = credit balance
 
         if net == 0:
@@ -0,0 +1,192 @@
+"""Rolling statistics of posted journal entries, for anomaly detection.
+
+Two tables are kept current as entries post:
+
+- ``gl_posting_stats`` — per source type, a Welford running mean and
+  ``m2`` of entry totals.  Observations are merged with the parallel form
+  of Welford's update (one entry is a batch of one) inside a single
+  upsert, so concurrent postings accumulate instead of overwriting.  The
+  sample count is capped at :data:`STATS_WINDOW`; past the cap ``m2`` is
+  rescaled to keep the variance, so the mean and variance track roughly
+  the most recent window of postings.
+- ``gl_account_combinations`` — per source type, the set of account
+  combination signatures seen, with the entry that introduced each.
+
+The anomaly detector reads one row from each instead of re-scanning
+recent entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import case, func as sa_func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gl import (
+    GLAccountCombination,
+    GLPostingStats,
+    JournalEntry,
+    JournalSourceType,
+)
+
+# Effective number of recent postings the statistics describe
+STATS_WINDOW = 100
+
+
+@dataclass
+class RollingStats:
+    """Count, mean and sum of squared deviations of a sample."""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "RollingStats":
+        stats = cls()
+        for x in values:
+            stats.merge(cls(1, float(x), 0.0))
+        return stats
+
+    def merge(self, other: "RollingStats", window: int = STATS_WINDOW) -> None:
+        """Fold *other* in (Chan et al.'s pairwise update), then cap at *window*."""
+        if not other.count:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / n
+        self.m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.cap(window)
+
+    def without(self, x: float) -> "RollingStats":
+        """These statistics with one observation *x* taken back out.
+
+        Exact below the window.  Past it the capped sample is treated as
+        still holding *x*, which is close since *x* is a recent posting.
+        """
+        if self.count <= 1:
+            return RollingStats()
+        n = self.count - 1
+        mean = (self.count * self.mean - x) / n
+        m2 = self.m2 - (x - self.mean) * (x - mean)
+        return RollingStats(n, mean, max(m2, 0.0))
+
+    def cap(self, window: int = STATS_WINDOW) -> None:
+        if self.count > window:
+            self.m2 = self.m2 * (window - 1) / (self.count - 1)
+            self.count = window
+
+    @property
+    def stdev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+
+def source_key(source_type: JournalSourceType | str) -> str:
+    return source_type.value if isinstance(source_type, JournalSourceType) else str(source_type)
+
+
+def account_signature(account_ids: Iterable[int]) -> str:
+    """md5 of the distinct account ids in ascending order (matches the SQL backfill)."""
+    joined = ",".join(str(a) for a in sorted(set(account_ids)))
+    return hashlib.md5(joined.encode()).hexdigest()
+
+
+def stats_merge_set(excluded) -> dict:
+    """``ON CONFLICT DO UPDATE`` assignments mirroring :meth:`RollingStats.merge`."""
+    t = GLPostingStats
+    n = t.sample_count + excluded.sample_count
+    delta = excluded.mean - t.mean
+    m2 = t.m2 + excluded.m2 + delta * delta * t.sample_count * excluded.sample_count / n
+    over = n > STATS_WINDOW
+    return {
+        "mean": t.mean + delta * excluded.sample_count / n,
+        "m2": case((over, m2 * (STATS_WINDOW - 1) / (n - 1)), else_=m2),
+        "sample_count": case((over, STATS_WINDOW), else_=n),
+        "updated_at": sa_func.now(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PostingObservation:
+    """What the statistics need from one posted entry."""
+    entry_id: int
+    source_type: str
+    amount: float
+    account_ids: list[int]
+
+
+def observation_for(entry: JournalEntry) -> PostingObservation:
+    """Observation of an entry whose ``lines`` are loaded."""
+    return PostingObservation(
+        entry_id=entry.id,
+        source_type=source_key(entry.source_type),
+        amount=float(entry.total_debits),
+        account_ids=[ln.gl_account_id for ln in entry.lines],
+    )
+
+
+async def observe_entry(db: AsyncSession, entry: JournalEntry) -> None:
+    await observe(db, [observation_for(entry)])
+
+
+async def observe(db: AsyncSession, observations: list[PostingObservation]) -> None:
+    """Fold posted entries into the statistics: one upsert per table."""
+    if not observations:
+        return
+
+    by_source: dict[str, RollingStats] = {}
+    for ob in observations:
+        by_source.setdefault(ob.source_type, RollingStats()).merge(RollingStats(1, ob.amount, 0.0))
+    stmt = pg_insert(GLPostingStats).values([
+        {"source_type": src, "sample_count": s.count, "mean": s.mean, "m2": s.m2}
+        for src, s in sorted(by_source.items())
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[GLPostingStats.source_type],
+        set_=stats_merge_set(stmt.excluded),
+    ))
+
+    combos: dict[tuple[str, str], tuple[int, int]] = {}
+    for ob in observations:
+        if not ob.account_ids:
+            continue
+        key = (ob.source_type, account_signature(ob.account_ids))
+        # Observations arrive in posting order, so the first one introduced it
+        first, seen = combos.get(key, (ob.entry_id, 0))
+        combos[key] = (first, seen + 1)
+    if not combos:
+        return
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(GLAccountCombination).values([
+        {
+            "source_type": src,
+            "signature": sig,
+            "first_entry_id": first,
+            "seen_count": seen,
+            "last_seen_at": now,
+        }
+        for (src, sig), (first, seen) in sorted(combos.items())
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[GLAccountCombination.source_type, GLAccountCombination.signature],
+        set_={
+            "first_entry_id": sa_func.least(
+                GLAccountCombination.first_entry_id, stmt.excluded.first_entry_id
+            ),
+            "seen_count": GLAccountCombination.seen_count + stmt.excluded.seen_count,
+            "last_seen_at": stmt.excluded.last_seen_at,
+        },
+    ))
+
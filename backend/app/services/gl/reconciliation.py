@@ -21,7 +21,7 @@ from app.models.gl import (
     GLAccount,
     AccountStatus,
 )
-from app.services.gl.coa_service import get_account_balance, get_account_by_code
+from app.services.gl.balance_engine import load_balances
 
 logger = logging.getLogger(__name__)
 
@@ -37,28 +37,21 @@ async def reconcile_control_account(
     Returns the reconciliation result with any discrepancies and
     suggested corrective entries.
     """
-    control = await get_account_by_code(db, control_code)
+    ledger = await load_balances(db, period_id=period_id)
+    control = ledger.get_by_code(control_code)
     if not control:
         return {"error": f"Control account {control_code} not found"}
 
     # Control balance aggregates all descendants (children, grandchildren, …)
-    control_bal = await get_account_balance(
-        db, control.id, period_id=period_id, include_children=True,
-    )
-
-    # Get direct children for the subsidiary breakdown
-    children = await db.execute(
-        select(GLAccount)
-        .where(GLAccount.parent_id == control.id, GLAccount.status != AccountStatus.CLOSED)
-        .order_by(GLAccount.account_code)
-    )
+    control_bal = ledger.balance(control.id, include_children=True)
 
+    # Direct children for the subsidiary breakdown
     subsidiary_total = 0.0
     subsidiaries = []
-    for child in children.scalars().all():
-        bal = await get_account_balance(
-            db, child.id, period_id=period_id, include_children=True,
-        )
+    for child in ledger.children_of(control.id):
+        if child.status == AccountStatus.CLOSED:
+            continue
+        bal = ledger.balance(child.id, include_children=True)
         subsidiary_total += bal["balance"]
         subsidiaries.append({
             "account_code": child.account_code,
@@ -86,7 +79,7 @@ async def reconcile_control_account(
     # Suggest corrective entry if unreconciled
     suggested_entry = None
     if not is_reconciled:
-        suspense = await get_account_by_code(db, "1-9000")
+        suspense = ledger.get_by_code("1-9000")
         if suspense:
             if difference > 0:
                 suggested_entry = {
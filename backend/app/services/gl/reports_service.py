@@ -24,7 +24,7 @@ from app.models.gl import (
     AccountingPeriod,
     GLAccountAudit,
 )
-from app.services.gl.coa_service import get_account_balance
+from app.services.gl.balance_engine import load_balances
 
 logger = logging.getLogger(__name__)
 
@@ -98,14 +98,12 @@ async def trial_balance_report(
     level: int = 3,
 ) -> list[dict]:
     """Trial balance with optional comparative period."""
-    accounts = await db.execute(
-        select(GLAccount)
-        .where(GLAccount.level <= level, GLAccount.status != AccountStatus.CLOSED)
-        .order_by(GLAccount.account_code)
-    )
+    ledger = await load_balances(db, as_of_date=as_of_date, period_id=period_id)
     rows = []
-    for acct in accounts.scalars().all():
-        bal = await get_account_balance(db, acct.id, as_of_date=as_of_date, period_id=period_id)
+    for acct in ledger.accounts:
+        if acct.level > level or acct.status == AccountStatus.CLOSED:
+            continue
+        bal = ledger.balance(acct.id)
         balance = bal["balance"]
         if balance == 0:
             continue
@@ -224,19 +222,14 @@ async def subsidiary_ledger_report(
 ) -> list[dict]:
     """Subsidiary breakdown under a control account (e.g. Loan Portfolio)."""
     # Get control account's children
-    parent = await db.execute(
-        select(GLAccount).where(GLAccount.account_code == control_account_code)
-    )
-    parent_acct = parent.scalar_one_or_none()
+    ledger = await load_balances(db, period_id=period_id)
+    parent_acct = ledger.get_by_code(control_account_code)
     if not parent_acct:
         return []
 
-    children = await db.execute(
-        select(GLAccount).where(GLAccount.parent_id == parent_acct.id).order_by(GLAccount.account_code)
-    )
     rows = []
-    for child in children.scalars().all():
-        bal = await get_account_balance(db, child.id, period_id=period_id)
+    for child in ledger.children_of(parent_acct.id):
+        bal = ledger.balance(child.id)
         rows.append({
             "account_code": child.account_code,
             "account_name": child.name,
@@ -264,14 +257,12 @@ async def loan_portfolio_summary(
         "interest_receivable": "1-3001",
         "allowance": "2-2000",
     }
+    ledger = await load_balances(db, period_id=period_id)
     summary = {}
     for label, code in key_codes.items():
-        acct = await db.execute(select(GLAccount).where(GLAccount.account_code == code))
-        acct_obj = acct.scalar_one_or_none()
+        acct_obj = ledger.get_by_code(code)
         if acct_obj:
-            bal = await get_account_balance(
-                db, acct_obj.id, period_id=period_id, include_children=True,
-            )
+            bal = ledger.balance(acct_obj.id, include_children=True)
             summary[label] = bal["balance"]
         else:
             summary[label] = 0
@@ -358,12 +349,12 @@ async def suspense_aging_report(
     db: AsyncSession,
 ) -> list[dict]:
     """Items in suspense accounts with aging."""
-    suspense = await db.execute(
-        select(GLAccount).where(GLAccount.account_code.like("%-9%")).order_by(GLAccount.account_code)
-    )
+    ledger = await load_balances(db)
     rows = []
-    for acct in suspense.scalars().all():
-        bal = await get_account_balance(db, acct.id)
+    for acct in ledger.accounts:
+        if "-9" not in acct.account_code:
+            continue
+        bal = ledger.balance(acct.id)
         if bal["balance"] != 0:
             rows.append({
                 "account_code": acct.account_code,
@@ -411,27 +402,18 @@ async def reconciliation_report(
 ) -> dict:
     """Compare control account balance with subsidiary totals."""
     # Control account balance
-    ctrl = await db.execute(
-        select(GLAccount).where(GLAccount.account_code == control_account_code)
-    )
-    ctrl_acct = ctrl.scalar_one_or_none()
+    ledger = await load_balances(db, period_id=period_id)
+    ctrl_acct = ledger.get_by_code(control_account_code)
     if not ctrl_acct:
         return {"error": f"Account {control_account_code} not found"}
 
-    ctrl_bal = await get_account_balance(
-        db, ctrl_acct.id, period_id=period_id, include_children=True,
-    )
+    ctrl_bal = ledger.balance(ctrl_acct.id, include_children=True)
 
     # Sum of subsidiaries
-    children = await db.execute(
-        select(GLAccount).where(GLAccount.parent_id == ctrl_acct.id)
-    )
     sub_total = 0.0
     sub_details = []
-    for child in children.scalars().all():
-        bal = await get_account_balance(
-            db, child.id, period_id=period_id, include_children=True,
-        )
+    for child in ledger.children_of(ctrl_acct.id):
+        bal = ledger.balance(child.id, include_children=True)
         sub_total += bal["balance"]
         sub_details.append({
             "account_code": child.account_code,
@@ -460,17 +442,15 @@ async def financial_statements_report(
     period_id: int | None = None,
 ) -> dict:
     """Combined balance sheet and income statement."""
+    ledger = await load_balances(db, period_id=period_id)
     categories = {}
     for cat in AccountCategory:
-        accounts = await db.execute(
-            select(GLAccount)
-            .where(GLAccount.account_category == cat, GLAccount.status != AccountStatus.CLOSED)
-            .order_by(GLAccount.account_code)
-        )
         items = []
         total = 0.0
-        for acct in accounts.scalars().all():
-            bal = await get_account_balance(db, acct.id, period_id=period_id)
+        for acct in ledger.accounts:
+            if acct.account_category != cat or acct.status == AccountStatus.CLOSED:
+                continue
+            bal = ledger.balance(acct.id)
             if bal["balance"] == 0:
                 continue
             items.append({
@@ -574,3 +554,32 @@ REPORT_REGISTRY = {
         "fn": financial_statements_report,
     },
 }
+
+
+async def run_report(
+    db: AsyncSession,
+    report_type: str,
+    *,
+    period_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    account_id: int | None = None,
+):
+    """Run a registered report with whichever of the filters it accepts."""
+    fn = REPORT_REGISTRY[report_type]["fn"]
+
+    kwargs: dict = {}
+    if period_id:
+        kwargs["period_id"] = period_id
+    if date_from:
+        kwargs["date_from"] = date_from
+    if date_to:
+        kwargs["date_to"] = date_to
+    if account_id and report_type == "account_activity":
+        kwargs["account_id"] = account_id
+
+    try:
+        return await fn(db, **kwargs)
+    except TypeError:
+        # Function doesn't accept some kwargs — retry with just db
+        return await fn(db)
@@ -0,0 +1,259 @@
+"""Loan servicing snapshots — per-loan balance, arrears and next-due figures.
+
+One ``loan_servicing_snapshots`` row per loan, derived from its payment
+schedule, completed repayments and latest decision.  Rows are rebuilt
+set-based (one ``INSERT … SELECT … ON CONFLICT``) for:
+
+- a single loan after a payment is applied or the loan is disbursed;
+- every disbursed loan whose row is missing or older than today, by the
+  nightly aging pass and at the start of each collections case sync.
+
+The loan book, the dashboard arrears summary and collections read these
+rows instead of re-deriving the figures from raw schedules.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy import and_, case, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Date
+
+from app.models.decision import Decision
+from app.models.loan import LoanApplication, LoanStatus
+from app.models.payment import (
+    LoanServicingSnapshot,
+    Payment,
+    PaymentSchedule,
+    PaymentStatus,
+    PaymentType,
+    ScheduleStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+CURRENT = "current"
+
+# (bucket, min DPD, max DPD, snapshot column holding the bucket's overdue amount)
+ARREARS_BUCKETS: tuple[tuple[str, int, int | None, str], ...] = (
+    ("1-30", 1, 30, "overdue_1_30"),
+    ("31-60", 31, 60, "overdue_31_60"),
+    ("61-90", 61, 90, "overdue_61_90"),
+    ("90+", 91, None, "overdue_90_plus"),
+)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Pure helpers
+# ────────────────────────────────────────────────────────────────────
+
+def days_past_due(oldest_unpaid_due_date: date | None, today: date) -> int:
+    """DPD on *today* given the due date of the oldest unpaid instalment.
+
+    Exact for any day after the snapshot was taken, as long as no payment
+    has been applied since (which refreshes the row).
+    """
+    if oldest_unpaid_due_date is None or oldest_unpaid_due_date >= today:
+        return 0
+    return (today - oldest_unpaid_due_date).days
+
+
+def arrears_bucket(dpd: int) -> str:
+    """Bucket label for a DPD figure: ``current``, ``1-30`` … ``90+``."""
+    for label, lo, hi, _ in ARREARS_BUCKETS:
+        if dpd >= lo and (hi is None or dpd <= hi):
+            return label
+    return CURRENT
+
+
+# ────────────────────────────────────────────────────────────────────
+# Snapshot query
+# ────────────────────────────────────────────────────────────────────
+
+def _schedule_rollup(as_of: date, loan_ids):
+    """Per-loan aggregates over the payment schedule, as of *as_of*."""
+    ps = PaymentSchedule
+    open_ = ps.status != ScheduleStatus.PAID
+    owed = ps.amount_due - ps.amount_paid
+    unpaid = and_(open_, ps.amount_paid < ps.amount_due)
+    past_due = and_(unpaid, ps.due_date < as_of)
+    # Repayments settle fees, then interest, then principal
+    non_principal_owed = owed - ps.principal
+    fee_owed = non_principal_owed - ps.interest
+
+    def _sum(condition, value):
+        return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+    def _bucket(lo: int, hi: int | None):
+        cond = and_(past_due, ps.due_date <= as_of - timedelta(days=lo))
+        if hi is not None:
+            cond = and_(cond, ps.due_date >= as_of - timedelta(days=hi))
+        return cond
+
+    columns = [
+        ps.loan_application_id.label("loan_application_id"),
+        func.coalesce(func.sum(ps.amount_paid), 0).label("total_paid"),
+        _sum(and_(open_, owed > 0), case((owed < ps.principal, owed), else_=ps.principal))
+        .label("outstanding_principal"),
+        _sum(
+            and_(open_, non_principal_owed > 0),
+            case((non_principal_owed < ps.interest, non_principal_owed), else_=ps.interest),
+        ).label("outstanding_interest"),
+        _sum(and_(open_, fee_owed > 0), case((fee_owed < ps.fee, fee_owed), else_=ps.fee))
+        .label("outstanding_fees"),
+        _sum(past_due, owed).label("overdue_amount"),
+        *(_sum(_bucket(lo, hi), owed).label(col) for _, lo, hi, col in ARREARS_BUCKETS),
+        func.min(case((unpaid, ps.due_date))).label("oldest_unpaid_due_date"),
+        func.min(case((and_(open_, ps.due_date >= as_of), ps.due_date))).label("next_due_date"),
+        _sum(ps.status == ScheduleStatus.PAID, ps.interest).label("interest_collected"),
+    ]
+    q = select(*columns).group_by(ps.loan_application_id)
+    if loan_ids is not None:
+        q = q.where(ps.loan_application_id.in_(loan_ids))
+    return q.subquery("schedule_rollup")
+
+
+def snapshot_query(as_of: date, loan_ids=None):
+    """SELECT producing one snapshot row per loan with a payment schedule.
+
+    *loan_ids* (a list or an id-selecting subquery) restricts the loans;
+    without it every disbursed loan is covered.
+    """
+    roll = _schedule_rollup(as_of, loan_ids)
+    loan_id = LoanApplication.id
+    principal = func.coalesce(LoanApplication.amount_approved, LoanApplication.amount_requested)
+    oldest = roll.c.oldest_unpaid_due_date
+
+    latest_decision = (
+        select(Decision)
+        .where(Decision.loan_application_id == loan_id)
+        .order_by(Decision.created_at.desc(), Decision.id.desc())
+        .limit(1)
+    )
+    last_payment = (
+        select(Payment)
+        .where(
+            Payment.loan_application_id == loan_id,
+            Payment.status == PaymentStatus.COMPLETED,
+            Payment.payment_type != PaymentType.DISBURSEMENT,
+        )
+        .order_by(Payment.payment_date.desc(), Payment.id.desc())
+        .limit(1)
+    )
+    next_due_amount = (
+        select(func.sum(PaymentSchedule.amount_due - PaymentSchedule.amount_paid))
+        .where(
+            PaymentSchedule.loan_application_id == loan_id,
+            PaymentSchedule.status != ScheduleStatus.PAID,
+            PaymentSchedule.due_date == roll.c.next_due_date,
+        )
+        .scalar_subquery()
+    )
+
+    bucket_whens = [
+        (oldest >= as_of - timedelta(days=hi), label)
+        for label, _, hi, _ in ARREARS_BUCKETS if hi is not None
+    ]
+    as_of_lit = literal(as_of, Date)
+
+    q = (
+        select(
+            loan_id.label("loan_application_id"),
+            principal.label("principal_amount"),
+            roll.c.total_paid,
+            (principal - roll.c.total_paid).label("outstanding_balance"),
+            roll.c.outstanding_principal,
+            roll.c.outstanding_interest,
+            roll.c.outstanding_fees,
+            roll.c.overdue_amount,
+            *(roll.c[col] for *_, col in ARREARS_BUCKETS),
+            oldest.label("oldest_unpaid_due_date"),
+            case((oldest < as_of, as_of_lit - oldest), else_=0).label("days_past_due"),
+            case(
+                (or_(oldest.is_(None), oldest >= as_of), CURRENT),
+                *bucket_whens,
+                else_=ARREARS_BUCKETS[-1][0],
+            ).label("arrears_bucket"),
+            roll.c.next_due_date,
+            next_due_amount.label("next_due_amount"),
+            last_payment.with_only_columns(Payment.payment_date).scalar_subquery()
+            .label("last_payment_date"),
+            last_payment.with_only_columns(Payment.amount).scalar_subquery()
+            .label("last_payment_amount"),
+            roll.c.interest_collected,
+            latest_decision.with_only_columns(Decision.risk_band).scalar_subquery()
+            .label("risk_band"),
+            latest_decision.with_only_columns(Decision.credit_score).scalar_subquery()
+            .label("credit_score"),
+            as_of_lit.label("as_of_date"),
+        )
+        .join(roll, roll.c.loan_application_id == loan_id)
+    )
+    if loan_ids is None:
+        q = q.where(LoanApplication.status == LoanStatus.DISBURSED)
+    return q
+
+
+# ────────────────────────────────────────────────────────────────────
+# Refresh
+# ────────────────────────────────────────────────────────────────────
+
+async def refresh_snapshots(db: AsyncSession, loan_ids=None, *, as_of: date | None = None) -> int:
+    """Upsert snapshot rows for *loan_ids* (or every disbursed loan).
+
+    Pending ORM changes are flushed first, so callers can refresh straight
+    after mutating schedules.  Returns the number of rows written.
+    """
+    if isinstance(loan_ids, (list, tuple, set)):
+        loan_ids = list(loan_ids)
+        if not loan_ids:
+            return 0
+
+    await db.flush()
+    query = snapshot_query(as_of or date.today(), loan_ids)
+    names = [c.name for c in query.selected_columns]
+    stmt = pg_insert(LoanServicingSnapshot).from_select(names, query)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LoanServicingSnapshot.loan_application_id],
+        set_={
+            **{n: stmt.excluded[n] for n in names if n != "loan_application_id"},
+            "updated_at": func.now(),
+        },
+    )
+    result = await db.execute(stmt)
+    return result.rowcount or 0
+
+
+async def refresh_loan_snapshot(db: AsyncSession, loan_id: int) -> None:
+    """Refresh one loan's row after its schedule or payments changed."""
+    await refresh_snapshots(db, [loan_id])
+
+
+async def age_snapshots(db: AsyncSession, as_of: date | None = None) -> int:
+    """Rebuild rows of disbursed loans that are missing or older than *as_of*.
+
+    A no-op once the day's aging pass has run, so it is cheap to call ahead
+    of any job that needs current DPD figures.
+    """
+    as_of = as_of or date.today()
+    stale = (
+        select(LoanApplication.id)
+        .outerjoin(
+            LoanServicingSnapshot,
+            LoanServicingSnapshot.loan_application_id == LoanApplication.id,
+        )
+        .where(
+            LoanApplication.status == LoanStatus.DISBURSED,
+            or_(
+                LoanServicingSnapshot.as_of_date.is_(None),
+                LoanServicingSnapshot.as_of_date < as_of,
+            ),
+        )
+    )
+    count = await refresh_snapshots(db, stale, as_of=as_of)
+    if count:
+        logger.info("Aged %d loan servicing snapshots to %s", count, as_of)
+    return count
@@ -0,0 +1,155 @@
+"""Short-lived shared cache for dashboard aggregates.
+
+Dashboards wrap their loader in :func:`cached` with a key and a TTL of a few
+seconds.  Values are stored in Redis as JSON, so every API worker shares one
+computation per TTL window, and are also held in-process until the Redis
+copy expires so repeat hits skip even the Redis round trip.
+
+Stampede protection works at both levels.  Inside a process, concurrent
+misses for a key wait on one ``asyncio.Lock``.  Across processes, the first
+worker to miss takes a short Redis lock (``SET NX PX``) and recomputes while
+the others poll for the fresh value instead of all running the same
+aggregate queries.  If Redis is unreachable the cache degrades to
+per-process and retries Redis after :data:`REDIS_RETRY_AFTER` seconds.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# TTL shared by the staff landing-page dashboards
+DASHBOARD_TTL = 30.0
+
+KEY_PREFIX = "zotta:metrics:"
+# How long a recomputing worker holds the lock, and how long others wait for it
+LOCK_TIMEOUT_MS = 10_000
+WAIT_TIMEOUT = 5.0
+WAIT_INTERVAL = 0.05
+# Seconds to stop trying Redis after a connection failure
+REDIS_RETRY_AFTER = 30.0
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    value: Any
+
+
+_local: dict[str, _Entry] = {}
+_locks: dict[str, asyncio.Lock] = {}
+_client: aioredis.Redis | None = None
+_redis_down_until = 0.0
+
+
+def _redis() -> aioredis.Redis | None:
+    global _client
+    if time.monotonic() < _redis_down_until:
+        return None
+    if _client is None:
+        _client = aioredis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=0.25,
+            socket_timeout=0.25,
+        )
+    return _client
+
+
+def _mark_down(error: Exception) -> None:
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+    logger.warning("Metrics cache: Redis unavailable (%s); using per-process cache", error)
+
+
+def clear_local() -> None:
+    """Drop this process's copies (tests, or after a bulk data change)."""
+    _local.clear()
+    _locks.clear()
+
+
+async def _recompute(
+    client: aioredis.Redis, redis_key: str, ttl: float, loader: Callable[[], Awaitable[Any]],
+) -> tuple[Any, float]:
+    lock_key = f"{redis_key}:lock"
+    token = uuid.uuid4().hex
+    try:
+        leader = await client.set(lock_key, token, nx=True, px=LOCK_TIMEOUT_MS)
+        if not leader:
+            # Another worker is computing it — wait for its result
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(WAIT_INTERVAL)
+                raw = await client.get(redis_key)
+                if raw is not None:
+                    return json.loads(raw), ttl
+    except RedisError as e:
+        _mark_down(e)
+        return await loader(), ttl
+
+    try:
+        value = await loader()
+        try:
+            await client.set(redis_key, json.dumps(value, default=str), px=int(ttl * 1000))
+        except RedisError as e:
+            _mark_down(e)
+    finally:
+        if leader:
+            try:
+                await client.eval(_RELEASE_LOCK, 1, lock_key, token)
+            except RedisError:
+                pass
+    return value, ttl
+
+
+async def _fetch(key: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> tuple[Any, float]:
+    """Return (value, seconds it stays fresh) from Redis, recomputing on a miss."""
+    client = _redis()
+    if client is None:
+        return await loader(), ttl
+    redis_key = f"{KEY_PREFIX}{key}"
+    try:
+        raw, pttl = await client.pipeline(transaction=False).get(redis_key).pttl(redis_key).execute()
+    except RedisError as e:
+        _mark_down(e)
+        return await loader(), ttl
+    if raw is not None:
+        return json.loads(raw), max(pttl, 0) / 1000
+    return await _recompute(client, redis_key, ttl, loader)
+
+
+async def cached(key: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Return the cached value for *key*, computing it with *loader* at most once per TTL.
+
+    *loader* must return JSON-serialisable data; callers should treat the
+    result as read-only since it is shared.
+    """
+    entry = _local.get(key)
+    if entry and entry.expires_at > time.monotonic():
+        return entry.value
+    lock = _locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        entry = _local.get(key)
+        if entry and entry.expires_at > time.monotonic():
+            return entry.value
+        value, fresh_for = await _fetch(key, ttl, loader)
+        _local[key] = _Entry(time.monotonic() + fresh_for, value)
+        return value
@@ -0,0 +1,283 @@
+"""Cached RBAC permission resolution.
+
+``require_permission`` runs on every guarded request.  Resolving it from
+the tables costs a role-assignment query, one query per level of role
+inheritance and a permission join.  Instead, each process holds:
+
+* a snapshot of every role's *effective* permission codes — its own plus
+  everything inherited through ``parent_role_id`` — loaded with two
+  queries and closed over the hierarchy in Python;
+* each user's assigned role ids, loaded on first use.
+
+so a permission check in steady state costs no queries at all.
+
+Both are tagged with a version stamp kept in Redis.  RBAC writes call
+:func:`invalidate_on_commit`; once the transaction commits, the version is
+bumped and published on :data:`CHANNEL`, and every worker's listener drops
+its copy when the published version differs from the one it loaded.  If
+Redis is unreachable the cache still works per process but only trusts a
+snapshot for :data:`UNSUBSCRIBED_MAX_AGE` seconds, which bounds how long
+another worker can act on stale permissions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.rbac import Permission, Role, RolePermission, UserRoleAssignment
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "zotta:rbac:invalidate"
+VERSION_KEY = "zotta:rbac:version"
+# Reload at least this often even when no invalidation arrives
+MAX_AGE = 600.0
+# ...and much sooner while the invalidation listener is not connected
+UNSUBSCRIBED_MAX_AGE = 15.0
+# Seconds between attempts to (re)subscribe after a Redis failure
+RESUBSCRIBE_AFTER = 5.0
+# Cached user -> roles entries before the map is simply cleared
+MAX_CACHED_USERS = 10_000
+
+_DIRTY = "rbac_cache_dirty"
+
+
+@dataclass
+class _Snapshot:
+    version: Optional[int]
+    loaded_at: float
+    role_permissions: dict[int, frozenset[str]]
+
+
+_snapshot: Optional[_Snapshot] = None
+_user_roles: dict[int, frozenset[int]] = {}
+# Bumped on every local drop so a load that raced an invalidation is discarded
+_generation = 0
+_listener: Optional[asyncio.Task] = None
+_listening = False
+_background: set[asyncio.Task] = set()
+_command_client: Optional[aioredis.Redis] = None
+
+
+# ────────────────────────────────────────────────────────────────────
+# Resolution
+# ────────────────────────────────────────────────────────────────────
+
+def effective_permissions(
+    parents: dict[int, Optional[int]], direct: dict[int, set[str]],
+) -> dict[int, frozenset[str]]:
+    """Close each role's permission codes over its ancestor chain."""
+    resolved: dict[int, frozenset[str]] = {}
+    for role_id in parents:
+        codes: set[str] = set()
+        seen: set[int] = set()
+        current: Optional[int] = role_id
+        # Guard against parent cycles left by bad data
+        while current is not None and current not in seen:
+            seen.add(current)
+            codes |= direct.get(current, set())
+            current = parents.get(current)
+        resolved[role_id] = frozenset(codes)
+    return resolved
+
+
+async def _load_snapshot(db: AsyncSession, version: Optional[int]) -> _Snapshot:
+    parents = dict((await db.execute(select(Role.id, Role.parent_role_id))).all())
+    direct: dict[int, set[str]] = {}
+    rows = await db.execute(
+        select(RolePermission.role_id, Permission.code)
+        .join(Permission, Permission.id == RolePermission.permission_id)
+    )
+    for role_id, code in rows.all():
+        direct.setdefault(role_id, set()).add(code)
+    return _Snapshot(version, time.monotonic(), effective_permissions(parents, direct))
+
+
+def _is_fresh(snapshot: Optional[_Snapshot]) -> bool:
+    if snapshot is None:
+        return False
+    max_age = MAX_AGE if _listening else UNSUBSCRIBED_MAX_AGE
+    return time.monotonic() - snapshot.loaded_at < max_age
+
+
+async def _role_permissions(db: AsyncSession) -> dict[int, frozenset[str]]:
+    global _snapshot
+    _ensure_listener()
+    if not _is_fresh(_snapshot):
+        generation = _generation
+        snapshot = await _load_snapshot(db, await _current_version())
+        if generation != _generation:
+            # Invalidated while loading; use it for this request only
+            return snapshot.role_permissions
+        _snapshot = snapshot
+        # Assignments age out with the snapshot
+        _user_roles.clear()
+    return _snapshot.role_permissions
+
+
+async def _roles_for(db: AsyncSession, user_id: int) -> frozenset[int]:
+    roles = _user_roles.get(user_id)
+    if roles is None:
+        generation = _generation
+        result = await db.execute(
+            select(UserRoleAssignment.role_id).where(UserRoleAssignment.user_id == user_id)
+        )
+        roles = frozenset(result.scalars().all())
+        if generation == _generation:
+            if len(_user_roles) >= MAX_CACHED_USERS:
+                _user_roles.clear()
+            _user_roles[user_id] = roles
+    return roles
+
+
+async def user_permissions(db: AsyncSession, user_id: int) -> frozenset[str]:
+    """All permission codes granted to *user_id* through their roles."""
+    role_permissions = await _role_permissions(db)
+    codes: set[str] = set()
+    for role_id in await _roles_for(db, user_id):
+        codes |= role_permissions.get(role_id, frozenset())
+    return frozenset(codes)
+
+
+async def has_any_permission(db: AsyncSession, user_id: int, codes: Iterable[str]) -> bool:
+    granted = await user_permissions(db, user_id)
+    return any(code in granted for code in codes)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Invalidation
+# ────────────────────────────────────────────────────────────────────
+
+def drop_local() -> None:
+    """Forget this process's snapshot and user-role map."""
+    global _snapshot, _generation
+    _snapshot = None
+    _user_roles.clear()
+    _generation += 1
+
+
+def invalidate_on_commit(db: AsyncSession) -> None:
+    """Mark *db*'s transaction as changing roles, permissions or assignments.
+
+    The cache is dropped everywhere once it commits — not before, or another
+    worker could reload the old rows in between.
+    """
+    db.info[_DIRTY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY, False):
+        drop_local()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(_publish())
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session: Session, previous_transaction) -> None:
+    # Fires even when nothing reached the database; savepoints keep the mark
+    if previous_transaction.parent is None:
+        session.info.pop(_DIRTY, None)
+
+
+def _redis() -> aioredis.Redis:
+    global _command_client
+    if _command_client is None:
+        _command_client = aioredis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=0.25,
+            socket_timeout=0.25,
+        )
+    return _command_client
+
+
+async def _current_version() -> Optional[int]:
+    if not _listening:
+        return None
+    try:
+        return int(await _redis().get(VERSION_KEY) or 0)
+    except (RedisError, OSError):
+        return None
+
+
+async def _publish() -> None:
+    try:
+        version = await _redis().incr(VERSION_KEY)
+        await _redis().publish(CHANNEL, version)
+    except (RedisError, OSError) as e:
+        logger.warning(
+            "Permission cache: could not publish invalidation (%s); other workers "
+            "refresh within %.0fs", e, UNSUBSCRIBED_MAX_AGE,
+        )
+
+
+def _on_message(data) -> None:
+    snapshot = _snapshot
+    # Our own publish arrives here too; skip it if we already loaded that version
+    if snapshot is None or snapshot.version is None or str(snapshot.version) != str(data):
+        drop_local()
+
+
+def _ensure_listener() -> None:
+    global _listener
+    loop = asyncio.get_running_loop()
+    if _listener is None or _listener.done() or _listener.get_loop() is not loop:
+        _listener = loop.create_task(_listen())
+
+
+async def _listen() -> None:
+    global _listening
+    while True:
+        # No socket_timeout: the subscription sits idle between messages
+        client = aioredis.from_url(
+            settings.redis_url, decode_responses=True, socket_connect_timeout=0.25,
+        )
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(CHANNEL)
+            _listening = True
+            # Anything published while we weren't subscribed was missed
+            drop_local()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _on_message(message["data"])
+        except (RedisError, OSError) as e:
+            if _listening:
+                logger.warning("Permission cache: invalidation listener lost (%s)", e)
+        finally:
+            _listening = False
+            try:
+                await pubsub.aclose()
+                await client.aclose()
+            except Exception:
+                pass
+        await asyncio.sleep(RESUBSCRIBE_AFTER)
+
+
+async def stop() -> None:
+    """Cancel the invalidation listener (app shutdown)."""
+    global _listener
+    task, _listener = _listener, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
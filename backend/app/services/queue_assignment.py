@@ -8,16 +8,18 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import Integer, insert, select, func, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.queue import (
     QueueConfig, QueueEntry, QueueEntryStatus, QueueEvent,
     StaffQueueProfile, AssignmentMode,
 )
-from app.models.loan import LoanApplication
+from app.models.loan import ApplicantProfile, LoanApplication
 from app.models.user import User, UserRole
 from app.config import settings
+from app.services.bulk_sql import chunks, values_table
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,9 @@ DEFAULT_ASSIGNMENT_WEIGHTS = {
     "continuity": 0.10,
 }
 
+# Most entries placed per auto-assign run
+AUTO_ASSIGN_BATCH = 5000
+
 
 def _get_assignment_weights(config: QueueConfig | None) -> dict:
     if config and config.ai_config and "assignment_weights" in config.ai_config:
@@ -43,15 +48,24 @@ def _score_staff_for_entry(
     application: LoanApplication,
     weights: dict,
     config: QueueConfig | None,
+    *,
+    current_load: int | None = None,
+    employer_sector: str | None = None,
 ) -> tuple[float, dict[str, Any]]:
-    """Score how well a staff member fits a particular entry."""
+    """Score how well a staff member fits a particular entry.
+
+    *current_load* overrides ``profile.current_load_count`` for batch runs
+    that track loads in memory; *employer_sector* is the applicant's sector.
+    """
     factors: dict[str, Any] = {}
+    if current_load is None:
+        current_load = profile.current_load_count
 
     # 1. Workload: lower is better
-    load_ratio = profile.current_load_count / max(1, profile.max_concurrent)
+    load_ratio = current_load / max(1, profile.max_concurrent)
     workload_score = max(0.0, 1.0 - load_ratio)
     factors["workload"] = {
-        "current": profile.current_load_count,
+        "current": current_load,
         "max": profile.max_concurrent,
         "score": round(workload_score, 3),
     }
@@ -72,12 +86,10 @@ def _score_staff_for_entry(
             if application.purpose.value in product_types:
                 matches += 1
 
-        if sectors and hasattr(application, "applicant") and application.applicant:
-            ap = getattr(application.applicant, "applicant_profile", None)
-            if ap and getattr(ap, "employer_sector", None):
-                checks += 1
-                if ap.employer_sector in sectors:
-                    matches += 1
+        if sectors and employer_sector:
+            checks += 1
+            if employer_sector in sectors:
+                matches += 1
 
         if complexity:
             checks += 1
@@ -132,28 +144,9 @@ def _score_staff_for_entry(
     return (round(total, 4), factors)
 
 
-async def suggest_assignment(
-    entry: QueueEntry,
-    db: AsyncSession,
-    config: QueueConfig | None = None,
-) -> tuple[int | None, str]:
-    """Suggest the best staff member for an entry. Returns (user_id, explanation)."""
-    if not config:
-        cfg_result = await db.execute(select(QueueConfig).limit(1))
-        config = cfg_result.scalar_one_or_none()
-
-    weights = _get_assignment_weights(config)
-
-    # Load application
-    app_result = await db.execute(
-        select(LoanApplication).where(LoanApplication.id == entry.application_id)
-    )
-    application = app_result.scalar_one_or_none()
-    if not application:
-        return None, "Application not found"
-
-    # Load available staff profiles
-    profiles_result = await db.execute(
+async def _load_roster(db: AsyncSession) -> list[tuple[StaffQueueProfile, User]]:
+    """Available, active underwriting staff with their queue profiles."""
+    result = await db.execute(
         select(StaffQueueProfile, User)
         .join(User, StaffQueueProfile.user_id == User.id)
         .where(
@@ -161,24 +154,37 @@ async def suggest_assignment(
             User.is_active == True,
             User.role.in_([UserRole.JUNIOR_UNDERWRITER, UserRole.SENIOR_UNDERWRITER, UserRole.ADMIN]),
         )
+        .order_by(StaffQueueProfile.user_id)
     )
+    return list(result.all())
 
+
+def _pick_staff(
+    roster: list[tuple[StaffQueueProfile, User]],
+    loads: dict[int, int],
+    entry: QueueEntry,
+    application: LoanApplication,
+    weights: dict,
+    config: QueueConfig | None,
+    employer_sector: str | None = None,
+) -> tuple[int | None, str]:
+    """Best-scoring staff member with spare capacity under *loads*."""
     best_user_id = None
     best_score = -1.0
     best_explanation = "No available staff"
-    best_factors: dict = {}
 
-    for profile, user in profiles_result.all():
-        if profile.current_load_count >= profile.max_concurrent:
+    for profile, user in roster:
+        load = loads[profile.user_id]
+        if load >= profile.max_concurrent:
             continue
 
         score, factors = _score_staff_for_entry(
             profile, user, entry, application, weights, config,
+            current_load=load, employer_sector=employer_sector,
         )
         if score > best_score:
             best_score = score
             best_user_id = profile.user_id
-            best_factors = factors
             best_explanation = (
                 f"Assigned to {user.first_name} {user.last_name}: "
                 f"workload {factors['workload']['current']}/{factors['workload']['max']}, "
@@ -189,8 +195,41 @@ async def suggest_assignment(
     return best_user_id, best_explanation
 
 
+async def suggest_assignment(
+    entry: QueueEntry,
+    db: AsyncSession,
+    config: QueueConfig | None = None,
+) -> tuple[int | None, str]:
+    """Suggest the best staff member for an entry. Returns (user_id, explanation)."""
+    if not config:
+        cfg_result = await db.execute(select(QueueConfig).limit(1))
+        config = cfg_result.scalar_one_or_none()
+
+    app_result = await db.execute(
+        select(LoanApplication, ApplicantProfile.employer_sector)
+        .outerjoin(ApplicantProfile, ApplicantProfile.user_id == LoanApplication.applicant_id)
+        .where(LoanApplication.id == entry.application_id)
+    )
+    row = app_result.first()
+    if not row:
+        return None, "Application not found"
+    application, sector = row
+
+    roster = await _load_roster(db)
+    loads = {profile.user_id: profile.current_load_count for profile, _ in roster}
+    return _pick_staff(
+        roster, loads, entry, application, _get_assignment_weights(config), config, sector,
+    )
+
+
 async def auto_assign_pending(db: AsyncSession) -> int:
-    """Batch auto-assign unassigned entries. Returns number assigned."""
+    """Batch auto-assign unassigned entries. Returns number assigned.
+
+    The roster and loads are read once; pending entries are placed greedily
+    in priority order against in-memory capacities, then written back with
+    one ``UPDATE … FROM (VALUES …)`` for entries and one for staff loads.
+    Entries claimed by someone else meanwhile are skipped by the UPDATE.
+    """
     config_result = await db.execute(select(QueueConfig).limit(1))
     config = config_result.scalar_one_or_none()
 
@@ -200,49 +239,91 @@ async def auto_assign_pending(db: AsyncSession) -> int:
         return 0
 
     is_hybrid = config.assignment_mode == AssignmentMode.HYBRID.value
+    pending = [
+        QueueEntry.status == QueueEntryStatus.NEW.value,
+        QueueEntry.assigned_to_id.is_(None),
+    ]
+    if is_hybrid:
+        pending.append(QueueEntry.suggested_for_id.is_(None))
+
+    roster = await _load_roster(db)
+    if not roster:
+        return 0
+    loads = {profile.user_id: profile.current_load_count for profile, _ in roster}
+    spare = sum(max(0, p.max_concurrent - loads[p.user_id]) for p, _ in roster)
+    if spare == 0:
+        return 0
 
-    # Get unassigned entries sorted by priority
-    entries_result = await db.execute(
-        select(QueueEntry)
-        .where(
-            QueueEntry.status == QueueEntryStatus.NEW.value,
-            QueueEntry.assigned_to_id.is_(None),
-            QueueEntry.suggested_for_id.is_(None) if is_hybrid else QueueEntry.assigned_to_id.is_(None),
-        )
-        .order_by(QueueEntry.priority_score.desc())
-        .limit(50)
-    )
-    entries = entries_result.scalars().all()
+    # Get unassigned entries sorted by priority — never more than can be placed
+    rows = (await db.execute(
+        select(QueueEntry, LoanApplication, ApplicantProfile.employer_sector)
+        .join(LoanApplication, LoanApplication.id == QueueEntry.application_id)
+        .outerjoin(ApplicantProfile, ApplicantProfile.user_id == LoanApplication.applicant_id)
+        .where(*pending)
+        .order_by(QueueEntry.priority_score.desc(), QueueEntry.id)
+        .limit(min(spare, AUTO_ASSIGN_BATCH))
+    )).all()
 
-    assigned_count = 0
-    for entry in entries:
-        user_id, explanation = await suggest_assignment(entry, db, config)
+    weights = _get_assignment_weights(config)
+    placed: dict[int, tuple[QueueEntry, int, str]] = {}
+    for entry, application, sector in rows:
+        user_id, explanation = _pick_staff(
+            roster, loads, entry, application, weights, config, sector,
+        )
         if user_id:
-            if is_hybrid:
-                entry.suggested_for_id = user_id
-            else:
-                entry.assigned_to_id = user_id
-                entry.status = QueueEntryStatus.IN_PROGRESS.value
-
-            event = QueueEvent(
-                queue_entry_id=entry.id,
-                application_id=entry.application_id,
-                event_type="assigned" if not is_hybrid else "suggested",
-                to_value={"user_id": user_id, "explanation": explanation},
-            )
-            db.add(event)
-
-            # Update staff load
-            profile_result = await db.execute(
-                select(StaffQueueProfile).where(StaffQueueProfile.user_id == user_id)
-            )
-            profile = profile_result.scalar_one_or_none()
-            if profile:
-                profile.current_load_count = profile.current_load_count + 1
+            loads[user_id] += 1
+            placed[entry.id] = (entry, user_id, explanation)
+    if not placed:
+        return 0
 
-            assigned_count += 1
+    target = QueueEntry.suggested_for_id if is_hybrid else QueueEntry.assigned_to_id
+    updated_ids: set[int] = set()
+    for chunk in chunks([(eid, uid) for eid, (_, uid, _) in placed.items()]):
+        v = values_table("v", {"id": Integer, "user_id": Integer}, chunk)
+        stmt = update(QueueEntry).where(QueueEntry.id == v.c.id, *pending)
+        if is_hybrid:
+            stmt = stmt.values(suggested_for_id=v.c.user_id)
+        else:
+            stmt = stmt.values(assigned_to_id=v.c.user_id, status=QueueEntryStatus.IN_PROGRESS.value)
+        result = await db.execute(
+            stmt.returning(QueueEntry.id).execution_options(synchronize_session=False)
+        )
+        updated_ids.update(result.scalars().all())
 
-    await db.flush()
+    added: dict[int, int] = {}
+    events = []
+    for entry_id, (entry, user_id, explanation) in placed.items():
+        if entry_id not in updated_ids:
+            continue
+        added[user_id] = added.get(user_id, 0) + 1
+        events.append({
+            "queue_entry_id": entry_id,
+            "application_id": entry.application_id,
+            "event_type": "suggested" if is_hybrid else "assigned",
+            "to_value": {"user_id": user_id, "explanation": explanation},
+        })
+        # Keep loaded entries consistent with what was written
+        set_committed_value(entry, target.key, user_id)
+        if not is_hybrid:
+            set_committed_value(entry, "status", QueueEntryStatus.IN_PROGRESS.value)
+
+    if added:
+        v = values_table("v", {"user_id": Integer, "n": Integer}, list(added.items()))
+        await db.execute(
+            update(StaffQueueProfile)
+            .where(StaffQueueProfile.user_id == v.c.user_id)
+            .values(current_load_count=StaffQueueProfile.current_load_count + v.c.n)
+            .execution_options(synchronize_session=False)
+        )
+        for profile, _ in roster:
+            if profile.user_id in added:
+                set_committed_value(
+                    profile, "current_load_count",
+                    profile.current_load_count + added[profile.user_id],
+                )
+        await db.execute(insert(QueueEvent), events)
+
+    assigned_count = len(updated_ids)
     logger.info("Auto-assigned %d entries (mode=%s)", assigned_count, config.assignment_mode)
     return assigned_count
 
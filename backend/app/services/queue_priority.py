@@ -10,11 +10,12 @@ import math
 from datetime import datetime, timezone, timedelta
 from typing import Any
 
-from sqlalchemy import select, func
+from sqlalchemy import JSON, Float, Integer, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.queue import QueueConfig, QueueEntry, QueueEntryStatus
 from app.models.loan import LoanApplication, LoanStatus
+from app.services.bulk_sql import chunks, values_table
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -125,7 +126,11 @@ def compute_priority(
 
 
 async def recalculate_all_priorities(db: AsyncSession) -> int:
-    """Batch recalculate priority scores for all active queue entries."""
+    """Batch recalculate priority scores for all active queue entries.
+
+    Scores are computed in Python from a column-only read and written back
+    with one ``UPDATE … FROM (VALUES …)`` per chunk.
+    """
     config_result = await db.execute(select(QueueConfig).limit(1))
     config = config_result.scalar_one_or_none()
 
@@ -139,27 +144,45 @@ async def recalculate_all_priorities(db: AsyncSession) -> int:
     )
     median_val = median_result.scalar() or 50000.0
 
-    # Load active entries with their applications
-    entries_result = await db.execute(
-        select(QueueEntry, LoanApplication)
+    # Only the columns compute_priority reads; rows stand in for entry and application
+    rows = (await db.execute(
+        select(
+            QueueEntry.id,
+            QueueEntry.application_id,
+            QueueEntry.status,
+            QueueEntry.return_count,
+            QueueEntry.waiting_since,
+            QueueEntry.completeness_score,
+            QueueEntry.is_stuck,
+            QueueEntry.is_flagged,
+            LoanApplication.submitted_at,
+            LoanApplication.created_at,
+            LoanApplication.amount_requested,
+        )
         .join(LoanApplication, QueueEntry.application_id == LoanApplication.id)
         .where(QueueEntry.status.in_([
             QueueEntryStatus.NEW.value,
             QueueEntryStatus.IN_PROGRESS.value,
             QueueEntryStatus.ON_HOLD.value,
         ]))
-    )
-
-    count = 0
-    for entry, application in entries_result.all():
-        score, factors = compute_priority(entry, application, config, float(median_val))
-        entry.priority_score = score
-        entry.priority_factors = factors
-        count += 1
+    )).all()
+
+    scored = []
+    for row in rows:
+        score, factors = compute_priority(row, row, config, float(median_val))
+        scored.append((row.id, score, factors))
+
+    for chunk in chunks(scored):
+        v = values_table("v", {"id": Integer, "score": Float, "factors": JSON}, chunk)
+        await db.execute(
+            update(QueueEntry)
+            .where(QueueEntry.id == v.c.id)
+            .values(priority_score=v.c.score, priority_factors=v.c.factors)
+            .execution_options(synchronize_session=False)
+        )
 
-    await db.flush()
-    logger.info("Recalculated priorities for %d queue entries", count)
-    return count
+    logger.info("Recalculated priorities for %d queue entries", len(scored))
+    return len(scored)
 
 
 def explain_priority_deterministic(
@@ -5,7 +5,10 @@ warning/breach detection, and escalation cascade execution.
 """
 
 import logging
+from bisect import bisect_left
+from dataclasses import dataclass
 from datetime import datetime, date, time, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
 from sqlalchemy import select, and_
@@ -47,10 +50,125 @@ def _get_holidays(config: QueueConfig | None) -> set[str]:
     return set(config.holidays)
 
 
-def _is_business_day(d: date, config: QueueConfig | None) -> bool:
-    holidays = _get_holidays(config)
-    business_days = _get_business_days(config)
-    return d.isoweekday() in business_days and d.isoformat() not in holidays
+# ────────────────────────────────────────────────────────────────────
+# Business calendar
+# ────────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class BusinessCalendar:
+    """Business seconds as a closed-form prefix sum over calendar days.
+
+    ``_seconds_before(day)`` — business seconds on all days before the given
+    date ordinal — is whole weeks times the weekly total, plus a weekday
+    prefix, minus one business day per holiday found by binary search.
+    Interval lengths are differences of positions and deadlines invert it
+    by binary search, so both are O(log n) however far apart the ends are.
+    """
+
+    day_start: int
+    daily_seconds: int
+    week_prefix: tuple[int, ...]
+    business_days: frozenset[int]
+    holidays: tuple[int, ...]
+
+    @classmethod
+    def build(
+        cls,
+        hours: tuple[time, time],
+        business_days: tuple[int, ...],
+        holidays: tuple[str, ...],
+    ) -> "BusinessCalendar":
+        start, end = hours
+        day_start = start.hour * 3600 + start.minute * 60
+        day_end = end.hour * 3600 + end.minute * 60
+        if day_end <= day_start:
+            day_start, day_end = 8 * 3600, 17 * 3600
+        daily = day_end - day_start
+        days = frozenset(business_days)
+
+        prefix = [0]
+        for weekday in range(1, 8):
+            prefix.append(prefix[-1] + (daily if weekday in days else 0))
+
+        ordinals = set()
+        for h in holidays:
+            try:
+                d = date.fromisoformat(str(h))
+            except ValueError:
+                logger.warning("Ignoring malformed queue holiday %r", h)
+                continue
+            if d.isoweekday() in days:
+                ordinals.add(d.toordinal())
+        return cls(day_start, daily, tuple(prefix), days, tuple(sorted(ordinals)))
+
+    def is_business_day(self, d: date) -> bool:
+        o = d.toordinal()
+        i = bisect_left(self.holidays, o)
+        is_holiday = i < len(self.holidays) and self.holidays[i] == o
+        return d.isoweekday() in self.business_days and not is_holiday
+
+    def _seconds_before(self, ordinal: int) -> int:
+        # Ordinal 1 (0001-01-01) is a Monday, so weeks align with ordinal 1
+        weeks, rem = divmod(ordinal - 1, 7)
+        return (
+            weeks * self.week_prefix[7]
+            + self.week_prefix[rem]
+            - self.daily_seconds * bisect_left(self.holidays, ordinal)
+        )
+
+    def position(self, t: datetime) -> float:
+        """Business seconds from the calendar origin up to *t*."""
+        d = t.date()
+        pos = self._seconds_before(d.toordinal())
+        if self.is_business_day(d):
+            into_day = t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+            pos += min(max(into_day - self.day_start, 0), self.daily_seconds)
+        return pos
+
+    def between(self, start: datetime, end: datetime) -> timedelta:
+        start, end = _aware(start), _aware(end).astimezone(_aware(start).tzinfo)
+        if start >= end:
+            return timedelta(0)
+        return timedelta(seconds=self.position(end) - self.position(start))
+
+    def add(self, start: datetime, seconds: float) -> Optional[datetime]:
+        """Earliest moment *seconds* business seconds after *start*.
+
+        Returns None when the calendar has no business days at all.
+        """
+        start = _aware(start)
+        if seconds <= 0:
+            return start
+        if not self.week_prefix[7]:
+            return None
+        target = self.position(start) + seconds
+
+        # Smallest day whose end reaches the target; each holiday costs at most a week
+        lo = start.date().toordinal()
+        hi = lo + 7 * (int(seconds // self.week_prefix[7]) + 2 + len(self.holidays))
+        day = bisect_left(range(lo, hi), target, key=lambda o: self._seconds_before(o + 1)) + lo
+
+        offset = target - self._seconds_before(day)
+        midnight = datetime.combine(date.fromordinal(day), time(0), tzinfo=start.tzinfo)
+        return midnight + timedelta(seconds=self.day_start + offset)
+
+
+def _aware(t: datetime) -> datetime:
+    return t if t.tzinfo else t.replace(tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=16)
+def _calendar(hours: tuple[time, time], business_days: tuple[int, ...], holidays: tuple[str, ...]) -> BusinessCalendar:
+    return BusinessCalendar.build(hours, business_days, holidays)
+
+
+def calendar_for(config: QueueConfig | None) -> BusinessCalendar:
+    """The calendar for *config*, built once per distinct hours/days/holidays."""
+    return _calendar(
+        _get_business_hours(config),
+        tuple(sorted(_get_business_days(config))),
+        tuple(sorted(str(h) for h in _get_holidays(config))),
+    )
 
 
 def business_hours_between(
@@ -59,124 +177,71 @@ def business_hours_between(
     config: QueueConfig | None = None,
 ) -> timedelta:
     """Calculate business hours between two datetimes, respecting weekends and holidays."""
-    if start >= end:
-        return timedelta(0)
-
-    bh_start, bh_end = _get_business_hours(config)
-    bh_start_seconds = bh_start.hour * 3600 + bh_start.minute * 60
-    bh_end_seconds = bh_end.hour * 3600 + bh_end.minute * 60
-    daily_seconds = bh_end_seconds - bh_start_seconds
-
-    if daily_seconds <= 0:
-        daily_seconds = 32400  # fallback 9 hours
-
-    total_seconds = 0
-    current = start
+    return calendar_for(config).between(start, end)
 
-    # Process day by day
-    max_days = 365  # safety limit
-    days_processed = 0
-    while current < end and days_processed < max_days:
-        days_processed += 1
-        current_date = current.date()
 
-        if not _is_business_day(current_date, config):
-            current = datetime.combine(current_date + timedelta(days=1), bh_start, tzinfo=current.tzinfo)
-            continue
+# ────────────────────────────────────────────────────────────────────
+# Deadlines
+# ────────────────────────────────────────────────────────────────────
 
-        day_start = datetime.combine(current_date, bh_start, tzinfo=current.tzinfo)
-        day_end = datetime.combine(current_date, bh_end, tzinfo=current.tzinfo)
-
-        # Clamp to business hours
-        effective_start = max(current, day_start)
-        effective_end = min(end, day_end)
+def _sla_hours(config: QueueConfig, stage: QueueStage | None) -> tuple[Optional[int], Optional[int]]:
+    """(target, warning) business hours for an entry in *stage*."""
+    target = None
+    if stage and stage.sla_target_hours:
+        target = stage.sla_target_hours
+    elif config.target_turnaround_hours:
+        target = config.target_turnaround_hours
 
-        if effective_start < effective_end:
-            total_seconds += (effective_end - effective_start).total_seconds()
+    warning = None
+    if stage and stage.sla_warning_hours:
+        warning = stage.sla_warning_hours
+    elif config.target_turnaround_hours:
+        warning = int(config.target_turnaround_hours * 0.75)
+    return target, warning
 
-        current = datetime.combine(current_date + timedelta(days=1), bh_start, tzinfo=current.tzinfo)
 
-    return timedelta(seconds=total_seconds)
+def _due(
+    calendar: BusinessCalendar,
+    entry: QueueEntry,
+    hours: Optional[int],
+    now: datetime,
+) -> Optional[datetime]:
+    start_time = entry.stage_entered_at or entry.created_at
+    if not hours or not start_time:
+        return None
+    # Time spent paused (waiting on the borrower) extends the clock
+    due = calendar.add(start_time, hours * 3600 + (entry.sla_elapsed_seconds or 0))
+    if due is None:
+        return None
+    return max(due, now)
 
 
 def calculate_sla_deadline(
     entry: QueueEntry,
     config: QueueConfig | None,
     stage: QueueStage | None = None,
+    now: datetime | None = None,
 ) -> Optional[datetime]:
-    """Calculate SLA deadline in business hours from stage_entered_at or created_at."""
+    """SLA deadline: target business hours after stage_entered_at (or created_at)."""
     if not config or config.sla_mode == SLAMode.NONE.value:
         return None
-
-    target_hours = None
-    if stage and stage.sla_target_hours:
-        target_hours = stage.sla_target_hours
-    elif config.target_turnaround_hours:
-        target_hours = config.target_turnaround_hours
-
-    if not target_hours:
-        return None
-
-    start_time = entry.stage_entered_at or entry.created_at
-    if not start_time:
-        return None
-
-    if start_time.tzinfo is None:
-        start_time = start_time.replace(tzinfo=timezone.utc)
-
-    bh_start, bh_end = _get_business_hours(config)
-    daily_hours = (
-        (bh_end.hour * 60 + bh_end.minute) - (bh_start.hour * 60 + bh_start.minute)
-    ) / 60.0
-    if daily_hours <= 0:
-        daily_hours = 9.0
-
-    # Rough estimate: add calendar days based on business-hour ratio
-    business_days_needed = target_hours / daily_hours
-    calendar_days_needed = business_days_needed * 7 / 5  # account for weekends
-
-    # Subtract already elapsed business time
-    now = datetime.now(timezone.utc)
-    elapsed = business_hours_between(start_time, now, config)
-    elapsed_hours = elapsed.total_seconds() / 3600
-
-    # Subtract paused time
-    paused_hours = entry.sla_elapsed_seconds / 3600
-
-    remaining_hours = target_hours - elapsed_hours + paused_hours
-    if remaining_hours <= 0:
-        return now  # already breached
-
-    remaining_days = remaining_hours / daily_hours * 7 / 5
-    return now + timedelta(days=remaining_days)
+    target, _ = _sla_hours(config, stage)
+    return _due(calendar_for(config), entry, target, now or datetime.now(timezone.utc))
 
 
 def calculate_sla_warning(
     entry: QueueEntry,
     config: QueueConfig | None,
     stage: QueueStage | None = None,
+    now: datetime | None = None,
 ) -> Optional[datetime]:
     """Calculate SLA warning timestamp."""
     if not config or config.sla_mode == SLAMode.NONE.value:
         return None
-
-    warning_hours = None
-    if stage and stage.sla_warning_hours:
-        warning_hours = stage.sla_warning_hours
-    elif config.target_turnaround_hours:
-        warning_hours = int(config.target_turnaround_hours * 0.75)
-
-    if not warning_hours:
-        return None
-
-    deadline = calculate_sla_deadline(entry, config, stage)
-    if not deadline:
+    target, warning = _sla_hours(config, stage)
+    if not target:
         return None
-
-    target_hours = (stage.sla_target_hours if stage and stage.sla_target_hours
-                    else config.target_turnaround_hours or 24)
-    buffer_hours = target_hours - warning_hours
-    return deadline - timedelta(hours=buffer_hours)
+    return _due(calendar_for(config), entry, warning, now or datetime.now(timezone.utc))
 
 
 def check_sla_status(
@@ -251,6 +316,17 @@ async def run_sla_checks(db: AsyncSession) -> dict:
     )
     entries = entries_result.scalars().all()
 
+    # Entries already warned / breached, in one query
+    notified: set[tuple[int, str]] = set()
+    if entries:
+        notified_result = await db.execute(
+            select(QueueEvent.queue_entry_id, QueueEvent.event_type).where(
+                QueueEvent.queue_entry_id.in_([e.id for e in entries]),
+                QueueEvent.event_type.in_(["sla_warning", "sla_breach"]),
+            )
+        )
+        notified = set(notified_result.all())
+
     warnings = 0
     breaches = 0
 
@@ -258,14 +334,7 @@ async def run_sla_checks(db: AsyncSession) -> dict:
         status = check_sla_status(entry, config)
 
         if status == "warning":
-            # Check if warning already sent
-            existing = await db.execute(
-                select(QueueEvent).where(
-                    QueueEvent.queue_entry_id == entry.id,
-                    QueueEvent.event_type == "sla_warning",
-                )
-            )
-            if not existing.scalar_one_or_none():
+            if (entry.id, "sla_warning") not in notified:
                 event = QueueEvent(
                     queue_entry_id=entry.id,
                     application_id=entry.application_id,
@@ -276,13 +345,7 @@ async def run_sla_checks(db: AsyncSession) -> dict:
                 warnings += 1
 
         elif status == "breached":
-            existing = await db.execute(
-                select(QueueEvent).where(
-                    QueueEvent.queue_entry_id == entry.id,
-                    QueueEvent.event_type == "sla_breach",
-                )
-            )
-            if not existing.scalar_one_or_none():
+            if (entry.id, "sla_breach") not in notified:
                 event = QueueEvent(
                     queue_entry_id=entry.id,
                     application_id=entry.application_id,
@@ -0,0 +1,152 @@
+"""Queue membership — keeps ``queue_entries`` in step with application status.
+
+Membership is maintained as applications change status: mapper listeners
+on ``LoanApplication`` run the same set-based statements as the
+reconciler, restricted to the one application, inside the flush that
+changed it.  :func:`reconcile_queue_entries` is the periodic safety net
+for rows written outside the ORM (raw SQL, imports): it inserts missing
+entries with ``INSERT … SELECT … ON CONFLICT DO NOTHING``, marks decided
+ones, and fills completeness/complexity on entries that lack them.
+
+Queue reads do no write work.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.loan import LoanApplication, LoanStatus
+from app.models.queue import QueueEntry, QueueEntryStatus
+
+logger = logging.getLogger(__name__)
+
+SYNCABLE_STATUSES = [
+    LoanStatus.SUBMITTED,
+    LoanStatus.UNDER_REVIEW,
+    LoanStatus.CREDIT_CHECK,
+    LoanStatus.DECISION_PENDING,
+    LoanStatus.AWAITING_DOCUMENTS,
+]
+
+DECIDED_STATUSES = [
+    LoanStatus.APPROVED,
+    LoanStatus.DECLINED,
+    LoanStatus.DISBURSED,
+    LoanStatus.CANCELLED,
+    LoanStatus.VOIDED,
+]
+
+# Entries scored for completeness/complexity per reconciler run
+SCORING_BATCH = 200
+
+
+# ────────────────────────────────────────────────────────────────────
+# Statements
+# ────────────────────────────────────────────────────────────────────
+
+def insert_missing_entries(application_ids=None):
+    """INSERT a NEW/IN_PROGRESS/WAITING_BORROWER entry for queue-able apps lacking one."""
+    la = LoanApplication
+    status = case(
+        (la.status == LoanStatus.AWAITING_DOCUMENTS, QueueEntryStatus.WAITING_BORROWER.value),
+        (la.assigned_underwriter_id.is_not(None), QueueEntryStatus.IN_PROGRESS.value),
+        else_=QueueEntryStatus.NEW.value,
+    )
+    source = select(
+        la.id,
+        status,
+        la.assigned_underwriter_id,
+        la.assigned_underwriter_id,
+        func.coalesce(la.submitted_at, la.created_at, func.now()),
+    ).where(la.status.in_(SYNCABLE_STATUSES))
+    if application_ids is not None:
+        source = source.where(la.id.in_(application_ids))
+
+    return (
+        pg_insert(QueueEntry)
+        .from_select(
+            ["application_id", "status", "assigned_to_id", "claimed_by_id", "stage_entered_at"],
+            source,
+        )
+        .on_conflict_do_nothing(index_elements=[QueueEntry.application_id])
+        .returning(QueueEntry.application_id)
+    )
+
+
+def mark_decided_entries(application_ids=None):
+    """UPDATE entries of decided applications to DECIDED."""
+    decided = select(LoanApplication.id).where(LoanApplication.status.in_(DECIDED_STATUSES))
+    if application_ids is not None:
+        decided = decided.where(LoanApplication.id.in_(application_ids))
+    return (
+        update(QueueEntry)
+        .where(
+            QueueEntry.application_id.in_(decided),
+            QueueEntry.status != QueueEntryStatus.DECIDED.value,
+        )
+        .values(status=QueueEntryStatus.DECIDED.value)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ────────────────────────────────────────────────────────────────────
+# Status-transition hooks
+# ────────────────────────────────────────────────────────────────────
+
+def _sync_application(connection, target: LoanApplication) -> None:
+    if target.status in SYNCABLE_STATUSES:
+        connection.execute(insert_missing_entries([target.id]))
+    elif target.status in DECIDED_STATUSES:
+        connection.execute(mark_decided_entries([target.id]))
+
+
+@event.listens_for(LoanApplication, "after_insert")
+def _application_inserted(mapper, connection, target) -> None:
+    if target.status in SYNCABLE_STATUSES:
+        _sync_application(connection, target)
+
+
+@event.listens_for(LoanApplication, "after_update")
+def _application_updated(mapper, connection, target) -> None:
+    if inspect(target).attrs.status.history.has_changes():
+        _sync_application(connection, target)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Reconciler
+# ────────────────────────────────────────────────────────────────────
+
+async def reconcile_queue_entries(db: AsyncSession) -> dict[str, int]:
+    """Safety-net pass: insert missing entries, mark decided ones, score new ones.
+
+    Returns counts: {"created": N, "marked_decided": N, "scored": N}
+    """
+    from app.services.queue_ai import compute_completeness, estimate_complexity
+
+    created = len((await db.execute(insert_missing_entries())).all())
+    marked = (await db.execute(mark_decided_entries())).rowcount or 0
+
+    unscored = (await db.execute(
+        select(QueueEntry)
+        .where(
+            QueueEntry.completeness_score.is_(None),
+            QueueEntry.status.notin_([
+                QueueEntryStatus.DECIDED.value, QueueEntryStatus.EXPIRED.value,
+            ]),
+        )
+        .order_by(QueueEntry.id)
+        .limit(SCORING_BATCH)
+    )).scalars().all()
+    for entry in unscored:
+        entry.completeness_score = await compute_completeness(entry.application_id, db)
+        entry.complexity_estimate_hours = await estimate_complexity(entry.application_id, db)
+
+    await db.flush()
+    stats = {"created": created, "marked_decided": marked, "scored": len(unscored)}
+    if created or marked:
+        logger.info("Queue reconcile: %s", stats)
+    return stats
@@ -0,0 +1,275 @@
+"""Background report jobs with a result cache.
+
+A job is a ``report_history`` row.  Submitting one computes a cache key
+from the report type, its parameters and a *data watermark* — the newest
+change in the tables the report reads, plus today's date for age-relative
+figures.  A completed job with the same key is reused as-is; an identical
+job that is still pending or running is joined; otherwise a new job is
+queued for the Celery worker, which builds the file into file storage and
+records status and progress on the row for clients to poll.
+
+Operational reports (``app.services.report_generators``) are stored as
+CSV; GL reports (``reports_service.REPORT_REGISTRY``, job types prefixed
+with ``gl.``) are stored as the JSON the synchronous endpoint returns.
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collection import CollectionRecord
+from app.models.decision import Decision
+from app.models.gl import AccountPeriodBalance, GLAccount, GLAccountAudit, JournalEntry
+from app.models.loan import LoanApplication
+from app.models.payment import LoanServicingSnapshot, Payment
+from app.models.report import ReportHistory, ReportJobStatus
+from app.services import file_storage, report_generators
+from app.services.gl import reports_service
+
+logger = logging.getLogger(__name__)
+
+GL_PREFIX = "gl."
+# A job still pending/running after this long is treated as lost
+STALE_JOB_AFTER = timedelta(minutes=30)
+
+_ACTIVE = (ReportJobStatus.PENDING.value, ReportJobStatus.RUNNING.value)
+
+# Newest change in the data each family of reports reads
+_LOAN_WATERMARK = (
+    func.max(LoanApplication.updated_at),
+    func.max(Payment.id),
+    func.max(Decision.updated_at),
+    func.max(CollectionRecord.id),
+    func.max(LoanServicingSnapshot.updated_at),
+)
+_GL_WATERMARK = (
+    func.max(JournalEntry.id),
+    func.max(JournalEntry.posted_at),
+    func.max(AccountPeriodBalance.updated_at),
+    func.max(GLAccount.updated_at),
+    func.max(GLAccountAudit.id),
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def is_gl(report_type: str) -> bool:
+    return report_type.startswith(GL_PREFIX)
+
+
+def report_name(report_type: str) -> str:
+    if is_gl(report_type):
+        return reports_service.REPORT_REGISTRY[report_type[len(GL_PREFIX):]]["name"]
+    return report_generators.REPORT_TYPES[report_type]["name"]
+
+
+async def data_watermark(db: AsyncSession, report_type: str) -> str:
+    """One round trip: today's date and the newest change in the report's tables."""
+    aggregates = _GL_WATERMARK if is_gl(report_type) else _LOAN_WATERMARK
+    row = (await db.execute(select(*(select(agg).scalar_subquery() for agg in aggregates)))).one()
+    return "|".join([date.today().isoformat(), *(str(v) for v in row)])
+
+
+def cache_key(report_type: str, parameters: dict, watermark: str) -> str:
+    payload = json.dumps([report_type, parameters, watermark], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _reusable(job: ReportHistory) -> bool:
+    if job.status == ReportJobStatus.COMPLETED.value:
+        return bool(job.file_path) and os.path.exists(job.file_path)
+    return True
+
+
+async def submit_job(
+    db: AsyncSession,
+    *,
+    report_type: str,
+    parameters: dict,
+    user_id: int,
+    name: str | None = None,
+) -> tuple[ReportHistory, bool]:
+    """Find or create the job for a request; returns (job, needs_enqueue)."""
+    key = cache_key(report_type, parameters, await data_watermark(db, report_type))
+
+    # Serialise identical submissions until this transaction commits
+    await db.execute(select(func.pg_advisory_xact_lock(int(key[:15], 16))))
+    candidates = await db.execute(
+        select(ReportHistory)
+        .where(
+            ReportHistory.cache_key == key,
+            or_(
+                ReportHistory.status == ReportJobStatus.COMPLETED.value,
+                and_(
+                    ReportHistory.status.in_(_ACTIVE),
+                    ReportHistory.created_at >= _now() - STALE_JOB_AFTER,
+                ),
+            ),
+        )
+        .order_by(ReportHistory.id.desc())
+        .limit(5)
+    )
+    for job in candidates.scalars():
+        if _reusable(job):
+            return job, False
+
+    job = ReportHistory(
+        report_type=report_type,
+        report_name=name or report_name(report_type),
+        generated_by=user_id,
+        parameters=parameters,
+        file_format="json" if is_gl(report_type) else "csv",
+        status=ReportJobStatus.PENDING.value,
+        progress=0,
+        cache_key=key,
+    )
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    return job, True
+
+
+async def enqueue(db: AsyncSession, job: ReportHistory) -> None:
+    """Hand a committed job to the Celery worker.
+
+    If the broker refuses it the job is marked failed before the error
+    propagates; a pending row nobody will run would otherwise absorb every
+    identical submission until it goes stale.
+    """
+    from app.tasks.report_tasks import build_report
+
+    try:
+        build_report.delay(job.id)
+    except Exception as e:
+        logger.exception("Could not enqueue report job %d", job.id)
+        job.status = ReportJobStatus.FAILED.value
+        job.error_message = f"Could not queue report job: {e}"[:1000]
+        job.completed_at = _now()
+        await db.commit()
+        raise
+
+
+def job_status(job: ReportHistory, *, cached: bool = False) -> dict:
+    done = job.status == ReportJobStatus.COMPLETED.value
+    return {
+        "id": job.id,
+        "report_type": job.report_type,
+        "report_name": job.report_name,
+        "status": job.status,
+        "progress": job.progress,
+        "error_message": job.error_message,
+        "file_format": job.file_format,
+        "cached": cached,
+        "download_url": f"/api/reports/history/{job.id}/download" if done else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _param_date(parameters: dict, key: str) -> date | None:
+    value = parameters.get(key)
+    return date.fromisoformat(value) if value else None
+
+
+async def _set_progress(db: AsyncSession, job: ReportHistory, progress: int) -> None:
+    job.progress = progress
+    await db.commit()
+
+
+async def _build(db: AsyncSession, job: ReportHistory, path: str) -> None:
+    params = job.parameters or {}
+    if is_gl(job.report_type):
+        report_type = job.report_type[len(GL_PREFIX):]
+        data = await reports_service.run_report(
+            db, report_type,
+            period_id=params.get("period_id"),
+            date_from=_param_date(params, "date_from"),
+            date_to=_param_date(params, "date_to"),
+            account_id=params.get("account_id"),
+        )
+        await _set_progress(db, job, 80)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"report_type": report_type, "report_name": job.report_name, "data": data},
+                fh, default=_json_default,
+            )
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            await report_generators.write_report(
+                csv.writer(fh), db, job.report_type,
+                date_from=_param_date(params, "date_from"),
+                date_to=_param_date(params, "date_to"),
+                application_id=params.get("application_id"),
+            )
+
+
+async def run_job(db: AsyncSession, job_id: int) -> ReportHistory | None:
+    """Build a pending job's file; a job already picked up is left alone."""
+    job = await db.get(ReportHistory, job_id)
+    if job is None or job.status != ReportJobStatus.PENDING.value:
+        return job
+
+    job.status = ReportJobStatus.RUNNING.value
+    job.started_at = _now()
+    await _set_progress(db, job, 10)
+
+    # The rollback on failure expires the job; don't lazy-load it afterwards
+    report_type = job.report_type
+    path = file_storage.new_file_path("reports", f".{job.file_format}")
+    try:
+        await _build(db, job, path)
+    except Exception as e:
+        file_storage.remove_file(path)
+        await db.rollback()
+        logger.exception("Report job %d (%s) failed", job_id, report_type)
+        job = await db.get(ReportHistory, job_id)
+        job.status = ReportJobStatus.FAILED.value
+        job.error_message = str(e)[:1000]
+        job.completed_at = _now()
+        await db.commit()
+        return job
+
+    job.file_path = path
+    job.status = ReportJobStatus.COMPLETED.value
+    job.completed_at = _now()
+    await _set_progress(db, job, 100)
+    logger.info("Report job %d (%s) completed", job_id, report_type)
+    return job
+
+
+async def fail_stale_jobs(db: AsyncSession) -> int:
+    """Mark jobs that never finished as failed so clients stop polling them."""
+    stale = (
+        await db.execute(
+            select(ReportHistory).where(
+                ReportHistory.status.in_(_ACTIVE),
+                ReportHistory.created_at < _now() - STALE_JOB_AFTER,
+            )
+        )
+    ).scalars().all()
+    for job in stale:
+        job.status = ReportJobStatus.FAILED.value
+        job.error_message = "Report job did not finish"
+        job.completed_at = _now()
+    return len(stale)
@@ -0,0 +1,222 @@
+"""Per-request database accounting and route latency metrics.
+
+``RequestMiddleware`` opens a :class:`RequestStats` for each request in a
+context variable; SQLAlchemy cursor hooks (installed on every engine by
+:func:`install_query_hooks`) add each statement's count and time to it.
+When the request finishes, :func:`observe_request` feeds the per-route
+histograms served in Prometheus text format on ``/metrics`` and logs
+requests slower than ``settings.slow_request_ms`` with their costliest
+statements — an N+1 loop shows up as one statement run hundreds of times.
+
+Metrics are per process; with several workers, scrape each one (or sum).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("zotta.requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+# Statements listed in a slow-request log line
+SLOW_LOG_TOP = 5
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+# ────────────────────────────────────────────────────────────────────
+# Per-request statement accounting
+# ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class RequestStats:
+    query_count: int = 0
+    db_seconds: float = 0.0
+    # normalised statement -> [executions, seconds]
+    statements: dict[str, list] = field(default_factory=dict)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.query_count += 1
+        self.db_seconds += seconds
+        key = _WHITESPACE.sub(" ", statement).strip()[:300]
+        entry = self.statements.setdefault(key, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def top_statements(self, n: int = SLOW_LOG_TOP) -> list[tuple[str, int, float]]:
+        ranked = sorted(self.statements.items(), key=lambda kv: kv[1][1], reverse=True)
+        return [(sql, count, seconds) for sql, (count, seconds) in ranked[:n]]
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request() -> tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_start")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    # The after hook doesn't run for failed statements; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def install_query_hooks() -> None:
+    """Count statements on every engine (API and Celery alike). Idempotent."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Metric registry (Prometheus text exposition format)
+# ────────────────────────────────────────────────────────────────────
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...]):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple[str, ...], amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> ([count per bucket..., +Inf], sum)
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, None), counts):
+                    cumulative += count
+                    le = "+Inf" if bound is None else _fmt(bound)
+                    bucket_labels = _labels(self.labelnames, labels, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter(
+    "zotta_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+)
+LATENCY = Histogram(
+    "zotta_http_request_duration_seconds", "Request latency by route.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+QUERIES = Histogram(
+    "zotta_http_request_db_queries", "Database statements executed per request.",
+    ("method", "route"), QUERY_BUCKETS,
+)
+DB_TIME = Histogram(
+    "zotta_http_request_db_seconds", "Time spent in database statements per request.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+_METRICS = (REQUESTS, LATENCY, QUERIES, DB_TIME)
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in _METRICS for line in metric.render()) + "\n"
+
+
+def route_label(scope) -> str:
+    """The matched route template, so label cardinality stays bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_request(
+    method: str, route: str, status_code: int, seconds: float, stats: RequestStats,
+) -> None:
+    labels = (method, route)
+    REQUESTS.inc((method, route, str(status_code)))
+    LATENCY.observe(labels, seconds)
+    QUERIES.observe(labels, stats.query_count)
+    DB_TIME.observe(labels, stats.db_seconds)
+
+    if seconds * 1000 >= settings.slow_request_ms:
+        top = "".join(
+            f"\n  {count}x {elapsed * 1000:.1f}ms  {sql}"
+            for sql, count, elapsed in stats.top_statements()
+        )
+        logger.warning(
+            "Slow request %s %s: %.0fms, %d queries, %.0fms in DB%s",
+            method, route, seconds * 1000, stats.query_count, stats.db_seconds * 1000, top,
+        )
@@ -9,11 +9,14 @@ import io
 import json
 import logging
 import random
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Any
+from itertools import islice
+from typing import Any, Iterable, Iterator
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -785,38 +788,43 @@ async def simulate_impact(
     """
     from app.models.loan import LoanStatus
 
-    # Get recent scored applications with profile data
-    apps_q = (
-        select(LoanApplication.id, LoanApplication.applicant_id)
+    compiled = compile_scorecard(scorecard)
+    scores: list[float] = []
+    decisions = {"AUTO_APPROVE": 0, "MANUAL_REVIEW": 0, "AUTO_DECLINE": 0}
+
+    # Most recent applications with their profiles, one keyset page at a time
+    base_q = (
+        select(LoanApplication, ApplicantProfile)
+        .outerjoin(ApplicantProfile, ApplicantProfile.user_id == LoanApplication.applicant_id)
         .where(LoanApplication.status.in_([
             LoanStatus.APPROVED, LoanStatus.DECLINED,
             LoanStatus.DECISION_PENDING, LoanStatus.DISBURSED,
         ]))
-        .order_by(LoanApplication.created_at.desc())
-        .limit(sample_limit)
+        .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
     )
-    apps = (await db.execute(apps_q)).all()
-
-    scores: list[float] = []
-    decisions = {"AUTO_APPROVE": 0, "MANUAL_REVIEW": 0, "AUTO_DECLINE": 0}
-
-    for app_id, applicant_id in apps:
-        profile_q = select(ApplicantProfile).where(ApplicantProfile.user_id == applicant_id)
-        profile = (await db.execute(profile_q)).scalar_one_or_none()
-        if not profile:
-            continue
-
-        app_q = select(LoanApplication).where(LoanApplication.id == app_id)
-        app_obj = (await db.execute(app_q)).scalar_one_or_none()
-        if not app_obj:
-            continue
-
-        applicant_data = extract_applicant_data(profile, app_obj)
-        result = score_application(scorecard, applicant_data)
-        scores.append(result["total_score"])
-        dec = result["decision"]
-        if dec in decisions:
-            decisions[dec] += 1
+    remaining = sample_limit
+    cursor: tuple[datetime, int] | None = None
+    while remaining > 0:
+        page_q = base_q
+        if cursor is not None:
+            page_q = page_q.where(
+                tuple_(LoanApplication.created_at, LoanApplication.id) < tuple_(*cursor)
+            )
+        page = (await db.execute(page_q.limit(min(remaining, BATCH_CHUNK_SIZE)))).all()
+        if not page:
+            break
+        remaining -= len(page)
+        last_app = page[-1][0]
+        cursor = (last_app.created_at, last_app.id)
+
+        rows = [
+            extract_applicant_data(profile, app_obj)
+            for app_obj, profile in page if profile is not None
+        ]
+        for total_score, dec in score_totals(compiled, rows):
+            scores.append(total_score)
+            if dec in decisions:
+                decisions[dec] += 1
 
     total = len(scores)
     if total == 0:
@@ -894,33 +902,360 @@ def what_if_analysis(
 # ────────────────────────────────────────────────────────────────────
 # 9. Batch Scoring
 # ────────────────────────────────────────────────────────────────────
+#
+# Batch paths (CSV upload, impact simulation) score many applicants against
+# the same scorecard, so the scorecard is compiled once into lookup tables
+# and applied column by column: range bins become a sorted edge list probed
+# with ``bisect`` and category bins a dict, with first-match-wins order
+# preserved.  Results are identical to ``score_application``.
+
+BATCH_CHUNK_SIZE = 2000
+
+
+@dataclass
+class CompiledCharacteristic:
+    code: str
+    name: str
+    data_field: str
+    weight_multiplier: float
+    # Elementary intervals [edges[k], edges[k+1]) → winning bin index (or -1).
+    edges: list[float]
+    segment_bins: list[int]
+    categories: dict[str, int]
+    default_bin: int
+    bin_labels: list[str]
+    bin_points: list[float]
+    bin_weighted: list[float]
+    bin_rounded: list[float]
+
+    def match(self, value: Any) -> int:
+        """Index of the bin ``_match_bin`` would return for ``value`` (-1 if none)."""
+        if value is None:
+            return self.default_bin
+        best = -1
+        if self.edges:
+            try:
+                num_val = float(value)
+            except (ValueError, TypeError):
+                num_val = None
+            if num_val is not None and num_val == num_val:
+                k = bisect_right(self.edges, num_val) - 1
+                if 0 <= k < len(self.segment_bins):
+                    best = self.segment_bins[k]
+        if self.categories:
+            cat = self.categories.get(str(value).strip().lower(), -1)
+            if cat >= 0 and (best < 0 or cat < best):
+                best = cat
+        return best if best >= 0 else self.default_bin
+
+
+@dataclass
+class CompiledScorecard:
+    base_score: float
+    min_score: float
+    max_score: float
+    auto_approve_threshold: float | None
+    manual_review_threshold: float | None
+    auto_decline_threshold: float | None
+    characteristics: list[CompiledCharacteristic] = field(default_factory=list)
+
+    @property
+    def data_fields(self) -> set[str]:
+        return {c.data_field for c in self.characteristics}
+
+
+def compile_scorecard(scorecard: Scorecard) -> CompiledScorecard:
+    """Compile a scorecard (characteristics and bins loaded) for batch scoring."""
+    compiled = CompiledScorecard(
+        base_score=scorecard.base_score,
+        min_score=scorecard.min_score,
+        max_score=scorecard.max_score,
+        auto_approve_threshold=scorecard.auto_approve_threshold,
+        manual_review_threshold=scorecard.manual_review_threshold,
+        auto_decline_threshold=scorecard.auto_decline_threshold,
+    )
+    for char in scorecard.characteristics:
+        if char.is_active:
+            compiled.characteristics.append(_compile_characteristic(char))
+    return compiled
+
+
+def _compile_characteristic(char: ScorecardCharacteristic) -> CompiledCharacteristic:
+    ranges: list[tuple[float, float, int]] = []
+    categories: dict[str, int] = {}
+    default_bin = -1
+    labels: list[str] = []
+    points: list[float] = []
+    weighted: list[float] = []
+
+    for idx, b in enumerate(char.bins):
+        labels.append(b.label)
+        points.append(b.points)
+        weighted.append(b.points * char.weight_multiplier)
+        if b.bin_type == BinType.DEFAULT:
+            default_bin = idx
+        elif b.bin_type == BinType.RANGE:
+            min_v = b.min_value if b.min_value is not None else float("-inf")
+            max_v = b.max_value if b.max_value is not None else float("inf")
+            if min_v < max_v:
+                ranges.append((min_v, max_v, idx))
+        elif b.bin_type == BinType.CATEGORY:
+            categories.setdefault((b.category_value or "").strip().lower(), idx)
+
+    # Split the number line at every bin edge; within each elementary
+    # interval the set of covering bins is constant, so the earliest one
+    # (the bin a linear scan would hit first) can be resolved up front.
+    edges = sorted({v for lo, hi, _ in ranges for v in (lo, hi)})
+    segment_bins: list[int] = []
+    for lo, hi in zip(edges, edges[1:]):
+        covering = [idx for r_lo, r_hi, idx in ranges if r_lo <= lo and hi <= r_hi]
+        segment_bins.append(min(covering) if covering else -1)
+
+    return CompiledCharacteristic(
+        code=char.code,
+        name=char.name,
+        data_field=char.data_field,
+        weight_multiplier=char.weight_multiplier,
+        edges=edges,
+        segment_bins=segment_bins,
+        categories=categories,
+        default_bin=default_bin,
+        bin_labels=labels,
+        bin_points=points,
+        bin_weighted=weighted,
+        bin_rounded=[round(p, 2) for p in weighted],
+    )
+
+
+def _match_column(char: CompiledCharacteristic, values: list[Any]) -> list[int]:
+    """Resolve bins for a whole column, matching each distinct value once."""
+    memo: dict[tuple[type, Any], int] = {}
+    out: list[int] = []
+    for v in values:
+        key = (v.__class__, v)
+        try:
+            idx = memo.get(key)
+        except TypeError:  # unhashable value
+            out.append(char.match(v))
+            continue
+        if idx is None:
+            idx = memo[key] = char.match(v)
+        out.append(idx)
+    return out
+
+
+def _score_columns(
+    compiled: CompiledScorecard,
+    rows: list[dict[str, Any]],
+) -> tuple[list[float], list[list[int]]]:
+    """Return clamped totals and per-characteristic bin indices for ``rows``."""
+    totals = [compiled.base_score] * len(rows)
+    matches: list[list[int]] = []
+    for char in compiled.characteristics:
+        field_name = char.data_field
+        idxs = _match_column(char, [row.get(field_name) for row in rows])
+        weighted = char.bin_weighted
+        for i, idx in enumerate(idxs):
+            totals[i] += weighted[idx] if idx >= 0 else 0.0
+        matches.append(idxs)
+    lo, hi = compiled.min_score, compiled.max_score
+    return [max(lo, min(t, hi)) for t in totals], matches
+
+
+def score_totals(
+    compiled: CompiledScorecard,
+    rows: list[dict[str, Any]],
+) -> list[tuple[float, str]]:
+    """Score ``rows`` returning only ``(total_score, decision)`` per applicant."""
+    totals, _ = _score_columns(compiled, rows)
+    return [(round(t, 2), _determine_decision(t, compiled)) for t in totals]
+
+
+def score_batch(
+    compiled: CompiledScorecard,
+    rows: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Score ``rows``, returning one ``score_application``-shaped dict per row.
+
+    Everything except the echoed raw values depends only on which bin each
+    characteristic matched, so the ranking (decision, reason codes, top
+    factors) is built once per distinct bin combination and reused.
+    """
+    totals, matches = _score_columns(compiled, rows)
+    chars = compiled.characteristics
+    templates = [
+        [_entry_template(char, idx) for idx in range(len(char.bin_labels))]
+        + [_entry_template(char, -1)]  # indexed by -1 when no bin matched
+        for char in chars
+    ]
+    outcomes: dict[tuple[int, ...], tuple[str, list, list, list]] = {}
+    results: list[dict[str, Any]] = []
+
+    for i, row in enumerate(rows):
+        combo = tuple(idxs[i] for idxs in matches)
+        contributions: list[dict] = []
+        for char, char_templates, idx in zip(chars, templates, combo):
+            entry = char_templates[idx].copy()
+            raw_value = row.get(char.data_field)
+            entry["value"] = str(raw_value) if raw_value is not None else None
+            contributions.append(entry)
+
+        total_score = totals[i]
+        outcome = outcomes.get(combo)
+        if outcome is None:
+            outcome = outcomes[combo] = _rank_contributions(
+                contributions, _determine_decision(total_score, compiled),
+            )
+        decision, reason_codes, top_positive, top_negative = outcome
+
+        results.append({
+            "total_score": round(total_score, 2),
+            "base_score_used": compiled.base_score,
+            "characteristic_scores": contributions,
+            "decision": decision,
+            "reason_codes": list(reason_codes),
+            "top_positive_factors": [f.copy() for f in top_positive],
+            "top_negative_factors": [f.copy() for f in top_negative],
+        })
+
+    return results
+
+
+def _entry_template(char: CompiledCharacteristic, idx: int) -> dict[str, Any]:
+    matched = idx >= 0
+    return {
+        "code": char.code,
+        "name": char.name,
+        "data_field": char.data_field,
+        "value": None,
+        "bin_label": char.bin_labels[idx] if matched else "Missing/Default",
+        "raw_points": char.bin_points[idx] if matched else 0,
+        "weight_multiplier": char.weight_multiplier,
+        "weighted_points": char.bin_rounded[idx] if matched else 0.0,
+    }
+
+
+def _rank_contributions(
+    contributions: list[dict],
+    decision: str,
+) -> tuple[str, list[str], list[dict], list[dict]]:
+    """Reason codes and top factors, exactly as ``score_application`` builds them."""
+    sorted_by_points = sorted(contributions, key=lambda x: x["weighted_points"])
+    reason_codes = _generate_reason_codes(contributions, decision)
+    top_negative = [
+        {"code": c["code"], "name": c["name"], "points": c["weighted_points"], "bin": c["bin_label"]}
+        for c in sorted_by_points[:3] if c["weighted_points"] < 0
+    ]
+    top_positive = [
+        {"code": c["code"], "name": c["name"], "points": c["weighted_points"], "bin": c["bin_label"]}
+        for c in reversed(sorted_by_points) if c["weighted_points"] > 0
+    ][:3]
+    return decision, reason_codes, top_positive, top_negative
+
+
+def _iter_csv_chunks(
+    compiled: CompiledScorecard,
+    lines: Iterable[str],
+    chunk_size: int,
+) -> Iterator[tuple[list[dict[str, str]], list[dict[str, Any]]]]:
+    """Yield ``(raw_rows, applicant_rows)`` chunks parsed from CSV lines.
+
+    Only the columns the scorecard reads are numeric-coerced.
+    """
+    fields = compiled.data_fields
+    reader = csv.DictReader(lines)
+    while True:
+        raw_rows = list(islice(reader, chunk_size))
+        if not raw_rows:
+            return
+
+        rows: list[dict[str, Any]] = []
+        for row in raw_rows:
+            applicant_data: dict[str, Any] = {}
+            for key in fields:
+                val = row.get(key)
+                if val is None or val.strip() == "":
+                    applicant_data[key] = None
+                else:
+                    try:
+                        applicant_data[key] = float(val)
+                    except ValueError:
+                        applicant_data[key] = val.strip()
+            rows.append(applicant_data)
+        yield raw_rows, rows
+
+
+def iter_batch_score_csv(
+    scorecard: Scorecard | CompiledScorecard,
+    lines: Iterable[str],
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> Iterator[list[dict[str, Any]]]:
+    """Stream CSV lines through the batch scorer, yielding scored chunks.
+
+    Memory stays bounded by ``chunk_size`` regardless of file length.
+    """
+    compiled = scorecard if isinstance(scorecard, CompiledScorecard) else compile_scorecard(scorecard)
+    row_num = 1
+    for raw_rows, rows in _iter_csv_chunks(compiled, lines, chunk_size):
+        scored = score_batch(compiled, rows)
+        for score_result, row in zip(scored, raw_rows):
+            row_num += 1
+            score_result["row_number"] = row_num
+            score_result["input_data"] = {k: v for k, v in row.items() if v}
+        yield scored
+
 
 def batch_score_csv(
     scorecard: Scorecard,
     csv_content: str,
 ) -> list[dict[str, Any]]:
     """Score a batch of applicants from CSV content."""
-    reader = csv.DictReader(io.StringIO(csv_content))
-    results = []
+    results: list[dict[str, Any]] = []
+    for chunk in iter_batch_score_csv(scorecard, io.StringIO(csv_content)):
+        results.extend(chunk)
+    return results
 
-    for row_num, row in enumerate(reader, start=2):
-        # Convert numeric fields
-        applicant_data = {}
-        for key, val in row.items():
-            if val is None or val.strip() == "":
-                applicant_data[key] = None
-            else:
-                try:
-                    applicant_data[key] = float(val)
-                except ValueError:
-                    applicant_data[key] = val.strip()
 
-        score_result = score_application(scorecard, applicant_data)
-        score_result["row_number"] = row_num
-        score_result["input_data"] = {k: v for k, v in row.items() if v}
-        results.append(score_result)
+def batch_score_summary(
+    scorecard: Scorecard | CompiledScorecard,
+    lines: Iterable[str],
+    max_results: int = 1000,
+) -> dict[str, Any]:
+    """Score a CSV stream returning full detail for the first ``max_results`` rows.
 
-    return results
+    Rows past the detail limit only feed the running totals, so arbitrarily
+    large uploads are scored in bounded memory.
+    """
+    compiled = scorecard if isinstance(scorecard, CompiledScorecard) else compile_scorecard(scorecard)
+    results: list[dict[str, Any]] = []
+    total = 0
+    score_sum = 0
+    decisions = {"AUTO_APPROVE": 0, "MANUAL_REVIEW": 0, "AUTO_DECLINE": 0}
+
+    for raw_rows, rows in _iter_csv_chunks(compiled, lines, BATCH_CHUNK_SIZE):
+        keep = min(max(max_results - len(results), 0), len(rows))
+        if keep:
+            detailed = score_batch(compiled, rows[:keep])
+            for offset, (score_result, row) in enumerate(zip(detailed, raw_rows)):
+                score_result["row_number"] = total + offset + 2
+                score_result["input_data"] = {k: v for k, v in row.items() if v}
+            results.extend(detailed)
+        for total_score, decision in score_totals(compiled, rows):
+            total += 1
+            score_sum += total_score
+            decisions[decision] += 1
+
+    denom = max(total, 1)
+    return {
+        "total_scored": total,
+        "results": results,
+        "summary": {
+            "avg_score": round(score_sum / denom, 1),
+            "approval_rate": round(decisions["AUTO_APPROVE"] / denom * 100, 1),
+            "decline_rate": round(decisions["AUTO_DECLINE"] / denom * 100, 1),
+            "review_rate": round(decisions["MANUAL_REVIEW"] / denom * 100, 1),
+        },
+    }
 
 
 # ────────────────────────────────────────────────────────────────────
@@ -0,0 +1,262 @@
+"""Scorecard Metrics — rank statistics (AUC/Gini, KS), PSI, IV and score-band
+tables over scored populations, plus the grouped default-flag lookup they feed on.
+
+Everything here works from a single sort of the scores, with tied scores
+grouped so that the results do not depend on the order ties come back from
+the database.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payment import PaymentSchedule, ScheduleStatus
+
+# A loan is counted as defaulted once an instalment is overdue past this
+DEFAULT_DAYS_PAST_DUE = 90
+
+PSI_WARNING = 0.1
+PSI_CRITICAL = 0.25
+
+
+# ────────────────────────────────────────────────────────────────────
+# 1. Default Flags
+# ────────────────────────────────────────────────────────────────────
+
+def defaulted_loans_query(as_of: date | None = None) -> Select:
+    """Select the ids of loans with an instalment overdue beyond the default horizon."""
+    as_of = as_of or date.today()
+    return (
+        select(PaymentSchedule.loan_application_id)
+        .where(
+            PaymentSchedule.status == ScheduleStatus.OVERDUE,
+            PaymentSchedule.due_date < as_of - timedelta(days=DEFAULT_DAYS_PAST_DUE),
+        )
+        .group_by(PaymentSchedule.loan_application_id)
+    )
+
+
+async def fetch_defaulted_loan_ids(
+    db: AsyncSession,
+    loan_ids: Select | Iterable[int] | None = None,
+    as_of: date | None = None,
+) -> set[int]:
+    """Return the subset of ``loan_ids`` that have defaulted, in one grouped query.
+
+    ``loan_ids`` may be a subquery selecting loan ids, so the candidate set is
+    never materialised client side.
+    """
+    q = defaulted_loans_query(as_of)
+    if loan_ids is not None:
+        q = q.where(PaymentSchedule.loan_application_id.in_(loan_ids))
+    return set((await db.execute(q)).scalars().all())
+
+
+# ────────────────────────────────────────────────────────────────────
+# 2. Rank Statistics
+# ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class RankStats:
+    """Scores collapsed into ascending tie groups of (score, bads, goods)."""
+    groups: list[tuple[float, int, int]]
+    n_bad: int
+    n_good: int
+
+    @property
+    def separable(self) -> bool:
+        return self.n_bad > 0 and self.n_good > 0
+
+
+def rank_statistics(scores: list[float], defaults: list[bool]) -> RankStats:
+    order = sorted(range(len(scores)), key=scores.__getitem__)
+    groups: list[tuple[float, int, int]] = []
+    n_bad = 0
+    current = None
+    bad = good = 0
+    for i in order:
+        s = scores[i]
+        if s != current:
+            if current is not None:
+                groups.append((current, bad, good))
+            current, bad, good = s, 0, 0
+        if defaults[i]:
+            bad += 1
+            n_bad += 1
+        else:
+            good += 1
+    if current is not None:
+        groups.append((current, bad, good))
+    return RankStats(groups=groups, n_bad=n_bad, n_good=len(scores) - n_bad)
+
+
+def auc_from_ranks(stats: RankStats) -> float:
+    """P(bad scores below good), counting ties as half (Mann-Whitney U / n_bad·n_good)."""
+    if not stats.separable:
+        return 0.5
+    cum_bad = 0
+    u = 0.0
+    for _, bad, good in stats.groups:
+        u += good * (cum_bad + bad / 2)
+        cum_bad += bad
+    return u / (stats.n_bad * stats.n_good)
+
+
+def ks_from_ranks(stats: RankStats) -> float:
+    """Maximum gap between the bad and good score CDFs, evaluated at tie boundaries."""
+    if not stats.separable:
+        return 0.0
+    cum_bad = cum_good = 0
+    max_ks = 0.0
+    for _, bad, good in stats.groups:
+        cum_bad += bad
+        cum_good += good
+        max_ks = max(max_ks, abs(cum_bad / stats.n_bad - cum_good / stats.n_good))
+    return max_ks
+
+
+def calculate_gini(scores: list[float], defaults: list[bool]) -> float:
+    """Calculate Gini coefficient from scores and default flags.
+
+    Gini = 2 * AUC - 1
+    """
+    if len(scores) < 2:
+        return 0.0
+    stats = rank_statistics(scores, defaults)
+    if not stats.separable:
+        return 0.0
+    return round(abs(2 * auc_from_ranks(stats) - 1), 4)
+
+
+def calculate_ks(scores: list[float], defaults: list[bool]) -> float:
+    """Kolmogorov-Smirnov statistic — max separation between good/bad CDFs."""
+    if len(scores) < 2:
+        return 0.0
+    return round(ks_from_ranks(rank_statistics(scores, defaults)), 4)
+
+
+# ────────────────────────────────────────────────────────────────────
+# 3. PSI and IV
+# ────────────────────────────────────────────────────────────────────
+
+def calculate_psi(
+    expected_pcts: list[float],
+    actual_pcts: list[float],
+) -> float:
+    """Calculate PSI between two distributions (as percentage arrays).
+
+    PSI = Σ (actual_i - expected_i) * ln(actual_i / expected_i)
+    """
+    if len(expected_pcts) != len(actual_pcts):
+        return 0.0
+
+    psi = 0.0
+    for exp, act in zip(expected_pcts, actual_pcts):
+        exp = max(exp, 0.001)  # avoid log(0)
+        act = max(act, 0.001)
+        psi += (act - exp) * math.log(act / exp)
+
+    return round(abs(psi), 4)
+
+
+def build_score_distribution_pcts(
+    scores: list[float],
+    min_score: float,
+    max_score: float,
+    n_bands: int = 10,
+) -> list[float]:
+    """Build percentage distribution across score bands."""
+    if not scores:
+        return [0.0] * n_bands
+
+    band_size = (max_score - min_score) / n_bands
+    counts = [0] * n_bands
+    total = len(scores)
+
+    for s in scores:
+        idx = int((s - min_score) / band_size)
+        idx = max(0, min(idx, n_bands - 1))
+        counts[idx] += 1
+
+    return [c / total if total > 0 else 0.0 for c in counts]
+
+
+def calculate_iv(
+    bin_good_pcts: list[float],
+    bin_bad_pcts: list[float],
+) -> float:
+    """Calculate Information Value for a characteristic.
+
+    IV = Σ (good_pct_i - bad_pct_i) * ln(good_pct_i / bad_pct_i)
+    """
+    iv = 0.0
+    for g, b in zip(bin_good_pcts, bin_bad_pcts):
+        g = max(g, 0.001)
+        b = max(b, 0.001)
+        iv += (g - b) * math.log(g / b)
+    return round(abs(iv), 4)
+
+
+# ────────────────────────────────────────────────────────────────────
+# 4. Score Band Tables
+# ────────────────────────────────────────────────────────────────────
+
+def score_band_tables(
+    scores: list[float],
+    defaults: list[bool],
+    decisions: list[str | None],
+    min_score: float,
+    max_score: float,
+    n_bands: int = 10,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Bucket a scored population into equal-width bands in a single pass.
+
+    Returns ``(distribution, band_analysis)``: the first lists every band,
+    the second only populated bands with approval and default rates.
+    Scores outside ``[min_score, max_score)`` fall in no band.
+    """
+    total = len(scores)
+    band_size = (max_score - min_score) / n_bands
+    lowers = [min_score + i * band_size for i in range(n_bands)]
+    uppers = [lower + band_size for lower in lowers]
+
+    counts = [0] * n_bands
+    band_defaults = [0] * n_bands
+    band_approved = [0] * n_bands
+    for s, d, dec in zip(scores, defaults, decisions):
+        idx = bisect_right(lowers, s) - 1
+        if idx < 0 or not s < uppers[idx]:
+            continue
+        counts[idx] += 1
+        band_defaults[idx] += d
+        band_approved[idx] += dec == "AUTO_APPROVE"
+
+    distribution = []
+    bands_analysis = []
+    for i in range(n_bands):
+        label = f"{int(lowers[i])}-{int(uppers[i])}"
+        count = counts[i]
+        distribution.append({
+            "band": label,
+            "count": count,
+            "pct": round(count / total * 100, 1) if total else 0,
+        })
+        if count:
+            bands_analysis.append({
+                "band": label,
+                "count": count,
+                "pct_of_total": round(count / total * 100, 1),
+                "approved": band_approved[i],
+                "approval_rate": round(band_approved[i] / count * 100, 1),
+                "default_count": band_defaults[i],
+                "default_rate": round(band_defaults[i] / count * 100, 2),
+            })
+
+    return distribution, bands_analysis
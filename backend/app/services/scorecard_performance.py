@@ -5,11 +5,10 @@ vintage analysis, score band analysis, and health alerts.
 from __future__ import annotations
 
 import logging
-import math
 from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
-from sqlalchemy import select, func, and_, case as sa_case
+from sqlalchemy import select, func, and_, case as sa_case, literal_column
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -18,146 +17,18 @@ from app.models.scorecard import (
     ScorecardPerformanceSnapshot, ScorecardAlert,
 )
 from app.models.loan import LoanApplication, LoanStatus
-from app.models.payment import PaymentSchedule, ScheduleStatus
+from app.services.scorecard_metrics import (
+    PSI_CRITICAL, PSI_WARNING,
+    build_score_distribution_pcts, calculate_gini, calculate_iv,  # noqa: F401
+    calculate_ks, calculate_psi, defaulted_loans_query,
+    fetch_defaulted_loan_ids, score_band_tables,
+)
 
 logger = logging.getLogger(__name__)
 
 
 # ────────────────────────────────────────────────────────────────────
-# 1. Gini Coefficient
-# ────────────────────────────────────────────────────────────────────
-
-def calculate_gini(scores: list[float], defaults: list[bool]) -> float:
-    """Calculate Gini coefficient from scores and default flags.
-
-    Gini = 2 * AUC - 1
-    """
-    if len(scores) < 2:
-        return 0.0
-
-    paired = list(zip(scores, defaults))
-    paired.sort(key=lambda x: x[0])
-
-    n = len(paired)
-    n_bad = sum(1 for _, d in paired if d)
-    n_good = n - n_bad
-
-    if n_bad == 0 or n_good == 0:
-        return 0.0
-
-    cum_bad = 0
-    auc = 0.0
-
-    for score, is_default in paired:
-        if is_default:
-            cum_bad += 1
-        else:
-            auc += cum_bad
-
-    auc /= (n_bad * n_good)
-    gini = 2 * auc - 1
-    return round(abs(gini), 4)
-
-
-# ────────────────────────────────────────────────────────────────────
-# 2. KS Statistic
-# ────────────────────────────────────────────────────────────────────
-
-def calculate_ks(scores: list[float], defaults: list[bool]) -> float:
-    """Kolmogorov-Smirnov statistic — max separation between good/bad CDFs."""
-    if len(scores) < 2:
-        return 0.0
-
-    paired = sorted(zip(scores, defaults), key=lambda x: x[0])
-    n_bad = sum(1 for _, d in paired if d)
-    n_good = len(paired) - n_bad
-
-    if n_bad == 0 or n_good == 0:
-        return 0.0
-
-    cum_bad = 0
-    cum_good = 0
-    max_ks = 0.0
-
-    for _, is_default in paired:
-        if is_default:
-            cum_bad += 1
-        else:
-            cum_good += 1
-        ks = abs(cum_bad / n_bad - cum_good / n_good)
-        max_ks = max(max_ks, ks)
-
-    return round(max_ks, 4)
-
-
-# ────────────────────────────────────────────────────────────────────
-# 3. PSI (Population Stability Index)
-# ────────────────────────────────────────────────────────────────────
-
-def calculate_psi(
-    expected_pcts: list[float],
-    actual_pcts: list[float],
-) -> float:
-    """Calculate PSI between two distributions (as percentage arrays).
-
-    PSI = Σ (actual_i - expected_i) * ln(actual_i / expected_i)
-    """
-    if len(expected_pcts) != len(actual_pcts):
-        return 0.0
-
-    psi = 0.0
-    for exp, act in zip(expected_pcts, actual_pcts):
-        exp = max(exp, 0.001)  # avoid log(0)
-        act = max(act, 0.001)
-        psi += (act - exp) * math.log(act / exp)
-
-    return round(abs(psi), 4)
-
-
-def build_score_distribution_pcts(
-    scores: list[float],
-    min_score: float,
-    max_score: float,
-    n_bands: int = 10,
-) -> list[float]:
-    """Build percentage distribution across score bands."""
-    if not scores:
-        return [0.0] * n_bands
-
-    band_size = (max_score - min_score) / n_bands
-    counts = [0] * n_bands
-    total = len(scores)
-
-    for s in scores:
-        idx = int((s - min_score) / band_size)
-        idx = max(0, min(idx, n_bands - 1))
-        counts[idx] += 1
-
-    return [c / total if total > 0 else 0.0 for c in counts]
-
-
-# ────────────────────────────────────────────────────────────────────
-# 4. Information Value (IV)
-# ────────────────────────────────────────────────────────────────────
-
-def calculate_iv(
-    bin_good_pcts: list[float],
-    bin_bad_pcts: list[float],
-) -> float:
-    """Calculate Information Value for a characteristic.
-
-    IV = Σ (good_pct_i - bad_pct_i) * ln(good_pct_i / bad_pct_i)
-    """
-    iv = 0.0
-    for g, b in zip(bin_good_pcts, bin_bad_pcts):
-        g = max(g, 0.001)
-        b = max(b, 0.001)
-        iv += (g - b) * math.log(g / b)
-    return round(abs(iv), 4)
-
-
-# ────────────────────────────────────────────────────────────────────
-# 5. Generate Performance Snapshot
+# 1. Generate Performance Snapshot
 # ────────────────────────────────────────────────────────────────────
 
 async def generate_performance_snapshot(
@@ -169,15 +40,17 @@ async def generate_performance_snapshot(
     today = date.today()
     cutoff = today - timedelta(days=period_months * 30)
 
-    # Get score results for this scorecard
+    # Score results for this scorecard, oldest first (PSI compares halves)
+    scored_filter = (
+        ScoreResult.scorecard_id == scorecard_id,
+        ScoreResult.scored_at >= datetime(cutoff.year, cutoff.month, cutoff.day, tzinfo=timezone.utc),
+    )
     scores_q = (
-        select(ScoreResult)
-        .where(
-            ScoreResult.scorecard_id == scorecard_id,
-            ScoreResult.scored_at >= datetime(cutoff.year, cutoff.month, cutoff.day, tzinfo=timezone.utc),
-        )
+        select(ScoreResult.loan_application_id, ScoreResult.total_score, ScoreResult.decision)
+        .where(*scored_filter)
+        .order_by(ScoreResult.scored_at, ScoreResult.id)
     )
-    score_results = (await db.execute(scores_q)).scalars().all()
+    score_results = (await db.execute(scores_q)).all()
 
     if not score_results:
         # Check for existing empty snapshot today
@@ -208,34 +81,26 @@ async def generate_performance_snapshot(
 
     # Count decisions
     total = len(score_results)
-    approved = sum(1 for s in score_results if s.decision == "AUTO_APPROVE")
-    declined = sum(1 for s in score_results if s.decision == "AUTO_DECLINE")
-    review = sum(1 for s in score_results if s.decision == "MANUAL_REVIEW")
-
-    # Get scores and default flags
-    scores_list: list[float] = []
-    defaults_list: list[bool] = []
-
-    for sr in score_results:
-        scores_list.append(sr.total_score)
-        # Check if loan defaulted (has overdue payments > 90 days)
-        overdue_q = (
-            select(func.count())
-            .where(
-                PaymentSchedule.loan_application_id == sr.loan_application_id,
-                PaymentSchedule.status == ScheduleStatus.OVERDUE,
-                PaymentSchedule.due_date < today - timedelta(days=90),
-            )
-        )
-        overdue_count = (await db.execute(overdue_q)).scalar() or 0
-        defaults_list.append(overdue_count > 0)
+    decisions_list = [r.decision for r in score_results]
+    approved = decisions_list.count("AUTO_APPROVE")
+    declined = decisions_list.count("AUTO_DECLINE")
+    review = decisions_list.count("MANUAL_REVIEW")
+
+    # Default flags for every scored loan in one grouped query
+    defaulted = await fetch_defaulted_loan_ids(
+        db,
+        select(ScoreResult.loan_application_id).where(*scored_filter),
+        as_of=today,
+    )
+    scores_list = [r.total_score for r in score_results]
+    defaults_list = [r.loan_application_id in defaulted for r in score_results]
 
     # Calculate metrics
     gini = calculate_gini(scores_list, defaults_list)
     ks = calculate_ks(scores_list, defaults_list)
 
     # Default rate
-    n_defaults = sum(1 for d in defaults_list if d)
+    n_defaults = sum(defaults_list)
     default_rate = n_defaults / total if total > 0 else 0
 
     # Average scores
@@ -251,42 +116,10 @@ async def generate_performance_snapshot(
     min_s = sc.min_score if sc else 100
     max_s = sc.max_score if sc else 850
 
-    # Score distribution
-    n_bands = 10
-    band_size = (max_s - min_s) / n_bands
-    distribution = []
-    for i in range(n_bands):
-        lower = min_s + i * band_size
-        upper = lower + band_size
-        count = sum(1 for s in scores_list if lower <= s < upper)
-        distribution.append({
-            "band": f"{int(lower)}-{int(upper)}",
-            "count": count,
-            "pct": round(count / total * 100, 1),
-        })
-
-    # Score band analysis
-    bands_analysis = []
-    for i in range(n_bands):
-        lower = min_s + i * band_size
-        upper = lower + band_size
-        band_scores = [(s, d) for s, d in zip(scores_list, defaults_list) if lower <= s < upper]
-        if band_scores:
-            band_total = len(band_scores)
-            band_defaults = sum(1 for _, d in band_scores if d)
-            band_approved = sum(
-                1 for sr in score_results
-                if lower <= sr.total_score < upper and sr.decision == "AUTO_APPROVE"
-            )
-            bands_analysis.append({
-                "band": f"{int(lower)}-{int(upper)}",
-                "count": band_total,
-                "pct_of_total": round(band_total / total * 100, 1),
-                "approved": band_approved,
-                "approval_rate": round(band_approved / band_total * 100, 1) if band_total > 0 else 0,
-                "default_count": band_defaults,
-                "default_rate": round(band_defaults / band_total * 100, 2) if band_total > 0 else 0,
-            })
+    # Score distribution and band analysis
+    distribution, bands_analysis = score_band_tables(
+        scores_list, defaults_list, decisions_list, min_s, max_s,
+    )
 
     # PSI (compare first half vs second half as a simple baseline)
     half = len(scores_list) // 2
@@ -338,7 +171,7 @@ async def generate_performance_snapshot(
 
 
 # ────────────────────────────────────────────────────────────────────
-# 6. Champion vs Challenger Comparison
+# 2. Champion vs Challenger Comparison
 # ────────────────────────────────────────────────────────────────────
 
 async def champion_challenger_comparison(
@@ -352,17 +185,24 @@ async def champion_challenger_comparison(
         ]))
     )
     scorecards = (await db.execute(scorecards_q)).scalars().all()
+    if not scorecards:
+        return []
+
+    # Latest snapshot per scorecard in one query
+    snap_q = (
+        select(ScorecardPerformanceSnapshot)
+        .where(ScorecardPerformanceSnapshot.scorecard_id.in_([sc.id for sc in scorecards]))
+        .distinct(ScorecardPerformanceSnapshot.scorecard_id)
+        .order_by(
+            ScorecardPerformanceSnapshot.scorecard_id,
+            ScorecardPerformanceSnapshot.snapshot_date.desc(),
+        )
+    )
+    latest = {snap.scorecard_id: snap for snap in (await db.execute(snap_q)).scalars().all()}
 
     comparisons = []
     for sc in scorecards:
-        # Latest snapshot
-        snap_q = (
-            select(ScorecardPerformanceSnapshot)
-            .where(ScorecardPerformanceSnapshot.scorecard_id == sc.id)
-            .order_by(ScorecardPerformanceSnapshot.snapshot_date.desc())
-            .limit(1)
-        )
-        snap = (await db.execute(snap_q)).scalar_one_or_none()
+        snap = latest.get(sc.id)
 
         comparisons.append({
             "scorecard_id": sc.id,
@@ -386,7 +226,7 @@ async def champion_challenger_comparison(
 
 
 # ────────────────────────────────────────────────────────────────────
-# 7. Score Band Analysis (detailed)
+# 3. Score Band Analysis (detailed)
 # ────────────────────────────────────────────────────────────────────
 
 async def get_score_band_analysis(
@@ -408,7 +248,7 @@ async def get_score_band_analysis(
 
 
 # ────────────────────────────────────────────────────────────────────
-# 8. Health Alert Checks
+# 4. Health Alert Checks
 # ────────────────────────────────────────────────────────────────────
 
 async def check_scorecard_health(
@@ -435,14 +275,14 @@ async def check_scorecard_health(
 
     # PSI breach
     if latest.psi is not None:
-        if latest.psi > 0.25:
+        if latest.psi > PSI_CRITICAL:
             alerts.append({
                 "type": "psi_breach", "severity": "critical",
                 "title": f"PSI Critical: {sc_name}",
                 "message": f"Score distribution has shifted significantly (PSI = {latest.psi}). Population may have changed.",
                 "recommendation": "Review characteristic-level stability. Consider recalibrating scorecard bins.",
             })
-        elif latest.psi > 0.1:
+        elif latest.psi > PSI_WARNING:
             alerts.append({
                 "type": "psi_breach", "severity": "warning",
                 "title": f"PSI Warning: {sc_name}",
@@ -499,7 +339,7 @@ async def check_scorecard_health(
 
 
 # ────────────────────────────────────────────────────────────────────
-# 9. Vintage Analysis
+# 5. Vintage Analysis
 # ────────────────────────────────────────────────────────────────────
 
 async def get_vintage_analysis(
@@ -509,45 +349,50 @@ async def get_vintage_analysis(
 ) -> list[dict[str, Any]]:
     """Vintage analysis: default rate by origination month."""
     today = date.today()
-    vintages = []
 
+    windows: list[tuple[int, date, date]] = []
     for i in range(n_months, 0, -1):
         month_start = (today.replace(day=1) - timedelta(days=i * 30)).replace(day=1)
         if month_start.month == 12:
             month_end = month_start.replace(year=month_start.year + 1, month=1, day=1)
         else:
             month_end = month_start.replace(month=month_start.month + 1, day=1)
+        windows.append((i, month_start, month_end))
+    if not windows:
+        return []
 
-        # Count scored in this vintage
-        scored_q = (
-            select(func.count())
-            .where(
-                ScoreResult.scorecard_id == scorecard_id,
-                ScoreResult.scored_at >= datetime(month_start.year, month_start.month, month_start.day, tzinfo=timezone.utc),
-                ScoreResult.scored_at < datetime(month_end.year, month_end.month, month_end.day, tzinfo=timezone.utc),
-            )
-        )
-        scored = (await db.execute(scored_q)).scalar() or 0
-
-        # Count defaults from those applications
-        default_q = (
-            select(func.count(func.distinct(ScoreResult.loan_application_id)))
-            .where(
-                ScoreResult.scorecard_id == scorecard_id,
-                ScoreResult.scored_at >= datetime(month_start.year, month_start.month, month_start.day, tzinfo=timezone.utc),
-                ScoreResult.scored_at < datetime(month_end.year, month_end.month, month_end.day, tzinfo=timezone.utc),
-                ScoreResult.loan_application_id.in_(
-                    select(PaymentSchedule.loan_application_id)
-                    .where(
-                        PaymentSchedule.status == ScheduleStatus.OVERDUE,
-                        PaymentSchedule.due_date < today - timedelta(days=90),
-                    )
-                    .distinct()
-                ),
-            )
+    def _utc(d: date) -> datetime:
+        return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+    # Scored and defaulted counts for every vintage month in one grouped query
+    months = sorted({(start, end) for _, start, end in windows})
+    month_key = sa_case(
+        *[
+            (and_(ScoreResult.scored_at >= _utc(start), ScoreResult.scored_at < _utc(end)), idx)
+            for idx, (start, end) in enumerate(months)
+        ],
+    ).label("month_idx")
+    defaulted_app = sa_case(
+        (ScoreResult.loan_application_id.in_(defaulted_loans_query(today)), ScoreResult.loan_application_id),
+    )
+    counts_q = (
+        select(month_key, func.count(), func.count(func.distinct(defaulted_app)))
+        .where(
+            ScoreResult.scorecard_id == scorecard_id,
+            ScoreResult.scored_at >= _utc(months[0][0]),
+            ScoreResult.scored_at < _utc(months[-1][1]),
         )
-        defaults = (await db.execute(default_q)).scalar() or 0
+        .group_by(literal_column("month_idx"))
+    )
+    counts = {
+        months[idx]: (scored, defaults)
+        for idx, scored, defaults in (await db.execute(counts_q)).all()
+        if idx is not None
+    }
 
+    vintages = []
+    for i, month_start, month_end in windows:
+        scored, defaults = counts.get((month_start, month_end), (0, 0))
         vintages.append({
             "vintage": month_start.strftime("%Y-%m"),
             "originated": scored,
@@ -560,7 +405,7 @@ async def get_vintage_analysis(
 
 
 # ────────────────────────────────────────────────────────────────────
-# 10. Performance History (trend)
+# 6. Performance History (trend)
 # ────────────────────────────────────────────────────────────────────
 
 async def get_performance_history(
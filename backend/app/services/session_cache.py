@@ -0,0 +1,340 @@
+"""Session-validity cache and write-behind heartbeat for ``get_current_user``.
+
+Every authenticated call used to run ``UPDATE user_sessions SET
+last_activity_at`` — taking a row lock just to learn that the session was
+still active — and then ``SELECT users``.  Now:
+
+* A validated access token's ``jti`` maps to a snapshot of its user's
+  columns for :data:`SESSION_TTL` seconds.  A hit rebuilds the ``User``
+  and merges it into the request's session without touching the database,
+  so endpoints can still modify and flush ``current_user`` as before.
+* ``last_activity_at`` is written behind: :meth:`HeartbeatBuffer.touch`
+  queues at most one write per session per :data:`HEARTBEAT_INTERVAL`,
+  and a background task sends the queued writes as one batched UPDATE.
+
+Entries are dropped when their session is revoked or their user row
+changes.  Revocation sites call :func:`revoke_on_commit`, while ``User``
+updates and deletes are picked up by mapper events.  After the transaction
+commits, the change is broadcast on :data:`CHANNEL` so every worker drops
+its copy.  If Redis is unreachable, other workers keep acting on a revoked
+session for at most :data:`UNSUBSCRIBED_TTL` seconds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy import bindparam, event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.config import settings
+from app.models.session import UserSession
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "zotta:sessions:invalidate"
+# How long a validated session is trusted without asking the database
+SESSION_TTL = 30.0
+# ...while revocations from other workers cannot reach us
+UNSUBSCRIBED_TTL = 5.0
+# Cached sessions before the map is simply cleared
+MAX_ENTRIES = 10_000
+# Seconds between last_activity_at writes for one session
+HEARTBEAT_INTERVAL = 60.0
+# Seconds queued heartbeats wait so they go out together
+HEARTBEAT_FLUSH_INTERVAL = 2.0
+# Seconds between attempts to (re)subscribe after a Redis failure
+RESUBSCRIBE_AFTER = 5.0
+
+_DIRTY = "session_cache_dirty"
+
+
+@dataclass
+class _Entry:
+    user_id: int
+    values: dict[str, Any]
+    expires_at: float
+
+
+_entries: dict[str, _Entry] = {}
+# Bumped on every drop so a lookup that raced a revocation is not cached
+_generation = 0
+_listener: Optional[asyncio.Task] = None
+_listening = False
+_background: set[asyncio.Task] = set()
+_command_client: Optional[aioredis.Redis] = None
+
+_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Validity cache
+# ────────────────────────────────────────────────────────────────────
+
+async def cached_user(db: AsyncSession, jti: str, user_id: int) -> Optional[User]:
+    """The user for a recently validated session, attached to *db*; None on a miss."""
+    _ensure_listener()
+    entry = _entries.get(jti)
+    if entry is None or entry.user_id != user_id:
+        return None
+    if entry.expires_at <= time.monotonic():
+        _entries.pop(jti, None)
+        return None
+    user = User(**entry.values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def generation() -> int:
+    """Take before validating a session; pass to :func:`remember`."""
+    return _generation
+
+
+def remember(jti: str, user: User, since_generation: int) -> None:
+    """Cache a session validated against the database."""
+    if since_generation != _generation:
+        # Something was revoked while we were checking; don't cache over it
+        return
+    if len(_entries) >= MAX_ENTRIES:
+        _entries.clear()
+    ttl = SESSION_TTL if _listening else UNSUBSCRIBED_TTL
+    _entries[jti] = _Entry(
+        user.id, {key: getattr(user, key) for key in _COLUMNS}, time.monotonic() + ttl,
+    )
+
+
+def _drop(message: str) -> None:
+    global _generation
+    _generation += 1
+    kind, _, value = message.partition(":")
+    if kind == "jti":
+        _entries.pop(value, None)
+    elif kind == "user":
+        user_id = int(value)
+        for jti in [j for j, e in _entries.items() if e.user_id == user_id]:
+            del _entries[jti]
+    else:
+        _entries.clear()
+
+
+def drop_local() -> None:
+    """Forget every cached session in this process."""
+    _drop("all")
+
+
+# ────────────────────────────────────────────────────────────────────
+# Invalidation
+# ────────────────────────────────────────────────────────────────────
+
+def revoke_on_commit(
+    db: AsyncSession | Session, *, jti: Optional[str] = None, user_id: Optional[int] = None,
+) -> None:
+    """Drop a session (by access-token *jti*) or all of a user's sessions once *db* commits."""
+    pending = db.info.setdefault(_DIRTY, set())
+    if jti is not None:
+        pending.add(f"jti:{jti}")
+    if user_id is not None:
+        pending.add(f"user:{user_id}")
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        revoke_on_commit(session, user_id=target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    messages = session.info.pop(_DIRTY, None)
+    if not messages:
+        return
+    for message in messages:
+        _drop(message)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_publish(sorted(messages)))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_DIRTY, None)
+
+
+def _redis() -> aioredis.Redis:
+    global _command_client
+    if _command_client is None:
+        _command_client = aioredis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=0.25,
+            socket_timeout=0.25,
+        )
+    return _command_client
+
+
+async def _publish(messages: list[str]) -> None:
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for message in messages:
+            pipe.publish(CHANNEL, message)
+        await pipe.execute()
+    except (RedisError, OSError) as e:
+        logger.warning(
+            "Session cache: could not broadcast revocation (%s); other workers "
+            "expire it within %.0fs", e, SESSION_TTL,
+        )
+
+
+def _ensure_listener() -> None:
+    global _listener
+    loop = asyncio.get_running_loop()
+    if _listener is None or _listener.done() or _listener.get_loop() is not loop:
+        _listener = loop.create_task(_listen())
+
+
+async def _listen() -> None:
+    global _listening
+    while True:
+        # No socket_timeout: the subscription sits idle between messages
+        client = aioredis.from_url(
+            settings.redis_url, decode_responses=True, socket_connect_timeout=0.25,
+        )
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(CHANNEL)
+            _listening = True
+            # Revocations published while we weren't subscribed were missed
+            drop_local()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _drop(message["data"])
+        except (RedisError, OSError) as e:
+            if _listening:
+                logger.warning("Session cache: revocation listener lost (%s)", e)
+        finally:
+            _listening = False
+            try:
+                await pubsub.aclose()
+                await client.aclose()
+            except Exception:
+                pass
+        await asyncio.sleep(RESUBSCRIBE_AFTER)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Write-behind heartbeat
+# ────────────────────────────────────────────────────────────────────
+
+class HeartbeatBuffer:
+    def __init__(
+        self,
+        *,
+        interval: float = HEARTBEAT_INTERVAL,
+        flush_interval: float = HEARTBEAT_FLUSH_INTERVAL,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._pending: dict[str, datetime] = {}
+        # jti -> monotonic time of the last queued write
+        self._last_queued: dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def touch(self, jti: str) -> bool:
+        """Record activity; True if a write was queued, False if debounced."""
+        now = time.monotonic()
+        last = self._last_queued.get(jti)
+        if last is not None and now - last < self.interval:
+            return False
+        if len(self._last_queued) >= MAX_ENTRIES:
+            self._last_queued = {
+                j: t for j, t in self._last_queued.items() if now - t < self.interval
+            }
+        self._last_queued[jti] = now
+        self._pending[jti] = datetime.now(timezone.utc)
+        self._ensure_flusher()
+        return True
+
+    def _ensure_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        # Runs while sessions keep touching; the next touch restarts it
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write all queued heartbeats in one UPDATE; returns how many were sent."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+
+        factory = self._session_factory
+        if factory is None:
+            from app.database import async_session as factory
+        table = UserSession.__table__
+        try:
+            async with factory() as db:
+                await db.execute(
+                    update(table)
+                    .where(table.c.token_jti == bindparam("jti"), table.c.is_active.is_(True))
+                    .values(last_activity_at=bindparam("seen")),
+                    [{"jti": jti, "seen": seen} for jti, seen in batch.items()],
+                )
+                await db.commit()
+        except Exception as db_err:
+            # Activity timestamps are best-effort; never fail a request over them
+            logger.warning("Failed to record %d session heartbeats: %s", len(batch), db_err)
+            return 0
+        return len(batch)
+
+    async def stop(self) -> None:
+        """Cancel the flusher and write what is queued (app shutdown)."""
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+
+heartbeats = HeartbeatBuffer()
+
+
+async def stop() -> None:
+    """Flush heartbeats and cancel the revocation listener (app shutdown)."""
+    global _listener
+    await heartbeats.stop()
+    task, _listener = _listener, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -41,6 +41,11 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.collection_reminders.execute_sequence_steps",
         "schedule": crontab(minute="*/30"),  # Every 30 minutes
     },
+    # Loan servicing snapshots (DPD / arrears buckets roll over at midnight)
+    "age-servicing-snapshots": {
+        "task": "app.tasks.servicing_tasks.age_servicing_snapshots",
+        "schedule": crontab(hour=0, minute=5),  # 12:05 AM daily
+    },
     # ── Queue Management ─────────────────────────────────
     "sync-queue-entries": {
         "task": "app.tasks.queue_tasks.sync_queue_entries",
@@ -66,6 +71,16 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.queue_tasks.auto_expire",
         "schedule": crontab(hour=23, minute=0),  # 11 PM daily
     },
+    # Report jobs
+    "fail-stale-report-jobs": {
+        "task": "app.tasks.report_tasks.fail_stale_report_jobs",
+        "schedule": crontab(minute="*/15"),  # Every 15 minutes
+    },
+    # Rendered PDF cache
+    "prune-pdf-cache": {
+        "task": "app.tasks.document_tasks.prune_pdf_cache",
+        "schedule": crontab(hour=3, minute=0),  # 3 AM daily
+    },
     # Pre-Approval lifecycle
     "expire-pre-approvals": {
         "task": "app.tasks.pre_approval_tasks.expire_pre_approvals",
@@ -81,4 +96,7 @@ celery_app.conf.beat_schedule = {
 from app.tasks.decision_tasks import *  # noqa
 from app.tasks.collection_reminders import *  # noqa
 from app.tasks.queue_tasks import *  # noqa
-from app.tasks.pre_approval_tasks import *  # noqa
\ No newline at end of file
+from app.tasks.pre_approval_tasks import *  # noqa
+from app.tasks.servicing_tasks import *  # noqa
+from app.tasks.report_tasks import *  # noqa
+from app.tasks.document_tasks import *  # noqa
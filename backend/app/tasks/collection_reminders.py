@@ -1,15 +1,14 @@
 """Celery periodic task: detect overdue payments and send WhatsApp reminders."""
 
-import asyncio
 import logging
 from datetime import date, timedelta
 
 from sqlalchemy import select, and_
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.tasks import celery_app
-from app.config import settings
+from app.tasks.runtime import get_session_factory, run_async
 from app.models.payment import PaymentSchedule, ScheduleStatus
 from app.models.loan import LoanApplication
 from app.models.user import User
@@ -26,11 +25,6 @@ from app.services.collections_engine import (
 logger = logging.getLogger(__name__)
 
 
-def _get_async_session():
-    engine = create_async_engine(settings.database_url)
-    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-
 # ── Reminder message templates ────────────────────────────────────
 
 REMINDER_TEMPLATES = {
@@ -65,7 +59,7 @@ def check_overdue_and_notify() -> dict:
     """
 
     async def _run():
-        session_factory = _get_async_session()
+        session_factory = get_session_factory()
         async with session_factory() as db:
             try:
                 stats = await _process_overdue(db)
@@ -75,11 +69,7 @@ def check_overdue_and_notify() -> dict:
                 await db.rollback()
                 raise
 
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+    return run_async(_run())
 
 
 async def _process_overdue(db: AsyncSession) -> dict:
@@ -219,7 +209,7 @@ def sync_cases() -> dict:
     """Periodic (every 15 min): sync collection cases and compute NBA."""
 
     async def _run():
-        session_factory = _get_async_session()
+        session_factory = get_session_factory()
         async with session_factory() as db:
             try:
                 stats = await sync_collection_cases(db)
@@ -240,11 +230,7 @@ def sync_cases() -> dict:
                 logger.exception("sync_cases task failed")
                 raise
 
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+    return run_async(_run())
 
 
 @celery_app.task(name="app.tasks.collection_reminders.check_ptps")
@@ -252,7 +238,7 @@ def check_ptps() -> dict:
     """Daily: check pending PTPs, mark broken if past grace period."""
 
     async def _run():
-        session_factory = _get_async_session()
+        session_factory = get_session_factory()
         async with session_factory() as db:
             try:
                 stats = await engine_check_ptp_status(db)
@@ -263,11 +249,7 @@ def check_ptps() -> dict:
                 logger.exception("check_ptps task failed")
                 raise
 
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+    return run_async(_run())
 
 
 @celery_app.task(name="app.tasks.collection_reminders.execute_sequence_steps")
@@ -281,7 +263,7 @@ def execute_sequence_steps() -> dict:
         from app.services.whatsapp_notifier import send_whatsapp_message
         from app.services.sequence_ai import render_template
 
-        session_factory = _get_async_session()
+        session_factory = get_session_factory()
         async with session_factory() as db:
             try:
                 # Get active enrollments with their cases and sequences
@@ -427,11 +409,7 @@ def execute_sequence_steps() -> dict:
                 logger.exception("execute_sequence_steps task failed")
                 raise
 
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+    return run_async(_run())
 
 
 @celery_app.task(name="app.tasks.collection_reminders.daily_snapshot")
@@ -439,7 +417,7 @@ def daily_snapshot() -> dict:
     """Daily: generate collections dashboard snapshot."""
 
     async def _run():
-        session_factory = _get_async_session()
+        session_factory = get_session_factory()
         async with session_factory() as db:
             try:
                 snap = await generate_daily_snapshot(db)
@@ -450,8 +428,4 @@ def daily_snapshot() -> dict:
                 logger.exception("daily_snapshot task failed")
                 raise
 
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+    return run_async(_run())
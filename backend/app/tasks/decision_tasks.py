@@ -1,17 +1,7 @@
 """Celery tasks for decision engine processing."""
 
-import asyncio
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-
 from app.tasks import celery_app
-from app.config import settings
-
-
-def get_async_session():
-    engine = create_async_engine(settings.database_url)
-    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+from app.tasks.runtime import get_session_factory, run_async
 
 
 @celery_app.task(name="run_decision_engine_task")
@@ -20,7 +10,7 @@ def run_decision_engine_task(application_id: int):
     from app.services.decision_engine.engine import run_decision_engine
 
     async def _run():
-        session_factory = get_async_session()
+        session_factory = get_session_factory()
         async with session_factory() as session:
             try:
                 decision = await run_decision_engine(application_id, session)
@@ -34,4 +24,4 @@ def run_decision_engine_task(application_id: int):
                 await session.rollback()
                 raise
 
-    return asyncio.get_event_loop().run_until_complete(_run())
+    return run_async(_run())
@@ -0,0 +1,10 @@
+"""Celery tasks for rendered document housekeeping."""
+
+from app.tasks import celery_app
+from app.services import document_render
+
+
+@celery_app.task(name="app.tasks.document_tasks.prune_pdf_cache")
+def prune_pdf_cache() -> dict:
+    """Nightly: expire cached PDFs and keep the cache under its size cap."""
+    return {"removed": document_render.prune_cache()}
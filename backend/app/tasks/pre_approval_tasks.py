@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from sqlalchemy import select, update
 
 from app.tasks import celery_app
-from app.database import async_session
+from app.tasks.runtime import get_session_factory, run_async
 from app.models.pre_approval import PreApproval
 
 logger = logging.getLogger(__name__)
@@ -15,10 +15,10 @@ logger = logging.getLogger(__name__)
 @celery_app.task(name="app.tasks.pre_approval_tasks.expire_pre_approvals")
 def expire_pre_approvals():
     """Mark pre-approvals past their expiry date as expired."""
-    import asyncio
 
     async def _run():
-        async with async_session() as db:
+        session_factory = get_session_factory()
+        async with session_factory() as db:
             now = datetime.now(timezone.utc)
             result = await db.execute(
                 update(PreApproval)
@@ -36,11 +36,7 @@ def expire_pre_approvals():
                 logger.info("Expired %d pre-approvals: %s", len(expired_ids), expired_ids)
             return len(expired_ids)
 
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+    return run_async(_run())
 
 
 @celery_app.task(name="app.tasks.pre_approval_tasks.purge_old_pre_approvals")
@@ -50,11 +46,11 @@ def purge_old_pre_approvals():
     Declined: 90 days, Others: 180 days.
     Does NOT purge converted records linked to active applications.
     """
-    import asyncio
     from datetime import timedelta
 
     async def _run():
-        async with async_session() as db:
+        session_factory = get_session_factory()
+        async with session_factory() as db:
             now = datetime.now(timezone.utc)
             declined_cutoff = now - timedelta(days=90)
             other_cutoff = now - timedelta(days=180)
@@ -100,8 +96,4 @@ def purge_old_pre_approvals():
                 logger.info("Purged %d pre-approvals (%d declined, %d other)", total, purged_declined, purged_other)
             return total
 
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+    return run_async(_run())
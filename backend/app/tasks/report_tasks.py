@@ -0,0 +1,41 @@
+"""Celery tasks for background report jobs."""
+
+import logging
+
+from app.tasks import celery_app
+from app.tasks.runtime import get_session_factory, run_async
+from app.services import report_jobs
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.report_tasks.build_report")
+def build_report(job_id: int) -> dict:
+    """Build one queued report; failures are recorded on the job itself."""
+
+    async def _run():
+        session_factory = get_session_factory()
+        async with session_factory() as db:
+            job = await report_jobs.run_job(db, job_id)
+            return {"job_id": job_id, "status": job.status if job else None}
+
+    return run_async(_run())
+
+
+@celery_app.task(name="app.tasks.report_tasks.fail_stale_report_jobs")
+def fail_stale_report_jobs() -> dict:
+    """Periodic: fail report jobs whose worker never finished them."""
+
+    async def _run():
+        session_factory = get_session_factory()
+        async with session_factory() as db:
+            try:
+                count = await report_jobs.fail_stale_jobs(db)
+                await db.commit()
+                return {"failed": count}
+            except Exception:
+                await db.rollback()
+                logger.exception("fail_stale_report_jobs task failed")
+                raise
+
+    return run_async(_run())
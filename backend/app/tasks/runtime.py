@@ -0,0 +1,94 @@
+"""Per-process async runtime for Celery workers.
+
+Each worker process owns one long-lived event loop and one pooled async
+engine, created on ``worker_process_init`` and disposed when the process
+shuts down.  Tasks run their coroutines with :func:`run_async` and open
+sessions from :func:`get_session_factory`, so pooled connections are reused
+across task runs instead of a fresh pool being built (and leaked) per task.
+
+asyncpg connections are bound to the loop that opened them, which is why the
+engine and the loop share a lifetime.  When no worker signal has fired
+(``celery -P solo``, eager mode, a shell) both are created lazily on first use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Coroutine, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's worker event loop, creating it if needed."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+    return _engine
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Session factory bound to the worker's shared engine."""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+    return _session_factory
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` to completion on the worker loop."""
+    return get_loop().run_until_complete(coro)
+
+
+@worker_process_init.connect
+def init_worker_runtime(**kwargs) -> None:
+    """Start each forked worker with its own loop and pool.
+
+    Anything inherited from the parent process is dropped without closing it,
+    since the parent still owns those sockets.
+    """
+    global _loop, _engine, _session_factory
+    if _engine is not None:
+        _engine.sync_engine.dispose(close=False)
+    _loop = None
+    _engine = None
+    _session_factory = None
+    get_loop()
+    get_session_factory()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_worker_runtime(**kwargs) -> None:
+    """Dispose the pool and close the loop; safe to call more than once."""
+    global _loop, _engine, _session_factory
+    if _engine is not None and _loop is not None and not _loop.is_closed():
+        try:
+            _loop.run_until_complete(_engine.dispose())
+        except Exception as e:
+            logger.warning("Failed to dispose worker engine: %s", e)
+    if _loop is not None and not _loop.is_closed():
+        _loop.close()
+    _loop = None
+    _engine = None
+    _session_factory = None
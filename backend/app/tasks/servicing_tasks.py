@@ -0,0 +1,28 @@
+"""Celery tasks for loan servicing snapshots."""
+
+import logging
+
+from app.tasks import celery_app
+from app.tasks.runtime import get_session_factory, run_async
+from app.services.loan_servicing import age_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.servicing_tasks.age_servicing_snapshots")
+def age_servicing_snapshots() -> dict:
+    """Nightly: roll every disbursed loan's servicing snapshot forward to today."""
+
+    async def _run():
+        session_factory = get_session_factory()
+        async with session_factory() as db:
+            try:
+                count = await age_snapshots(db)
+                await db.commit()
+                return {"aged": count}
+            except Exception:
+                await db.rollback()
+                logger.exception("age_servicing_snapshots task failed")
+                raise
+
+    return run_async(_run())
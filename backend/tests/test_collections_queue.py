@@ -0,0 +1,182 @@
+"""Tests for the SQL-backed collections work queue."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.collections_ext import (
+    CaseStatus,
+    CollectionCase,
+    DelinquencyStage,
+    propensity_band,
+    propensity_estimate,
+)
+from app.models.loan import ApplicantProfile, LoanApplication, LoanPurpose, LoanStatus
+from app.models.payment import LoanServicingSnapshot
+from app.models.user import User
+from app.services.collections_engine import apply_latest_ptp
+from app.services.collections_queue import (
+    InvalidCursor,
+    QueueFilters,
+    QueueSort,
+    decode_cursor,
+    encode_cursor,
+    page_query,
+)
+
+NOW = datetime(2026, 3, 31, 12, 0, tzinfo=timezone.utc)
+
+
+# ── Propensity ────────────────────────────────────
+
+class TestPropensity:
+    def test_score_falls_with_dpd(self):
+        scores = [propensity_estimate(dpd, None)[0] for dpd in (10, 25, 45, 80, 120)]
+        assert scores == [70, 60, 40, 25, 15]
+
+    def test_ptp_history_adjusts_score_and_trend(self):
+        assert propensity_estimate(20, "kept") == (75, "improving")
+        assert propensity_estimate(20, "broken") == (45, "stable")
+        assert propensity_estimate(75, None) == (25, "declining")
+
+    def test_bands(self):
+        assert [propensity_band(s) for s in (65, 64, 35, 34)] == ["high", "medium", "medium", "low"]
+
+    def test_apply_latest_ptp(self):
+        case = CollectionCase(dpd=20)
+        apply_latest_ptp(case, None)
+        assert case.latest_ptp_status is None
+        assert case.propensity_score == 60
+
+
+# ── Cursors ───────────────────────────────────────
+
+class TestCursor:
+    def test_round_trip(self):
+        sort = QueueSort.parse("amount_due", "asc")
+        cursor = encode_cursor(sort, Decimal("125.50"), 42)
+        assert decode_cursor(cursor, sort) == (Decimal("125.50"), 42)
+
+    def test_datetime_round_trip(self):
+        sort = QueueSort.parse("sla_hours_remaining", "asc")
+        assert decode_cursor(encode_cursor(sort, NOW, 7), sort) == (NOW, 7)
+
+    def test_rejects_other_sort(self):
+        cursor = encode_cursor(QueueSort.parse("days_past_due", "desc"), 30, 1)
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, QueueSort.parse("days_past_due", "asc"))
+
+    def test_rejects_garbage(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor", QueueSort())
+
+    def test_unknown_sort_falls_back_to_priority(self):
+        sort = QueueSort.parse("applicant_name", "DESC")
+        assert (sort.key, sort.descending) == ("priority_score", True)
+
+
+# ── Queue query ───────────────────────────────────
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__,
+        ApplicantProfile.__table__,
+        LoanApplication.__table__,
+        LoanServicingSnapshot.__table__,
+        CollectionCase.__table__,
+    ])
+    with Session(engine) as s:
+        yield s
+
+
+def _seed(s, n=25):
+    for i in range(1, n + 1):
+        s.add(User(id=i, email=f"u{i}@example.com", hashed_password="x",
+                   first_name=f"First{i}", last_name="Borrower", phone=f"868555{i:04d}"))
+        s.add(ApplicantProfile(user_id=i, employer_sector="Retail" if i % 2 else "Energy"))
+        s.add(LoanApplication(
+            id=i, reference_number=f"ZOT-{i}", applicant_id=i, amount_requested=5000,
+            amount_approved=5000, term_months=12, purpose=LoanPurpose.PERSONAL,
+            status=LoanStatus.DISBURSED,
+        ))
+        dpd = (i * 7) % 40  # includes ties and a few zero-DPD rows
+        score, _ = propensity_estimate(dpd, "broken" if i % 5 == 0 else None)
+        s.add(CollectionCase(
+            id=i, loan_application_id=i, dpd=dpd, total_overdue=Decimal(100 * (i % 4)),
+            outstanding_balance=Decimal(4000), priority_score=round(dpd / 90, 4),
+            propensity_score=score, latest_ptp_status="broken" if i % 5 == 0 else None,
+            status=CaseStatus.CLOSED if i == 3 else CaseStatus.OPEN,
+            delinquency_stage=DelinquencyStage.EARLY_1_30 if dpd <= 30 else DelinquencyStage.MID_31_60,
+            sla_first_contact_deadline=NOW + timedelta(hours=i - 10) if i % 3 else None,
+        ))
+    s.flush()
+
+
+def _walk(s, filters, sort, limit=4):
+    """All case ids in queue order, fetched page by page through cursors."""
+    ids, cursor = [], None
+    while True:
+        rows = s.execute(page_query(filters, sort, NOW, cursor=cursor).limit(limit + 1)).all()
+        page = rows[:limit]
+        ids += [r[0].id for r in page]
+        if len(rows) <= limit:
+            return ids
+        cursor = encode_cursor(sort, page[-1].sort_value, page[-1][0].id)
+
+
+class TestQueueQuery:
+    @pytest.mark.parametrize("sort_by", [
+        "days_past_due", "amount_due", "propensity_score", "priority_score", "sla_hours_remaining",
+    ])
+    @pytest.mark.parametrize("sort_dir", ["asc", "desc"])
+    def test_keyset_pages_match_full_ordering(self, session, sort_by, sort_dir):
+        _seed(session)
+        sort = QueueSort.parse(sort_by, sort_dir)
+        full = [r[0].id for r in session.execute(page_query(QueueFilters(), sort, NOW)).all()]
+        assert _walk(session, QueueFilters(), sort) == full
+        assert len(full) == len(set(full))
+
+    def test_excludes_closed_and_current_cases(self, session):
+        _seed(session)
+        ids = {r[0].id for r in session.execute(page_query(QueueFilters(), QueueSort(), NOW)).all()}
+        assert 3 not in ids
+        assert all(session.get(CollectionCase, i).dpd > 0 or session.get(CollectionCase, i).total_overdue > 0 for i in ids)
+        closed = page_query(QueueFilters(status="closed"), QueueSort(), NOW)
+        assert [r[0].id for r in session.execute(closed).all()] == [3]
+
+    def test_filters_run_in_sql(self, session):
+        _seed(session)
+
+        def ids(**kw):
+            return {r[0].id for r in session.execute(page_query(QueueFilters(**kw), QueueSort(), NOW)).all()}
+
+        assert ids(ptp_status="broken") == {i for i in ids() if i % 5 == 0}
+        assert ids(ptp_status="none").isdisjoint(ids(ptp_status="broken"))
+        assert all(i % 2 == 0 for i in ids(sector="energy"))
+        assert ids(search="ZOT-12") == {12}
+        assert ids(stage="not-a-stage") == set()
+        assert ids(product_type="not-a-product") == set()
+        breached = ids(sla_status="breached")
+        assert breached and all(
+            session.get(CollectionCase, i).sla_first_contact_deadline <= NOW.replace(tzinfo=None) for i in breached
+        )
+        for band in ("high", "medium", "low"):
+            assert all(propensity_band(session.get(CollectionCase, i).propensity_score) == band for i in ids(propensity_band=band))
+
+    def test_sla_sort_uses_the_indexed_expression(self):
+        [index] = [i for i in CollectionCase.__table__.indexes if i.name == "ix_cc_queue_sla"]
+        indexed = str(index.expressions[0])
+        sort = QueueSort.parse("sla_hours_remaining", "asc")
+        query = page_query(QueueFilters(), sort, NOW, cursor=encode_cursor(sort, NOW, 5))
+        sql = str(query.compile(
+            dialect=postgresql.asyncpg.dialect(), compile_kwargs={"render_postcompile": True},
+        )).replace("collection_cases.", "")
+        assert f"ORDER BY {indexed} ASC, id ASC" in sql
+        assert f"({indexed}, id) >" in sql
@@ -0,0 +1,163 @@
+"""Tests for the dashboard metrics cache and the consolidated aggregates."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.services import dashboard_metrics, metrics_cache
+
+
+class FakeRedis:
+    """In-memory stand-in for the handful of Redis calls the cache makes."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttl_ms = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        self.ttl_ms[key] = px
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    def pipeline(self, transaction=True):
+        redis = self
+        ops = []
+
+        class Pipeline:
+            def get(self, key):
+                ops.append(lambda: redis.data.get(key))
+                return self
+
+            def pttl(self, key):
+                ops.append(lambda: redis.ttl_ms.get(key, -2) if key in redis.data else -2)
+                return self
+
+            async def execute(self):
+                return [op() for op in ops]
+
+        return Pipeline()
+
+
+class DownRedis(FakeRedis):
+    def pipeline(self, transaction=True):
+        raise RedisConnectionError("connection refused")
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    metrics_cache.clear_local()
+    monkeypatch.setattr(metrics_cache, "_client", None)
+    monkeypatch.setattr(metrics_cache, "_redis_down_until", 0.0)
+    yield
+    metrics_cache.clear_local()
+
+
+def _use(monkeypatch, client):
+    monkeypatch.setattr(metrics_cache, "_redis", lambda: client)
+
+
+def _counting_loader(value, delay=0.0):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+
+    return loader, calls
+
+
+@pytest.mark.asyncio
+class TestCached:
+    async def test_concurrent_misses_compute_once(self, monkeypatch):
+        redis = FakeRedis()
+        _use(monkeypatch, redis)
+        loader, calls = _counting_loader({"total": 3}, delay=0.01)
+        results = await asyncio.gather(*(metrics_cache.cached("k", 30, loader) for _ in range(20)))
+        assert results == [{"total": 3}] * 20
+        assert len(calls) == 1
+        assert redis.data[f"{metrics_cache.KEY_PREFIX}k"] == '{"total": 3}'
+        assert redis.ttl_ms[f"{metrics_cache.KEY_PREFIX}k"] == 30_000
+        # the recompute lock is released
+        assert f"{metrics_cache.KEY_PREFIX}k:lock" not in redis.data
+
+    async def test_other_worker_value_is_reused(self, monkeypatch):
+        redis = FakeRedis()
+        redis.data[f"{metrics_cache.KEY_PREFIX}k"] = '{"total": 9}'
+        redis.ttl_ms[f"{metrics_cache.KEY_PREFIX}k"] = 12_000
+        _use(monkeypatch, redis)
+        loader, calls = _counting_loader({"total": 0})
+        assert await metrics_cache.cached("k", 30, loader) == {"total": 9}
+        assert calls == []
+        # held locally only for the remainder of the Redis TTL
+        assert metrics_cache._local["k"].expires_at - metrics_cache.time.monotonic() <= 12
+
+    async def test_waits_for_worker_holding_lock(self, monkeypatch):
+        redis = FakeRedis()
+        lock_key = f"{metrics_cache.KEY_PREFIX}k:lock"
+        redis.data[lock_key] = "someone-else"
+        _use(monkeypatch, redis)
+        loader, calls = _counting_loader({"total": 0})
+
+        async def publish():
+            await asyncio.sleep(0.02)
+            redis.data[f"{metrics_cache.KEY_PREFIX}k"] = '{"total": 5}'
+
+        result, _ = await asyncio.gather(metrics_cache.cached("k", 30, loader), publish())
+        assert result == {"total": 5}
+        assert calls == []
+        assert redis.data[lock_key] == "someone-else"
+
+    async def test_redis_down_degrades_to_process_cache(self, monkeypatch):
+        monkeypatch.setattr(metrics_cache, "_client", DownRedis())
+        loader, calls = _counting_loader([1, 2])
+        assert await metrics_cache.cached("k", 30, loader) == [1, 2]
+        assert await metrics_cache.cached("k", 30, loader) == [1, 2]
+        assert len(calls) == 1
+        # Redis is not retried until the back-off expires
+        assert metrics_cache._redis() is None
+
+    async def test_expired_entry_recomputed(self, monkeypatch):
+        _use(monkeypatch, None)
+        loader, calls = _counting_loader("v")
+        await metrics_cache.cached("k", 0, loader)
+        await metrics_cache.cached("k", 0, loader)
+        assert len(calls) == 2
+
+
+def test_loan_totals_are_one_statement():
+    stmt = select(dashboard_metrics._application_totals(), dashboard_metrics._arrears_totals())
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.count("SELECT") == 3  # outer select over the two aggregate subqueries
+    assert "FILTER (WHERE" in sql
+    assert "GROUP BY" not in sql
+
+
+def test_arrears_summary_shape():
+    row = SimpleNamespace(delinquent=3)
+    for i, (_, _, _, col) in enumerate(dashboard_metrics.ARREARS_BUCKETS, start=1):
+        setattr(row, f"{col}_count", i)
+        setattr(row, f"{col}_overdue", 10.0 * i)
+        setattr(row, f"{col}_outstanding", 100.0 * i)
+    summary, outstanding = dashboard_metrics._arrears_summary(row)
+    assert [b["label"] for b in summary["buckets"]] == [
+        "1–30 days", "31–60 days", "61–90 days", "90+ days",
+    ]
+    assert summary["total_overdue_amount"] == 100.0
+    assert summary["total_outstanding_at_risk"] == 1000.0
+    assert sum(outstanding[k] for k in dashboard_metrics.LOSS_BUCKETS) == 700.0
@@ -9,15 +9,18 @@ Covers:
   - Catch-all enforcement
 """
 
+from datetime import datetime, timedelta, timezone
+
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 from app.models.strategy import (
-    DecisionTreeNode, NodeType, ConditionType,
+    DecisionTreeNode, NodeType, ConditionType, TreeStatus,
 )
 from app.services.decision_engine.tree_router import (
-    RoutingContext, route_application,
+    RoutingContext, route_application, compile_tree,
 )
+from app.services.decision_engine import tree_cache
 from app.services.decision_engine.tree_validator import validate_tree
 
 
@@ -329,6 +332,80 @@ class TestScorecardGate:
         assert result.strategy_id == 300  # min inclusive
 
 
+class TestCompiledTree:
+    def _tree(self):
+        root = _node(1, "root", NodeType.CONDITION, is_root=True,
+                      condition_type=ConditionType.NUMERIC_RANGE, attribute="Monthly Income",
+                      branches={"Low": {"min": None, "max": "5000"}, "High": {"min": 5000, "max": None}})
+        low = _node(2, "low", NodeType.STRATEGY, parent_id=1,
+                    branch_label="low", strategy_id=100)
+        high = _node(3, "high", NodeType.STRATEGY, parent_id=1,
+                     branch_label="High", strategy_id=200)
+        return [high, low, root]
+
+    def test_compiled_tree_routes_like_node_list(self):
+        nodes = self._tree()
+        compiled = compile_tree(nodes, tree_id=7, version=3)
+        for income in (0, 4999.99, 5000, 80000):
+            ctx = RoutingContext(monthly_income=income)
+            expected = route_application(ctx, nodes)
+            actual = route_application(ctx, compiled)
+            assert actual.strategy_id == expected.strategy_id
+            assert [s.branch_taken for s in actual.path] == [s.branch_taken for s in expected.path]
+
+    def test_branch_label_matched_case_insensitively(self):
+        result = route_application(RoutingContext(monthly_income=100), compile_tree(self._tree()))
+        assert result.strategy_id == 100
+
+    def test_invalid_range_bound_rejected_at_compile(self):
+        root = _node(1, "root", NodeType.CONDITION, is_root=True,
+                      condition_type=ConditionType.NUMERIC_RANGE, attribute="loan_amount",
+                      branches={"Small": {"min": "abc", "max": None}})
+        with pytest.raises(ValueError, match="Invalid range bound"):
+            compile_tree([root])
+
+    def test_cache_keyed_by_stamp_and_invalidated(self):
+        compiled = compile_tree(self._tree(), tree_id=42, version=2)
+        activated = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        tree_cache.cache_tree(compiled, (2, activated))
+        try:
+            assert tree_cache.get_cached_tree(42, (2, activated)) is compiled
+            assert tree_cache.get_cached_tree(42, (1, activated)) is None
+            # Re-activated in place: same version, new activation time
+            assert tree_cache.get_cached_tree(42, (2, activated + timedelta(days=1))) is None
+            tree_cache.invalidate_tree(42)
+            assert tree_cache.get_cached_tree(42, (2, activated)) is None
+        finally:
+            tree_cache.invalidate_tree(42)
+
+    @pytest.mark.asyncio
+    async def test_load_skips_stale_compilation_from_another_worker(self):
+        stale = compile_tree(self._tree(), tree_id=42, version=2)
+        activated = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        tree_cache.cache_tree(stale, (2, activated))
+        reactivated = activated + timedelta(days=1)
+        tree = MagicMock(
+            id=42, version=2, activated_at=reactivated, status=TreeStatus.ACTIVE,
+            nodes=self._tree(), default_strategy_id=None,
+        )
+        tree.name = "edited"
+        head = MagicMock(version=2, activated_at=reactivated, status=TreeStatus.ACTIVE)
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[
+            MagicMock(one_or_none=MagicMock(return_value=head)),
+            MagicMock(scalar_one_or_none=MagicMock(return_value=tree)),
+            MagicMock(one_or_none=MagicMock(return_value=head)),
+        ])
+        try:
+            fresh = await tree_cache.load_compiled_tree(42, db)
+            assert fresh is not stale and fresh.name == "edited"
+            # Cached under the new stamp: the next load is a single lookup
+            assert await tree_cache.load_compiled_tree(42, db) is fresh
+            assert db.execute.await_count == 3
+        finally:
+            tree_cache.invalidate_tree(42)
+
+
 # ── Validation Tests ───────────────────────────────────────────────
 
 class TestTreeValidation:
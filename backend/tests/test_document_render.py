@@ -0,0 +1,202 @@
+"""Tests for off-loop contract rendering and the PDF cache."""
+
+import asyncio
+import io
+import os
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services import docx_to_pdf, document_render
+
+
+CONTRACT = dict(
+    applicant_name="Jane Doe",
+    applicant_address="1 Main St, Port of Spain",
+    national_id="19900101001",
+    reference_number="ZOT-2026-TEST0001",
+    amount=5000.0,
+    term_months=12,
+    monthly_payment=480.0,
+    total_financed=5000.0,
+    signed_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+    signature_name="Jane Doe",
+)
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def inline_render(monkeypatch):
+    """Run worker entry points in-process and count them."""
+    calls = []
+
+    async def fake_run(fn, fields):
+        calls.append(fn.__name__)
+        await asyncio.sleep(0.01)
+        data = b"%PDF-" + fields["reference_number"].encode()
+        return data if fn.__name__.endswith("docx_bytes") else (data, True)
+
+    monkeypatch.setattr(document_render, "_run", fake_run)
+    return calls
+
+
+class TestCacheKey:
+    def test_stable_and_input_sensitive(self):
+        key = document_render.cache_key("contract", CONTRACT)
+        assert key == document_render.cache_key("contract", dict(reversed(CONTRACT.items())))
+        assert key != document_render.cache_key("contract", {**CONTRACT, "monthly_payment": 481.0})
+        assert key != document_render.cache_key("consent", CONTRACT)
+
+    def test_render_version_invalidates(self, monkeypatch):
+        key = document_render.cache_key("contract", CONTRACT)
+        monkeypatch.setattr(document_render, "RENDER_VERSION", document_render.RENDER_VERSION + 1)
+        assert document_render.cache_key("contract", CONTRACT) != key
+
+
+@pytest.mark.asyncio
+class TestCachedPdf:
+    async def test_concurrent_requests_share_one_render(self, upload_dir, inline_render):
+        results = await asyncio.gather(*(document_render.contract_pdf(**CONTRACT) for _ in range(5)))
+        assert inline_render == ["_contract_pdf_bytes"]
+        assert {r.getvalue() for r in results} == {b"%PDF-ZOT-2026-TEST0001"}
+        assert document_render._inflight == {}
+
+    async def test_second_request_served_from_disk(self, upload_dir, inline_render):
+        await document_render.contract_pdf(**CONTRACT)
+        cached = os.listdir(upload_dir / document_render.CACHE_AREA)
+        assert cached == [f"{document_render.cache_key('contract', CONTRACT)}.pdf"]
+        again = await document_render.contract_pdf(**CONTRACT)
+        assert again.getvalue() == b"%PDF-ZOT-2026-TEST0001"
+        assert len(inline_render) == 1
+
+    async def test_docx_is_not_cached(self, upload_dir, inline_render):
+        await document_render.contract_docx(**CONTRACT)
+        await document_render.contract_docx(**CONTRACT)
+        assert inline_render == ["_contract_docx_bytes"] * 2
+
+    async def test_fallback_rendering_is_not_cached(self, upload_dir, monkeypatch):
+        renders = []
+
+        async def degraded(fn, fields):
+            renders.append(fn.__name__)
+            return b"%PDF-reportlab", False
+
+        monkeypatch.setattr(document_render, "_run", degraded)
+        for _ in range(2):
+            pdf = await document_render.contract_pdf(**CONTRACT)
+            assert pdf.getvalue() == b"%PDF-reportlab"
+        # The next request retries LibreOffice instead of reading the fallback
+        assert renders == ["_contract_pdf_bytes"] * 2
+        assert not (upload_dir / document_render.CACHE_AREA).exists()
+
+    async def test_renders_in_worker_process(self, upload_dir, monkeypatch):
+        monkeypatch.setattr(settings, "document_workers", 1)
+        try:
+            pdf = await document_render.contract_pdf(**CONTRACT)
+        finally:
+            document_render.shutdown()
+        assert pdf.getvalue().startswith(b"%PDF")
+
+
+class TestPruneCache:
+    def _write(self, directory, name, size, age_days, now):
+        path = directory / name
+        path.write_bytes(b"x" * size)
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+        return path
+
+    def test_expired_and_oversized_files_removed_oldest_first(self, upload_dir, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_cache_max_age_days", 30)
+        monkeypatch.setattr(settings, "pdf_cache_max_mb", 1)
+        cache = upload_dir / document_render.CACHE_AREA
+        cache.mkdir()
+        now = 1_800_000_000.0
+        mb = 1024 * 1024
+        self._write(cache, "expired.pdf", 10, 31, now)
+        self._write(cache, "old.pdf", mb // 2, 5, now)
+        self._write(cache, "mid.pdf", mb // 2, 3, now)
+        self._write(cache, "new.pdf", mb // 4, 1, now)
+        self._write(cache, "abandoned.pdf.abc.tmp", 10, 1, now)
+
+        assert document_render.prune_cache(now=now) == 3
+        assert sorted(os.listdir(cache)) == ["mid.pdf", "new.pdf"]
+
+    def test_missing_cache_directory(self, upload_dir):
+        assert document_render.prune_cache() == 0
+
+
+class TestLibreOffice:
+    def test_no_listener_without_unoserver(self, monkeypatch):
+        monkeypatch.setattr(docx_to_pdf, "_listener", None)
+        monkeypatch.setattr(docx_to_pdf.shutil, "which", lambda name: None)
+        assert docx_to_pdf._get_listener() is None
+
+    def test_cold_conversion_reuses_profile(self, monkeypatch):
+        commands = []
+
+        def fake_run(cmd, **kwargs):
+            commands.append(cmd)
+            return SimpleNamespace(returncode=0, stderr="")
+
+        monkeypatch.setattr(docx_to_pdf.subprocess, "run", fake_run)
+        docx_to_pdf._convert_cold("soffice", "/tmp/a.docx", "/tmp")
+        docx_to_pdf._convert_cold("soffice", "/tmp/b.docx", "/tmp")
+        profiles = [c[1] for c in commands]
+        assert profiles[0] == profiles[1]
+        assert profiles[0].startswith("-env:UserInstallation=file://")
+
+    def test_failed_start_backs_off_to_cold_path(self, monkeypatch):
+        listener = docx_to_pdf._LibreOfficeListener("unoserver", "unoconvert")
+        monkeypatch.setattr(docx_to_pdf, "_listener", listener)
+        monkeypatch.setattr(docx_to_pdf, "_find_libreoffice", lambda: "soffice")
+        starts, cold = [], []
+
+        def dead_server(cmd, **kwargs):
+            starts.append(cmd)
+            return SimpleNamespace(poll=lambda: 1)
+
+        def fake_cold(lo_bin, docx_path, outdir):
+            cold.append(docx_path)
+            Path(outdir, "document.pdf").write_bytes(b"%PDF-1.4")
+
+        monkeypatch.setattr(docx_to_pdf.subprocess, "Popen", dead_server)
+        monkeypatch.setattr(docx_to_pdf, "_convert_cold", fake_cold)
+        for _ in range(3):
+            pdf = docx_to_pdf._convert_with_libreoffice(io.BytesIO(b"docx"))
+            assert pdf.getvalue() == b"%PDF-1.4"
+        assert len(starts) == 1 and len(cold) == 3
+        assert not listener.available()
+
+    def test_contract_pdf_reports_converter(self, monkeypatch):
+        def busy(buf):
+            raise RuntimeError("listener busy")
+
+        monkeypatch.setattr(docx_to_pdf, "_convert_with_libreoffice", busy)
+        data, cacheable = document_render._contract_pdf_bytes(CONTRACT)
+        assert data.startswith(b"%PDF") and cacheable is False
+
+        monkeypatch.setattr(docx_to_pdf, "_convert_with_libreoffice", lambda buf: io.BytesIO(b"%PDF-lo"))
+        assert document_render._contract_pdf_bytes(CONTRACT) == (b"%PDF-lo", True)
+
+    def test_timed_out_conversion_stops_listener(self, monkeypatch):
+        listener = docx_to_pdf._LibreOfficeListener("unoserver", "unoconvert")
+        stopped = []
+        monkeypatch.setattr(listener, "start", lambda: None)
+        monkeypatch.setattr(listener, "stop", lambda: stopped.append(True))
+
+        def hang(cmd, **kwargs):
+            raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+
+        monkeypatch.setattr(docx_to_pdf.subprocess, "run", hang)
+        with pytest.raises(subprocess.TimeoutExpired):
+            listener.convert("/tmp/a.docx", "/tmp/a.pdf")
+        assert stopped == [True]
@@ -0,0 +1,142 @@
+"""Tests for buffered, fingerprint-aggregated error logging."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.error_log import ErrorSeverity
+from app.services import error_log_buffer, error_logger
+from app.services.error_log_buffer import ErrorLogBuffer
+
+
+class FakeSession:
+    """Records statements; the first execute returns the open-row lookup."""
+
+    def __init__(self, open_rows=()):
+        self.open_rows = list(open_rows)
+        self.executed = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+        return SimpleNamespace(all=lambda: self.open_rows)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _raise(msg):
+    raise ValueError(msg)
+
+
+def _caught(msg="boom"):
+    try:
+        _raise(msg)
+    except ValueError as e:
+        return e
+
+
+def _record(fingerprint="fp1", **kw):
+    return {"fingerprint": fingerprint, "error_type": "ValueError", "message": "boom",
+            "severity": ErrorSeverity.ERROR, **kw}
+
+
+class TestFingerprint:
+    def test_same_raise_site_matches_despite_message(self):
+        a = error_logger._fingerprint("ValueError", "api.x", _caught("a"), None, "/a")
+        b = error_logger._fingerprint("ValueError", "api.x", _caught("b"), None, "/b")
+        assert a == b
+
+    def test_module_and_type_distinguish(self):
+        exc = _caught()
+        base = error_logger._fingerprint("ValueError", "api.x", exc, None, None)
+        assert base != error_logger._fingerprint("ValueError", "api.y", exc, None, None)
+        assert base != error_logger._fingerprint("KeyError", "api.x", exc, None, None)
+
+    def test_synthetic_errors_split_by_path(self):
+        mod = "middleware.error_capture"
+        a = error_logger._fingerprint("Exception", mod, Exception("HTTP 503"), None, "/api/a")
+        b = error_logger._fingerprint("Exception", mod, Exception("HTTP 503"), None, "/api/b")
+        assert a != b
+
+
+@pytest.mark.asyncio
+class TestBuffer:
+    async def test_repeats_collapse_into_count(self):
+        buf = ErrorLogBuffer(flush_interval=60, session_factory=FakeSession)
+        for _ in range(100):
+            buf.add(_record())
+        assert buf.pending == 1
+        assert buf._pending["fp1"].count == 100
+        await buf.stop()
+
+    async def test_overflow_drops_new_fingerprints(self, caplog):
+        buf = ErrorLogBuffer(max_pending=2, flush_interval=60, session_factory=FakeSession)
+        assert buf.add(_record("a")) and buf.add(_record("b"))
+        assert buf.add(_record("c")) is False
+        assert buf.add(_record("a"))  # known fingerprints still count
+        await buf.stop()
+        assert "1 errors were logged but not stored" in caplog.text
+
+    async def test_background_flush_is_one_transaction(self):
+        sessions = []
+
+        def factory():
+            sessions.append(FakeSession())
+            return sessions[-1]
+
+        buf = ErrorLogBuffer(flush_interval=0.01, session_factory=factory)
+        for i in range(50):
+            buf.add(_record(f"fp{i % 5}"))
+        await asyncio.sleep(0.05)
+        assert buf.pending == 0
+        assert len(sessions) == 1 and sessions[0].commits == 1
+        _, inserted = sessions[0].executed[-1]
+        assert sorted(r["occurrence_count"] for r in inserted) == [10] * 5
+        # flusher exits once idle
+        assert buf._task.done()
+
+    async def test_flush_failure_is_swallowed(self):
+        class Broken(FakeSession):
+            async def execute(self, stmt, params=None):
+                raise ConnectionError("db down")
+
+        buf = ErrorLogBuffer(flush_interval=60, session_factory=Broken)
+        buf.add(_record())
+        assert await buf.flush() == 0
+        assert buf.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_write_batch_updates_open_rows_and_inserts_rest():
+    db = FakeSession(open_rows=[("fp1", 42)])
+    items = [
+        error_log_buffer._Pending(_record("fp1"), 7, error_log_buffer._now()),
+        error_log_buffer._Pending(_record("fp2"), 3, error_log_buffer._now()),
+    ]
+    await error_log_buffer.write_batch(db, items)
+    (_, update_params), (_, insert_params) = db.executed[1:]
+    assert [(p["row_id"], p["n"]) for p in update_params] == [(42, 7)]
+    assert [(p["fingerprint"], p["occurrence_count"]) for p in insert_params] == [("fp2", 3)]
+
+
+@pytest.mark.asyncio
+async def test_standalone_logging_only_queues(monkeypatch):
+    buf = ErrorLogBuffer(flush_interval=60, session_factory=FakeSession)
+    monkeypatch.setattr(error_log_buffer, "buffer", buf)
+    for _ in range(3):
+        await error_logger.log_error_standalone(
+            _caught(), module="middleware.error_capture", request_method="GET", request_path="/x",
+        )
+    assert buf.pending == 1
+    [pending] = buf._pending.values()
+    assert pending.count == 3
+    assert pending.record["module"] == "middleware.error_capture"
+    await buf.stop()
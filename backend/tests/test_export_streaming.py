@@ -0,0 +1,106 @@
+"""Tests for the incremental export writers and file storage."""
+
+import csv
+import io
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from app.config import settings
+from app.services import file_storage
+from app.services.gl import export_service
+from app.services.gl.export_service import WRITE_BATCH_SIZE, write_export
+
+
+def _rows(n):
+    return [{"entry": f"JE-{i:05d}", "debit": float(i), "credit": 0.0} for i in range(n)]
+
+
+async def _agen(rows, closed=None):
+    try:
+        for row in rows:
+            yield row
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+async def _stream(fmt, rows, **kwargs):
+    out = io.BytesIO()
+    count, truncated = await write_export(out, _agen(rows), fmt, **kwargs)
+    return out.getvalue(), count, truncated
+
+
+N = WRITE_BATCH_SIZE * 2 + 37
+
+
+@pytest.mark.asyncio
+class TestWriteExport:
+    async def test_csv_spans_batches(self):
+        data, count, _ = await _stream("csv", _rows(N), columns=["entry", "debit"])
+        parsed = list(csv.reader(io.StringIO(data.decode())))
+        assert count == N
+        assert parsed[0] == ["entry", "debit"]
+        assert len(parsed) == N + 1
+        assert parsed[-1] == [f"JE-{N - 1:05d}", f"{float(N - 1)}"]
+
+    async def test_json_envelope_counts_at_end(self):
+        data, _, _ = await _stream("json", _rows(N), metadata={"title": "Ledger"})
+        parsed = json.loads(data)
+        assert parsed["record_count"] == N
+        assert parsed["metadata"]["title"] == "Ledger"
+        assert parsed["data"][N - 1]["entry"] == f"JE-{N - 1:05d}"
+
+    async def test_json_lines(self):
+        data, _, _ = await _stream("jsonl", _rows(3))
+        assert [json.loads(line)["entry"] for line in data.decode().splitlines()] == [
+            "JE-00000", "JE-00001", "JE-00002",
+        ]
+
+    async def test_empty_json_is_valid(self):
+        data, count, _ = await _stream("json", [])
+        assert count == 0
+        assert json.loads(data)["data"] == []
+
+    async def test_streamed_xml_trails_record_count(self):
+        data, _, _ = await _stream("xml", _rows(2))
+        text = data.decode()
+        assert text.count("<Entry>") == 2
+        assert text.endswith("<RecordCount>2</RecordCount></GLExport>")
+
+    async def test_xlsx_write_only(self):
+        data, _, _ = await _stream("xlsx", _rows(N))
+        ws = load_workbook(io.BytesIO(data)).active
+        assert ws.max_row == N + 1
+        assert ws["A1"].value == "Entry"
+        assert ws.auto_filter.ref == f"A1:C{N + 1}"
+        assert ws.freeze_panes == "A2"
+
+    async def test_pdf_capped(self, monkeypatch):
+        monkeypatch.setattr(export_service._PdfWriter, "limit", 10)
+        closed = []
+        out = io.BytesIO()
+        count, truncated = await write_export(out, _agen(_rows(N), closed), "pdf")
+        assert (count, truncated) == (10, True)
+        assert out.getvalue().startswith(b"%PDF")
+        # the row source is closed rather than drained
+        assert closed == [True]
+
+    async def test_exact_fit_is_not_truncated(self, monkeypatch):
+        monkeypatch.setattr(export_service._PdfWriter, "limit", 10)
+        _, count, truncated = await _stream("pdf", _rows(10))
+        assert (count, truncated) == (10, False)
+
+
+def test_file_storage_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    path = file_storage.new_file_path("exports", ".csv")
+    assert path.startswith(str(tmp_path / "exports"))
+    payload = b"x" * (file_storage.STREAM_CHUNK_SIZE + 10)
+    with open(path, "wb") as fh:
+        fh.write(payload)
+    chunks = list(file_storage.iter_file(path))
+    assert [len(c) for c in chunks] == [file_storage.STREAM_CHUNK_SIZE, 10]
+    file_storage.remove_file(path)
+    file_storage.remove_file(path)  # already gone is fine
@@ -0,0 +1,202 @@
+"""Tests for rolling GL posting statistics and the anomaly flag rules."""
+
+import random
+import statistics
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.gl import (
+    AnomalyType,
+    GLPostingStats,
+    JournalEntry,
+    JournalEntryLine,
+    JournalEntryStatus,
+    JournalSourceType,
+)
+from app.services.gl import anomaly_detector
+from app.services.gl.anomaly_detector import (
+    AnomalyResult,
+    _flag_amount,
+    _flag_pattern,
+    _flag_velocity,
+)
+from app.services.gl.posting_stats import (
+    STATS_WINDOW,
+    RollingStats,
+    account_signature,
+    stats_merge_set,
+)
+
+
+class TestRollingStats:
+    def test_matches_sample_statistics_below_window(self):
+        rng = random.Random(1)
+        values = [rng.uniform(100, 5000) for _ in range(60)]
+        stats = RollingStats.of(values)
+        assert stats.count == 60
+        assert stats.mean == pytest.approx(statistics.mean(values))
+        assert stats.stdev == pytest.approx(statistics.stdev(values))
+
+    def test_batch_merge_equals_one_by_one(self):
+        values = [float(v) for v in range(1, 41)]
+        merged = RollingStats.of(values[:25])
+        merged.merge(RollingStats.of(values[25:]))
+        assert merged.mean == pytest.approx(statistics.mean(values))
+        assert merged.stdev == pytest.approx(statistics.stdev(values))
+
+    def test_without_undoes_one_observation(self):
+        values = [120.0, 80.0, 101.0, 99.0, 100.0, 4000.0]
+        stats = RollingStats.of(values).without(4000.0)
+        assert stats.count == 5
+        assert stats.mean == pytest.approx(statistics.mean(values[:-1]))
+        assert stats.stdev == pytest.approx(statistics.stdev(values[:-1]))
+
+    def test_capped_at_window_and_tracks_recent_level(self):
+        stats = RollingStats.of([100.0] * 300 + [1000.0] * 300)
+        assert stats.count == STATS_WINDOW
+        assert stats.mean == pytest.approx(1000.0, rel=0.05)
+
+    def test_signature_ignores_order_and_repeats(self):
+        assert account_signature([7, 3, 7, 12]) == account_signature([12, 3, 7])
+        assert account_signature([3, 7]) != account_signature([3, 7, 12])
+
+
+def test_sql_merge_matches_python():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[GLPostingStats.__table__])
+    rng = random.Random(7)
+    expected = RollingStats()
+    with Session(engine) as s:
+        for _ in range(150):
+            batch = RollingStats.of(rng.uniform(10, 900) for _ in range(rng.randint(1, 3)))
+            expected.merge(batch)
+            stmt = sqlite_insert(GLPostingStats).values(
+                source_type="fee", sample_count=batch.count, mean=batch.mean, m2=batch.m2,
+            )
+            s.execute(stmt.on_conflict_do_update(
+                index_elements=[GLPostingStats.source_type], set_=stats_merge_set(stmt.excluded),
+            ))
+        row = s.execute(select(GLPostingStats)).scalar_one()
+        assert row.sample_count == expected.count == STATS_WINDOW
+        assert row.mean == pytest.approx(expected.mean)
+        assert row.m2 == pytest.approx(expected.m2)
+
+
+class TestFlagRules:
+    def test_amount_outlier(self):
+        stats = RollingStats.of([100, 110, 90, 105, 95, 100])
+        result = AnomalyResult()
+        _flag_amount(result, 500.0, stats)
+        assert [f["type"] for f in result.flags] == [AnomalyType.AMOUNT]
+        assert result.risk_score == 40
+
+    @pytest.mark.parametrize("similar", [5, 7, 9])
+    def test_large_posting_scored_without_itself(self, similar):
+        amounts = [100.0 + 5 * (i % 3) for i in range(similar)] + [1000.0]
+        observed = RollingStats.of(amounts)
+        # Counted in its own mean and stdev, |z| cannot exceed (n-1)/sqrt(n)
+        included = AnomalyResult()
+        _flag_amount(included, 1000.0, observed)
+        assert included.risk_score < 40
+        result = AnomalyResult()
+        _flag_amount(result, 1000.0, observed.without(1000.0))
+        assert result.risk_score == 40
+
+    def test_amount_needs_history(self):
+        result = AnomalyResult()
+        _flag_amount(result, 1e9, RollingStats.of([1, 2, 3]))
+        _flag_amount(result, 1e9, None)
+        assert not result.has_anomalies
+
+    @pytest.mark.parametrize("first_entry_id,has_history,flagged", [
+        (None, True, True),   # never seen
+        (50, True, True),     # introduced by this entry
+        (10, True, False),    # seen on an earlier entry
+        (None, False, False), # first entry of its type
+    ])
+    def test_pattern(self, first_entry_id, has_history, flagged):
+        result = AnomalyResult()
+        _flag_pattern(result, first_entry_id, 50, has_history)
+        assert result.has_anomalies is flagged
+
+    def test_velocity_tiers(self):
+        scores = []
+        for count in (20, 21, 51):
+            result = AnomalyResult()
+            _flag_velocity(result, count)
+            scores.append(result.risk_score)
+        assert scores == [0, 15, 30]
+
+
+class TestStatsWindow:
+    T0 = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+    def _entry(self, id, source_type, status=JournalEntryStatus.POSTED, posted_minutes=None):
+        return JournalEntry(
+            id=id, entry_number=f"JE-2026-{id:06d}", transaction_date=date(2026, 3, 2),
+            effective_date=date(2026, 3, 2), source_type=source_type, description="test",
+            currency_id=1, status=status, created_at=self.T0 + timedelta(minutes=id),
+            posted_at=self.T0 + timedelta(minutes=posted_minutes if posted_minutes is not None else id),
+        )
+
+    @pytest.mark.asyncio
+    async def test_only_recent_postings_are_in_window(self, monkeypatch):
+        pytest.importorskip("aiosqlite")
+        monkeypatch.setattr(anomaly_detector, "STATS_WINDOW", 3)
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(JournalEntry.__table__.create)
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                fee = JournalSourceType.FEE
+                entries = [
+                    self._entry(1, fee),
+                    # Approved late: posted after entries 2-5
+                    self._entry(2, fee, posted_minutes=60),
+                    self._entry(3, fee),
+                    self._entry(4, fee),
+                    self._entry(5, fee),
+                    self._entry(6, JournalSourceType.MANUAL),
+                    self._entry(7, fee, status=JournalEntryStatus.DRAFT),
+                ]
+                db.add_all(entries)
+                await db.commit()
+                assert await anomaly_detector._in_stats_window(db, entries) == {2, 4, 5, 6}
+                assert await anomaly_detector._in_stats_window(db, []) == set()
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("in_window,flagged", [(True, True), (False, False)])
+    async def test_aged_out_entry_not_removed_from_stats(self, monkeypatch, in_window, flagged):
+        # 1000 was observed; with it taken out the rest sit tightly around 100
+        observed = RollingStats.of([100.0, 105.0, 95.0, 100.0, 105.0, 95.0, 1000.0])
+
+        async def load_stats(db, sources):
+            return {"fee": observed}
+
+        async def window(db, entries):
+            return {e.id for e in entries} if in_window else set()
+
+        async def no_combinations(db, keys):
+            return {}, {}
+
+        async def no_balances(db, account_ids):
+            return {}
+
+        monkeypatch.setattr(anomaly_detector, "_load_stats", load_stats)
+        monkeypatch.setattr(anomaly_detector, "_in_stats_window", window)
+        monkeypatch.setattr(anomaly_detector, "_load_combinations", no_combinations)
+        monkeypatch.setattr(anomaly_detector, "_load_account_balances", no_balances)
+        entry = self._entry(9, JournalSourceType.FEE)
+        entry.lines = [JournalEntryLine(gl_account_id=1, debit_amount=Decimal("1000"))]
+
+        result = await anomaly_detector.analyze_entry(None, entry)
+        assert (result.risk_score == 40) is flagged
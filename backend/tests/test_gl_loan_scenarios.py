@@ -533,9 +533,9 @@ class TestCreateJournalEntryRepaidLoan:
             if "gl_accounting_periods" in stmt_str:
                 result.scalar_one_or_none.return_value = period
                 return result
-            # Entry number lookup
-            if "max" in stmt_str.lower():
-                result.scalar_one_or_none.return_value = None
+            # Entry number counter
+            if "gl_entry_number_counters" in stmt_str:
+                result.scalar_one_or_none.return_value = 1
                 return result
             return result
 
@@ -666,8 +666,8 @@ class TestCreateJournalEntryWrittenOff:
                 p.status = PeriodStatus.OPEN
                 result.scalar_one_or_none.return_value = p
                 return result
-            if "max" in stmt_str.lower():
-                result.scalar_one_or_none.return_value = None
+            if "gl_entry_number_counters" in stmt_str:
+                result.scalar_one_or_none.return_value = 1
                 return result
             return result
 
@@ -777,8 +777,8 @@ class TestCreateJournalEntryWrittenOff:
                 p.status = PeriodStatus.CLOSED
                 result.scalar_one_or_none.return_value = p
                 return result
-            if "max" in stmt_str.lower():
-                result.scalar_one_or_none.return_value = None
+            if "gl_entry_number_counters" in stmt_str:
+                result.scalar_one_or_none.return_value = 1
                 return result
             return result
 
@@ -6,6 +6,7 @@ Tests cover:
 - NL query pattern matching
 - Anomaly detection scoring
 - Classifier keyword rules
+- Balance engine roll-ups
 """
 
 import pytest
@@ -23,7 +24,75 @@ from app.services.gl.nl_query import PATTERNS, process_query
 from app.services.gl.anomaly_detector import AnomalyResult
 from app.services.gl.classifier import _keyword_classify
 from app.services.gl.mapping_engine import _evaluate_conditions
-from app.models.gl import AnomalyType
+from app.services.gl.balance_engine import LedgerBalances
+from app.services.gl.period_balances import entry_deltas, compare_totals
+from app.models.gl import AnomalyType, AccountType, GLAccount, JournalEntryLine
+
+
+# ===================================================================
+# Balance engine tests
+# ===================================================================
+
+
+def _acct(id, code, parent_id=None, account_type=AccountType.DEBIT):
+    return GLAccount(id=id, account_code=code, name=code, parent_id=parent_id, account_type=account_type)
+
+
+class TestLedgerBalances:
+    def _ledger(self):
+        return LedgerBalances([
+            (_acct(1, "1-0000"), None, None),
+            (_acct(2, "1-2000", parent_id=1), Decimal("10.00"), None),
+            (_acct(3, "1-2001", parent_id=2), Decimal("500.00"), Decimal("100.00")),
+            (_acct(4, "1-2002", parent_id=2), Decimal("50.25"), None),
+            (_acct(5, "2-2000", account_type=AccountType.CREDIT), Decimal("5.00"), Decimal("80.00")),
+        ])
+
+    def test_own_balance(self):
+        ledger = self._ledger()
+        assert ledger.balance(3) == {"debit_total": 500.0, "credit_total": 100.0, "balance": 400.0}
+        assert ledger.balance(5)["balance"] == 75.0
+        assert ledger.balance(1) == {"debit_total": 0.0, "credit_total": 0.0, "balance": 0.0}
+
+    def test_rollup_includes_all_descendants(self):
+        ledger = self._ledger()
+        assert ledger.balance(2, include_children=True)["balance"] == 460.25
+        assert ledger.balance(1, include_children=True) == {
+            "debit_total": 560.25, "credit_total": 100.0, "balance": 460.25,
+        }
+
+    def test_lookups(self):
+        ledger = self._ledger()
+        assert ledger.get_by_code("1-2000").id == 2
+        assert [a.account_code for a in ledger.children_of(2)] == ["1-2001", "1-2002"]
+        assert ledger.children_of(5) == []
+
+
+def _line(account_id, dr="0", cr="0"):
+    return JournalEntryLine(gl_account_id=account_id, debit_amount=Decimal(dr), credit_amount=Decimal(cr))
+
+
+class TestPeriodBalances:
+    def test_entry_deltas_group_by_account(self):
+        lines = [_line(1, dr="100.00"), _line(1, dr="25.50"), _line(2, cr="125.50")]
+        assert entry_deltas(lines) == {
+            1: (Decimal("125.50"), Decimal("0")),
+            2: (Decimal("0"), Decimal("125.50")),
+        }
+
+    def test_reversal_deltas_are_negated(self):
+        deltas = entry_deltas([_line(1, dr="40.00"), _line(2, cr="40.00")], sign=-1)
+        assert deltas[1] == (Decimal("-40.00"), Decimal("0"))
+        assert deltas[2] == (Decimal("0"), Decimal("-40.00"))
+
+    def test_compare_totals_reports_drift(self):
+        stored = {(1, 7): (Decimal("10"), Decimal("0")), (2, 7): (Decimal("0"), Decimal("5"))}
+        ledger = {(1, 7): (Decimal("10"), Decimal("0")), (3, 7): (Decimal("1"), Decimal("0"))}
+        drifts = compare_totals(stored, ledger)
+        assert [(d.gl_account_id, d.accounting_period_id) for d in drifts] == [(2, 7), (3, 7)]
+        assert drifts[0].ledger_credit == Decimal("0")
+        assert drifts[1].stored_debit == Decimal("0")
+        assert compare_totals(ledger, ledger) == []
 
 
 # ===================================================================
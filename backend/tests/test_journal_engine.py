@@ -15,6 +15,7 @@ import pytest
 from decimal import Decimal
 from datetime import date, datetime, timezone
 from unittest.mock import AsyncMock, patch, MagicMock
+from sqlalchemy.dialects import postgresql
 
 from app.models.gl import (
     JournalEntry,
@@ -36,6 +37,10 @@ from app.services.gl.journal_engine import (
     post_entry,
     reject_entry,
     reverse_entry,
+    post_line_batch,
+    reserve_entry_numbers,
+    LineBatch,
+    _summarize_batch,
     _validate_balance,
     BalanceError,
     StatusTransitionError,
@@ -591,6 +596,143 @@ class TestInputValidation:
         assert dr == cr == Decimal("6913.00")
 
 
+# ===================================================================
+# Entry numbers
+# ===================================================================
+
+
+class TestEntryNumbers:
+    @pytest.mark.asyncio
+    async def test_reserve_block_ends_at_counter_value(self):
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=42))
+        numbers = await reserve_entry_numbers(db, 3)
+
+        year = datetime.now(timezone.utc).year
+        assert numbers == [f"JE-{year}-000040", f"JE-{year}-000041", f"JE-{year}-000042"]
+        db.execute.assert_awaited_once()
+        sql = str(db.execute.await_args.args[0])
+        assert sql.startswith("UPDATE gl_entry_number_counters") and "RETURNING" in sql
+
+    @pytest.mark.asyncio
+    async def test_first_reservation_of_year_seeds_from_posted_entries(self):
+        db = AsyncMock()
+        db.execute.side_effect = [
+            MagicMock(scalar_one_or_none=MagicMock(return_value=None)),
+            MagicMock(scalar_one=MagicMock(return_value=502)),
+        ]
+        numbers = await reserve_entry_numbers(db, 2)
+
+        year = datetime.now(timezone.utc).year
+        assert numbers == [f"JE-{year}-000501", f"JE-{year}-000502"]
+        stmt = db.execute.await_args_list[1].args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (year) DO UPDATE" in sql
+        assert "coalesce(max(CAST(split_part(gl_journal_entries.entry_number" in sql
+        # Only numbers the cast can handle, e.g. not JE-YYYY-000123-R
+        assert "gl_journal_entries.entry_number ~ %(entry_number_2)s" in sql
+        assert stmt.compile(dialect=postgresql.dialect()).params["entry_number_2"] == f"^JE-{year}-[0-9]+$"
+
+    @pytest.mark.asyncio
+    async def test_reserve_rejects_empty_block(self):
+        with pytest.raises(ValueError):
+            await reserve_entry_numbers(AsyncMock(), 0)
+
+
+# ===================================================================
+# Bulk posting
+# ===================================================================
+
+
+class TestLineBatch:
+    """Columnar batches posted through post_line_batch."""
+
+    def _batch(self, loans: int = 3, split_by_branch: bool = False) -> LineBatch:
+        batch = LineBatch()
+        for i in range(loans):
+            batch.add_pair(
+                1, 2, Decimal("10.25") + i,
+                debit_description=f"DR {i}",
+                credit_description=f"CR {i}",
+                loan_reference=f"LOAN-{i}",
+                split_key=f"Branch {i % 2}" if split_by_branch else None,
+            )
+        return batch
+
+    def test_summary_groups_by_split_key(self):
+        groups, per_account = _summarize_batch(self._batch(split_by_branch=True))
+        assert list(groups) == ["Branch 0", "Branch 1"]
+        assert groups["Branch 0"].indices == [0, 1, 4, 5]
+        assert groups["Branch 0"].debit == Decimal("22.50")
+        assert per_account == {
+            1: (Decimal("33.75"), Decimal("0")),
+            2: (Decimal("0"), Decimal("33.75")),
+        }
+
+    def test_each_group_must_balance(self):
+        batch = self._batch()
+        batch.add(1, Decimal("5.00"), split_key="Branch 9")
+        batch.add(2, Decimal("0"), Decimal("4.99"), split_key="Branch 9")
+        with pytest.raises(BalanceError, match="Branch 9"):
+            _summarize_batch(batch)
+
+    @pytest.mark.asyncio
+    async def test_post_line_batch_writes_one_entry_per_group(self):
+        db = AsyncMock()
+        db.add = MagicMock()
+        currency = MagicMock(id=1)
+        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=currency))
+        period = MagicMock(id=4, status=PeriodStatus.OPEN)
+
+        with patch("app.services.gl.journal_engine._validate_accounts", new=AsyncMock()) as validate, \
+             patch("app.services.gl.journal_engine._find_period_for_date", new=AsyncMock(return_value=period)), \
+             patch("app.services.gl.journal_engine.reserve_entry_numbers", new=AsyncMock(return_value=["JE-1", "JE-2"])) as reserve, \
+             patch("app.services.gl.journal_engine.period_balances.apply_deltas", new=AsyncMock()) as apply_deltas, \
+             patch("app.services.gl.journal_engine.BULK_INSERT_CHUNK", 3):
+            entries = await post_line_batch(
+                db,
+                self._batch(loans=4, split_by_branch=True),
+                source_type=JournalSourceType.INTEREST_ACCRUAL,
+                description="Accrual",
+            )
+
+        validate.assert_awaited_once_with(db, [1, 2])
+        reserve.assert_awaited_once_with(db, 2)
+        assert [e.entry_number for e in entries] == ["JE-1", "JE-2"]
+        assert [e.description for e in entries] == ["Accrual — Branch 0", "Accrual — Branch 1"]
+        assert all(e.status == JournalEntryStatus.POSTED for e in entries)
+
+        inserts = [c.args[1] for c in db.execute.await_args_list if len(c.args) > 1]
+        assert [len(rows) for rows in inserts] == [3, 1, 3, 1]
+        assert [r["line_number"] for r in inserts[0] + inserts[1]] == [1, 2, 3, 4]
+        apply_deltas.assert_awaited_once()
+        assert apply_deltas.await_args.args[2][1] == (Decimal("47.00"), Decimal("0"))
+
+    @pytest.mark.asyncio
+    async def test_post_line_batch_rejects_closed_period(self):
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=MagicMock(id=1)))
+        period = MagicMock(status=PeriodStatus.CLOSED)
+        period.name = "Jan 2026"
+        with patch("app.services.gl.journal_engine._validate_accounts", new=AsyncMock()), \
+             patch("app.services.gl.journal_engine._find_period_for_date", new=AsyncMock(return_value=period)):
+            with pytest.raises(PeriodClosedError):
+                await post_line_batch(
+                    db, self._batch(), source_type=JournalSourceType.PROVISION, description="Provision",
+                )
+
+    def test_finished_batch_records_every_entry(self):
+        from app.models.gl import AccrualBatch, AccrualBatchStatus
+        from app.services.gl.accrual_service import _finish_batch
+
+        batch = AccrualBatch(status=AccrualBatchStatus.PROCESSING)
+        entries = [MagicMock(id=41), MagicMock(id=42), MagicMock(id=43)]
+        _finish_batch(batch, entries, 9, Decimal("120.00"))
+        assert batch.status == AccrualBatchStatus.COMPLETED
+        assert batch.journal_entry_ids == [41, 42, 43]
+        assert batch.journal_entry_id == 41
+
+
 # ===================================================================
 # Enum completeness
 # ===================================================================
@@ -0,0 +1,153 @@
+"""Tests for loan servicing snapshots."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.decision import Decision
+from app.models.loan import LoanApplication, LoanPurpose, LoanStatus
+from app.models.payment import (
+    Payment,
+    PaymentSchedule,
+    PaymentStatus,
+    PaymentType,
+    ScheduleStatus,
+)
+from app.services.loan_servicing import (
+    arrears_bucket,
+    days_past_due,
+    snapshot_query,
+)
+
+TODAY = date(2026, 3, 31)
+
+
+# ── Pure helpers ──────────────────────────────────
+
+class TestDaysPastDue:
+    def test_no_unpaid_instalment(self):
+        assert days_past_due(None, TODAY) == 0
+
+    def test_due_today_or_later_is_current(self):
+        assert days_past_due(TODAY, TODAY) == 0
+        assert days_past_due(TODAY + timedelta(days=5), TODAY) == 0
+
+    def test_counts_from_oldest_unpaid(self):
+        assert days_past_due(TODAY - timedelta(days=45), TODAY) == 45
+
+
+class TestArrearsBucket:
+    @pytest.mark.parametrize("dpd,bucket", [
+        (0, "current"), (1, "1-30"), (30, "1-30"), (31, "31-60"),
+        (60, "31-60"), (61, "61-90"), (90, "61-90"), (91, "90+"), (400, "90+"),
+    ])
+    def test_boundaries(self, dpd, bucket):
+        assert arrears_bucket(dpd) == bucket
+
+
+# ── Snapshot query ────────────────────────────────
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        LoanApplication.__table__,
+        PaymentSchedule.__table__,
+        Payment.__table__,
+        Decision.__table__,
+    ])
+    with Session(engine) as s:
+        yield s
+
+
+def _loan(s, loan_id, status=LoanStatus.DISBURSED, approved=3000):
+    s.add(LoanApplication(
+        id=loan_id, reference_number=f"ZOT-{loan_id}", applicant_id=1,
+        amount_requested=3000, amount_approved=approved, term_months=3,
+        purpose=LoanPurpose.PERSONAL, status=status,
+    ))
+
+
+def _instalment(s, loan_id, n, due, paid="0", status=ScheduleStatus.UPCOMING, fee="0"):
+    s.add(PaymentSchedule(
+        loan_application_id=loan_id, installment_number=n, due_date=due,
+        principal=Decimal("900"), interest=Decimal("100"), fee=Decimal(fee),
+        amount_due=1000 + Decimal(fee), amount_paid=Decimal(paid), status=status,
+    ))
+
+
+class TestSnapshotQuery:
+    def test_figures_for_a_loan_in_arrears(self, session):
+        _loan(session, 1)
+        _instalment(session, 1, 1, TODAY - timedelta(days=70), "1000", ScheduleStatus.PAID)
+        _instalment(session, 1, 2, TODAY - timedelta(days=40), "150", ScheduleStatus.PARTIAL)
+        _instalment(session, 1, 3, TODAY - timedelta(days=10), status=ScheduleStatus.OVERDUE)
+        _instalment(session, 1, 4, TODAY + timedelta(days=20))
+        session.add(Payment(
+            loan_application_id=1, amount=Decimal("3000"), payment_type=PaymentType.DISBURSEMENT,
+            payment_date=TODAY - timedelta(days=100), status=PaymentStatus.COMPLETED,
+        ))
+        session.add(Payment(
+            loan_application_id=1, amount=Decimal("150"), payment_type=PaymentType.ONLINE,
+            payment_date=TODAY - timedelta(days=35), status=PaymentStatus.COMPLETED,
+        ))
+        session.add(Decision(loan_application_id=1, credit_score=612, risk_band="C"))
+        session.flush()
+
+        row = session.execute(snapshot_query(TODAY)).mappings().one()
+        assert row["total_paid"] == 1150
+        assert row["outstanding_balance"] == 3000 - 1150
+        # 150 paid on instalment 2 settles its interest first
+        assert row["outstanding_interest"] == 0 + 100 + 100
+        assert row["outstanding_principal"] == 850 + 900 + 900
+        assert row["outstanding_fees"] == 0
+        assert row["overdue_amount"] == 850 + 1000
+        assert row["overdue_1_30"] == 1000
+        assert row["overdue_31_60"] == 850
+        assert row["overdue_61_90"] == 0
+        assert row["oldest_unpaid_due_date"] == TODAY - timedelta(days=40)
+        assert row["arrears_bucket"] == "31-60"
+        assert row["next_due_date"] == TODAY + timedelta(days=20)
+        assert row["next_due_amount"] == 1000
+        assert row["last_payment_date"] == TODAY - timedelta(days=35)
+        assert row["last_payment_amount"] == 150
+        assert row["interest_collected"] == 100
+        assert (row["risk_band"], row["credit_score"]) == ("C", 612)
+
+    def test_unpaid_fees_are_outstanding(self, session):
+        _loan(session, 1)
+        _instalment(session, 1, 1, TODAY - timedelta(days=10), "30", ScheduleStatus.PARTIAL, fee="50")
+        _instalment(session, 1, 2, TODAY + timedelta(days=20), fee="50")
+        session.flush()
+
+        row = session.execute(snapshot_query(TODAY)).mappings().one()
+        # 30 paid on instalment 1 goes to its fee first
+        assert row["outstanding_fees"] == 20 + 50
+        assert row["outstanding_interest"] == 100 + 100
+        assert row["outstanding_principal"] == 900 + 900
+        owed = row["outstanding_principal"] + row["outstanding_interest"] + row["outstanding_fees"]
+        assert owed == 2100 - 30
+
+    def test_only_disbursed_loans_without_ids(self, session):
+        _loan(session, 1)
+        _loan(session, 2, status=LoanStatus.DECLINED)
+        _loan(session, 3)  # no schedule yet
+        for loan_id in (1, 2):
+            _instalment(session, loan_id, 1, TODAY + timedelta(days=30))
+        session.flush()
+
+        rows = session.execute(snapshot_query(TODAY)).mappings().all()
+        assert [r["loan_application_id"] for r in rows] == [1]
+        assert rows[0]["arrears_bucket"] == "current"
+        ids = session.execute(snapshot_query(TODAY, [2])).mappings().all()
+        assert [r["loan_application_id"] for r in ids] == [2]
+
+    def test_compiles_for_postgres(self):
+        sql = str(snapshot_query(TODAY, [1]).compile(dialect=postgresql.dialect()))
+        assert "GROUP BY payment_schedules.loan_application_id" in sql
+        assert "AS days_past_due" in sql
@@ -0,0 +1,152 @@
+"""Tests for cached RBAC permission resolution."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.services import permission_cache
+
+
+class FakeSession:
+    """Answers the cache's three queries from in-memory RBAC tables."""
+
+    def __init__(self, parents, direct, assignments):
+        self.parents = parents
+        self.direct = direct
+        self.assignments = assignments
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        sql = str(stmt)
+        if "user_role_assignments" in sql:
+            user_id = stmt.compile().params["user_id_1"]
+            roles = self.assignments.get(user_id, [])
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: roles))
+        if "role_permissions" in sql:
+            rows = [(r, c) for r, codes in self.direct.items() for c in codes]
+        else:
+            rows = list(self.parents.items())
+        return SimpleNamespace(all=lambda: rows)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.version = 0
+        self.published = []
+
+    async def incr(self, key):
+        self.version += 1
+        return self.version
+
+    async def get(self, key):
+        return str(self.version)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(permission_cache, "_ensure_listener", lambda: None)
+    monkeypatch.setattr(permission_cache, "_listening", False)
+    permission_cache.drop_local()
+    yield
+    permission_cache.drop_local()
+
+
+@pytest.fixture
+def db():
+    # viewer <- officer <- manager; auditor stands alone
+    return FakeSession(
+        parents={1: None, 2: 1, 3: 2, 4: None},
+        direct={1: {"loans.view"}, 2: {"loans.edit"}, 3: {"users.roles.manage"}, 4: {"audit.view"}},
+        assignments={10: [3], 11: [1, 4]},
+    )
+
+
+def test_closure_follows_parents_and_survives_cycles():
+    resolved = permission_cache.effective_permissions(
+        {1: None, 2: 1, 3: 2, 5: 6, 6: 5},
+        {1: {"a"}, 2: {"b"}, 3: {"c"}, 5: {"x"}, 6: {"y"}},
+    )
+    assert resolved[3] == {"a", "b", "c"}
+    assert resolved[1] == {"a"}
+    assert resolved[5] == resolved[6] == {"x", "y"}
+
+
+@pytest.mark.asyncio
+class TestResolution:
+    async def test_inherited_permissions(self, db):
+        assert await permission_cache.user_permissions(db, 10) == {
+            "loans.view", "loans.edit", "users.roles.manage",
+        }
+        assert await permission_cache.has_any_permission(db, 11, ["loans.edit", "audit.view"])
+        assert not await permission_cache.has_any_permission(db, 11, ["loans.edit"])
+        assert not await permission_cache.has_any_permission(db, 99, ["loans.view"])
+
+    async def test_warm_checks_cost_no_queries(self, db):
+        await permission_cache.has_any_permission(db, 10, ["loans.view"])
+        assert db.queries == 3
+        for _ in range(50):
+            await permission_cache.has_any_permission(db, 10, ["loans.edit"])
+        assert db.queries == 3
+
+    async def test_stale_snapshot_is_reloaded(self, db, monkeypatch):
+        await permission_cache.user_permissions(db, 10)
+        monkeypatch.setattr(permission_cache, "UNSUBSCRIBED_MAX_AGE", 0)
+        db.direct[1] = {"loans.view", "reports.view"}
+        assert "reports.view" in await permission_cache.user_permissions(db, 10)
+
+    async def test_load_racing_an_invalidation_is_not_kept(self, db, monkeypatch):
+        real_load = permission_cache._load_snapshot
+
+        async def load_then_invalidate(session, version):
+            snapshot = await real_load(session, version)
+            permission_cache.drop_local()
+            return snapshot
+
+        monkeypatch.setattr(permission_cache, "_load_snapshot", load_then_invalidate)
+        await permission_cache.user_permissions(db, 10)
+        assert permission_cache._snapshot is None
+
+
+@pytest.mark.asyncio
+class TestInvalidation:
+    async def test_commit_drops_cache_and_publishes(self, db, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(permission_cache, "_redis", lambda: redis)
+        await permission_cache.user_permissions(db, 10)
+
+        with Session(create_engine("sqlite://")) as session:
+            permission_cache.invalidate_on_commit(session)
+            session.commit()
+        assert permission_cache._snapshot is None
+        await asyncio.sleep(0)
+        assert redis.published == [(permission_cache.CHANNEL, 1)]
+
+    async def test_rollback_discards_the_mark(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(permission_cache, "_redis", lambda: redis)
+        with Session(create_engine("sqlite://")) as session:
+            session.execute(text("SELECT 1"))
+            permission_cache.invalidate_on_commit(session)
+            session.rollback()
+            session.commit()
+        await asyncio.sleep(0)
+        assert redis.published == []
+
+    async def test_message_for_loaded_version_is_ignored(self, db, monkeypatch):
+        redis = FakeRedis()
+        redis.version = 7
+        monkeypatch.setattr(permission_cache, "_redis", lambda: redis)
+        monkeypatch.setattr(permission_cache, "_listening", True)
+        await permission_cache.user_permissions(db, 10)
+
+        permission_cache._on_message("7")
+        assert permission_cache._snapshot is not None
+        permission_cache._on_message("8")
+        assert permission_cache._snapshot is None
@@ -0,0 +1,84 @@
+"""Tests for batched queue priority and assignment."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import Float, Integer, update
+from sqlalchemy.dialects import postgresql
+
+from app.models.loan import LoanApplication, LoanPurpose
+from app.models.queue import QueueEntry, QueueEntryStatus, StaffQueueProfile
+from app.models.user import User
+from app.services.bulk_sql import chunks, values_table
+from app.services.queue_assignment import DEFAULT_ASSIGNMENT_WEIGHTS, _pick_staff
+from app.services import queue_priority
+from app.services.queue_priority import compute_priority
+
+
+def _staff(user_id, max_concurrent=2, load=0):
+    profile = StaffQueueProfile(user_id=user_id, max_concurrent=max_concurrent, current_load_count=load)
+    return profile, User(id=user_id, first_name=f"Staff{user_id}", last_name="U")
+
+
+def _pending(entry_id):
+    entry = QueueEntry(id=entry_id, application_id=entry_id, status=QueueEntryStatus.NEW.value)
+    app = LoanApplication(id=entry_id, amount_requested=10000, purpose=LoanPurpose.PERSONAL)
+    return entry, app
+
+
+class TestPickStaff:
+    def test_greedy_spreads_by_in_memory_load(self):
+        roster = [_staff(1), _staff(2)]
+        loads = {1: 0, 2: 0}
+        picks = []
+        for i in range(1, 6):
+            entry, app = _pending(i)
+            user_id, _ = _pick_staff(roster, loads, entry, app, DEFAULT_ASSIGNMENT_WEIGHTS, None)
+            if user_id:
+                loads[user_id] += 1
+            picks.append(user_id)
+        # alternates while capacity lasts, then nobody is left
+        assert picks == [1, 2, 1, 2, None]
+        assert loads == {1: 2, 2: 2}
+
+    def test_roster_load_is_not_mutated(self):
+        roster = [_staff(1, load=1)]
+        entry, app = _pending(1)
+        _pick_staff(roster, {1: 1}, entry, app, DEFAULT_ASSIGNMENT_WEIGHTS, None)
+        assert roster[0][0].current_load_count == 1
+
+    def test_continuity_preferred(self):
+        roster = [_staff(1), _staff(2)]
+        entry, app = _pending(1)
+        app.assigned_underwriter_id = 2
+        user_id, explanation = _pick_staff(roster, {1: 0, 2: 0}, entry, app, DEFAULT_ASSIGNMENT_WEIGHTS, None)
+        assert user_id == 2
+        assert explanation.startswith("Assigned to Staff2 U")
+
+
+class TestBulkWrites:
+    def test_priority_from_column_rows(self, monkeypatch):
+        now = datetime(2026, 3, 31, 12, 0, tzinfo=timezone.utc)
+        monkeypatch.setattr(queue_priority, "_now", lambda: now)
+        submitted = now - timedelta(hours=5)
+        row = SimpleNamespace(
+            application_id=3, status=QueueEntryStatus.NEW.value, return_count=1,
+            waiting_since=None, completeness_score=90.0, is_stuck=False, is_flagged=False,
+            submitted_at=submitted, created_at=submitted, amount_requested=25000,
+        )
+        entry = QueueEntry(**{k: getattr(row, k) for k in (
+            "application_id", "status", "return_count", "waiting_since",
+            "completeness_score", "is_stuck", "is_flagged",
+        )})
+        app = LoanApplication(submitted_at=submitted, created_at=submitted, amount_requested=25000)
+        assert compute_priority(row, row) == compute_priority(entry, app)
+
+    def test_update_from_values_compiles(self):
+        v = values_table("v", {"id": Integer, "score": Float}, [(1, 0.5), (2, 0.25)])
+        stmt = update(QueueEntry).where(QueueEntry.id == v.c.id).values(priority_score=v.c.score)
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "FROM (VALUES" in sql
+        assert "AS v (id, score)" in sql
+
+    def test_chunks(self):
+        assert [len(c) for c in chunks(list(range(5)), 2)] == [2, 2, 1]
@@ -0,0 +1,108 @@
+"""Tests for the business calendar behind queue SLAs."""
+
+import random
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+from app.models.queue import QueueConfig, QueueEntry, QueueStage, SLAMode
+from app.services.queue_sla import (
+    BusinessCalendar,
+    business_hours_between,
+    calculate_sla_deadline,
+    calculate_sla_warning,
+    calendar_for,
+)
+
+UTC = timezone.utc
+MON = datetime(2026, 3, 30, tzinfo=UTC)  # a Monday
+
+
+def _walk(start, end, hours, days, holidays):
+    """Reference: accumulate business seconds one day at a time."""
+    total = 0.0
+    d = start.date()
+    while datetime.combine(d, time(0), tzinfo=UTC) < end:
+        if d.isoweekday() in days and d.isoformat() not in holidays:
+            lo = max(start, datetime.combine(d, hours[0], tzinfo=UTC))
+            hi = min(end, datetime.combine(d, hours[1], tzinfo=UTC))
+            total += max(0.0, (hi - lo).total_seconds())
+        d += timedelta(days=1)
+    return total
+
+
+def _config(**kw):
+    kw.setdefault("sla_mode", SLAMode.SOFT.value)
+    return QueueConfig(
+        business_hours_start=time(8, 0), business_hours_end=time(17, 0),
+        business_days=[1, 2, 3, 4, 5], holidays=[], **kw,
+    )
+
+
+class TestBusinessCalendar:
+    def test_interval_within_a_week(self):
+        cal = calendar_for(None)
+        # Mon 10:00 → Wed 12:00 = 7h + 9h + 4h
+        assert cal.between(MON + timedelta(hours=10), MON + timedelta(days=2, hours=12)) == timedelta(hours=20)
+
+    def test_weekend_and_holiday_skipped(self):
+        config = _config()
+        config.holidays = ["2026-04-03"]  # Friday
+        start = MON + timedelta(days=3, hours=16)  # Thu 16:00
+        assert business_hours_between(start, start + timedelta(days=4), config) == timedelta(hours=1 + 8)
+
+    def test_add_lands_on_day_end_not_next_morning(self):
+        cal = calendar_for(None)
+        assert cal.add(MON + timedelta(hours=8), 9 * 3600) == MON + timedelta(hours=17)
+        assert cal.add(MON + timedelta(hours=17), 1) == MON + timedelta(days=1, hours=8, seconds=1)
+
+    def test_cached_per_distinct_config(self):
+        assert calendar_for(_config()) is calendar_for(_config())
+        other = _config()
+        other.holidays = ["2026-12-25"]
+        assert calendar_for(other) is not calendar_for(_config())
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_day_walk(self, seed):
+        rng = random.Random(seed)
+        for _ in range(200):
+            hours = (time(rng.choice([7, 8, 9]), rng.choice([0, 30])), time(rng.choice([16, 17, 20])))
+            days = tuple(sorted(rng.sample(range(1, 8), rng.randint(1, 7))))
+            holidays = tuple(sorted({
+                (date(2026, 1, 1) + timedelta(days=rng.randint(0, 120))).isoformat() for _ in range(5)
+            }))
+            cal = BusinessCalendar.build(hours, days, holidays)
+            start = datetime(2026, 1, 1, tzinfo=UTC) + timedelta(minutes=rng.randint(0, 90 * 1440))
+            end = start + timedelta(minutes=rng.randint(0, 40 * 1440))
+            assert cal.between(start, end).total_seconds() == pytest.approx(
+                _walk(start, end, hours, set(days), set(holidays))
+            )
+            seconds = rng.randint(1, 200 * 3600)
+            due = cal.add(start, seconds)
+            assert _walk(start, due, hours, set(days), set(holidays)) == pytest.approx(seconds)
+
+
+class TestSlaTimes:
+    def test_deadlines_use_stage_targets(self):
+        config = _config(target_turnaround_hours=18)
+        stage = QueueStage(id=5, sla_target_hours=4, sla_warning_hours=2)
+        entry = QueueEntry(id=1, stage_entered_at=MON + timedelta(hours=8), sla_elapsed_seconds=0)
+        assert calculate_sla_deadline(entry, config, now=MON) == MON + timedelta(days=1, hours=17)
+        assert calculate_sla_warning(entry, config, now=MON) == MON + timedelta(days=1, hours=12)
+        assert calculate_sla_deadline(entry, config, stage, now=MON) == MON + timedelta(hours=12)
+        assert calculate_sla_warning(entry, config, stage, now=MON) == MON + timedelta(hours=10)
+
+    def test_paused_time_extends_and_past_is_now(self):
+        config = _config(target_turnaround_hours=2)
+        entry = QueueEntry(id=1, stage_entered_at=MON + timedelta(hours=8), sla_elapsed_seconds=3600)
+        assert calculate_sla_deadline(entry, config, now=MON) == MON + timedelta(hours=11)
+        # Entered the previous Monday: the deadline has passed, so it is reported as now
+        entry.stage_entered_at = MON + timedelta(days=-7, hours=8)
+        now = MON + timedelta(hours=9)
+        assert calculate_sla_deadline(entry, config, now=now) == now
+
+    def test_no_sla_mode(self):
+        config = _config(sla_mode=SLAMode.NONE.value, target_turnaround_hours=2)
+        entry = QueueEntry(id=1, stage_entered_at=MON)
+        assert calculate_sla_deadline(entry, config) is None
+        assert calculate_sla_warning(entry, config) is None
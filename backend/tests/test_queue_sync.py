@@ -0,0 +1,79 @@
+"""Tests for event-driven queue membership."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.loan import LoanApplication, LoanPurpose, LoanStatus
+from app.models.queue import QueueEntry, QueueEntryStatus, QueueStage
+from app.models.user import User
+from app.services.queue_sync import insert_missing_entries, mark_decided_entries
+
+
+def _pg(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestStatements:
+    def test_insert_is_idempotent_set_based(self):
+        sql = _pg(insert_missing_entries())
+        assert "INSERT INTO queue_entries" in sql
+        assert "SELECT loan_applications.id" in sql
+        assert "ON CONFLICT (application_id) DO NOTHING" in sql
+        assert "RETURNING queue_entries.application_id" in sql
+
+    def test_insert_restricted_to_ids(self):
+        sql = _pg(insert_missing_entries([7]))
+        assert "loan_applications.id IN" in sql
+
+    def test_mark_decided_skips_already_decided(self):
+        sql = _pg(mark_decided_entries([7]))
+        assert sql.startswith("UPDATE queue_entries SET status=")
+        assert "queue_entries.status !=" in sql
+
+
+# ── Status hooks ──────────────────────────────────
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__,
+        LoanApplication.__table__,
+        QueueStage.__table__,
+        QueueEntry.__table__,
+    ])
+    with Session(engine) as s:
+        yield s
+
+
+def test_decision_marks_entry_decided_in_the_same_flush(session):
+    session.add(LoanApplication(
+        id=1, reference_number="ZOT-1", applicant_id=1, amount_requested=5000,
+        term_months=12, purpose=LoanPurpose.PERSONAL, status=LoanStatus.APPROVED,
+    ))
+    session.flush()
+    session.add(QueueEntry(application_id=1, status=QueueEntryStatus.IN_PROGRESS.value))
+    session.flush()
+
+    loan = session.get(LoanApplication, 1)
+    loan.status = LoanStatus.DECLINED
+    session.flush()
+    session.expire_all()
+    assert session.get(QueueEntry, 1).status == QueueEntryStatus.DECIDED.value
+
+
+def test_unrelated_update_does_no_queue_work(session):
+    session.add(LoanApplication(
+        id=1, reference_number="ZOT-1", applicant_id=1, amount_requested=5000,
+        term_months=12, purpose=LoanPurpose.PERSONAL, status=LoanStatus.DECLINED,
+    ))
+    session.add(QueueEntry(application_id=1, status=QueueEntryStatus.NEW.value))
+    session.flush()
+
+    session.get(LoanApplication, 1).amount_requested = 6000
+    session.flush()
+    session.expire_all()
+    assert session.get(QueueEntry, 1).status == QueueEntryStatus.NEW.value
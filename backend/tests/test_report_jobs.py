@@ -0,0 +1,194 @@
+"""Tests for background report jobs and their result cache."""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.models.report import ReportHistory, ReportJobStatus
+from app.services import report_generators, report_jobs
+from app.services.gl import reports_service
+
+
+class FakeSession:
+    """Just enough of AsyncSession for run_job."""
+
+    def __init__(self, job):
+        self.job = job
+        self.commits = 0
+
+    async def get(self, model, pk):
+        return self.job if self.job and self.job.id == pk else None
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def _job(report_type="aged", **kw):
+    kw.setdefault("status", ReportJobStatus.PENDING.value)
+    return ReportHistory(
+        id=7, report_type=report_type, report_name="Aged", generated_by=1,
+        parameters={"date_from": "2026-01-01", "date_to": "2026-03-31", "application_id": None},
+        file_format="json" if report_jobs.is_gl(report_type) else "csv", progress=0, **kw,
+    )
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    return tmp_path
+
+
+class TestCacheKey:
+    def test_stable_across_parameter_order(self):
+        a = report_jobs.cache_key("aged", {"date_from": "2026-01-01", "date_to": "2026-02-01"}, "w1")
+        b = report_jobs.cache_key("aged", {"date_to": "2026-02-01", "date_from": "2026-01-01"}, "w1")
+        assert a == b and len(a) == 64
+
+    @pytest.mark.parametrize("change", [
+        ("exposure", {"date_from": "2026-01-01"}, "w1"),
+        ("aged", {"date_from": "2026-01-02"}, "w1"),
+        ("aged", {"date_from": "2026-01-01"}, "w2"),
+    ])
+    def test_any_component_changes_key(self, change):
+        assert report_jobs.cache_key(*change) != report_jobs.cache_key("aged", {"date_from": "2026-01-01"}, "w1")
+
+    def test_status_links_download_only_when_completed(self):
+        assert report_jobs.job_status(_job())["download_url"] is None
+        done = report_jobs.job_status(_job(status=ReportJobStatus.COMPLETED.value), cached=True)
+        assert done["download_url"] == "/api/reports/history/7/download"
+        assert done["cached"] is True
+
+
+@pytest.mark.asyncio
+class TestRunJob:
+    async def test_builds_csv_and_completes(self, upload_dir, monkeypatch):
+        seen = {}
+
+        async def fake_write(writer, db, report_type, **kwargs):
+            seen.update(kwargs)
+            writer.writerow(["Bucket", "Count"])
+            writer.writerow(["Current", 3])
+
+        monkeypatch.setattr(report_generators, "write_report", fake_write)
+        job = _job()
+        await report_jobs.run_job(FakeSession(job), 7)
+
+        assert job.status == ReportJobStatus.COMPLETED.value
+        assert job.progress == 100
+        assert job.file_path.startswith(str(upload_dir / "reports"))
+        with open(job.file_path) as fh:
+            assert fh.read().splitlines() == ["Bucket,Count", "Current,3"]
+        assert str(seen["date_from"]) == "2026-01-01"
+
+    async def test_gl_report_stored_as_json(self, upload_dir, monkeypatch):
+        async def fake_run(db, report_type, **kwargs):
+            return [{"account": "1-1000", "balance": 12.5}]
+
+        monkeypatch.setattr(reports_service, "run_report", fake_run)
+        job = _job("gl.trial_balance")
+        await report_jobs.run_job(FakeSession(job), 7)
+        with open(job.file_path) as fh:
+            payload = json.load(fh)
+        assert payload["report_type"] == "trial_balance"
+        assert payload["data"] == [{"account": "1-1000", "balance": 12.5}]
+
+    async def test_failure_recorded_and_file_removed(self, upload_dir, monkeypatch):
+        async def boom(writer, db, report_type, **kwargs):
+            writer.writerow(["partial"])
+            raise RuntimeError("query timed out")
+
+        monkeypatch.setattr(report_generators, "write_report", boom)
+        job = _job()
+        await report_jobs.run_job(FakeSession(job), 7)
+        assert job.status == ReportJobStatus.FAILED.value
+        assert job.error_message == "query timed out"
+        assert job.file_path is None
+        assert os.listdir(upload_dir / "reports") == []
+
+    async def test_failure_recorded_on_real_session(self, upload_dir, monkeypatch):
+        # The rollback expires the job; nothing after it may lazy-load
+        pytest.importorskip("aiosqlite")
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(ReportHistory.__table__.create)
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                db.add(_job())
+                await db.commit()
+
+                async def boom(writer, db, report_type, **kwargs):
+                    await db.execute(text("SELECT 1"))
+                    raise RuntimeError("query timed out")
+
+                monkeypatch.setattr(report_generators, "write_report", boom)
+                await report_jobs.run_job(db, 7)
+
+            async with AsyncSession(engine) as db:
+                job = await db.get(ReportHistory, 7)
+                assert job.status == ReportJobStatus.FAILED.value
+                assert job.error_message == "query timed out"
+        finally:
+            await engine.dispose()
+
+    async def test_job_already_picked_up_is_left_alone(self, upload_dir):
+        job = _job(status=ReportJobStatus.RUNNING.value)
+        db = FakeSession(job)
+        await report_jobs.run_job(db, 7)
+        assert db.commits == 0
+        assert job.file_path is None
+
+
+@pytest.mark.asyncio
+class TestEnqueue:
+    async def test_broker_failure_fails_the_job(self, monkeypatch):
+        from app.tasks import report_tasks
+
+        def refuse(job_id):
+            raise ConnectionError("broker unavailable")
+
+        monkeypatch.setattr(report_tasks.build_report, "delay", refuse)
+        job = _job()
+        db = FakeSession(job)
+        with pytest.raises(ConnectionError):
+            await report_jobs.enqueue(db, job)
+        # Identical submissions must not join a job no worker will run
+        assert job.status == ReportJobStatus.FAILED.value
+        assert "broker unavailable" in job.error_message
+        assert job.completed_at is not None
+        assert db.commits == 1
+
+    async def test_queued_job_is_left_pending(self, monkeypatch):
+        from app.tasks import report_tasks
+
+        sent = []
+        monkeypatch.setattr(report_tasks.build_report, "delay", sent.append)
+        job = _job()
+        db = FakeSession(job)
+        await report_jobs.enqueue(db, job)
+        assert sent == [7]
+        assert job.status == ReportJobStatus.PENDING.value
+        assert db.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_watermark_is_one_statement():
+    captured = SimpleNamespace(stmt=None)
+
+    class DB:
+        async def execute(self, stmt):
+            captured.stmt = stmt
+            return SimpleNamespace(one=lambda: (None, 4, None, 2, None))
+
+    watermark = await report_jobs.data_watermark(DB(), "aged")
+    assert watermark.endswith("|None|4|None|2|None")
+    sql = str(captured.stmt.compile(dialect=postgresql.dialect()))
+    assert sql.count("SELECT") == 6  # outer select over five scalar subqueries
@@ -0,0 +1,106 @@
+"""Tests for per-request query counting and the /metrics exposition."""
+
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.middleware.request_middleware import RequestMiddleware
+from app.services import request_metrics
+from app.services.request_metrics import Histogram, RequestStats
+
+
+@pytest.fixture(scope="module")
+def engine():
+    request_metrics.install_query_hooks()
+    request_metrics.install_query_hooks()  # idempotent
+    eng = create_engine("sqlite://")
+    yield eng
+    eng.dispose()
+
+
+def _run_queries(engine, n):
+    with engine.connect() as conn:
+        for i in range(n):
+            conn.execute(text("SELECT :i"), {"i": i})
+        conn.execute(text("SELECT 'other'"))
+
+
+class TestQueryHooks:
+    def test_counts_only_inside_a_request(self, engine):
+        _run_queries(engine, 2)  # outside any request: not attributed
+        stats, token = request_metrics.start_request()
+        try:
+            _run_queries(engine, 3)
+        finally:
+            request_metrics.end_request(token)
+        assert stats.query_count == 4
+        assert stats.db_seconds > 0
+        # repeated statements are grouped by their SQL text
+        assert {sql: count for sql, count, _ in stats.top_statements()} == {
+            "SELECT ?": 3, "SELECT 'other'": 1,
+        }
+        assert request_metrics.current_stats() is None
+
+    def test_failed_statement_does_not_skew_timing(self, engine):
+        stats, token = request_metrics.start_request()
+        try:
+            with engine.connect() as conn:
+                with pytest.raises(Exception):
+                    conn.execute(text("SELECT * FROM missing_table"))
+                conn.execute(text("SELECT 1"))
+        finally:
+            request_metrics.end_request(token)
+        assert stats.query_count == 1
+
+
+def test_histogram_exposition():
+    hist = Histogram("t_seconds", "Test.", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(("/a",), value)
+    lines = hist.render()
+    assert lines[:2] == ["# HELP t_seconds Test.", "# TYPE t_seconds histogram"]
+    assert 't_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 't_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 't_seconds_sum{route="/a"} 3.65' in lines
+    assert 't_seconds_count{route="/a"} 4' in lines
+
+
+def test_slow_request_logs_top_statements(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_request_ms", 10)
+    stats = RequestStats()
+    for _ in range(40):
+        stats.record("SELECT * FROM payments WHERE loan_id = $1", 0.002)
+    with caplog.at_level(logging.WARNING, logger="zotta.requests"):
+        request_metrics.observe_request("GET", "/api/test/slow", 200, 0.5, stats)
+    assert "Slow request GET /api/test/slow: 500ms, 40 queries" in caplog.text
+    assert "40x 80.0ms  SELECT * FROM payments WHERE loan_id = $1" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_route_template(engine):
+    app = FastAPI()
+    app.add_middleware(RequestMiddleware)
+
+    @app.get("/api/test/loans/{loan_id}")
+    async def loan(loan_id: int):
+        _run_queries(engine, loan_id)
+        return {"id": loan_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for loan_id in (2, 7):
+            assert (await client.get(f"/api/test/loans/{loan_id}")).status_code == 200
+
+    output = request_metrics.render_metrics()
+    labels = 'method="GET",route="/api/test/loans/{loan_id}"'
+    assert f"zotta_http_requests_total{{{labels},status=\"200\"}} 2" in output
+    assert f"zotta_http_request_duration_seconds_count{{{labels}}} 2" in output
+    # 3 and 8 statements: one in the le=5 bucket, both by le=10
+    assert f'zotta_http_request_db_queries_bucket{{{labels},le="5"}} 1' in output
+    assert f'zotta_http_request_db_queries_bucket{{{labels},le="10"}} 2' in output
+    assert f"zotta_http_request_db_queries_sum{{{labels}}} 11" in output
@@ -0,0 +1,124 @@
+"""Tests for the pure-ASGI request middleware."""
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.middleware import error_capture, request_middleware
+from app.middleware.request_middleware import RequestMiddleware
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(RequestMiddleware)
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.post("/boom")
+    async def boom(request: Request):
+        await request.json()
+        raise RuntimeError("database unavailable")
+
+    @app.get("/unavailable")
+    async def unavailable():
+        return JSONResponse({"detail": "down"}, status_code=503)
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    @app.post("/api/auth/login")
+    async def login(request: Request):
+        await request.body()
+        raise RuntimeError("login failed")
+
+    return app
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = []
+
+    async def fake_log(exc, **kwargs):
+        calls.append({"exc": exc, **kwargs})
+
+    monkeypatch.setattr(error_capture, "log_error_standalone", fake_log)
+    return calls
+
+
+@pytest.fixture
+def token_decodes(monkeypatch):
+    calls = []
+    real = error_capture._user_from_token
+
+    def counting(headers):
+        calls.append(1)
+        return real(headers)
+
+    monkeypatch.setattr(error_capture, "_user_from_token", counting)
+    return calls
+
+
+async def _request(method, path, **kwargs):
+    transport = httpx.ASGITransport(app=_app(), raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, **kwargs)
+
+
+@pytest.mark.asyncio
+class TestRequestMiddleware:
+    async def test_headers_added_without_touching_auth(self, recorded, token_decodes):
+        resp = await _request("GET", "/ok", headers={"Authorization": "Bearer x.y.z"})
+        assert resp.json() == {"ok": True}
+        assert resp.headers["X-Content-Type-Options"] == "nosniff"
+        assert resp.headers["X-Frame-Options"] == "DENY"
+        assert resp.headers["X-Response-Time"].endswith("ms")
+        assert recorded == [] and token_decodes == []
+
+    async def test_streaming_response_passes_through(self, recorded):
+        resp = await _request("GET", "/stream")
+        assert resp.text == "chunk0\nchunk1\nchunk2\n"
+        assert resp.headers["Referrer-Policy"] == "strict-origin-when-cross-origin"
+
+    async def test_unhandled_exception_becomes_500_and_is_recorded(self, recorded, token_decodes):
+        resp = await _request("POST", "/boom", json={"amount": 100})
+        assert resp.status_code == 500
+        assert resp.json() == {"detail": "Internal Server Error"}
+        assert resp.headers["X-Frame-Options"] == "DENY"
+        [entry] = recorded
+        assert str(entry["exc"]) == "database unavailable"
+        assert entry["severity"] == request_middleware.ErrorSeverity.CRITICAL
+        assert entry["request_body"] == '{"amount":100}'
+        assert entry["request_path"] == "/boom"
+        assert token_decodes == [1]
+
+    async def test_large_body_not_recorded(self, recorded):
+        payload = {"blob": "x" * error_capture._MAX_BODY_SIZE}
+        await _request("POST", "/boom", json=payload)
+        assert recorded[0]["request_body"] is None
+
+    async def test_sensitive_body_not_recorded(self, recorded):
+        await _request("POST", "/api/auth/login", json={"password": "secret"})
+        assert recorded[0]["request_body"] is None
+
+    async def test_returned_5xx_recorded(self, recorded):
+        resp = await _request("GET", "/unavailable")
+        assert resp.status_code == 503
+        [entry] = recorded
+        assert entry["status_code"] == 503
+        assert str(entry["exc"]) == "HTTP 503 on GET /unavailable"
+
+    async def test_4xx_not_recorded(self, recorded):
+        resp = await _request("GET", "/missing")
+        assert resp.status_code == 404
+        assert recorded == []
@@ -9,6 +9,8 @@ from app.services.decision_engine.rules import (
     RuleInput,
     evaluate_rules,
     get_active_registry,
+    get_compiled_rules,
+    bind_comparator,
     RULES_REGISTRY,
     DEFAULT_RULES,
     _compare,
@@ -663,3 +665,51 @@ class TestR21ScorecardScoreRule:
         assert r21.passed is False
         assert r21.severity == "refer"
         assert result.outcome == "manual_review"
+
+
+# ── Compiled rules program ───────────────────────────────────────────────
+
+class TestCompiledRules:
+    def _config(self):
+        config = dict(DEFAULT_RULES)
+        config["rules_registry"] = {
+            "R03": {"threshold": 5000},
+            "R16": {"enabled": False},
+            "CUSTOM_01": {
+                "name": "Sector",
+                "field": "employment_type",
+                "operator": "not_in",
+                "threshold": ["Gambling ", "CASINO"],
+                "outcome": "refer",
+                "severity": "refer",
+                "type": "threshold",
+                "is_custom": True,
+                "enabled": True,
+            },
+        }
+        return config
+
+    def test_compiled_output_matches_raw_config(self):
+        config = self._config()
+        program = get_compiled_rules(config)
+        for inp in (
+            _healthy_input(),
+            _healthy_input(monthly_income=4000, employment_type="casino"),
+            _healthy_input(applicant_age=16, scorecard_score=300.0),
+        ):
+            assert evaluate_rules(inp, program) == evaluate_rules(inp, config)
+
+    def test_cached_per_version(self):
+        config = self._config()
+        first = get_compiled_rules(config, version=9001)
+        assert get_compiled_rules(config, version=9001) is first
+        assert get_compiled_rules(config, version=9002) is not first
+
+    def test_default_program_shared(self):
+        assert get_compiled_rules(None) is get_compiled_rules(DEFAULT_RULES)
+
+    def test_bound_in_operator_normalizes_threshold_once(self):
+        matcher = bind_comparator("in", ["Salaried ", "CONTRACT"])
+        assert matcher("salaried") is True
+        assert matcher(" Contract") is True
+        assert matcher("self_employed") is False
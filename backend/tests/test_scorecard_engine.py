@@ -12,12 +12,14 @@ from app.services.scorecard_engine import (
     score_application, _match_bin, _determine_decision, _generate_reason_codes,
     generate_scoring_script, parse_scorecard_csv, build_scorecard_from_parsed,
     select_decisioning_model, extract_applicant_data, what_if_analysis,
-    batch_score_csv,
+    batch_score_csv, compile_scorecard, score_batch, score_totals,
+    iter_batch_score_csv, batch_score_summary,
 )
 from app.services.scorecard_performance import (
     calculate_gini, calculate_ks, calculate_psi,
     build_score_distribution_pcts, calculate_iv,
 )
+from app.services.scorecard_metrics import score_band_tables
 
 
 # ────────────────────────────────────────────────────────────────────
@@ -466,12 +468,24 @@ class TestPerformanceMetrics:
 
     def test_gini_no_discrimination(self):
         """Truly random/mixed scores should give Gini between 0 and 1."""
-        # With tied scores, Gini depends on sort-order of ties, so it won't be exactly 0
         scores = [300, 400, 500, 300, 400, 500]
         defaults = [True, False, True, False, True, False]
         gini = calculate_gini(scores, defaults)
         assert 0 <= gini < 0.5  # weak discrimination
 
+    def test_gini_ties_do_not_depend_on_order(self):
+        """Tied scores count as half a concordant pair regardless of row order."""
+        scores = [500, 500, 500, 500]
+        assert calculate_gini(scores, [True, True, False, False]) == 0.0
+        assert calculate_gini(scores, [False, False, True, True]) == 0.0
+        assert calculate_ks(scores, [True, False, True, False]) == 0.0
+
+    def test_gini_partial_ties(self):
+        scores = [100, 200, 200, 300]
+        defaults = [True, True, False, False]
+        # Pairs (bad, good): 3 concordant, 1 tied -> AUC 0.875, Gini 0.75
+        assert calculate_gini(scores, defaults) == 0.75
+
     def test_gini_empty(self):
         """Empty lists should return 0."""
         assert calculate_gini([], []) == 0.0
@@ -516,6 +530,20 @@ class TestPerformanceMetrics:
         iv = calculate_iv(good_pcts, bad_pcts)
         assert iv > 0  # Should have predictive power
 
+    def test_score_band_tables(self):
+        scores = [150, 160, 420, 849, 850, 90]
+        defaults = [True, False, False, False, True, True]
+        decisions = ["AUTO_DECLINE", "MANUAL_REVIEW", "AUTO_APPROVE", "AUTO_APPROVE", "AUTO_APPROVE", "AUTO_DECLINE"]
+        distribution, bands = score_band_tables(scores, defaults, decisions, 100, 850)
+        assert len(distribution) == 10
+        # 850 and 90 fall outside [min, max)
+        assert sum(d["count"] for d in distribution) == 4
+        assert bands[0] == {
+            "band": "100-175", "count": 2, "pct_of_total": 33.3, "approved": 0,
+            "approval_rate": 0.0, "default_count": 1, "default_rate": 50.0,
+        }
+        assert [b["band"] for b in bands] == ["100-175", "400-475", "775-850"]
+
     def test_score_distribution_pcts(self):
         """Test score distribution percentage calculation."""
         scores = [100, 200, 300, 400, 500]
@@ -539,6 +567,53 @@ class TestBatchScoring:
         assert results[0]["total_score"] == 536 - 16 + 47 + 39  # 606
         assert results[1]["total_score"] == 536 + 8 + 0 + 16  # 560
 
+    def test_score_batch_matches_score_application(self):
+        sc = _make_scorecard()
+        # Overlapping range appended last: the earlier bins must still win
+        sc.characteristics[0].bins.append(
+            ScorecardBin(id=5, characteristic_id=1, bin_type=BinType.RANGE,
+                         min_value=None, max_value=40, label="Under 40", points=-99, sort_order=4),
+        )
+        rows = [
+            {"age": 30, "occupation": "Professional", "payment_channel": "Payroll"},
+            {"age": 12.5, "occupation": " clerical ", "payment_channel": None},
+            {"age": "abc", "occupation": "Unknown"},
+            {"age": float("inf"), "occupation": None, "payment_channel": "cash"},
+            {"age": 55, "occupation": "Manual/Laborer", "payment_channel": "Payroll"},
+            {},
+        ]
+        compiled = compile_scorecard(sc)
+        expected = [score_application(sc, r) for r in rows]
+        assert score_batch(compiled, rows) == expected
+        assert score_totals(compiled, rows) == [
+            (e["total_score"], e["decision"]) for e in expected
+        ]
+
+    def test_chunked_csv_keeps_row_numbers(self):
+        sc = _make_scorecard()
+        lines = ["age,occupation,payment_channel\n"] + [
+            f"{20 + i},Professional,Cash\n" for i in range(7)
+        ]
+        chunks = list(iter_batch_score_csv(sc, lines, chunk_size=3))
+        assert [len(c) for c in chunks] == [3, 3, 1]
+        flat = [r for c in chunks for r in c]
+        assert [r["row_number"] for r in flat] == list(range(2, 9))
+        assert flat == batch_score_csv(sc, "".join(lines))
+
+    def test_batch_score_summary(self):
+        sc = _make_scorecard()
+        csv_content = (
+            "age,occupation,payment_channel\n"
+            "50,Professional,Payroll\n"
+            "30,Manual/Laborer,\n"
+            "40,Clerical,Cash\n"
+        )
+        summary = batch_score_summary(sc, csv_content.splitlines(keepends=True), max_results=2)
+        assert summary["total_scored"] == 3
+        assert [r["row_number"] for r in summary["results"]] == [2, 3]
+        assert summary["summary"]["decline_rate"] == 33.3
+        assert summary["summary"]["review_rate"] == 66.7
+
 
 # ────────────────────────────────────────────────────────────────────
 # Scorecard1.csv Verification Tests
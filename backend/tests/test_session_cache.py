@@ -0,0 +1,165 @@
+"""Tests for the session-validity cache and write-behind heartbeat."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.models.user import User, UserRole
+from app.services import session_cache
+from app.services.session_cache import HeartbeatBuffer
+
+
+class AsyncAdapter:
+    """Just enough of AsyncSession over a sync Session for ``cached_user``."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def merge(self, instance, load=True):
+        return self.session.merge(instance, load=load)
+
+
+class FakeSession:
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(session_cache, "_ensure_listener", lambda: None)
+    monkeypatch.setattr(session_cache, "_listening", True)
+    session_cache.drop_local()
+    yield
+    session_cache.drop_local()
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine("sqlite://")
+    User.__table__.create(eng)
+    with Session(eng) as s:
+        s.add(User(
+            id=1, email="officer@zotta.tt", hashed_password="x", first_name="Ann",
+            last_name="Lee", role=UserRole.SENIOR_UNDERWRITER, status="active",
+        ))
+        s.commit()
+    eng.statements = []
+    event.listen(eng, "before_cursor_execute", lambda *a: eng.statements.append(a[2]))
+    yield eng
+    eng.dispose()
+
+
+def _remember(engine, jti="jti-1"):
+    with Session(engine) as s:
+        session_cache.remember(jti, s.get(User, 1), session_cache.generation())
+    engine.statements.clear()
+
+
+@pytest.mark.asyncio
+class TestValidityCache:
+    async def test_hit_attaches_user_without_queries(self, engine):
+        _remember(engine)
+        with Session(engine) as s:
+            user = await session_cache.cached_user(AsyncAdapter(s), "jti-1", 1)
+            assert user in s
+            assert user.email == "officer@zotta.tt"
+            assert (user.role, user.status) == (UserRole.SENIOR_UNDERWRITER, "active")
+            assert engine.statements == []
+
+    async def test_miss_for_other_user_or_expired(self, engine, monkeypatch):
+        _remember(engine)
+        with Session(engine) as s:
+            assert await session_cache.cached_user(AsyncAdapter(s), "jti-1", 2) is None
+            assert await session_cache.cached_user(AsyncAdapter(s), "unknown", 1) is None
+        monkeypatch.setattr(session_cache, "SESSION_TTL", -1)
+        _remember(engine)
+        with Session(engine) as s:
+            assert await session_cache.cached_user(AsyncAdapter(s), "jti-1", 1) is None
+
+    async def test_editing_cached_user_writes_and_invalidates(self, engine, monkeypatch):
+        published = []
+
+        async def publish(messages):
+            published.extend(messages)
+
+        monkeypatch.setattr(session_cache, "_publish", publish)
+        _remember(engine)
+        with Session(engine) as s:
+            user = await session_cache.cached_user(AsyncAdapter(s), "jti-1", 1)
+            user.first_name = "Anne"
+            s.commit()
+        assert any(sql.startswith("UPDATE users") for sql in engine.statements)
+        assert "jti-1" not in session_cache._entries
+        await asyncio.sleep(0)
+        assert published == ["user:1"]
+
+    async def test_revocations(self, engine):
+        _remember(engine, "jti-1")
+        _remember(engine, "jti-2")
+        session_cache._drop("jti:jti-1")
+        assert set(session_cache._entries) == {"jti-2"}
+        session_cache._drop("user:1")
+        assert session_cache._entries == {}
+
+    async def test_revocation_during_validation_is_not_cached(self, engine):
+        with Session(engine) as s:
+            generation = session_cache.generation()
+            user = s.get(User, 1)
+            session_cache._drop("user:1")
+            session_cache.remember("jti-1", user, generation)
+        assert session_cache._entries == {}
+
+
+@pytest.mark.asyncio
+class TestHeartbeat:
+    async def test_touches_are_debounced_per_session(self):
+        buf = HeartbeatBuffer(flush_interval=60, session_factory=FakeSession)
+        assert buf.touch("a") is True
+        assert buf.touch("a") is False
+        assert buf.touch("b") is True
+        assert buf.pending == 2
+        await buf.stop()
+
+    async def test_flush_is_one_batched_update(self):
+        sessions = []
+
+        def factory():
+            sessions.append(FakeSession())
+            return sessions[-1]
+
+        buf = HeartbeatBuffer(flush_interval=0.01, session_factory=factory)
+        for jti in ("a", "b", "c", "a"):
+            buf.touch(jti)
+        await asyncio.sleep(0.05)
+        assert buf.pending == 0
+        [db] = sessions
+        stmt, params = db.executed[0]
+        assert str(stmt).startswith("UPDATE user_sessions SET last_activity_at")
+        assert sorted(p["jti"] for p in params) == ["a", "b", "c"]
+        assert db.commits == 1
+
+    async def test_flush_failure_is_swallowed(self):
+        class Broken(FakeSession):
+            async def execute(self, stmt, params=None):
+                raise ConnectionError("db down")
+
+        buf = HeartbeatBuffer(flush_interval=60, session_factory=Broken)
+        buf.touch("a")
+        assert await buf.flush() == 0
+        assert buf.pending == 0
+        await buf.stop()
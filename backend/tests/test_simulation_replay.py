@@ -0,0 +1,210 @@
+"""Tests for the batched replay behind strategy simulation and scorecard impact."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.catalog import CreditProduct
+from app.models.decision import Decision
+from app.models.loan import ApplicantProfile, LoanApplication, LoanPurpose, LoanStatus
+from app.services import scorecard_engine
+from app.services.decision_engine import simulation
+
+pytest.importorskip("aiosqlite")
+# SQLite ignores DISTINCT ON; load_replay_batch keeps the first row per
+# application, so the ORDER BY alone still picks the latest decision here
+pytestmark = pytest.mark.filterwarnings("ignore:DISTINCT ON:sqlalchemy.exc.SADeprecationWarning")
+
+T0 = datetime(2026, 3, 1, 9, 0)
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for table in (
+            CreditProduct.__table__, LoanApplication.__table__,
+            ApplicantProfile.__table__, Decision.__table__,
+        ):
+            await conn.run_sync(table.create)
+
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, sql, params, context, many: statements.append(sql),
+    )
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.info["statements"] = statements
+        yield session
+    await engine.dispose()
+
+
+def _app(id, created_at=T0, status=LoanStatus.APPROVED):
+    return LoanApplication(
+        id=id, reference_number=f"ZOT-{id:04d}", applicant_id=id, amount_requested=5000,
+        term_months=12, purpose=LoanPurpose.PERSONAL, status=status, created_at=created_at,
+    )
+
+
+def _profile(user_id):
+    return ApplicantProfile(user_id=user_id, monthly_income=8000, monthly_expenses=1000)
+
+
+# ===================================================================
+# Strategy replay
+# ===================================================================
+
+
+@pytest.mark.asyncio
+class TestLoadReplayBatch:
+    async def test_latest_decision_per_application(self, db):
+        db.add_all([_app(1), _app(2), _profile(1), _profile(2)])
+        db.add_all([
+            Decision(id=10, loan_application_id=1, final_outcome="auto_decline", created_at=T0),
+            Decision(id=11, loan_application_id=1, final_outcome="auto_approve",
+                     created_at=T0 + timedelta(hours=1)),
+            # Same timestamp: the higher id is the later decision
+            Decision(id=20, loan_application_id=2, final_outcome="manual_review", created_at=T0),
+            Decision(id=21, loan_application_id=2, final_outcome="auto_decline", created_at=T0),
+        ])
+        await db.commit()
+
+        applications, latest = await simulation.load_replay_batch([1, 2, 3], db)
+        assert set(applications) == {1, 2}
+        assert applications[1][1].user_id == 1
+        assert latest == {1: "auto_approve", 2: "auto_decline"}
+
+    async def test_empty_batch_skips_the_database(self, db):
+        assert await simulation.load_replay_batch([], db) == ({}, {})
+        assert db.info["statements"] == []
+
+    async def test_latest_decision_uses_distinct_on(self):
+        captured = []
+
+        class DB:
+            async def execute(self, stmt):
+                captured.append(stmt)
+                return SimpleNamespace(all=lambda: [])
+
+        await simulation.load_replay_batch([1], DB())
+        sql = str(captured[1].compile(dialect=postgresql.dialect()))
+        assert "DISTINCT ON (decisions.loan_application_id)" in sql
+        assert "ORDER BY decisions.loan_application_id, decisions.created_at DESC, decisions.id DESC" in sql
+
+
+@pytest.mark.asyncio
+class TestReplayHistorical:
+    async def _seed(self, db, n):
+        for i in range(1, n + 1):
+            db.add_all([_app(i), _profile(i)])
+            db.add(Decision(loan_application_id=i, final_outcome="auto_decline", created_at=T0))
+        await db.commit()
+
+    async def test_every_application_replayed_once_across_chunks(self, db):
+        await self._seed(db, 7)
+        ids = [1, 2, 3, 4, 5, 6, 7, 99]  # 99 does not exist
+        result = await simulation.replay_historical(None, None, ids, db, chunk_size=3)
+
+        assert [r["application_id"] for r in result.results] == [1, 2, 3, 4, 5, 6, 7]
+        assert result.total_applications == 8
+        assert sum(result.summary["original"].values()) == 7
+        assert result.summary["original"]["decline"] == 7
+        assert sum(result.summary["new"].values()) == 7
+
+    async def test_results_capped_but_summary_covers_all(self, db):
+        await self._seed(db, 6)
+        result = await simulation.replay_historical(
+            None, None, list(range(1, 7)), db, chunk_size=4, sample_size=2,
+        )
+        assert [r["application_id"] for r in result.results] == [1, 2]
+        assert sum(result.summary["new"].values()) == 6
+        assert result.summary["total_changed"] == sum(
+            n for outcome, n in result.summary["new"].items() if outcome != "decline"
+        )
+
+    async def test_impact_compares_every_application(self, db):
+        await self._seed(db, 5)
+        analysis = await simulation.impact_analysis(
+            None, None, None, None, list(range(1, 6)), db, chunk_size=2, sample_size=1,
+        )
+        # Identical configurations never disagree
+        assert analysis.total_compared == 5
+        assert analysis.approvals_old == analysis.approvals_new
+        assert analysis.approvals_new + analysis.declines_new + analysis.refers_new == 5
+        assert analysis.total_changed == 0
+        assert analysis.changed_decisions == []
+
+
+# ===================================================================
+# Scorecard impact simulation
+# ===================================================================
+
+
+@pytest.mark.asyncio
+class TestSimulateImpactPaging:
+    @pytest.fixture
+    def scored(self, monkeypatch):
+        seen: list[int] = []
+
+        def fake_totals(compiled, rows):
+            seen.extend(row["id"] for row in rows)
+            return [(500.0, "AUTO_APPROVE") for _ in rows]
+
+        monkeypatch.setattr(scorecard_engine, "compile_scorecard", lambda sc: None)
+        monkeypatch.setattr(
+            scorecard_engine, "extract_applicant_data", lambda profile, app: {"id": app.id},
+        )
+        monkeypatch.setattr(scorecard_engine, "score_totals", fake_totals)
+        monkeypatch.setattr(scorecard_engine, "BATCH_CHUNK_SIZE", 2)
+        return seen
+
+    async def test_pages_newest_first_without_gaps_or_repeats(self, db, scored):
+        # Ties on created_at straddle the page boundaries
+        created = {1: T0, 2: T0, 3: T0, 4: T0 + timedelta(days=1), 5: T0 + timedelta(days=1),
+                   6: T0 + timedelta(days=2), 7: T0 - timedelta(days=1)}
+        for app_id, ts in created.items():
+            db.add_all([_app(app_id, created_at=ts), _profile(app_id)])
+        db.add(_app(8, status=LoanStatus.DRAFT))
+        await db.commit()
+
+        scorecard = SimpleNamespace(min_score=0, max_score=1000)
+        result = await scorecard_engine.simulate_impact(scorecard, db, sample_limit=100)
+
+        assert scored == [6, 5, 4, 3, 2, 1, 7]
+        assert result["total_scored"] == 7
+
+    async def test_sample_limit_respected_mid_page(self, db, scored):
+        for app_id in range(1, 6):
+            db.add_all([_app(app_id), _profile(app_id)])
+        await db.commit()
+
+        scorecard = SimpleNamespace(min_score=0, max_score=1000)
+        await scorecard_engine.simulate_impact(scorecard, db, sample_limit=3)
+        assert scored == [5, 4, 3]
+
+    async def test_empty_page_stops_the_loop(self, db, scored):
+        for app_id in range(1, 5):
+            db.add_all([_app(app_id), _profile(app_id)])
+        await db.commit()
+        db.info["statements"].clear()
+
+        scorecard = SimpleNamespace(min_score=0, max_score=1000)
+        await scorecard_engine.simulate_impact(scorecard, db, sample_limit=100)
+        # Two full pages, then one empty page ends the scan
+        assert scored == [4, 3, 2, 1]
+        pages = [s for s in db.info["statements"] if "FROM loan_applications" in s]
+        assert len(pages) == 3
+
+    async def test_applications_without_profile_are_not_scored(self, db, scored):
+        db.add_all([_app(1), _app(2), _profile(2)])
+        await db.commit()
+
+        scorecard = SimpleNamespace(min_score=0, max_score=1000)
+        result = await scorecard_engine.simulate_impact(scorecard, db, sample_limit=100)
+        assert scored == [2]
+        assert result["total_scored"] == 1
@@ -10,13 +10,16 @@ Covers:
   - Reason code correctness
 """
 
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from unittest.mock import MagicMock
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.models.strategy import DecisionStrategy, EvaluationMode, StrategyStatus
 from app.services.decision_engine.rules import RuleInput
 from app.services.decision_engine.strategy_executor import (
-    execute_strategy, StrategyResult,
+    execute_strategy, StrategyResult, _compile_rule_set, _rule_set_key,
 )
 
 
@@ -308,3 +311,39 @@ class TestReasonCodes:
         result = execute_strategy(strategy, rule_input)
         # Should approve since the field is not available and fail_on_null is False
         assert result.outcome in ("approve", "refer")
+
+
+class TestRuleSetCache:
+    KNOCK_OUT = {"rule_id": "KO1", "name": "Min Age", "field": "applicant_age",
+                 "operator": "gte", "threshold": 18, "severity": "hard"}
+
+    def _saved(self, updated_at, threshold=18):
+        s = DecisionStrategy(
+            id=9, name="Saved", version=3, evaluation_mode=EvaluationMode.DUAL_PATH,
+            knock_out_rules=[dict(self.KNOCK_OUT, threshold=threshold)], overlay_rules=[],
+            score_cutoffs=None, terms_matrix=None, concentration_limits=None,
+            reason_code_map=None, rules_config_id=None, scorecard_id=None,
+            updated_at=updated_at,
+        )
+        make_transient_to_detached(s)
+        return s
+
+    def test_saved_rule_list_compiled_once_per_edit(self):
+        before = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        strategy = self._saved(before)
+        key = _rule_set_key(strategy, "knock_out")
+        assert key == ("DecisionStrategy", (9,), before, "knock_out")
+        first = _compile_rule_set(strategy.knock_out_rules, key)
+        assert _compile_rule_set(list(strategy.knock_out_rules), key) is first
+
+        # Edited in place and saved: same id and version, new updated_at
+        edited = self._saved(before + timedelta(minutes=1), threshold=21)
+        assert execute_strategy(edited, _make_input(applicant_age=19)).outcome == "decline"
+        assert execute_strategy(strategy, _make_input(applicant_age=19)).outcome != "decline"
+
+    def test_unsaved_or_modified_rules_not_cached(self):
+        strategy = self._saved(datetime(2026, 5, 1, tzinfo=timezone.utc))
+        strategy.knock_out_rules = [dict(self.KNOCK_OUT, threshold=30)]
+        assert _rule_set_key(strategy, "knock_out") is None
+        assert _rule_set_key(_make_strategy(), "knock_out") is None
+        assert _rule_set_key(None, "hard") is None
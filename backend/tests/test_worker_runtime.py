@@ -0,0 +1,97 @@
+"""Tests for the per-process event loop and engine behind Celery tasks."""
+
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.tasks import runtime
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture(autouse=True)
+def fresh_runtime(monkeypatch, tmp_path):
+    monkeypatch.setattr(runtime.settings, "database_url", f"sqlite+aiosqlite:///{tmp_path / 'worker.db'}")
+    # aiosqlite defaults to NullPool; pool like asyncpg does in production
+    monkeypatch.setattr(
+        runtime, "create_async_engine",
+        lambda url, **kw: create_async_engine(url, poolclass=AsyncAdaptedQueuePool, **kw),
+    )
+    runtime.shutdown_worker_runtime()
+    yield
+    runtime.shutdown_worker_runtime()
+    asyncio.set_event_loop(None)
+
+
+def _count_connects(engine) -> list:
+    connects = []
+    event.listen(engine.sync_engine, "connect", lambda conn, record: connects.append(conn))
+    return connects
+
+
+async def _select_one() -> int:
+    async with runtime.get_session_factory()() as db:
+        return (await db.execute(text("SELECT 1"))).scalar_one()
+
+
+class TestSharedRuntime:
+    def test_factory_and_engine_created_once(self):
+        factory = runtime.get_session_factory()
+        assert runtime.get_session_factory() is factory
+        assert factory.kw["bind"] is runtime.get_engine()
+        assert factory.kw["expire_on_commit"] is False
+
+    def test_tasks_reuse_loop_and_pooled_connection(self):
+        connects = _count_connects(runtime.get_engine())
+        loop = runtime.get_loop()
+        for _ in range(3):
+            assert runtime.run_async(_select_one()) == 1
+        assert runtime.get_loop() is loop
+        assert len(connects) == 1
+
+    def test_closed_loop_replaced(self):
+        loop = runtime.get_loop()
+        loop.close()
+        assert runtime.get_loop() is not loop
+        assert runtime.run_async(asyncio.sleep(0, result="ok")) == "ok"
+
+
+class TestWorkerSignals:
+    def test_init_drops_inherited_engine_without_closing(self):
+        inherited = MagicMock()
+        runtime._engine = inherited
+        parent_loop = runtime.get_loop()
+
+        runtime.init_worker_runtime()
+
+        inherited.sync_engine.dispose.assert_called_once_with(close=False)
+        assert runtime._engine is not inherited
+        assert runtime._loop is not parent_loop
+        assert runtime._session_factory.kw["bind"] is runtime._engine
+
+    def test_shutdown_disposes_pool_and_closes_loop(self):
+        runtime.run_async(_select_one())
+        engine, loop = runtime._engine, runtime._loop
+        assert engine.pool.checkedin() == 1
+
+        runtime.shutdown_worker_runtime()
+        assert engine.pool.checkedin() == 0
+        assert loop.is_closed()
+        assert (runtime._loop, runtime._engine, runtime._session_factory) == (None, None, None)
+        # Both shutdown signals fire in the worker's main process
+        runtime.shutdown_worker_runtime()
+
+    def test_failed_dispose_still_closes_loop(self, caplog):
+        loop = runtime.get_loop()
+        runtime._engine = MagicMock(dispose=AsyncMock(side_effect=OSError("gone")))
+
+        with caplog.at_level(logging.WARNING, logger=runtime.__name__):
+            runtime.shutdown_worker_runtime()
+        assert "Failed to dispose worker engine: gone" in caplog.text
+        assert loop.is_closed()
+        assert runtime._engine is None
@@ -166,6 +166,7 @@ export const reportsApi = {
   getReportTypes: () => api.get('/reports/types'),
   generateReport: (reportType: string, params: { date_from?: string; date_to?: string; application_id?: number }) =>
     api.post(`/reports/generate/${reportType}`, params),
+  getJob: (id: number) => api.get(`/reports/jobs/${id}`),
   getHistory: () => api.get('/reports/history'),
   downloadHistorical: (id: number) =>
     api.get(`/reports/history/${id}/download`, { responseType: 'blob' }),
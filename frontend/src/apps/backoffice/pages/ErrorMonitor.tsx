@@ -15,6 +15,8 @@ interface ErrorLogEntry {
   error_type: string;
   message: string;
   traceback: string | null;
+  fingerprint: string | null;
+  occurrence_count: number;
   module: string | null;
   function_name: string | null;
   line_number: number | null;
@@ -31,6 +33,7 @@ interface ErrorLogEntry {
   resolved_at: string | null;
   resolution_notes: string | null;
   created_at: string;
+  last_seen_at: string;
 }
 
 interface ErrorStats {
@@ -356,7 +359,12 @@ export default function ErrorMonitor() {
                     <span className={`text-xs font-medium ${sev.color}`}>{sev.label}</span>
                   </div>
                   <div className="min-w-0">
-                    <p className="text-sm font-medium truncate">{log.error_type}</p>
+                    <p className="text-sm font-medium truncate">
+                      {log.error_type}
+                      {log.occurrence_count > 1 && (
+                        <span className="ml-2 text-xs font-mono text-orange-400">×{log.occurrence_count}</span>
+                      )}
+                    </p>
                     <p className="text-xs text-[var(--color-text-muted)] truncate">{log.message}</p>
                   </div>
                   <div className="text-xs font-mono text-[var(--color-text-muted)] truncate">
@@ -369,7 +377,7 @@ export default function ErrorMonitor() {
                     {log.module ? log.module.split('/').pop()?.replace('.py', '') : '-'}
                   </div>
                   <div className="text-xs text-[var(--color-text-muted)]">
-                    {timeAgo(log.created_at)}
+                    {timeAgo(log.last_seen_at || log.created_at)}
                   </div>
                   <div className="flex items-center gap-1">
                     {log.resolved ? (
@@ -414,8 +422,13 @@ export default function ErrorMonitor() {
                         <p className="text-sm">{log.user_id || '-'}</p>
                       </div>
                       <div>
-                        <p className="text-xs text-[var(--color-text-muted)] mb-1">Timestamp</p>
-                        <p className="text-sm">{new Date(log.created_at).toLocaleString()}</p>
+                        <p className="text-xs text-[var(--color-text-muted)] mb-1">
+                          {log.occurrence_count > 1 ? `First / last seen (${log.occurrence_count} times)` : 'Timestamp'}
+                        </p>
+                        <p className="text-sm">
+                          {new Date(log.created_at).toLocaleString()}
+                          {log.occurrence_count > 1 && ` – ${new Date(log.last_seen_at).toLocaleString()}`}
+                        </p>
                       </div>
                     </div>
 
@@ -12,6 +12,7 @@ interface ReportHistoryItem {
   report_type: string;
   report_name: string;
   file_format: string;
+  status: string;
   created_at: string;
 }
 
@@ -71,10 +72,17 @@ export default function Reports() {
       if (reportType === 'loan_statement') {
         params.application_id = parseInt(appIdInput.trim(), 10);
       }
-      const res = await reportsApi.generateReport(reportType, params);
-      // Decode and download
-      const csvContent = atob(res.data.file_data);
-      const blob = new Blob([csvContent], { type: 'text/csv' });
+      // Reports are built in the background; poll the job until it finishes
+      let job = (await reportsApi.generateReport(reportType, params)).data;
+      while (job.status === 'pending' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 1500));
+        job = (await reportsApi.getJob(job.id)).data;
+      }
+      if (job.status !== 'completed') {
+        throw new Error(job.error_message || 'Report generation failed');
+      }
+      const file = await reportsApi.downloadHistorical(job.id);
+      const blob = new Blob([file.data], { type: 'text/csv' });
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
@@ -195,12 +203,16 @@ export default function Reports() {
                       {new Date(item.created_at).toLocaleString()}
                     </td>
                     <td className="px-4 py-2">
-                      <button
-                        onClick={() => handleDownloadHistorical(item.id, item.report_type)}
-                        className="text-[var(--color-primary)] hover:text-[var(--color-primary-light)] text-xs"
-                      >
-                        <Download size={14} />
-                      </button>
+                      {item.status === 'completed' ? (
+                        <button
+                          onClick={() => handleDownloadHistorical(item.id, item.report_type)}
+                          className="text-[var(--color-primary)] hover:text-[var(--color-primary-light)] text-xs"
+                        >
+                          <Download size={14} />
+                        </button>
+                      ) : (
+                        <span className="capitalize text-xs text-[var(--color-text-muted)]">{item.status}</span>
+                      )}
                     </td>
                   </tr>
                 ))}